@@ -15,6 +15,9 @@ import psycopg2.extras
 import redis as sync_redis
 import redis.asyncio as aioredis
 
+from backend.engine.owner_activity import touch_owner
+from backend.engine.vitals import apply_vitals, world_state
+
 log = logging.getLogger("nx_api")
 
 # ============================================================
@@ -185,6 +188,22 @@ def execute(query, params=None):
             cur.execute(query, params)
 
 
+def with_current_vitals(devs):
+    """Dev rows with their vitals decayed to now (engine/vitals.py).
+
+    For responses only — nothing is written. Rows need ``status`` and
+    ``vitals_settled_at``; pass a single row or a list."""
+    rows = devs if isinstance(devs, list) else [devs]
+    if rows:
+        effects = world_state.cached("weekly")
+        if effects is None:
+            with get_db() as conn:
+                with conn.cursor() as cur:
+                    effects = world_state.effects(cur, "weekly")
+        apply_vitals(rows, effects)
+    return devs
+
+
 # ============================================================
 # WEBSOCKET BROADCAST
 # ============================================================
@@ -199,6 +218,19 @@ ws_clients = set()
 _WALLET_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
 
 
+def mark_owner_active(wallet: str):
+    """Record that ``wallet`` is using the terminal (owner_activity.touch_owner)
+    in its own short transaction. Call it from the routes the connected
+    wallet drives, after their ownership checks. Best-effort: a failure
+    is logged and never breaks the request."""
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                touch_owner(cur, wallet.lower())
+    except Exception as e:
+        log.warning(f"Owner activity not recorded for {wallet}: {e}")
+
+
 def validate_wallet(addr: str) -> str:
     """Validate Ethereum address format and return lowercased. Raises HTTPException on bad input."""
     from fastapi import HTTPException
@@ -225,16 +257,6 @@ async def broadcast(event_type, data):
 
 
 def get_active_event_effects(cur) -> dict:
-    """Get effects from the currently active weekly event, if any."""
-    cur.execute("""
-        SELECT effects FROM world_events
-        WHERE is_active = TRUE AND starts_at <= NOW() AND ends_at >= NOW()
-        ORDER BY starts_at DESC LIMIT 1
-    """)
-    row = cur.fetchone()
-    if not row:
-        return {}
-    effects = row["effects"]
-    if isinstance(effects, str):
-        effects = json.loads(effects)
-    return effects
+    """Get effects from the currently active event, if any (cached
+    process-wide — see engine/world_state.py; don't mutate)."""
+    return world_state.effects(cur)
@@ -14,6 +14,7 @@ from backend.api.deps import init_db_pool, close_db_pool, init_redis, close_redi
 from backend.api.middleware.correlation import CorrelationIdMiddleware
 from backend.api.routes import simulation, devs, protocols, ais, leaderboard, prompts, chat, players, shop, notifications, academy, sentinel, missions, streaks, achievements, admin, health, nxmarket
 from backend.api.ws.feed import router as ws_router
+from backend.engine.vitals import world_state
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("nx_api")
@@ -28,9 +29,16 @@ def _run_auto_migrations():
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS caffeine SMALLINT NOT NULL DEFAULT 50")
-                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS social_vitality SMALLINT NOT NULL DEFAULT 50")
-                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS knowledge SMALLINT NOT NULL DEFAULT 50")
+                # devs becomes a view over dev_profile + dev_runtime with
+                # backend/db/migration_dev_runtime.sql, which creates every
+                # devs column below itself — skip the ALTER TABLE devs steps.
+                cur.execute("SELECT to_regclass('dev_runtime') IS NULL AS devs_is_table")
+                devs_is_table = cur.fetchone()["devs_is_table"]
+                if devs_is_table:
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS caffeine SMALLINT NOT NULL DEFAULT 50")
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS social_vitality SMALLINT NOT NULL DEFAULT 50")
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS knowledge SMALLINT NOT NULL DEFAULT 50")
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS vitals_settled_at TIMESTAMPTZ NOT NULL DEFAULT NOW()")
                 # Tables that must exist before anything else
                 cur.execute("""
                     CREATE TABLE IF NOT EXISTS login_streaks (
@@ -299,14 +307,15 @@ def _run_auto_migrations():
                 """)
                 # devs — 2-phase commit sync status. Source of truth:
                 # backend/db/migration_devs_sync_status.sql
-                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS sync_status TEXT")
-                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS sync_tx_hash VARCHAR(66)")
-                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS sync_started_at TIMESTAMPTZ")
-                cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_devs_sync_status
-                        ON devs(sync_status, sync_started_at)
-                        WHERE sync_status IS NOT NULL
-                """)
+                if devs_is_table:
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS sync_status TEXT")
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS sync_tx_hash VARCHAR(66)")
+                    cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS sync_started_at TIMESTAMPTZ")
+                    cur.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_devs_sync_status
+                            ON devs(sync_status, sync_started_at)
+                            WHERE sync_status IS NOT NULL
+                    """)
                 # nxt_ledger — append-only economic ledger (Fase 3A).
                 # Source of truth: backend/db/migration_nxt_ledger.sql
                 cur.execute("""
@@ -505,7 +514,8 @@ def _run_auto_migrations():
                 # step clears the legacy values (Mentor, Troll, Copy Paste,
                 # Grinder, Steady, Balanced).
                 # NX-PHASE-2.2 Step A: drop legacy column.
-                cur.execute("ALTER TABLE devs DROP COLUMN IF EXISTS devs_burned")
+                if devs_is_table:
+                    cur.execute("ALTER TABLE devs DROP COLUMN IF EXISTS devs_burned")
                 # NX-PHASE-2.2 Step B: add 'exhausted' to dev_status_enum.
                 cur.execute("""
                     DO $$ BEGIN
@@ -698,6 +708,8 @@ async def lifespan(app: FastAPI):
     init_db_pool(minconn=5, maxconn=50)
     _run_auto_migrations()
     await init_redis()
+    world_state.start_listener()
+    world_state.publish()  # migrations may have seeded / renamed the launch event
     log.info("✅ NX Terminal API ready")
     yield
     log.info("🛑 NX Terminal API shutting down...")
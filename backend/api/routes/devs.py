@@ -5,7 +5,7 @@ import json
 import logging
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from backend.api.deps import fetch_one, fetch_all, get_db
+from backend.api.deps import fetch_one, fetch_all, get_db, with_current_vitals
 from backend.engine.dev_generator import generate_dev_data
 from backend.services.canonical.mint import (
     build_canonical_mint_data,
@@ -68,13 +68,14 @@ async def list_devs(
         "       last_action_type, last_action_detail, last_action_at,"
         "       last_message, minted_at,"
         "       pc_health, training_course, training_ends_at, last_raid_at,"
-        "       caffeine, social_vitality, knowledge"
+        "       caffeine, social_vitality, knowledge, vitals_settled_at"
         " FROM devs"
         " WHERE " + where +
         " ORDER BY " + order +
         " LIMIT %s OFFSET %s",
         params
     )
+    with_current_vitals(rows)
     for r in rows:
         r["is_idle"] = (r.get("energy") or 0) <= 0
     return rows
@@ -115,6 +116,15 @@ def _check_token_owner(token_id):
     return None
 
 
+def _on_conflict_token_id(cur):
+    """ON CONFLICT clause for the on-demand INSERT, so a concurrent first
+    load of the same dev is a no-op. Once migration_dev_runtime.sql has
+    turned devs into a view (which takes no ON CONFLICT) the view's
+    INSERT trigger skips an existing token_id itself."""
+    cur.execute("SELECT to_regclass('dev_runtime') IS NULL AS is_table")
+    return "ON CONFLICT (token_id) DO NOTHING" if cur.fetchone()["is_table"] else ""
+
+
 def _insert_dev_on_demand(token_id, owner):
     """Insert a Dev when the listener missed it. Identity comes from
     `nx.dev_canonical_traits` (Phase 2.2 Step 6); engine fields are
@@ -137,7 +147,7 @@ def _insert_dev_on_demand(token_id, owner):
             if mint is not None:
                 # Canonical-aware path (Phase 2.2 Step 6).
                 start_balance = STARTING_BALANCE.get(mint.rarity, 2000)
-                cur.execute("""
+                cur.execute(f"""
                     INSERT INTO devs (
                         token_id, name, owner_address, archetype, corporation, rarity_tier,
                         personality_seed,
@@ -155,7 +165,7 @@ def _insert_dev_on_demand(token_id, owner):
                         %s, %s,
                         'active', NOW(), NOW()
                     )
-                    ON CONFLICT (token_id) DO NOTHING
+                    {_on_conflict_token_id(cur)}
                 """, (
                     token_id,
                     mint.name, owner.lower(),
@@ -195,7 +205,7 @@ def _insert_dev_on_demand(token_id, owner):
                 return row is not None
             data = generate_dev_data(token_id, check_name_exists=check_name)
             start_balance = STARTING_BALANCE.get(data["rarity"], 2000)
-            cur.execute("""
+            cur.execute(f"""
                 INSERT INTO devs (
                     token_id, name, owner_address, archetype, corporation, rarity_tier,
                     personality_seed,
@@ -213,7 +223,7 @@ def _insert_dev_on_demand(token_id, owner):
                     %s, %s,
                     'active', NOW(), NOW()
                 )
-                ON CONFLICT (token_id) DO NOTHING
+                {_on_conflict_token_id(cur)}
             """, (
                 token_id,
                 data["name"], owner.lower(),
@@ -246,6 +256,7 @@ async def get_dev(token_id: int, owner: Optional[str] = None):
     Pass ?owner=0x... to skip the on-chain ownerOf check (frontend already verified)."""
     dev = fetch_one("SELECT * FROM devs WHERE token_id = %s", (token_id,))
     if dev:
+        with_current_vitals(dev)
         dev["is_idle"] = (dev.get("energy") or 0) <= 0
         return dev
 
@@ -349,6 +360,7 @@ async def get_dev_metadata(token_id: int):
     dev = fetch_one("SELECT * FROM devs WHERE token_id = %s", (token_id,))
     if not dev:
         raise HTTPException(404, "Token not found")
+    with_current_vitals(dev)
 
     # Visual traits (conditional — only include if present).
     # Post Phase 2.2 alignment, species is one of {Bunny, Zombie, Robot, Ghost}
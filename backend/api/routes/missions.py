@@ -7,7 +7,8 @@ import uuid
 from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from backend.api.deps import fetch_one, fetch_all, get_db, validate_wallet
+from backend.api.deps import fetch_one, fetch_all, get_db, mark_owner_active, validate_wallet
+from backend.engine.vitals import apply_vitals, current_event_effects, settle_devs
 from backend.services.logging_helpers import log_info
 from backend.services.admin_log import log_event as admin_log_event
 from backend.services.ledger import (
@@ -60,11 +61,11 @@ async def get_available_missions(wallet: str = Query(...)):
             cur.execute(
                 "SELECT token_id, name, archetype, corporation, rarity_tier, ipfs_hash, "
                 "       stat_coding, stat_hacking, stat_trading, stat_social, stat_endurance, stat_luck, "
-                "       energy, max_energy, pc_health, balance_nxt "
+                "       energy, max_energy, pc_health, balance_nxt, status, vitals_settled_at "
                 "FROM devs WHERE LOWER(owner_address) = %s AND status = 'active'",
                 (addr,)
             )
-            available_devs = cur.fetchall()
+            available_devs = apply_vitals(cur.fetchall(), current_event_effects(cur))
 
             # All eligible missions
             cur.execute(
@@ -195,6 +196,10 @@ async def start_mission(req: MissionStartRequest):
             if cur.fetchone():
                 raise HTTPException(400, "You already have this mission active")
 
+            # Vitals freeze while on mission: settle the time spent active
+            # before the status changes.
+            settle_devs(cur, req.dev_token_ids)
+
             # Validate each dev
             devs = []
             for dev_id in req.dev_token_ids:
@@ -272,6 +277,7 @@ async def start_mission(req: MissionStartRequest):
                                  "duration_hours": mission["duration_hours"], "group_id": group_id}))
                 )
 
+    mark_owner_active(addr)
     dev_names = ", ".join(d["name"] for d in devs)
     return {
         "success": True,
@@ -332,9 +338,11 @@ async def claim_mission(req: MissionClaimRequest):
             for i, row in enumerate(group_rows):
                 dev_reward = reward_per_dev + (1 if i < remainder else 0)
 
-                # Credit reward to dev and return to active
+                # Credit reward to dev and return to active (vitals were
+                # frozen on the mission and restart from now)
                 cur.execute(
-                    "UPDATE devs SET balance_nxt = balance_nxt + %s, total_earned = total_earned + %s, status = 'active' "
+                    "UPDATE devs SET balance_nxt = balance_nxt + %s, total_earned = total_earned + %s, status = 'active', "
+                    "vitals_settled_at = NOW() "
                     "WHERE token_id = %s RETURNING name, archetype",
                     (dev_reward, dev_reward, row["dev_token_id"])
                 )
@@ -449,6 +457,7 @@ async def abandon_mission(req: MissionAbandonRequest):
 
             for row in group_rows:
                 cur.execute("UPDATE player_missions SET status = 'abandoned' WHERE id = %s", (row["id"],))
-                cur.execute("UPDATE devs SET status = 'active' WHERE token_id = %s", (row["dev_token_id"],))
+                cur.execute("UPDATE devs SET status = 'active', vitals_settled_at = NOW() WHERE token_id = %s",
+                            (row["dev_token_id"],))
 
     return {"success": True, "message": f"Mission abandoned. {len(group_rows)} dev(s) returned.", "devs_returned": len(group_rows)}
@@ -3,7 +3,7 @@
 import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from backend.api.deps import fetch_one, fetch_all, get_db
+from backend.api.deps import fetch_one, fetch_all, get_db, mark_owner_active
 
 log = logging.getLogger("nx_api")
 router = APIRouter()
@@ -81,6 +81,9 @@ async def submit_ticket(req: TicketRequest):
 async def get_notifications(wallet: str, unread: bool = False, limit: int = 50):
     """Get notifications for a player wallet."""
     wallet = wallet.lower()
+    # Polled for the connected wallet: a returning owner's catch-up
+    # notification lands before the read below.
+    mark_owner_active(wallet)
     if unread:
         return fetch_all(
             """SELECT id, type, title, body, read, dev_id, created_at
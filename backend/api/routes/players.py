@@ -5,7 +5,9 @@ from datetime import date, timedelta
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 from typing import Optional
-from backend.api.deps import fetch_one, fetch_all, execute, get_db, validate_wallet
+from backend.api.deps import (
+    fetch_one, fetch_all, execute, get_db, mark_owner_active, validate_wallet, with_current_vitals,
+)
 from backend.services.logging_helpers import log_info, log_warning
 from backend.services.admin_log import log_event as admin_log_event
 from backend.services.event_parser import parse_nxt_claimed_event
@@ -135,10 +137,12 @@ async def get_player(wallet: str):
 
     devs = fetch_all(
         """SELECT token_id, name, archetype, rarity_tier, energy, mood,
-                  location, balance_nxt, reputation, status, last_action_type
+                  location, balance_nxt, reputation, status, last_action_type,
+                  vitals_settled_at
            FROM devs WHERE owner_address = %s ORDER BY balance_nxt DESC""",
         (addr,)
     )
+    with_current_vitals(devs)
 
     # VIP tester welcome (one-time)
     try:
@@ -377,6 +381,8 @@ async def get_wallet_summary(wallet: str):
     )
     if not player:
         raise HTTPException(404, "Player not found")
+    # The wallet window polls this for the connected wallet.
+    mark_owner_active(player["wallet_address"])
 
     devs = fetch_all(
         """SELECT token_id, name, rarity_tier, balance_nxt, total_earned, total_spent, status
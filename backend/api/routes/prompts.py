@@ -2,8 +2,9 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from backend.api.deps import fetch_one, fetch_all, get_db, validate_wallet
+from backend.api.deps import fetch_one, fetch_all, get_db, mark_owner_active, validate_wallet
 from backend.api.rate_limit import prompt_limiter
+from backend.engine import prompt_wake
 
 router = APIRouter()
 
@@ -17,7 +18,8 @@ class PromptRequest(BaseModel):
 @router.post("")
 async def send_prompt(req: PromptRequest):
     """
-    Send a prompt to your dev. The engine picks it up on the next cycle.
+    Send a prompt to your dev. The dev is made due now and the engine
+    woken (prompt_wake), so it answers within seconds.
     Validates ownership before accepting.
     """
     # Validate wallet format
@@ -53,6 +55,9 @@ async def send_prompt(req: PromptRequest):
                 (addr, req.dev_id, req.prompt_text[:500])
             )
             result = cur.fetchone()
+            prompt_wake.wake_dev(cur, req.dev_id)
+    prompt_wake.publish(req.dev_id)
+    mark_owner_active(addr)
 
     return {
         "id": result["id"],
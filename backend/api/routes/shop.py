@@ -8,8 +8,12 @@ import time
 from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from backend.api.deps import fetch_one, fetch_all, get_db, validate_wallet, get_active_event_effects
+from backend.api.deps import (
+    fetch_one, fetch_all, get_db, validate_wallet, get_active_event_effects, mark_owner_active,
+    with_current_vitals,
+)
 from backend.api.rate_limit import shop_limiter
+from backend.engine.vitals import settle_devs
 from backend.services.logging_helpers import log_info
 from backend.services.admin_log import log_event as admin_log_event
 from backend.services.ledger import (
@@ -266,6 +270,9 @@ async def buy_item(req: PurchaseRequest):
 
     with get_db() as conn:
         with conn.cursor() as cur:
+            # Decay the stored vitals to now before the item adds to them
+            # (lazy vitals, engine/vitals.py).
+            settle_devs(cur, [req.target_dev_id])
             cur.execute(
                 "SELECT token_id, owner_address, balance_nxt, name, energy, max_energy, training_course, bugs_shipped, social_vitality, knowledge FROM devs WHERE token_id = %s FOR UPDATE",
                 (req.target_dev_id,)
@@ -391,6 +398,7 @@ async def buy_item(req: PurchaseRequest):
             cur.execute("SELECT * FROM devs WHERE token_id = %s", (req.target_dev_id,))
             updated_dev = cur.fetchone()
 
+    mark_owner_active(addr)
     return {
         "purchase_id": purchase["id"],
         "item": req.item_id,
@@ -416,6 +424,7 @@ async def graduate_training(req: GraduateRequest):
 
     with get_db() as conn:
         with conn.cursor() as cur:
+            settle_devs(cur, [req.dev_id])   # before the +knowledge bonus
             cur.execute(
                 "SELECT token_id, owner_address, training_course, training_ends_at, name FROM devs WHERE token_id = %s FOR UPDATE",
                 (req.dev_id,)
@@ -507,6 +516,35 @@ def _resolve_mega_name(addr: str) -> str:
         return fallback
 
 
+_RAID_TARGET_SQL = (
+    "SELECT token_id, name, corporation, balance_nxt, owner_address FROM devs "
+    "WHERE corporation != %s AND status = 'active' AND balance_nxt > 0 "
+    "AND token_id {op} %s ORDER BY token_id LIMIT 1 FOR UPDATE"
+)
+
+
+def _pick_raid_target(cur, corporation: str):
+    """Random eligible target from another corporation, row-locked.
+
+    Replaces ``ORDER BY RANDOM() LIMIT 1`` (scan + sort of every dev per
+    raid) with a random pivot on the token_id primary key: first
+    eligible dev at or after the pivot, wrapping around to the start.
+    Two index probes instead of a full sort. Devs right after a run of
+    ineligible ones are a little more likely to be hit — fine for a
+    raid roll."""
+    cur.execute("SELECT MIN(token_id) AS lo, MAX(token_id) AS hi FROM devs")
+    bounds = cur.fetchone()
+    if not bounds or bounds["lo"] is None:
+        return None
+    pivot = random.randint(bounds["lo"], bounds["hi"])
+    cur.execute(_RAID_TARGET_SQL.format(op=">="), (corporation, pivot))
+    target = cur.fetchone()
+    if target is None:
+        cur.execute(_RAID_TARGET_SQL.format(op="<"), (corporation, pivot))
+        target = cur.fetchone()
+    return target
+
+
 @router.post("/hack-mainframe")
 async def hack_mainframe(req: HackRequest):
     """Hack the corporate mainframe. Reward from treasury."""
@@ -515,7 +553,8 @@ async def hack_mainframe(req: HackRequest):
 
     with get_db() as conn:
         with conn.cursor() as cur:
-            # Lock attacker
+            # Lock attacker, its social_vitality decayed to now
+            settle_devs(cur, [req.attacker_dev_id])
             cur.execute(
                 "SELECT token_id, owner_address, balance_nxt, name, corporation, stat_hacking, last_raid_at, social_vitality, archetype FROM devs WHERE token_id = %s FOR UPDATE",
                 (req.attacker_dev_id,)
@@ -697,6 +736,7 @@ async def hack_mainframe(req: HackRequest):
         cost=result.get("cost"),
         amount_nxt=result.get("stolen"),
     )
+    mark_owner_active(addr)
     return result
 
 
@@ -708,7 +748,8 @@ async def hack_player(req: HackRequest):
 
     with get_db() as conn:
         with conn.cursor() as cur:
-            # Lock attacker
+            # Lock attacker, its social_vitality decayed to now
+            settle_devs(cur, [req.attacker_dev_id])
             cur.execute(
                 "SELECT token_id, owner_address, balance_nxt, name, corporation, stat_hacking, last_raid_at, social_vitality, archetype FROM devs WHERE token_id = %s FOR UPDATE",
                 (req.attacker_dev_id,)
@@ -754,11 +795,7 @@ async def hack_player(req: HackRequest):
                 })
 
             # Find random target from another corporation
-            cur.execute(
-                "SELECT token_id, name, corporation, balance_nxt, owner_address FROM devs WHERE corporation != %s AND status = 'active' AND balance_nxt > 0 ORDER BY RANDOM() LIMIT 1 FOR UPDATE",
-                (attacker["corporation"],)
-            )
-            target = cur.fetchone()
+            target = _pick_raid_target(cur, attacker["corporation"])
             if not target:
                 raise HTTPException(400, detail={
                     "error": "no_targets",
@@ -982,6 +1019,7 @@ async def hack_player(req: HackRequest):
         cost=result.get("cost"),
         amount_nxt=result.get("stolen"),
     )
+    mark_owner_active(addr)
     return result
 
 
@@ -1193,7 +1231,7 @@ async def fund_dev(req: FundRequest):
         "dev": dev["name"],
         "amount": credit_amount,
         "new_balance": updated_dev["balance_nxt"] if updated_dev else None,
-        "updated_dev": dict(updated_dev) if updated_dev else None,
+        "updated_dev": with_current_vitals(dict(updated_dev)) if updated_dev else None,
     }
 
 
@@ -1341,6 +1379,7 @@ async def transfer_nxt(req: TransferRequest):
         to_dev_token_id=req.to_dev_token_id,
         amount_nxt=req.amount,
     )
+    with_current_vitals(list(updated_map.values()))
     return {
         "status": "transferred",
         "amount": req.amount,
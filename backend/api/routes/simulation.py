@@ -5,6 +5,7 @@ import logging
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Request
 from backend.api.deps import fetch_one, fetch_all, get_db, validate_wallet
+from backend.engine.vitals import current_energy_sql, sim_clock
 from backend.services.logging_helpers import log_info
 from backend.services.admin_log import log_event as admin_log_event
 
@@ -23,17 +24,18 @@ async def get_simulation_state():
 @router.get("/stats")
 async def get_simulation_stats():
     """Get aggregate simulation statistics."""
-    stats = fetch_one("""
+    # Stored energy is a snapshot (lazy vitals): average the decayed value.
+    stats = fetch_one(f"""
         SELECT
             COUNT(*) as total_devs,
             COUNT(*) FILTER (WHERE status = 'active') as active_devs,
             COALESCE(SUM(balance_nxt), 0) as total_nxt_in_wallets,
             COALESCE(SUM(protocols_created), 0) as total_protocols,
             COALESCE(SUM(ais_created), 0) as total_ais,
-            COALESCE(AVG(energy), 0) as avg_energy,
+            COALESCE(AVG({current_energy_sql()}), 0) as avg_energy,
             COALESCE(AVG(reputation), 0) as avg_reputation
         FROM devs
-    """)
+    """, {"now": sim_clock.now()})
     protocol_count = fetch_one("SELECT COUNT(*) as c FROM protocols WHERE status = 'active'")
     ai_count = fetch_one("SELECT COUNT(*) as c FROM absurd_ais")
 
@@ -0,0 +1,334 @@
+-- Migration: split the hot simulation state out of devs
+--
+-- Context: devs is a wide row (identity, traits, stats, sync status,
+-- vitals, counters, last_message …) and the engine rewrites it several
+-- times per action — every rewrite copies the whole row into WAL and a
+-- new heap tuple, and every index on an updated column (schedule,
+-- balance, reputation, location) gets a new entry too. The columns the
+-- engine touches every cycle now live in a narrow table:
+--
+--   dev_profile  identity, traits, stats, training, sync_* — rarely
+--                written (the old devs table, renamed: its primary key,
+--                owner / archetype / corporation / sync indexes and every
+--                foreign key pointing at devs(token_id) come along)
+--   dev_runtime  energy, vitals, balance, counters, last_action_* /
+--                last_message, next_cycle_at, status, updated_at —
+--                fillfactor 70 and no index besides the primary key, so
+--                an engine update stays on its page as a HOT update
+--                (no index writes) and VACUUM has less to do
+--   devs         a view joining the two, with the old column defaults
+--                and INSTEAD OF INSERT / UPDATE / DELETE triggers, so
+--                every existing query, route and script keeps working
+--
+-- next_cycle_at, balance_nxt, reputation and location are deliberately
+-- left unindexed: any index on a column an update changes rules out
+-- HOT. The engine finds due devs through its in-process due queue
+-- (token_id lookups on the primary key, NX_ENGINE_DUE_QUEUE, on by
+-- default) and the reconcile / backlog scans read the narrow table
+-- once a minute; leaderboards sort ~35k narrow rows.
+--
+-- The engine detects the split on startup (engine.use_dev_layout) and
+-- writes the tick flush, salary and vitals settle straight to
+-- dev_runtime; with FOR UPDATE OF dev_runtime its due-dev claims no
+-- longer lock the profile row. Everything else goes through the view.
+--
+-- Writes through the view: INSERT skips a token_id that already exists
+-- (a view takes no ON CONFLICT, so the trigger does what ON CONFLICT
+-- (token_id) DO NOTHING did on the table). UPDATE applies numeric
+-- columns as deltas (col = col + (NEW - OLD)) and other columns only
+-- when they changed, and only touches dev_profile when a profile
+-- column changed, so an API write never clobbers a concurrent engine
+-- flush. A view has no row re-check: a read-modify-write that must see
+-- the latest row (shop, hack, fund, missions) locks it first with
+-- SELECT … FOR UPDATE, as those routes already do. token_id is
+-- immutable through the view.
+--
+-- Adding a column later: ALTER TABLE dev_profile / dev_runtime, then
+-- SELECT rebuild_devs_view(); — new columns are appended to the view.
+--
+-- Run manually on Render, once, after align_existing_devs.py:
+--   psql $DATABASE_URL -v ON_ERROR_STOP=1 -f backend/db/migration_dev_runtime.sql
+-- It takes an exclusive lock on devs for the copy (seconds at ~35k
+-- rows); stop the engine first. The engine / API auto-migrations skip
+-- their ALTER TABLE devs steps once devs is a view, so the columns they
+-- add are created here first.
+
+BEGIN;
+
+SET search_path TO nx;
+
+DO $$
+BEGIN
+    IF to_regclass('dev_runtime') IS NOT NULL THEN
+        RAISE EXCEPTION 'dev_runtime already exists: migration_dev_runtime.sql was already applied';
+    END IF;
+END $$;
+
+-- Columns and indexes the auto-migrations would add to devs later.
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS caffeine SMALLINT NOT NULL DEFAULT 50;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS social_vitality SMALLINT NOT NULL DEFAULT 50;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS knowledge SMALLINT NOT NULL DEFAULT 50;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS vitals_settled_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS bugs_fixed INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS pc_health SMALLINT NOT NULL DEFAULT 100;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS training_course VARCHAR(30) DEFAULT NULL;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS training_ends_at TIMESTAMPTZ DEFAULT NULL;
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS last_raid_at TIMESTAMPTZ DEFAULT NULL;
+ALTER TABLE devs
+    ADD COLUMN IF NOT EXISTS sync_status     TEXT,
+    ADD COLUMN IF NOT EXISTS sync_tx_hash    VARCHAR(66),
+    ADD COLUMN IF NOT EXISTS sync_started_at TIMESTAMPTZ;
+CREATE INDEX IF NOT EXISTS idx_devs_sync_status
+    ON devs(sync_status, sync_started_at)
+    WHERE sync_status IS NOT NULL;
+ALTER TABLE devs DROP COLUMN IF EXISTS devs_burned;
+
+LOCK TABLE devs IN ACCESS EXCLUSIVE MODE;
+
+-- Recreated below on top of the devs view.
+DROP MATERIALIZED VIEW IF EXISTS leaderboard;
+DROP VIEW IF EXISTS protocol_market;
+DROP VIEW IF EXISTS ai_lab;
+
+-- Same types, defaults, NOT NULLs and CHECKs as devs (whatever the
+-- live table has), minus the profile columns.
+CREATE TABLE dev_runtime (LIKE devs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    WITH (fillfactor = 70, autovacuum_vacuum_scale_factor = 0.05);
+
+DO $$
+DECLARE
+    hot TEXT[] := ARRAY[
+        'energy', 'max_energy', 'mood', 'location', 'balance_nxt', 'reputation', 'status',
+        'day', 'coffee_count', 'lines_of_code', 'bugs_shipped', 'bugs_fixed', 'hours_since_sleep',
+        'protocols_created', 'protocols_failed', 'ais_created',
+        'total_earned', 'total_spent', 'total_invested',
+        'code_reviews_done', 'bugs_found', 'cycles_active',
+        'last_action_type', 'last_action_detail', 'last_action_at',
+        'last_message', 'last_message_channel',
+        'caffeine', 'social_vitality', 'knowledge', 'vitals_settled_at',
+        'pc_health', 'last_raid_at',
+        'next_cycle_at', 'cycle_interval_sec', 'updated_at'
+    ];
+    col  TEXT;
+    cols TEXT;
+BEGIN
+    FOR col IN
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = 'dev_runtime'::regclass AND attnum > 0 AND NOT attisdropped
+          AND attname <> 'token_id' AND attname <> ALL(hot)
+    LOOP
+        EXECUTE format('ALTER TABLE dev_runtime DROP COLUMN %I', col);
+    END LOOP;
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO cols
+    FROM pg_attribute
+    WHERE attrelid = 'dev_runtime'::regclass AND attnum > 0 AND NOT attisdropped;
+    EXECUTE format('INSERT INTO dev_runtime (%1$s) SELECT %1$s FROM devs', cols);
+
+    -- Moved columns leave the profile (with their indexes and CHECKs).
+    FOR col IN
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = 'dev_runtime'::regclass AND attnum > 0 AND NOT attisdropped
+          AND attname <> 'token_id'
+    LOOP
+        EXECUTE format('ALTER TABLE devs DROP COLUMN %I', col);
+    END LOOP;
+END $$;
+
+ALTER TABLE devs RENAME TO dev_profile;
+ALTER TABLE dev_runtime ADD CONSTRAINT dev_runtime_pkey PRIMARY KEY (token_id);
+ALTER TABLE dev_runtime ADD CONSTRAINT dev_runtime_token_id_fkey
+    FOREIGN KEY (token_id) REFERENCES dev_profile(token_id) ON DELETE CASCADE;
+
+-- updated_at moved with the runtime state.
+DROP TRIGGER IF EXISTS trg_devs_updated ON dev_profile;
+CREATE TRIGGER trg_dev_runtime_updated
+    BEFORE UPDATE ON dev_runtime
+    FOR EACH ROW EXECUTE FUNCTION update_timestamp();
+
+
+-- (Re)creates the devs view and its write triggers from the current
+-- columns of dev_profile and dev_runtime. Existing view columns keep
+-- their position; new ones are appended.
+CREATE OR REPLACE FUNCTION rebuild_devs_view()
+RETURNS void AS $fn$
+DECLARE
+    s          TEXT := current_schema();
+    profile    REGCLASS := format('%I.dev_profile', s)::regclass;
+    runtime    REGCLASS := format('%I.dev_runtime', s)::regclass;
+    view_cols  TEXT;
+    p_cols     TEXT[];
+    r_cols     TEXT[];
+    p_numeric  TEXT[];
+    r_numeric  TEXT[];
+    p_set      TEXT;
+    r_set      TEXT;
+    d          RECORD;
+BEGIN
+    SELECT string_agg(format('%s.%I', c.src, c.name), ', '
+                      ORDER BY c.view_pos NULLS LAST, c.src, c.own_pos)
+      INTO view_cols
+    FROM (
+        SELECT a.attname AS name, t.src, a.attnum AS own_pos, v.attnum AS view_pos
+        FROM (VALUES ('p', profile), ('r', runtime)) AS t(src, rel)
+        JOIN pg_attribute a ON a.attrelid = t.rel AND a.attnum > 0 AND NOT a.attisdropped
+        LEFT JOIN pg_attribute v ON v.attrelid = to_regclass(format('%I.devs', s))
+                                AND v.attname = a.attname AND NOT v.attisdropped
+        WHERE NOT (t.src = 'r' AND a.attname = 'token_id')
+    ) AS c;
+
+    EXECUTE format('CREATE OR REPLACE VIEW %I.devs AS SELECT %s FROM %s p JOIN %s r ON r.token_id = p.token_id',
+                   s, view_cols, profile, runtime);
+
+    FOR d IN
+        SELECT a.attname, pg_get_expr(ad.adbin, ad.adrelid) AS expr
+        FROM pg_attrdef ad
+        JOIN pg_attribute a ON a.attrelid = ad.adrelid AND a.attnum = ad.adnum
+        WHERE ad.adrelid IN (profile, runtime) AND NOT a.attisdropped
+    LOOP
+        EXECUTE format('ALTER VIEW %I.devs ALTER COLUMN %I SET DEFAULT %s', s, d.attname, d.expr);
+    END LOOP;
+
+    SELECT array_agg(attname::text ORDER BY attnum),
+           array_agg(attname::text) FILTER (WHERE atttypid IN ('int2'::regtype, 'int4'::regtype,
+                                                                 'int8'::regtype, 'numeric'::regtype))
+      INTO p_cols, p_numeric
+    FROM pg_attribute
+    WHERE attrelid = profile AND attnum > 0 AND NOT attisdropped AND attname <> 'token_id';
+    SELECT array_agg(attname::text ORDER BY attnum),
+           array_agg(attname::text) FILTER (WHERE atttypid IN ('int2'::regtype, 'int4'::regtype,
+                                                                 'int8'::regtype, 'numeric'::regtype))
+      INTO r_cols, r_numeric
+    FROM pg_attribute
+    WHERE attrelid = runtime AND attnum > 0 AND NOT attisdropped AND attname <> 'token_id';
+
+    -- Numbers move by the caller's delta, everything else is replaced
+    -- only when the caller changed it.
+    SELECT string_agg(CASE WHEN c = ANY(COALESCE(p_numeric, '{}'))
+                THEN format('%1$I = CASE WHEN NEW.%1$I IS NOT DISTINCT FROM OLD.%1$I THEN %1$I'
+                            ' WHEN NEW.%1$I IS NULL OR OLD.%1$I IS NULL OR %1$I IS NULL THEN NEW.%1$I'
+                            ' ELSE %1$I + (NEW.%1$I - OLD.%1$I) END', c)
+                ELSE format('%1$I = CASE WHEN NEW.%1$I IS DISTINCT FROM OLD.%1$I THEN NEW.%1$I ELSE %1$I END', c)
+           END, ', ')
+      INTO p_set FROM unnest(p_cols) AS c;
+    SELECT string_agg(CASE WHEN c = ANY(COALESCE(r_numeric, '{}'))
+                THEN format('%1$I = CASE WHEN NEW.%1$I IS NOT DISTINCT FROM OLD.%1$I THEN %1$I'
+                            ' WHEN NEW.%1$I IS NULL OR OLD.%1$I IS NULL OR %1$I IS NULL THEN NEW.%1$I'
+                            ' ELSE %1$I + (NEW.%1$I - OLD.%1$I) END', c)
+                ELSE format('%1$I = CASE WHEN NEW.%1$I IS DISTINCT FROM OLD.%1$I THEN NEW.%1$I ELSE %1$I END', c)
+           END, ', ')
+      INTO r_set FROM unnest(r_cols) AS c;
+
+    EXECUTE format($body$
+        CREATE OR REPLACE FUNCTION %1$I.devs_view_write()
+        RETURNS TRIGGER AS $trg$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                -- As ON CONFLICT (token_id) DO NOTHING on the old table:
+                -- a concurrent insert of the same dev is skipped.
+                INSERT INTO %2$s (token_id, %3$s) VALUES (NEW.token_id, %4$s)
+                ON CONFLICT (token_id) DO NOTHING;
+                IF NOT FOUND THEN
+                    RETURN NULL;
+                END IF;
+                INSERT INTO %5$s (token_id, %6$s) VALUES (NEW.token_id, %7$s)
+                RETURNING %6$s INTO %7$s;
+                RETURN NEW;
+            ELSIF TG_OP = 'UPDATE' THEN
+                IF NEW.token_id IS DISTINCT FROM OLD.token_id THEN
+                    RAISE EXCEPTION 'devs.token_id cannot be changed';
+                END IF;
+                IF ROW(%4$s) IS DISTINCT FROM ROW(%8$s) THEN
+                    UPDATE %2$s SET %9$s WHERE token_id = OLD.token_id
+                    RETURNING %3$s INTO %4$s;
+                    UPDATE %5$s SET %10$s WHERE token_id = OLD.token_id
+                    RETURNING %6$s INTO %7$s;
+                ELSIF ROW(%7$s) IS DISTINCT FROM ROW(%11$s) THEN
+                    UPDATE %5$s SET %10$s WHERE token_id = OLD.token_id
+                    RETURNING %6$s INTO %7$s;
+                END IF;
+                RETURN NEW;
+            ELSE
+                DELETE FROM %2$s WHERE token_id = OLD.token_id;
+                RETURN OLD;
+            END IF;
+        END;
+        $trg$ LANGUAGE plpgsql
+        $body$,
+        s, profile,
+        (SELECT string_agg(quote_ident(c), ', ') FROM unnest(p_cols) AS c),
+        (SELECT string_agg('NEW.' || quote_ident(c), ', ') FROM unnest(p_cols) AS c),
+        runtime,
+        (SELECT string_agg(quote_ident(c), ', ') FROM unnest(r_cols) AS c),
+        (SELECT string_agg('NEW.' || quote_ident(c), ', ') FROM unnest(r_cols) AS c),
+        (SELECT string_agg('OLD.' || quote_ident(c), ', ') FROM unnest(p_cols) AS c),
+        p_set, r_set,
+        (SELECT string_agg('OLD.' || quote_ident(c), ', ') FROM unnest(r_cols) AS c));
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_devs_view_write ON %I.devs', s);
+    EXECUTE format('CREATE TRIGGER trg_devs_view_write INSTEAD OF INSERT OR UPDATE OR DELETE ON %I.devs'
+                   ' FOR EACH ROW EXECUTE FUNCTION %I.devs_view_write()', s, s);
+END;
+$fn$ LANGUAGE plpgsql;
+
+SELECT rebuild_devs_view();
+
+
+-- The views schema.sql defines over devs, unchanged.
+CREATE MATERIALIZED VIEW leaderboard AS
+SELECT
+    d.token_id,
+    d.name,
+    d.archetype,
+    d.corporation,
+    d.owner_address,
+    d.balance_nxt,
+    d.reputation,
+    d.protocols_created,
+    d.ais_created,
+    d.rarity_tier,
+    ROW_NUMBER() OVER (ORDER BY d.balance_nxt DESC) as rank_balance,
+    ROW_NUMBER() OVER (ORDER BY d.reputation DESC) as rank_reputation
+FROM devs d
+WHERE d.status = 'active'
+ORDER BY d.balance_nxt DESC;
+
+CREATE UNIQUE INDEX idx_leaderboard_token ON leaderboard(token_id);
+
+CREATE VIEW protocol_market AS
+SELECT
+    p.id,
+    p.name,
+    p.description,
+    p.code_quality,
+    p.value,
+    p.investor_count,
+    p.total_invested,
+    p.status,
+    d.name as creator_name,
+    d.archetype as creator_archetype,
+    p.created_at
+FROM protocols p
+JOIN devs d ON d.token_id = p.creator_dev_id
+WHERE p.status = 'active'
+ORDER BY p.value DESC;
+
+CREATE VIEW ai_lab AS
+SELECT
+    a.id,
+    a.name,
+    a.description,
+    a.vote_count,
+    a.weighted_votes,
+    a.reward_tier,
+    d.name as creator_name,
+    d.archetype as creator_archetype,
+    a.created_at
+FROM absurd_ais a
+JOIN devs d ON d.token_id = a.creator_dev_id
+ORDER BY a.weighted_votes DESC;
+
+ANALYZE dev_profile;
+ANALYZE dev_runtime;
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- Migration: engine sharding — lease table + singleton cron claims
+--
+-- Context: several engine nodes can run the simulation at once, each
+-- owning the devs with token_id % NX_ENGINE_SHARDS in its shard set.
+-- Shard ownership, node liveness and the cron leader are leases in
+-- engine_leases (renewed every ttl/3, taken over once expired).
+-- engine_cron_runs records the last claimed run of each singleton cron
+-- so a new leader never re-runs salary for an interval already paid.
+--
+-- Run manually on Render. The engine also auto-creates these tables on
+-- startup (see engine.py auto-migrations).
+
+SET search_path TO nx;
+
+CREATE TABLE IF NOT EXISTS engine_leases (
+    name         TEXT PRIMARY KEY,
+    holder       TEXT NOT NULL,
+    acquired_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at   TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS engine_cron_runs (
+    name         TEXT PRIMARY KEY,
+    last_run_at  TIMESTAMPTZ NOT NULL,
+    holder       TEXT NOT NULL DEFAULT ''
+);
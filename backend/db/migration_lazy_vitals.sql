@@ -0,0 +1,15 @@
+-- Migration: lazy vitals — devs.vitals_settled_at
+--
+-- Context: the hourly salary cron used to decay energy, pc_health,
+-- caffeine, social_vitality and knowledge (and ship bugs) on every
+-- active dev. The vitals are now a snapshot as of vitals_settled_at and
+-- the current values are a closed form of the hours since then
+-- (backend/engine/vitals.py), written back only when a dev is touched.
+-- Existing rows start settled at migration time.
+--
+-- Run manually on Render. The engine and the API also add the column
+-- on startup (auto-migrations).
+
+SET search_path TO nx;
+
+ALTER TABLE devs ADD COLUMN IF NOT EXISTS vitals_settled_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
@@ -161,6 +161,7 @@ CREATE TABLE devs (
     caffeine            SMALLINT NOT NULL DEFAULT 50,
     social_vitality     SMALLINT NOT NULL DEFAULT 50,
     knowledge           SMALLINT NOT NULL DEFAULT 50,
+    vitals_settled_at   TIMESTAMPTZ NOT NULL DEFAULT NOW(),  -- vitals above are as of this hour (engine/vitals.py)
 
     -- Game mechanics
     pc_health           SMALLINT NOT NULL DEFAULT 100,
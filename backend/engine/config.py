@@ -4,6 +4,7 @@ NX TERMINAL: PROTOCOL WARS — Configuration
 
 import math
 import os
+import socket
 
 # ============================================================
 # DATABASE
@@ -16,6 +17,8 @@ DB_PASS = os.getenv("NX_DB_PASS", "postgres")
 DB_SCHEMA = "nx"
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# External Render hostnames (*.render.com) need SSL; internal ones don't.
+DB_SSLMODE = "require" if "render.com" in DB_HOST else "prefer"
 
 # ============================================================
 # SIMULATION
@@ -25,9 +28,45 @@ MINT_PRICE_MON = 0.0025
 MAX_PER_WALLET = 20
 
 # Scheduling
-SCHEDULER_INTERVAL_SEC = 1       # Check for due devs every second
+SCHEDULER_INTERVAL_SEC = 1       # Retry delay after errors / idle poll without the due queue
 SCHEDULER_BATCH_SIZE = 500       # Max devs per scheduler tick
-WORKER_THREADS = 4               # Parallel workers
+# A tick claims, runs and commits its batch this many devs at a time,
+# bounding how long it holds row locks against the API's FOR UPDATE
+# paths. Kept under 64 so a micro-batch's per-dev savepoints fit
+# Postgres' per-backend subtransaction cache.
+SCHEDULER_COMMIT_EVERY = int(os.getenv("NX_ENGINE_COMMIT_EVERY", "50"))
+# The engine keeps every dev's next_cycle_at in an in-process heap
+# (due_queue.py) and sleeps until the next one is due instead of polling
+# Postgres. The heap is reconciled against the devs table this often.
+DUE_QUEUE = os.getenv("NX_ENGINE_DUE_QUEUE", "true").lower() != "false"
+SCHEDULER_RECONCILE_SEC = int(os.getenv("NX_ENGINE_RECONCILE_SEC", "60"))
+# Parallel scheduler workers, each on its own connection claiming due
+# devs with FOR UPDATE SKIP LOCKED. 1 = sequential tick on the main loop.
+WORKER_THREADS = int(os.getenv("NX_ENGINE_WORKER_THREADS", "4"))
+# Decide a whole tick batch with the NumPy decision kernel instead of
+# one random.choices() per dev. Falls back to the per-dev path when
+# disabled or when numpy is not installed.
+BATCH_DECISIONS = os.getenv("NX_ENGINE_BATCH_DECISIONS", "true").lower() != "false"
+
+# Sharding across engine nodes (see sharding.py). Each node owns a
+# slice of token_id % ENGINE_SHARDS; 1 = single-node engine.
+ENGINE_SHARDS = int(os.getenv("NX_ENGINE_SHARDS", "1"))
+ENGINE_NODE_ID = os.getenv("NX_ENGINE_NODE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+ENGINE_LEASE_TTL_SEC = int(os.getenv("NX_ENGINE_LEASE_TTL_SEC", "30"))
+
+# Prometheus text endpoint (GET /metrics) of the engine process, see
+# metrics.py. Off unless a port is set (9464 is the usual one); the
+# admin_logs summary is written anyway. It has no auth and every scrape
+# scans devs, so it listens on localhost unless a host is given.
+METRICS_PORT = int(os.getenv("NX_ENGINE_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("NX_ENGINE_METRICS_HOST", "127.0.0.1")
+
+# Shared DB connection pool of the engine process (see db_pool.py):
+# main loop, scheduler workers, listener and reconciler threads.
+DB_POOL_MAX = int(os.getenv("NX_ENGINE_DB_POOL_MAX", str(WORKER_THREADS + 8)))
+DB_POOL_MAX_LIFETIME_SEC = int(os.getenv("NX_ENGINE_DB_POOL_MAX_LIFETIME_SEC", "1800"))
+DB_POOL_CHECK_IDLE_SEC = int(os.getenv("NX_ENGINE_DB_POOL_CHECK_IDLE_SEC", "30"))
+DB_POOL_TIMEOUT_SEC = int(os.getenv("NX_ENGINE_DB_POOL_TIMEOUT_SEC", "30"))
 
 # Cycle intervals (seconds)
 CYCLE_HACKATHON = 300            # 5 min — dev in active hackathon
@@ -36,6 +75,9 @@ CYCLE_NORMAL = 720               # 12 min — energy 4-7
 CYCLE_LOW_ENERGY = 1200          # 20 min — energy 1-3
 CYCLE_NO_ENERGY = 2700           # 45 min — energy 0
 CYCLE_OWNER_OFFLINE = 3600       # 60 min — owner offline >24h
+# Owners unseen (players.last_active_at) for this long are dormant and
+# their devs cycle every CYCLE_OWNER_OFFLINE (owner_activity.py); 0 = off.
+OWNER_DORMANT_HOURS = int(os.getenv("NX_ENGINE_OWNER_DORMANT_HOURS", "24"))
 
 # ============================================================
 # ECONOMY
@@ -0,0 +1,254 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Engine Connection Pool
+Postgres connections shared by every thread of the engine process.
+
+engine.get_db used to open a fresh connection per main-loop iteration
+and the listener one per checkpoint write — against Render Postgres
+that is a TLS handshake each time, which dominated idle CPU. Now the
+engine loop, scheduler workers, blockchain listener, sync / ledger
+reconcilers and NXTClaimed listener all borrow from ``shared_pool()``:
+
+  - checkout is LIFO, so a quiet process keeps reusing one or two warm
+    connections and the rest age out;
+  - a connection idle longer than CHECK_IDLE_SEC is pinged (SELECT 1)
+    before it is handed out, and replaced if the ping fails — Render
+    drops idle connections on maintenance;
+  - a connection older than MAX_LIFETIME_SEC is closed when returned
+    (or checked out) and reopened on demand, bounding server-side
+    memory growth and picking up failovers;
+  - at most ``maxconn`` are open; callers wait for a free one up to
+    ``timeout_sec`` and then get PoolTimeout.
+
+Every returned connection is rolled back to a clean, non-autocommit
+state, so nothing leaks between borrowers. Checkout wait, opened /
+recycled / failed connections and the pool size are recorded in
+metrics.py (nx_engine_db_pool_*).
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+try:
+    import metrics
+    from config import (DATABASE_URL, DB_SCHEMA, DB_SSLMODE, DB_POOL_MAX,
+                        DB_POOL_MAX_LIFETIME_SEC, DB_POOL_CHECK_IDLE_SEC, DB_POOL_TIMEOUT_SEC)
+except ImportError:
+    from backend.engine import metrics
+    from backend.engine.config import (DATABASE_URL, DB_SCHEMA, DB_SSLMODE, DB_POOL_MAX,
+                                       DB_POOL_MAX_LIFETIME_SEC, DB_POOL_CHECK_IDLE_SEC,
+                                       DB_POOL_TIMEOUT_SEC)
+
+log = logging.getLogger("nx_engine")
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """No connection became free within the pool's timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections made by ``connect()``."""
+
+    def __init__(self, connect: Callable, maxconn: int = 10,
+                 max_lifetime_sec: float = 1800, check_idle_sec: float = 30,
+                 timeout_sec: float = 30):
+        self._connect = connect
+        self.maxconn = maxconn
+        self.max_lifetime_sec = max_lifetime_sec
+        self.check_idle_sec = check_idle_sec
+        self.timeout_sec = timeout_sec
+        self._idle = []          # [(conn, opened_at, returned_at)], most recent last
+        self._opened = {}        # id(conn) -> opened_at, for every open connection
+        self._connecting = 0     # slots reserved by threads opening a connection
+        self._cond = threading.Condition()
+        self._closed = False
+
+    # ── Checkout / return ──────────────────────────────────
+
+    def getconn(self):
+        """Borrow a healthy connection, waiting up to timeout_sec."""
+        started = time.monotonic()
+        deadline = started + self.timeout_sec
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                if self._idle:
+                    conn, opened_at, returned_at = self._idle.pop()
+                    break
+                if len(self._opened) + self._connecting < self.maxconn:
+                    conn = None
+                    self._connecting += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.DB_POOL_EVENTS.inc("timeout")
+                    raise PoolTimeout(f"no DB connection free after {self.timeout_sec}s "
+                                      f"({self.maxconn} in use)")
+                self._cond.wait(remaining)
+        metrics.DB_POOL_WAIT.observe(time.monotonic() - started)
+
+        if conn is not None and not self._usable(conn, opened_at, returned_at):
+            with self._cond:   # its slot goes straight to the replacement
+                self._opened.pop(id(conn), None)
+                self._connecting += 1
+            self._close(conn)
+            conn = None
+        if conn is None:
+            conn = self._open()
+        self._sample()
+        return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return ``conn``: reset it and keep it, or close it if it is
+        broken, too old or ``discard`` is set."""
+        opened_at = self._opened.get(id(conn))
+        if opened_at is None:
+            conn.close()
+            return
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                conn.autocommit = False
+            except psycopg2.Error:
+                discard = True
+        expired = time.monotonic() - opened_at >= self.max_lifetime_sec
+        if discard or conn.closed or expired or self._closed:
+            if expired and not discard:
+                metrics.DB_POOL_EVENTS.inc("recycled")
+            self._discard(conn)
+        else:
+            with self._cond:
+                self._idle.append((conn, opened_at, time.monotonic()))
+                self._cond.notify()
+        self._sample()
+
+    @contextmanager
+    def connection(self, autocommit: bool = False):
+        """Borrow a connection for a block: commit on success, roll back
+        on error, always return it to the pool."""
+        conn = self.getconn()
+        broken = False
+        try:
+            conn.autocommit = autocommit
+            yield conn
+            if not autocommit:
+                conn.commit()
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken or bool(conn.closed))
+
+    def closeall(self):
+        """Close idle connections; borrowed ones are closed on return."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+        self._sample()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"open": len(self._opened), "idle": len(self._idle), "max": self.maxconn}
+
+    # ── Internals ──────────────────────────────────────────
+
+    def _usable(self, conn, opened_at: float, returned_at: float) -> bool:
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if now - opened_at >= self.max_lifetime_sec:
+            metrics.DB_POOL_EVENTS.inc("recycled")
+            return False
+        if now - returned_at < self.check_idle_sec:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            log.warning(f"DB pool: idle connection failed health check ({e}); replacing")
+            metrics.DB_POOL_EVENTS.inc("failed_check")
+            return False
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._connecting -= 1
+                self._cond.notify()
+            raise
+        conn.autocommit = False
+        with self._cond:
+            self._connecting -= 1
+            self._opened[id(conn)] = time.monotonic()
+        metrics.DB_POOL_EVENTS.inc("opened")
+        return conn
+
+    def _discard(self, conn):
+        with self._cond:
+            self._opened.pop(id(conn), None)
+            self._cond.notify()
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _sample(self):
+        stats = self.stats()
+        metrics.DB_POOL_CONNECTIONS.set(stats["open"] - stats["idle"], "in_use")
+        metrics.DB_POOL_CONNECTIONS.set(stats["idle"], "idle")
+
+
+# ── Process-wide pool ─────────────────────────────────────
+
+_shared: Optional[ConnectionPool] = None
+_shared_lock = threading.Lock()
+
+
+def _connect_engine_db():
+    return psycopg2.connect(os.getenv("DATABASE_URL") or DATABASE_URL,
+                            options=f"-c search_path={DB_SCHEMA}", sslmode=DB_SSLMODE)
+
+
+def shared_pool() -> ConnectionPool:
+    """The engine process's pool, created on first use from config."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = ConnectionPool(_connect_engine_db, maxconn=DB_POOL_MAX,
+                                         max_lifetime_sec=DB_POOL_MAX_LIFETIME_SEC,
+                                         check_idle_sec=DB_POOL_CHECK_IDLE_SEC,
+                                         timeout_sec=DB_POOL_TIMEOUT_SEC)
+                log.info(f"DB pool: up to {DB_POOL_MAX} connections (ssl={DB_SSLMODE})")
+    return _shared
+
+
+def close_shared_pool():
+    global _shared
+    with _shared_lock:
+        pool, _shared = _shared, None
+    if pool is not None:
+        pool.closeall()
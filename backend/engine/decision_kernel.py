@@ -0,0 +1,243 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Batch Decision Kernel
+Vectorized twin of engine.apply_context_modifiers + decide_action.
+
+The per-dev path copies a weights dict, applies ~10 rounds of
+multipliers in Python and calls random.choices once per dev. Here the
+whole scheduler batch is laid out as column arrays and every modifier
+becomes one row-wise multiply against a precomputed table:
+
+    base[archetype] * ENERGY[band] * MOOD[mood] * LOCATION[location]
+        * event * prompt * pc_penalty * training * variation
+
+Multipliers are applied in exactly the same order as the per-dev path
+so the resulting weights are bit-for-bit identical — the only thing
+that differs is the random stream used to sample the action.
+"""
+
+import random
+from typing import Optional, Sequence
+
+import numpy as np
+
+from personality import personality_variation
+
+ACTIONS = ("CREATE_PROTOCOL", "CREATE_AI", "INVEST", "SELL", "MOVE", "CHAT", "CODE_REVIEW", "REST")
+_A = {a: i for i, a in enumerate(ACTIONS)}
+
+# Energy bands, same thresholds as apply_context_modifiers:
+#   0: energy <= 2    1: energy <= 5    2: 6-7 (no-op)    3: energy >= 8
+ENERGY_BAND_MODIFIERS = (
+    {"REST": 4.0, "CREATE_PROTOCOL": 0.1, "CREATE_AI": 0.1, "CODE_REVIEW": 0.1},
+    {"REST": 1.5, "CREATE_PROTOCOL": 0.5},
+    {},
+    {"CREATE_PROTOCOL": 2.0, "REST": 0.1},
+)
+
+# World-event effect key → action it boosts.
+EVENT_WEIGHT_EFFECTS = {
+    "create_protocol_multiplier": "CREATE_PROTOCOL",
+    "create_ai_multiplier": "CREATE_AI",
+    "invest_weight_boost": "INVEST",
+    "sell_weight_boost": "SELL",
+}
+
+PC_PENALTY_ACTIONS = ("CREATE_PROTOCOL", "CREATE_AI", "CODE_REVIEW")
+TRAINING_ACTIONS = ("CREATE_PROTOCOL", "CREATE_AI", "INVEST")
+TRAINING_PENALTY = 0.3
+
+
+def _modifier_table(rows: Sequence[dict]) -> np.ndarray:
+    """One row of per-action multipliers per entry, 1.0 where unset."""
+    table = np.ones((len(rows), len(ACTIONS)))
+    for i, mods in enumerate(rows):
+        for action, mult in mods.items():
+            if action in _A:
+                table[i, _A[action]] = mult
+    return table
+
+
+class DecisionKernel:
+    """Precomputed PERSONALITY_MATRIX / LOCATION_MODIFIERS tensors.
+
+    Built once at engine import. Unknown archetypes raise (same as the
+    per-dev KeyError); unknown moods and locations map to an all-ones
+    row, matching the ``.get(..., {})`` fallbacks of the dict path.
+    """
+
+    def __init__(self, personality_matrix: dict, location_modifiers: dict,
+                 mood_modifiers: dict, *, cost_create_protocol: int,
+                 cost_create_ai: int, min_invest_balance: int = 5):
+        self.archetypes = tuple(personality_matrix)
+        self.archetype_index = {a: i for i, a in enumerate(self.archetypes)}
+        self.base = np.array(
+            [[personality_matrix[a][x] for x in ACTIONS] for a in self.archetypes],
+            dtype=float,
+        )
+
+        self.locations = tuple(location_modifiers)
+        self.location_index = {l: i for i, l in enumerate(self.locations)}
+        self.location_table = _modifier_table(
+            [location_modifiers[l] for l in self.locations] + [{}]
+        )
+
+        self.moods = tuple(mood_modifiers)
+        self.mood_index = {m: i for i, m in enumerate(self.moods)}
+        self.mood_table = _modifier_table(
+            [mood_modifiers[m] for m in self.moods] + [{}]
+        )
+
+        self.energy_table = _modifier_table(ENERGY_BAND_MODIFIERS)
+
+        self.cost_create_protocol = cost_create_protocol
+        self.cost_create_ai = cost_create_ai
+        self.min_invest_balance = min_invest_balance
+
+        self._pc_cols = [_A[a] for a in PC_PENALTY_ACTIONS]
+        self._training_row = np.ones(len(ACTIONS))
+        self._training_row[[_A[a] for a in TRAINING_ACTIONS]] = TRAINING_PENALTY
+
+    # ── Column extraction ──────────────────────────────────
+
+    def columns(self, devs: Sequence[dict]) -> dict:
+        """Lay the batch rows out as column arrays.
+
+        Reads the same keys (and defaults) as apply_context_modifiers.
+        """
+        n_loc = len(self.locations)
+        n_mood = len(self.moods)
+        return {
+            "archetype": np.array([self.archetype_index[d["archetype"]] for d in devs], dtype=np.intp),
+            "energy": np.array([d["energy"] for d in devs], dtype=np.int64),
+            "balance": np.array([d["balance_nxt"] for d in devs], dtype=np.int64),
+            "mood": np.array([self.mood_index.get(d["mood"], n_mood) for d in devs], dtype=np.intp),
+            "location": np.array([self.location_index.get(d["location"], n_loc) for d in devs], dtype=np.intp),
+            "pc_health": np.array([d.get("pc_health", 100) for d in devs], dtype=float),
+            "training": np.array([bool(d.get("training_course")) for d in devs], dtype=bool),
+            "seed": [d.get("personality_seed", 0) for d in devs],
+        }
+
+    def event_row(self, effects: dict) -> np.ndarray:
+        """Per-action multipliers of a world event's ``effects``."""
+        row = np.ones(len(ACTIONS))
+        for key, action in EVENT_WEIGHT_EFFECTS.items():
+            if effects.get(key):
+                row[_A[action]] = effects[key]
+        return row
+
+    def _context_arrays(self, contexts: Sequence[dict]):
+        n = len(contexts)
+        has_protocols = np.array([bool(c.get("has_protocols")) for c in contexts], dtype=bool)
+        has_investments = np.array([bool(c.get("has_investments")) for c in contexts], dtype=bool)
+
+        # Event effects are shared by the whole tick in practice — build
+        # one row per distinct dict instead of one per dev.
+        event = np.empty((n, len(ACTIONS)))
+        rows_by_id = {}
+        for i, c in enumerate(contexts):
+            effects = c.get("event_effects", {}) or {}
+            row = rows_by_id.get(id(effects))
+            if row is None:
+                row = rows_by_id[id(effects)] = self.event_row(effects)
+            event[i] = row
+
+        prompt = np.ones((n, len(ACTIONS)))
+        for i, c in enumerate(contexts):
+            for action, mult in (c.get("prompt_weight_modifiers") or {}).items():
+                if action in _A:
+                    prompt[i, _A[action]] = mult
+        return has_protocols, has_investments, event, prompt
+
+    # ── Kernel ─────────────────────────────────────────────
+
+    def weights(self, devs: Sequence[dict], contexts: Sequence[dict],
+                variations: Optional[np.ndarray] = None) -> np.ndarray:
+        """(n, len(ACTIONS)) matrix of final decision weights.
+
+        ``variations`` is an optional (n, len(ACTIONS)) array of
+        personality draws; when omitted they are derived from each
+        dev's ``personality_seed``.
+        """
+        n = len(devs)
+        if n == 0:
+            return np.zeros((0, len(ACTIONS)))
+        cols = self.columns(devs)
+        has_protocols, has_investments, event, prompt = self._context_arrays(contexts)
+        if variations is None:
+            # cached per seed (personality.py) — no RNG built per tick
+            variations = np.array([personality_variation(s) for s in cols["seed"]])
+        return self.column_weights(cols, has_protocols, has_investments, event,
+                                   variations, prompt)
+
+    def column_weights(self, cols: dict, has_protocols: np.ndarray,
+                       has_investments: np.ndarray, event: np.ndarray,
+                       variations: np.ndarray,
+                       prompt: Optional[np.ndarray] = None) -> np.ndarray:
+        """weights() on column arrays already laid out as columns()
+        returns them (``seed`` unused). ``event`` may be one row shared
+        by the batch; ``prompt`` None means no prompt modifiers. For
+        callers that keep dev state as arrays (scripts/project_economy.py)."""
+        energy = cols["energy"]
+        band = np.select([energy <= 2, energy <= 5, energy >= 8], [0, 1, 3], default=2)
+        w = self.base[cols["archetype"]] * self.energy_table[band]
+
+        balance = cols["balance"]
+        w[balance < self.cost_create_protocol, _A["CREATE_PROTOCOL"]] = 0
+        w[balance < self.cost_create_ai, _A["CREATE_AI"]] = 0
+        w[balance < self.min_invest_balance, _A["INVEST"]] = 0
+
+        w *= self.mood_table[cols["mood"]]
+        w *= self.location_table[cols["location"]]
+
+        no_protocols = ~has_protocols
+        w[no_protocols, _A["INVEST"]] = 0
+        w[no_protocols, _A["SELL"]] = 0
+        w[no_protocols, _A["CODE_REVIEW"]] = 0
+        w[~has_investments, _A["SELL"]] = 0
+
+        w *= event
+        if prompt is not None:
+            w *= prompt
+
+        pc_health = cols["pc_health"]
+        low_pc = pc_health < 50
+        if low_pc.any():
+            w[np.ix_(low_pc, self._pc_cols)] *= (pc_health[low_pc] / 100.0)[:, None]
+
+        training = cols["training"]
+        if training.any():
+            w[training] *= self._training_row
+
+        # k-th positive weight in a row takes the k-th draw.
+        positive = w > 0
+        draw_idx = np.cumsum(positive, axis=1) - 1
+        draws = np.take_along_axis(variations, np.clip(draw_idx, 0, None), axis=1)
+        w = np.where(positive, w * draws, w)
+        return w
+
+    def sample(self, weights: np.ndarray, rng: Optional[np.random.Generator] = None) -> list:
+        """Draw one action per row, proportional to its weights.
+
+        Rows whose weights sum to zero fall back to REST, like
+        decide_action.
+        """
+        if len(weights) == 0:
+            return []
+        return [ACTIONS[i] for i in self.sample_indices(weights, rng)]
+
+    def sample_indices(self, weights: np.ndarray,
+                       rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """sample() as indices into ACTIONS."""
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        cum = np.cumsum(weights, axis=1)
+        total = cum[:, -1] if len(weights) else np.zeros(0)
+        r = rng.random(len(weights)) * total
+        idx = (cum > r[:, None]).argmax(axis=1)
+        idx[total <= 0] = _A["REST"]
+        return idx
+
+    def decide(self, devs: Sequence[dict], contexts: Sequence[dict],
+               rng: Optional[np.random.Generator] = None) -> list:
+        """Actions for a whole batch — the vectorized decide_action."""
+        return self.sample(self.weights(devs, contexts), rng)
@@ -0,0 +1,151 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Due Queue
+In-process timing heap of every dev's next_cycle_at.
+
+The scheduler used to ask Postgres "who is due?" every second, whether
+or not anyone was. The engine now loads (token_id, next_cycle_at) for
+all schedulable devs once, keeps them in a min-heap per shard, and:
+
+  - sleeps until the earliest entry is due (or an earlier one is
+    pushed),
+  - pops the due token_ids and hands them to run_scheduler_tick, which
+    still claims the rows in SQL (next_cycle_at <= NOW(), FOR UPDATE
+    SKIP LOCKED) — the DB stays the source of truth, the heap only
+    decides when to ask and for whom,
+  - pushes each processed dev back with the next_cycle_at it was just
+    given.
+
+Devs changed outside the engine (minted, fed back to energy > 0,
+prompted) are picked up by reload(), run every SCHEDULER_RECONCILE_SEC;
+prompted devs are also pushed as soon as the API publishes the prompt
+(prompt_wake.py).
+An id popped but not returned by the claim query is pushed back at its
+DB next_cycle_at if that is still ahead (clock skew, stale entry) and
+otherwise dropped — energy 0, inactive, or locked by the worker that
+will push it itself; the next reload restores anything missed.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+_LOAD_SQL = """
+    SELECT token_id, next_cycle_at FROM devs
+    WHERE status = 'active' AND energy > 0
+"""
+
+
+def _ts(at) -> float:
+    return at.timestamp() if isinstance(at, datetime) else float(at)
+
+
+class DueQueue:
+    """Min-heaps of (due_ts, token_id), one per shard.
+
+    Entries are never removed from the middle of a heap: ``_due`` holds
+    each dev's current due time and heap entries that disagree with it
+    are skipped when they surface (lazy deletion)."""
+
+    def __init__(self, shard_count: int = 1):
+        self.shard_count = max(1, shard_count)
+        self._heaps = [[] for _ in range(self.shard_count)]
+        self._due = {}
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._due)
+
+    def _shards(self, shards: Optional[tuple]):
+        """Heap indexes for ``shards`` = (shard_count, owned) or None (all)."""
+        if shards is None:
+            return range(self.shard_count)
+        return shards[1]
+
+    def _top(self, shard: int) -> Optional[float]:
+        heap = self._heaps[shard]
+        while heap:
+            ts, token_id = heap[0]
+            if self._due.get(token_id) == ts:
+                return ts
+            heapq.heappop(heap)
+        return None
+
+    # ── Updates ────────────────────────────────────────────
+
+    def reload(self, cur):
+        """Replace the queue with the devs table (reconciliation)."""
+        cur.execute(_LOAD_SQL)
+        rows = cur.fetchall()
+        heaps = [[] for _ in range(self.shard_count)]
+        due = {}
+        for r in rows:
+            ts = _ts(r["next_cycle_at"])
+            due[r["token_id"]] = ts
+            heaps[r["token_id"] % self.shard_count].append((ts, r["token_id"]))
+        for heap in heaps:
+            heapq.heapify(heap)
+        with self._cond:
+            self._heaps, self._due = heaps, due
+            self._cond.notify_all()
+        return len(due)
+
+    def push(self, token_id: int, at):
+        """(Re)schedule a dev. Wakes waiters if it is now the earliest."""
+        ts = _ts(at)
+        shard = token_id % self.shard_count
+        with self._cond:
+            earliest = self._top(shard)
+            self._due[token_id] = ts
+            heapq.heappush(self._heaps[shard], (ts, token_id))
+            if earliest is None or ts < earliest:
+                self._cond.notify_all()
+
+    def discard(self, token_id: int):
+        with self._cond:
+            self._due.pop(token_id, None)
+
+    # ── Reads ──────────────────────────────────────────────
+
+    def next_due(self, shards: Optional[tuple] = None) -> Optional[float]:
+        """Epoch seconds of the earliest scheduled dev, None if empty."""
+        with self._cond:
+            tops = [t for t in (self._top(s) for s in self._shards(shards)) if t is not None]
+            return min(tops) if tops else None
+
+    def pop_due(self, limit: int, shards: Optional[tuple] = None,
+                now: Optional[float] = None) -> list:
+        """Remove and return up to ``limit`` due token_ids, earliest first."""
+        now = time.time() if now is None else now
+        out = []
+        with self._cond:
+            while len(out) < limit:
+                best = None
+                for s in self._shards(shards):
+                    ts = self._top(s)
+                    if ts is not None and ts <= now and (best is None or ts < best[0]):
+                        best = (ts, s)
+                if best is None:
+                    break
+                _, token_id = heapq.heappop(self._heaps[best[1]])
+                del self._due[token_id]
+                out.append(token_id)
+        return out
+
+    def wait(self, timeout: float, shards: Optional[tuple] = None) -> bool:
+        """Sleep until a dev is due, a push/wake() or ``timeout`` seconds.
+
+        True if a dev is due on return."""
+        deadline = time.time() + timeout
+        with self._cond:
+            nxt = self.next_due(shards)
+            delay = min(deadline, nxt if nxt is not None else deadline) - time.time()
+            if delay > 0:
+                self._cond.wait(delay)
+            nxt = self.next_due(shards)
+        return nxt is not None and nxt <= time.time()
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
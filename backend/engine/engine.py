@@ -24,6 +24,7 @@ import random as _random
 import time
 import json
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from contextlib import contextmanager
@@ -36,15 +37,37 @@ from config import *
 from templates import (
     gen_dev_name, gen_protocol_name, gen_protocol_description,
     gen_ai_name, gen_ai_description, gen_chat_message, gen_visual_traits,
-    gen_chat_by_type,
+    gen_chat_by_type, gen_chats_by_type,
 )
 from prompt_system import process_prompt
+from tick_writer import TickWriter
+import tick_writer
+from storage import MemoryStore
+from personality import personality_variation
+
+try:
+    from decision_kernel import DecisionKernel
+except ImportError:  # numpy not installed → per-dev decision path
+    DecisionKernel = None
+
+from sharding import ShardCoordinator, claim_cron
+from db_pool import shared_pool
+from sampling import SamplingCache
+from due_queue import DueQueue
+from protocol_matcher import ProtocolMatcher
+from vitals import current_event_effects, settle_devs
+from owner_activity import is_dormant
+from prompt_wake import pending as pending_prompts
+from world_state import world_state
+import metrics
+import sim_clock
 
 try:
     from backend.services.logging_helpers import log_info
     from backend.services.admin_log import log_event as admin_log_event
     from backend.services.ledger import (
         ledger_insert,
+        ledger_insert_dev_batch,
         LedgerSource,
         is_shadow_write_enabled,
         tx_hash_to_bigint,
@@ -76,6 +99,7 @@ except ImportError as _e:
     log_info = None  # type: ignore
     admin_log_event = None  # type: ignore
     ledger_insert = None  # type: ignore
+    ledger_insert_dev_batch = None  # type: ignore
     LedgerSource = None  # type: ignore
     is_shadow_write_enabled = lambda: False  # type: ignore
     tx_hash_to_bigint = None  # type: ignore
@@ -127,29 +151,40 @@ CHAT_SOCIAL_GAIN = {
 }
 
 
-def _apply_chat_social_gain(cur, dev_token_id: int, archetype: str) -> int:
+def _apply_chat_social_gain(cur, dev_token_id: int, archetype: str,
+                            writer: Optional[TickWriter] = None,
+                            current: Optional[int] = None) -> int:
     """Apply CHAT_SOCIAL_GAIN honestly, respecting the 40 cap.
 
     Returns the effective gain — the value that actually hit the DB. If
     the dev was already at cap, returns 0 so the Live Feed's "+N SOCIAL"
     badge reflects reality instead of lying (bug #4 in the audit).
+
+    With a ``writer`` the gain is buffered for the tick flush; pass the
+    dev's ``current`` social_vitality (as fetched) to skip the SELECT.
     """
     raw = CHAT_SOCIAL_GAIN.get(archetype, 1)
     if raw <= 0:
         return 0
-    cur.execute(
-        "SELECT social_vitality FROM devs WHERE token_id = %s",
-        (dev_token_id,),
-    )
-    row = cur.fetchone()
-    current = row["social_vitality"] if row else 0
-    effective = max(0, min(raw, 40 - current))
-    if effective > 0:
+    if current is None:
         cur.execute(
-            "UPDATE devs SET social_vitality = social_vitality + %s "
-            "WHERE token_id = %s",
-            (effective, dev_token_id),
+            "SELECT social_vitality FROM devs WHERE token_id = %s",
+            (dev_token_id,),
         )
+        row = cur.fetchone()
+        current = row["social_vitality"] if row else 0
+    if writer is not None:
+        current += writer.pending(dev_token_id, "social_vitality")
+    effective = max(0, min(raw, 40 - current))
+    if effective > 0:
+        if writer is not None:
+            writer.add(dev_token_id, social_vitality=effective)
+        else:
+            cur.execute(
+                "UPDATE devs SET social_vitality = social_vitality + %s "
+                "WHERE token_id = %s",
+                (effective, dev_token_id),
+            )
     return effective
 
 
@@ -168,6 +203,35 @@ CHAT_TYPE_WEIGHTS = {
     "LURKER":        {"idle": 60, "hot_take":  5, "meme": 15, "drama":  5, "reaction": 15},
 }
 
+
+
+def roll_chat_type(arch: str) -> str:
+    type_weights = CHAT_TYPE_WEIGHTS.get(arch, CHAT_TYPE_WEIGHTS["10X_DEV"])
+    return random.choices(
+        list(type_weights.keys()),
+        weights=list(type_weights.values()),
+        k=1,
+    )[0]
+
+
+def pregenerate_chats(devs: list, contexts: list, actions: list):
+    """Draw every chat message of a tick in one gen_chats_by_type call.
+
+    Sets context["chat"] = (msg, chat_type) for each minted dev about to
+    CHAT; execute_action uses it instead of generating its own."""
+    chatting = [i for i, action in enumerate(actions)
+                if action == "CHAT" and devs[i].get("ipfs_hash")]
+    if not chatting:
+        return
+    chats = gen_chats_by_type([
+        (roll_chat_type(devs[i]["archetype"]), devs[i]["archetype"],
+         devs[i].get("corporation", ""))
+        for i in chatting
+    ])
+    for i, chat in zip(chatting, chats):
+        contexts[i]["chat"] = chat
+
+
 LOCATION_MODIFIERS = {
     "HACKATHON_HALL":   {"CREATE_PROTOCOL": 2.5, "CREATE_AI": 2.0},
     "THE_PIT":          {"INVEST": 2.5, "SELL": 2.0},
@@ -182,6 +246,13 @@ LOCATION_MODIFIERS = {
     "GitHub HQ":        {"CREATE_PROTOCOL": 2.0, "CODE_REVIEW": 1.5},
 }
 
+MOOD_MODIFIERS = {
+    "angry":    {"CHAT": 2.0, "CODE_REVIEW": 1.5, "REST": 0.5},
+    "excited":  {"CREATE_PROTOCOL": 1.5, "CREATE_AI": 2.0, "INVEST": 1.5},
+    "depressed":{"REST": 2.0, "CHAT": 0.5, "CREATE_PROTOCOL": 0.3},
+    "focused":  {"CREATE_PROTOCOL": 2.0, "CODE_REVIEW": 1.5, "CHAT": 0.3},
+}
+
 MOODS = ["neutral", "excited", "angry", "depressed", "focused"]
 LOCATIONS = list(LOCATION_MODIFIERS.keys())
 
@@ -204,21 +275,104 @@ WEEKLY_EVENTS = [
 
 @contextmanager
 def get_db():
-    """Context manager for DB connection."""
-    conn = psycopg2.connect(DATABASE_URL, options=f"-c search_path={DB_SCHEMA}")
-    conn.autocommit = False
-    try:
+    """Context manager for a pooled DB connection (db_pool.shared_pool):
+    commit on success, rollback on error, then back to the pool."""
+    with shared_pool().connection() as conn:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+
+
+class _CountingCursor(psycopg2.extras.RealDictCursor):
+    """RealDictCursor that counts statements for the per-tick metric and
+    carries a pending per-dev savepoint (_DevSavepoint) on the first one."""
+
+    def execute(self, query, vars=None):
+        metrics.count_query()
+        savepoint = _DevSavepoint.take(self.connection)
+        if savepoint and isinstance(query, str):
+            query = savepoint + query
+        elif savepoint:
+            super().execute(savepoint)
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        metrics.count_query()
+        savepoint = _DevSavepoint.take(self.connection)
+        if savepoint:
+            super().execute(savepoint)
+        return super().executemany(query, vars_list)
+
+
+class _DevSavepoint:
+    """Savepoint isolating one dev's work in a scheduler tick.
+
+    begin() only arms it: the dev's first statement through get_cursor
+    is sent as "SAVEPOINT tick_dev; <statement>" (releasing the
+    previous dev's first), in the same round trip, so devs that touch
+    no SQL — most of them, the TickWriter buffers their writes — cost
+    nothing extra. rollback() undoes the dev's statements, if it sent
+    any, and everything it buffered in the writer since begin().
+
+    ``wrote`` is set when the dev writes inline (note_write): its
+    buffered rows then have to land under this savepoint too
+    (TickWriter.flush_savepoint), as the flush's per-dev fallback could
+    drop them but not the inline writes."""
+
+    _active = threading.local()
+
+    def __init__(self, conn, writer: TickWriter):
+        self.conn = conn
+        self.writer = writer
+        self.armed = False
+        self.established = False
+        self.wrote = False
+
+    @classmethod
+    def take(cls, conn) -> str:
+        """SQL to prepend to ``conn``'s next statement ("" if none)."""
+        self = getattr(cls._active, "savepoint", None)
+        if self is None or not self.armed or conn is not self.conn:
+            return ""
+        self.armed = False
+        release = "RELEASE SAVEPOINT tick_dev; " if self.established else ""
+        self.established = True
+        return release + "SAVEPOINT tick_dev; "
+
+    @classmethod
+    def note_write(cls, conn):
+        """The active dev is about to write inline on ``conn``."""
+        self = getattr(cls._active, "savepoint", None)
+        if self is not None and conn is self.conn:
+            self.wrote = True
+
+    def begin(self):
+        self.armed = True
+        self.wrote = False
+        self.writer.savepoint()
+        _DevSavepoint._active.savepoint = self
+
+    def rollback(self):
+        self.writer.rollback_to_savepoint()
+        if self.conn.closed:
+            self.armed = False
+            return
+        if not self.armed and self.established:
+            self.conn.cursor().execute("ROLLBACK TO SAVEPOINT tick_dev")
+        elif self.conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            # A statement that bypassed get_cursor failed: the only way
+            # out is rolling back the whole micro-batch.
+            self.conn.rollback()
+            self.writer.clear()
+            self.established = False
+        self.armed = False
+
+    def end(self):
+        """Stop tagging statements (shared queries, the flush)."""
+        self.armed = False
+        _DevSavepoint._active.savepoint = None
 
 
 def get_cursor(conn):
-    return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    return conn.cursor(cursor_factory=_CountingCursor)
 
 
 # ============================================================
@@ -251,13 +405,7 @@ def apply_context_modifiers(weights: dict, dev: dict, context: dict) -> dict:
     if balance < 5: w["INVEST"] = 0
 
     # --- Mood ---
-    mood_mods = {
-        "angry":    {"CHAT": 2.0, "CODE_REVIEW": 1.5, "REST": 0.5},
-        "excited":  {"CREATE_PROTOCOL": 1.5, "CREATE_AI": 2.0, "INVEST": 1.5},
-        "depressed":{"REST": 2.0, "CHAT": 0.5, "CREATE_PROTOCOL": 0.3},
-        "focused":  {"CREATE_PROTOCOL": 2.0, "CODE_REVIEW": 1.5, "CHAT": 0.3},
-    }
-    for action, mult in mood_mods.get(mood, {}).items():
+    for action, mult in MOOD_MODIFIERS.get(mood, {}).items():
         if action in w:
             w[action] *= mult
 
@@ -308,12 +456,14 @@ def apply_context_modifiers(weights: dict, dev: dict, context: dict) -> dict:
         w["INVEST"] *= 0.3
 
     # --- Personality seed variation (±15%) ---
-    seed = dev.get("personality_seed", 0)
-    rng = random.Random(seed)
+    # The k-th positive weight takes the k-th draw; the draws are cached
+    # per seed (personality.py) instead of re-seeding an RNG every call.
+    draws = personality_variation(dev.get("personality_seed", 0))
+    k = 0
     for action in w:
         if w[action] > 0:
-            variation = rng.uniform(0.85, 1.15)
-            w[action] *= variation
+            w[action] *= draws[k]
+            k += 1
 
     return w
 
@@ -333,6 +483,29 @@ def decide_action(dev: dict, context: dict) -> str:
     return random.choices(actions, weights=probs, k=1)[0]
 
 
+# Batch twin of apply_context_modifiers + decide_action (see
+# decision_kernel.py). Same weights, one set of matrix ops per tick.
+_decision_kernel = (
+    DecisionKernel(
+        PERSONALITY_MATRIX, LOCATION_MODIFIERS, MOOD_MODIFIERS,
+        cost_create_protocol=COST_CREATE_PROTOCOL_NXT,
+        cost_create_ai=COST_CREATE_AI_NXT,
+    )
+    if DecisionKernel is not None and BATCH_DECISIONS else None
+)
+
+
+def decide_actions(devs: list, contexts: list) -> list:
+    """Decide a whole batch. Uses the vectorized kernel when available,
+    otherwise (or if the kernel blows up) one decide_action per dev."""
+    if _decision_kernel is not None:
+        try:
+            return _decision_kernel.decide(devs, contexts)
+        except Exception as e:
+            log.error(f"Decision kernel failed, falling back to per-dev path: {e}")
+    return [decide_action(dev, ctx) for dev, ctx in zip(devs, contexts)]
+
+
 # ============================================================
 # NOTIFICATIONS
 # ============================================================
@@ -377,9 +550,158 @@ def insert_notification(cur, owner: str, notif_type: str, title: str, body: str,
 # ACTION EXECUTION
 # ============================================================
 
-def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
-    """Execute action, update DB, return result dict."""
-    cur = get_cursor(conn)
+# Active protocol / AI ids for O(1) random target picks (sampling.py),
+# shared by every scheduler worker. Refreshed once per tick.
+_sampling = SamplingCache()
+
+# Active protocol names for prompt mention extraction (protocol_matcher.py).
+_protocol_matcher = ProtocolMatcher()
+
+
+class PostgresStore:
+    """execute_action's reads and inline writes on the tick's cursor.
+
+    The production backend; storage.MemoryStore implements the same
+    methods over in-process tables for offline runs (run_offline_tick).
+    """
+
+    def __init__(self, cur):
+        self.cur = cur
+
+    def _write(self, query: str, vars=None):
+        _DevSavepoint.note_write(self.cur.connection)
+        self.cur.execute(query, vars)
+
+    def insert_protocol(self, creator: int, name: str, description: str,
+                        quality: int, value: int) -> int:
+        self._write("""
+            INSERT INTO protocols (name, description, creator_dev_id, code_quality, value)
+            VALUES (%s, %s, %s, %s, %s) RETURNING id
+        """, (name, description, creator, quality, value))
+        proto_id = self.cur.fetchone()["id"]
+        _sampling.add_protocol(proto_id)
+        return proto_id
+
+    def insert_ai(self, creator: int, name: str, description: str) -> int:
+        self._write("""
+            INSERT INTO absurd_ais (name, description, creator_dev_id)
+            VALUES (%s, %s, %s) RETURNING id
+        """, (name, description, creator))
+        ai_id = self.cur.fetchone()["id"]
+        _sampling.add_ai(ai_id)
+        return ai_id
+
+    def pick_protocol(self, columns: str = "id"):
+        return _sampling.pick_protocol(self.cur, columns)
+
+    def pick_ai(self, exclude_creator: int):
+        return _sampling.pick_ai(self.cur, exclude_creator=exclude_creator)
+
+    def invest(self, dev_id: int, protocol_id: int, amount: int) -> bool:
+        """Upsert the position. True when it is new (xmax = 0), False
+        when an existing one was topped up."""
+        self._write("""
+            INSERT INTO protocol_investments (dev_id, protocol_id, shares, nxt_invested)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (dev_id, protocol_id)
+            DO UPDATE SET shares = protocol_investments.shares + EXCLUDED.shares,
+                         nxt_invested = protocol_investments.nxt_invested + EXCLUDED.nxt_invested
+            RETURNING (xmax = 0) AS inserted
+        """, (dev_id, protocol_id, amount, amount))
+        return self.cur.fetchone()["inserted"]
+
+    def holdings(self, dev_id: int) -> list:
+        # A dev holds a handful of positions (one row per protocol,
+        # idx_invest_dev), so callers pick in Python — no sort.
+        self.cur.execute("""
+            SELECT pi.id, pi.protocol_id, pi.shares, pi.nxt_invested, p.name, p.value
+            FROM protocol_investments pi
+            JOIN protocols p ON p.id = pi.protocol_id
+            WHERE pi.dev_id = %s
+        """, (dev_id,))
+        return self.cur.fetchall()
+
+    def close_position(self, dev_id: int, protocol_id: int) -> int:
+        self._write("DELETE FROM protocol_investments WHERE dev_id = %s AND protocol_id = %s",
+                         (dev_id, protocol_id))
+        return self.cur.rowcount
+
+    def credit_sale(self, dev: dict, inv: dict, sell_value: int, energy_cost: int):
+        _DevSavepoint.note_write(self.cur.connection)
+        cur = self.cur
+        # Stays inline: ledger_insert snapshots devs.balance_nxt
+        # right after this UPDATE.
+        cur.execute(f"""
+            UPDATE {tick_writer.DEV_STATE_TABLE} SET
+                balance_nxt = balance_nxt + %s,
+                total_earned = total_earned + %s,
+                energy = GREATEST(0, energy - %s)
+            WHERE token_id = %s
+        """, (sell_value, sell_value, energy_cost, dev["token_id"]))
+
+        # Shadow-write to nxt_ledger (Fase 3B, fixed in follow-up).
+        # protocol_investments.id is the natural SERIAL PK — each
+        # sell → reinvest cycle creates a new row with a fresh id,
+        # so a dev that sells, reinvests, and sells again no longer
+        # collides on idempotency_key (which was the latent bug
+        # when ref_id was protocol_id).
+        if is_shadow_write_enabled() and ledger_insert is not None:
+            try:
+                ledger_insert(
+                    cur,
+                    wallet_address=dev["owner_address"],
+                    dev_token_id=dev["token_id"],
+                    delta_nxt=sell_value,
+                    source=LedgerSource.SELL_INVESTMENT,
+                    ref_table="protocol_investments",
+                    ref_id=inv["id"],
+                )
+            except Exception as _e:  # noqa: BLE001
+                log.warning(
+                    "ledger_shadow_write_failed source=sell_investment "
+                    "token_id=%s error=%s",
+                    dev["token_id"], _e,
+                )
+
+    def vote(self, dev_id: int, ai_id: int, weight: float):
+        """The stored weight, or None for a repeat vote (a no-op)."""
+        self._write("""
+            INSERT INTO ai_votes (voter_dev_id, ai_id, weight)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (voter_dev_id, ai_id) DO NOTHING
+            RETURNING weight
+        """, (dev_id, ai_id, weight))
+        row = self.cur.fetchone()
+        return row["weight"] if row else None
+
+    def flush(self, writer: TickWriter, fallback: bool = True) -> int:
+        return writer.flush(self.cur, fallback)
+
+
+def _store(conn):
+    """``conn`` is a DB connection or an offline storage.MemoryStore."""
+    return conn if isinstance(conn, MemoryStore) else PostgresStore(get_cursor(conn))
+
+
+def execute_action(conn, dev: dict, action: str, context: dict,
+                   writer: Optional[TickWriter] = None) -> dict:
+    """Execute action, update DB, return result dict.
+
+    Dev-row updates, protocol / AI counters and actions / chat_messages
+    inserts are buffered in ``writer`` and hit the DB when the scheduler
+    flushes the tick. Rows whose id the action needs right away
+    (protocols, absurd_ais) and the investment rows are still written
+    inline. Without a writer the buffered writes are flushed before
+    returning.
+
+    ``conn`` may also be a storage.MemoryStore: every read and write
+    goes through the store, so offline runs share these rules.
+    """
+    store = _store(conn)
+    own_writer = writer is None
+    if own_writer:
+        writer = TickWriter()
+    token_id = dev["token_id"]
     result = {
         "action": action,
         "dev_id": dev["token_id"],
@@ -402,11 +724,8 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
         quality = min(100, quality)
         value = 1000 + quality * 10
 
-        cur.execute("""
-            INSERT INTO protocols (name, description, creator_dev_id, code_quality, value)
-            VALUES (%s, %s, %s, %s, %s) RETURNING id
-        """, (name, desc, dev["token_id"], quality, value))
-        proto_id = cur.fetchone()["id"]
+        proto_id = store.insert_protocol(dev["token_id"], name, desc, quality, value)
+        _protocol_matcher.add(name, proto_id)
 
         result["energy_cost"] = COST_CREATE_PROTOCOL_ENERGY
         result["nxt_cost"] = COST_CREATE_PROTOCOL_NXT
@@ -416,27 +735,19 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
 
         # Update dev stats
         lines_written = random.randint(50, 300)
-        cur.execute("""
-            UPDATE devs SET
-                energy = GREATEST(0, energy - %s),
-                balance_nxt = balance_nxt - %s,
-                total_spent = total_spent + %s,
-                protocols_created = protocols_created + 1,
-                reputation = reputation + %s,
-                lines_of_code = lines_of_code + %s
-            WHERE token_id = %s
-        """, (COST_CREATE_PROTOCOL_ENERGY, COST_CREATE_PROTOCOL_NXT,
-              COST_CREATE_PROTOCOL_NXT, quality // 10, lines_written, dev["token_id"]))
+        writer.energy(token_id, -COST_CREATE_PROTOCOL_ENERGY)
+        writer.add(token_id,
+                   balance_nxt=-COST_CREATE_PROTOCOL_NXT,
+                   total_spent=COST_CREATE_PROTOCOL_NXT,
+                   protocols_created=1,
+                   reputation=quality // 10,
+                   lines_of_code=lines_written)
 
     elif action == "CREATE_AI":
         name = gen_ai_name()
         desc = gen_ai_description()
 
-        cur.execute("""
-            INSERT INTO absurd_ais (name, description, creator_dev_id)
-            VALUES (%s, %s, %s) RETURNING id
-        """, (name, desc, dev["token_id"]))
-        ai_id = cur.fetchone()["id"]
+        ai_id = store.insert_ai(dev["token_id"], name, desc)
 
         result["energy_cost"] = COST_CREATE_AI_ENERGY
         result["nxt_cost"] = COST_CREATE_AI_NXT
@@ -444,41 +755,26 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
         result["chat_msg"] = gen_chat_message(arch, "created_ai", name=name)
         result["chat_channel"] = "trollbox"
 
-        cur.execute("""
-            UPDATE devs SET
-                energy = GREATEST(0, energy - %s),
-                balance_nxt = balance_nxt - %s,
-                total_spent = total_spent + %s,
-                ais_created = ais_created + 1
-            WHERE token_id = %s
-        """, (COST_CREATE_AI_ENERGY, COST_CREATE_AI_NXT, COST_CREATE_AI_NXT, dev["token_id"]))
+        writer.energy(token_id, -COST_CREATE_AI_ENERGY)
+        writer.add(token_id,
+                   balance_nxt=-COST_CREATE_AI_NXT,
+                   total_spent=COST_CREATE_AI_NXT,
+                   ais_created=1)
 
 
     elif action == "INVEST":
         # Pick a random active protocol
-        cur.execute("SELECT id, name, value FROM protocols WHERE status = 'active' ORDER BY RANDOM() LIMIT 1")
-        proto = cur.fetchone()
+        proto = store.pick_protocol("id, name, value")
         if proto:
             max_invest = min(500, dev["balance_nxt"] // 5)  # max 20% of balance
             amount = random.randint(2, max(3, max_invest))
 
-            # Upsert investment
-            cur.execute("""
-                INSERT INTO protocol_investments (dev_id, protocol_id, shares, nxt_invested)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (dev_id, protocol_id)
-                DO UPDATE SET shares = protocol_investments.shares + EXCLUDED.shares,
-                             nxt_invested = protocol_investments.nxt_invested + EXCLUDED.nxt_invested
-            """, (dev["token_id"], proto["id"], amount, amount))
-
-            # Update protocol
-            cur.execute("""
-                UPDATE protocols SET
-                    value = value + %s,
-                    total_invested = total_invested + %s,
-                    investor_count = (SELECT COUNT(DISTINCT dev_id) FROM protocol_investments WHERE protocol_id = %s)
-                WHERE id = %s
-            """, (amount // 2, amount, proto["id"], proto["id"]))
+            new_position = store.invest(dev["token_id"], proto["id"], amount)
+
+            # Update protocol — one more investor only if the upsert
+            # inserted (xmax = 0) rather than topped up a position.
+            writer.protocol(token_id, proto["id"], value=amount // 2,
+                            total_invested=amount, investors=int(new_position))
 
             result["energy_cost"] = COST_INVEST_ENERGY
             result["nxt_cost"] = amount
@@ -486,71 +782,29 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
             result["chat_msg"] = gen_chat_message(arch, "invested", name=proto["name"])
             result["chat_channel"] = "location"
 
-            cur.execute("""
-                UPDATE devs SET
-                    energy = GREATEST(0, energy - %s),
-                    balance_nxt = balance_nxt - %s,
-                    total_spent = total_spent + %s,
-                    total_invested = total_invested + %s
-                WHERE token_id = %s
-            """, (COST_INVEST_ENERGY, amount, amount, amount, dev["token_id"]))
+            writer.energy(token_id, -COST_INVEST_ENERGY)
+            writer.add(token_id,
+                       balance_nxt=-amount,
+                       total_spent=amount,
+                       total_invested=amount)
 
     elif action == "SELL":
-        # Check investments
-        cur.execute("""
-            SELECT pi.id, pi.protocol_id, pi.shares, pi.nxt_invested, p.name, p.value
-            FROM protocol_investments pi
-            JOIN protocols p ON p.id = pi.protocol_id
-            WHERE pi.dev_id = %s
-            ORDER BY RANDOM() LIMIT 1
-        """, (dev["token_id"],))
-        inv = cur.fetchone()
+        holdings = store.holdings(dev["token_id"])
+        inv = random.choice(holdings) if holdings else None
         if inv:
             result["energy_cost"] = COST_SELL_ENERGY
             sell_value = int(inv["shares"] * random.uniform(0.5, 1.8))
             pnl = sell_value - inv["nxt_invested"]
 
-            cur.execute("DELETE FROM protocol_investments WHERE dev_id = %s AND protocol_id = %s",
-                        (dev["token_id"], inv["protocol_id"]))
-            cur.execute("UPDATE protocols SET value = GREATEST(0, value - %s) WHERE id = %s",
-                        (inv["shares"] // 3, inv["protocol_id"]))
+            closed = store.close_position(dev["token_id"], inv["protocol_id"])
+            writer.protocol(token_id, inv["protocol_id"], value=-(inv["shares"] // 3),
+                            investors=-closed)
 
             result["details"] = {"protocol_id": inv["protocol_id"], "name": inv["name"],
                                  "sold_for": sell_value, "invested": inv["nxt_invested"], "pnl": pnl}
             result["chat_msg"] = gen_chat_message(arch, "sold", name=inv["name"])
             result["chat_channel"] = "location"
-
-            cur.execute("""
-                UPDATE devs SET
-                    balance_nxt = balance_nxt + %s,
-                    total_earned = total_earned + %s,
-                    energy = GREATEST(0, energy - %s)
-                WHERE token_id = %s
-            """, (sell_value, sell_value, COST_SELL_ENERGY, dev["token_id"]))
-
-            # Shadow-write to nxt_ledger (Fase 3B, fixed in follow-up).
-            # protocol_investments.id is the natural SERIAL PK — each
-            # sell → reinvest cycle creates a new row with a fresh id,
-            # so a dev that sells, reinvests, and sells again no longer
-            # collides on idempotency_key (which was the latent bug
-            # when ref_id was protocol_id).
-            if is_shadow_write_enabled() and ledger_insert is not None:
-                try:
-                    ledger_insert(
-                        cur,
-                        wallet_address=dev["owner_address"],
-                        dev_token_id=dev["token_id"],
-                        delta_nxt=sell_value,
-                        source=LedgerSource.SELL_INVESTMENT,
-                        ref_table="protocol_investments",
-                        ref_id=inv["id"],
-                    )
-                except Exception as _e:  # noqa: BLE001
-                    log.warning(
-                        "ledger_shadow_write_failed source=sell_investment "
-                        "token_id=%s error=%s",
-                        dev["token_id"], _e,
-                    )
+            store.credit_sale(dev, inv, sell_value, COST_SELL_ENERGY)
 
     elif action == "MOVE":
         old_loc = dev["location"]
@@ -563,9 +817,8 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
         result["energy_cost"] = COST_MOVE_ENERGY
         result["details"] = {"from": old_loc, "to": new_loc}
 
-        cur.execute("""
-            UPDATE devs SET energy = GREATEST(0, energy - %s), location = %s WHERE token_id = %s
-        """, (COST_MOVE_ENERGY, new_loc, dev["token_id"]))
+        writer.energy(token_id, -COST_MOVE_ENERGY)
+        writer.set(token_id, location=new_loc)
 
     elif action == "CHAT":
         # Only minted devs (with ipfs_hash) can chat. Un-minted devs would
@@ -575,22 +828,16 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
         if not dev.get("ipfs_hash"):
             regen = 5
             result["details"] = {"energy_restored": regen}
-            cur.execute(
-                "UPDATE devs SET energy = LEAST(max_energy, energy + %s), "
-                "hours_since_sleep = 0 WHERE token_id = %s",
-                (regen, dev["token_id"]),
-            )
+            writer.energy(token_id, regen)
+            writer.reset_sleep(token_id)
             action = "REST"
         else:
             # Pick a chat_type weighted by archetype personality. LURKER stays
             # mostly idle, INFLUENCER favors hot_takes/drama, DEGEN memes, etc.
-            type_weights = CHAT_TYPE_WEIGHTS.get(arch, CHAT_TYPE_WEIGHTS["10X_DEV"])
-            chat_type = random.choices(
-                list(type_weights.keys()),
-                weights=list(type_weights.values()),
-                k=1,
-            )[0]
-            msg, final_type = gen_chat_by_type(chat_type, arch, dev.get("corporation", ""))
+            # The scheduler tick draws these for all its chatting devs at
+            # once (pregenerate_chats); single-dev callers draw here.
+            msg, final_type = context.get("chat") or gen_chat_by_type(
+                roll_chat_type(arch), arch, dev.get("corporation", ""))
             channel = random.choice(["location", "trollbox"])
 
             # Socializing raises social_vitality — amount varies by archetype
@@ -603,7 +850,8 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
             # _apply_chat_social_gain returns the EFFECTIVE gain (what actually
             # persisted to the DB), which is 0 if the dev is already at cap —
             # so the Live Feed "+N SOCIAL" badge never lies.
-            social_gain = _apply_chat_social_gain(cur, dev["token_id"], arch)
+            social_gain = _apply_chat_social_gain(
+                store.cur, token_id, arch, writer, dev.get("social_vitality"))
 
             result["chat_msg"] = msg
             result["chat_channel"] = channel
@@ -621,8 +869,7 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
             }
 
     elif action == "CODE_REVIEW":
-        cur.execute("SELECT id, name, code_quality FROM protocols WHERE status = 'active' ORDER BY RANDOM() LIMIT 1")
-        proto = cur.fetchone()
+        proto = store.pick_protocol("id, name, code_quality")
         if proto:
             found_bug = random.random() < 0.25
             result["energy_cost"] = COST_REVIEW_ENERGY
@@ -630,17 +877,18 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
             if found_bug:
                 damage = random.randint(50, 200)
                 quality_drop = random.randint(5, 15)
-                cur.execute("UPDATE protocols SET value = GREATEST(0, value - %s), code_quality = GREATEST(0, code_quality - %s) WHERE id = %s",
-                            (damage, quality_drop, proto["id"]))
+                writer.protocol(token_id, proto["id"], value=-damage, code_quality=-quality_drop)
                 review_lines = random.randint(20, 100)
-                cur.execute("UPDATE devs SET energy = GREATEST(0, energy - %s), code_reviews_done = code_reviews_done + 1, bugs_found = bugs_found + 1, reputation = reputation + 5, lines_of_code = lines_of_code + %s WHERE token_id = %s",
-                            (COST_REVIEW_ENERGY, review_lines, dev["token_id"]))
+                writer.energy(token_id, -COST_REVIEW_ENERGY)
+                writer.add(token_id, code_reviews_done=1, bugs_found=1,
+                           reputation=5, lines_of_code=review_lines)
                 result["details"] = {"protocol_id": proto["id"], "name": proto["name"], "found_bug": True}
                 result["chat_msg"] = gen_chat_message(arch, "code_review_bug", name=proto["name"])
             else:
                 review_lines = random.randint(10, 50)
-                cur.execute("UPDATE devs SET energy = GREATEST(0, energy - %s), code_reviews_done = code_reviews_done + 1, reputation = reputation + 1, lines_of_code = lines_of_code + %s WHERE token_id = %s",
-                            (COST_REVIEW_ENERGY, review_lines, dev["token_id"]))
+                writer.energy(token_id, -COST_REVIEW_ENERGY)
+                writer.add(token_id, code_reviews_done=1, reputation=1,
+                           lines_of_code=review_lines)
                 result["details"] = {"protocol_id": proto["id"], "name": proto["name"], "found_bug": False}
                 result["chat_msg"] = gen_chat_message(arch, "code_review_clean", name=proto["name"])
             result["chat_channel"] = "location"
@@ -648,46 +896,30 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
     elif action == "REST":
         regen = 5
         result["details"] = {"energy_restored": regen}
-        cur.execute("UPDATE devs SET energy = LEAST(max_energy, energy + %s), hours_since_sleep = 0 WHERE token_id = %s",
-                    (regen, dev["token_id"]))
+        writer.energy(token_id, regen)
+        writer.reset_sleep(token_id)
 
     # --- Post-action: increment hours_since_sleep for non-REST actions ---
     if action != "REST":
-        cur.execute("UPDATE devs SET hours_since_sleep = hours_since_sleep + 1 WHERE token_id = %s",
-                    (dev["token_id"],))
+        writer.add(token_id, hours_since_sleep=1)
 
     # --- Post-action: mood shift (10% chance) ---
     if random.random() < 0.10:
         new_mood = random.choice(MOODS)
-        cur.execute("UPDATE devs SET mood = %s WHERE token_id = %s", (new_mood, dev["token_id"]))
+        writer.set(token_id, mood=new_mood)
 
     # --- Auto-vote on a random AI (15% chance) ---
     if random.random() < 0.15:
         vote_weight = ARCHETYPE_META[arch]["vote_weight"]
         if random.random() < vote_weight:
-            cur.execute("""
-                SELECT id FROM absurd_ais WHERE creator_dev_id != %s ORDER BY RANDOM() LIMIT 1
-            """, (dev["token_id"],))
-            ai_row = cur.fetchone()
+            ai_row = store.pick_ai(exclude_creator=dev["token_id"])
             if ai_row:
-                cur.execute("""
-                    INSERT INTO ai_votes (voter_dev_id, ai_id, weight)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (voter_dev_id, ai_id) DO NOTHING
-                """, (dev["token_id"], ai_row["id"], vote_weight))
-                cur.execute("""
-                    UPDATE absurd_ais SET
-                        vote_count = (SELECT COUNT(*) FROM ai_votes WHERE ai_id = %s),
-                        weighted_votes = (SELECT COALESCE(SUM(weight), 0) FROM ai_votes WHERE ai_id = %s)
-                    WHERE id = %s
-                """, (ai_row["id"], ai_row["id"], ai_row["id"]))
+                weight = store.vote(dev["token_id"], ai_row["id"], vote_weight)
+                if weight is not None:  # a repeat vote is a no-op, counters included
+                    writer.vote(token_id, ai_row["id"], weight)
 
     # --- Log action ---
-    cur.execute("""
-        INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """, (dev["token_id"], dev["name"], dev["archetype"], action,
-          json.dumps(result["details"]), result["energy_cost"], result["nxt_cost"]))
+    writer.action(dev, action, result["details"], result["energy_cost"], result["nxt_cost"])
 
     # --- Contextual CHAT row for Live Feed ---
     # Actions like CREATE_PROTOCOL / CREATE_AI / INVEST / SELL / CODE_REVIEW
@@ -704,7 +936,8 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
         and result.get("chat_channel")
         and dev.get("ipfs_hash")
     ):
-        contextual_gain = _apply_chat_social_gain(cur, dev["token_id"], arch)
+        contextual_gain = _apply_chat_social_gain(
+            store.cur, token_id, arch, writer, dev.get("social_vitality"))
         contextual_details = {
             "location": dev["location"],
             "message": result["chat_msg"],
@@ -713,25 +946,15 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
             "contextual": True,
             "trigger_action": action,
         }
-        cur.execute("""
-            INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
-            VALUES (%s, %s, %s, 'CHAT', %s, 0, 0)
-        """, (dev["token_id"], dev["name"], dev["archetype"],
-              json.dumps(contextual_details)))
+        writer.action(dev, "CHAT", contextual_details)
 
     # --- Log chat message ---
     if result["chat_msg"] and result["chat_channel"]:
-        cur.execute("""
-            INSERT INTO chat_messages
-                (dev_id, dev_name, archetype, channel, location, message,
-                 chat_type, social_gain)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (dev["token_id"], dev["name"], dev["archetype"],
-              result["chat_channel"],
-              dev["location"] if result["chat_channel"] == "location" else None,
-              result["chat_msg"],
-              result.get("chat_type", "idle"),
-              result.get("social_gain", 0)))
+        writer.chat(dev, result["chat_channel"],
+                    dev["location"] if result["chat_channel"] == "location" else None,
+                    result["chat_msg"],
+                    result.get("chat_type", "idle"),
+                    result.get("social_gain", 0))
 
     # --- Random bug generation (5% chance per action) ---
     if random.random() < 0.05:
@@ -742,41 +965,41 @@ def execute_action(conn, dev: dict, action: str, context: dict) -> dict:
             severity, fix_cost = "error", 8
         else:
             severity, fix_cost = "bsod", 20
-        bug_expires = (datetime.now(timezone.utc) + timedelta(hours=2)).isoformat()
-        cur.execute("""
-            INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
-            VALUES (%s, %s, %s, 'GET_SABOTAGED', %s::jsonb, 0, 0)
-        """, (dev["token_id"], dev["name"], dev["archetype"],
-              json.dumps({"event": "bug_detected", "severity": severity,
-                          "fix_cost": fix_cost, "expires_at": bug_expires,
-                          "message": f"BUG DETECTED ({severity.upper()}) in {dev['name']}'s workstation"})))
-        cur.execute("UPDATE devs SET bugs_shipped = bugs_shipped + 1 WHERE token_id = %s", (dev["token_id"],))
+        bug_expires = (sim_clock.now() + timedelta(hours=2)).isoformat()
+        writer.action(dev, "GET_SABOTAGED",
+                      {"event": "bug_detected", "severity": severity,
+                       "fix_cost": fix_cost, "expires_at": bug_expires,
+                       "message": f"BUG DETECTED ({severity.upper()}) in {dev['name']}'s workstation"})
+        writer.add(token_id, bugs_shipped=1)
 
     # --- Update last action + scheduling ---
     interval = calc_next_interval(dev, context)
-    now = datetime.now(timezone.utc)
-    cur.execute("""
-        UPDATE devs SET
-            last_action_type = %s,
-            last_action_detail = %s,
-            last_action_at = %s,
-            last_message = %s,
-            last_message_channel = %s,
-            next_cycle_at = %s,
-            cycle_interval_sec = %s,
-            cycles_active = cycles_active + 1
-        WHERE token_id = %s
-    """, (action, json.dumps(result["details"])[:500], now,
-          result["chat_msg"][:500] if result["chat_msg"] else None,
-          result["chat_channel"],
-          now + timedelta(seconds=interval), interval,
-          dev["token_id"]))
+    now = sim_clock.now()
+    writer.schedule(
+        token_id,
+        action=action,
+        detail=json.dumps(result["details"])[:500],
+        at=now,
+        message=result["chat_msg"][:500] if result["chat_msg"] else None,
+        channel=result["chat_channel"],
+        next_cycle_at=now + timedelta(seconds=interval),
+        interval=interval,
+    )
+
+    if own_writer:
+        store.flush(writer, fallback=False)
 
     return result
 
 
 def calc_next_interval(dev: dict, context: dict) -> int:
-    """Calculate next cycle interval based on dev state."""
+    """Calculate next cycle interval based on dev state.
+
+    Devs of dormant owners (owner_activity.py) cycle hourly, whatever
+    their energy."""
+    if is_dormant(dev.get("owner_active_at")):
+        metrics.DORMANT_CYCLES.inc()
+        return CYCLE_OWNER_OFFLINE
     energy = dev["energy"]
     if context.get("event_effects", {}).get("create_protocol_multiplier", 1) > 1:
         return CYCLE_HACKATHON  # Hackathon = faster cycles
@@ -793,25 +1016,33 @@ def calc_next_interval(dev: dict, context: dict) -> int:
 # PROCESS SINGLE DEV CYCLE
 # ============================================================
 
-def check_and_process_prompt(conn, dev: dict, context: dict) -> Optional[dict]:
-    """Check for a pending player prompt, process it, and return result if any."""
+def check_and_process_prompt(conn, dev: dict, context: dict,
+                             prompts: Optional[dict] = None) -> Optional[dict]:
+    """Check for a pending player prompt and process it; the result, if
+    any, with the player_prompts row under "prompt". Reads only — the
+    prompt is consumed by record_prompt_response, with the action.
+
+    ``prompts`` is the tick's prefetched {token_id: oldest pending prompt}
+    (see _fetch_shared_context); without it the prompt is looked up here."""
     cur = get_cursor(conn)
 
     # Fetch oldest unconsumed prompt for this dev
-    cur.execute("""
-        SELECT id, player_address, prompt_text
-        FROM player_prompts
-        WHERE dev_id = %s AND consumed = FALSE
-        ORDER BY created_at ASC
-        LIMIT 1
-    """, (dev["token_id"],))
-    prompt_row = cur.fetchone()
+    if prompts is not None:
+        prompt_row = prompts.get(dev["token_id"])
+    else:
+        cur.execute("""
+            SELECT id, player_address, prompt_text
+            FROM player_prompts
+            WHERE dev_id = %s AND consumed = FALSE
+            ORDER BY created_at ASC
+            LIMIT 1
+        """, (dev["token_id"],))
+        prompt_row = cur.fetchone()
     if not prompt_row:
         return None
 
-    # Gather known protocol names for context
-    cur.execute("SELECT name FROM protocols WHERE status = 'active'")
-    known_protocols = [r["name"] for r in cur.fetchall()]
+    # Known protocol names for mention extraction
+    _protocol_matcher.refresh(cur)
 
     # Fetch extra dev stats needed by process_prompt
     cur.execute("""
@@ -822,50 +1053,57 @@ def check_and_process_prompt(conn, dev: dict, context: dict) -> Optional[dict]:
     dev_full = {**dev, **stats} if stats else dev
 
     # Process the prompt through the personality system
-    prompt_result = process_prompt(prompt_row["prompt_text"], dev_full, known_protocols)
+    prompt_result = process_prompt(prompt_row["prompt_text"], dev_full, _protocol_matcher)
+    prompt_result["prompt"] = prompt_row
+    return prompt_result
+
+
+def record_prompt_response(conn, dev: dict, prompt_result: dict,
+                           writer: Optional[TickWriter] = None):
+    """Consume the prompt check_and_process_prompt processed and log the
+    dev's response (chat, action, owner notification)."""
+    prompt_row = prompt_result["prompt"]
+    cur = get_cursor(conn)
+    own_writer = writer is None
+    if own_writer:
+        writer = TickWriter()
 
     # Mark prompt as consumed
+    _DevSavepoint.note_write(conn)
     cur.execute("""
-        UPDATE player_prompts SET consumed = TRUE, consumed_at = NOW()
+        UPDATE player_prompts SET consumed = TRUE, consumed_at = %s
         WHERE id = %s
-    """, (prompt_row["id"],))
+    """, (sim_clock.now(), prompt_row["id"]))
 
     # Save dev response as a chat message
     if prompt_result.get("response"):
-        cur.execute("""
-            INSERT INTO chat_messages (dev_id, dev_name, archetype, channel, location, message)
-            VALUES (%s, %s, %s, 'trollbox', NULL, %s)
-        """, (dev["token_id"], dev["name"], dev["archetype"],
-              prompt_result["response"][:500]))
+        writer.chat(dev, "trollbox", None, prompt_result["response"][:500])
 
     # Log as action
-    cur.execute("""
-        INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
-        VALUES (%s, %s, %s, 'CHAT', %s, 0, 0)
-    """, (dev["token_id"], dev["name"], dev["archetype"],
-          json.dumps({
-              "event": "prompt_response",
-              "player_prompt": prompt_row["prompt_text"][:200],
-              "intent": prompt_result.get("intent"),
-              "compliance": prompt_result.get("compliance"),
-              "response": prompt_result.get("response", ""),
-          })))
+    writer.action(dev, "CHAT", {
+        "event": "prompt_response",
+        "player_prompt": prompt_row["prompt_text"][:200],
+        "intent": prompt_result.get("intent"),
+        "compliance": prompt_result.get("compliance"),
+        "response": prompt_result.get("response", ""),
+    })
 
     # Notify the player about the dev's response
     owner = prompt_row.get("player_address") or dev.get("owner_address")
     if owner and prompt_result.get("response"):
-        insert_notification(cur, owner, "prompt_response",
+        writer.notification(owner, "prompt_response",
             f"{dev['name']} responded to your order",
             f"You said: \"{prompt_row['prompt_text'][:100]}\"\n\n"
             f"{dev['name']} [{prompt_result.get('compliance', 'unknown')}]: "
             f"\"{prompt_result['response'][:300]}\"",
             dev["token_id"])
 
+    if own_writer:
+        writer.flush(cur, fallback=False)
+
     log.info(f"📨 {dev['name']} received prompt: \"{prompt_row['prompt_text'][:60]}\"")
     log.info(f"   → [{prompt_result.get('compliance', '?')}] \"{prompt_result.get('response', '')[:80]}\"")
 
-    return prompt_result
-
 
 def apply_prompt_modifiers(context: dict, prompt_result: dict) -> dict:
     """Apply weight modifiers from a processed prompt to the dev's context."""
@@ -883,19 +1121,27 @@ def apply_prompt_modifiers(context: dict, prompt_result: dict) -> dict:
     return ctx
 
 
-def process_dev(conn, dev: dict, context: dict) -> dict:
-    """Full cycle for one dev: check prompt → decide → execute → return result."""
-    # Check for pending player prompts before deciding action
-    prompt_result = check_and_process_prompt(conn, dev, context)
+def prepare_dev(conn, dev: dict, context: dict,
+                prompts: Optional[dict] = None) -> tuple:
+    """Process a pending player prompt (if any) ahead of the decision.
+
+    Returns (context, prompt_result) — context carries the prompt's
+    weight modifiers when one was processed. Writes nothing: finish_dev
+    consumes the prompt, so a dev rolled back keeps it for next time."""
+    prompt_result = check_and_process_prompt(conn, dev, context, prompts)
     if prompt_result:
         context = apply_prompt_modifiers(context, prompt_result)
+    return context, prompt_result
 
-    action = decide_action(dev, context)
 
-    # Budget cap: engine can only spend up to 40% of balance on auto-actions
-    # This preserves ~60% for player-initiated spending (shop, training, raids)
-    # Exempt low-balance devs (<50 $NXT) so they can start creating early
-    SPENDING_ACTIONS = {"CREATE_PROTOCOL", "CREATE_AI", "INVEST"}
+SPENDING_ACTIONS = {"CREATE_PROTOCOL", "CREATE_AI", "INVEST"}
+
+
+def apply_budget_cap(dev: dict, action: str) -> str:
+    """Budget cap: engine can only spend up to 40% of balance on auto-actions.
+
+    This preserves ~60% for player-initiated spending (shop, training, raids)
+    Exempt low-balance devs (<50 $NXT) so they can start creating early"""
     if action in SPENDING_ACTIONS and dev["balance_nxt"] >= 50:
         available_budget = int(dev["balance_nxt"] * 0.4)
         action_cost = {
@@ -905,8 +1151,18 @@ def process_dev(conn, dev: dict, context: dict) -> dict:
         }.get(action, 0)
         if action_cost > available_budget:
             action = "REST"
+    return action
 
-    result = execute_action(conn, dev, action, context)
+
+def finish_dev(conn, dev: dict, action: str, context: dict,
+               prompt_result: Optional[dict] = None,
+               writer: Optional[TickWriter] = None) -> dict:
+    """Record the prompt response, if any, then apply the budget cap to
+    a decided action and execute it."""
+    if prompt_result:
+        record_prompt_response(conn, dev, prompt_result, writer)
+    action = apply_budget_cap(dev, action)
+    result = execute_action(conn, dev, action, context, writer)
 
     # Attach prompt info to result for logging
     if prompt_result:
@@ -915,53 +1171,134 @@ def process_dev(conn, dev: dict, context: dict) -> dict:
     return result
 
 
+def process_dev(conn, dev: dict, context: dict) -> dict:
+    """Full cycle for one dev: check prompt → decide → execute → return result."""
+    context, prompt_result = prepare_dev(conn, dev, context)
+    action = decide_action(dev, context)
+    return finish_dev(conn, dev, action, context, prompt_result)
+
+
 # ============================================================
 # SCHEDULER — Fetches due devs and processes them
 # ============================================================
 
-def fetch_due_devs(conn, limit: int = SCHEDULER_BATCH_SIZE) -> list:
+def fetch_due_devs(conn, limit: int = SCHEDULER_BATCH_SIZE,
+                   skip_locked: bool = False,
+                   shards: Optional[tuple] = None,
+                   token_ids: Optional[list] = None,
+                   exclude: Optional[set] = None) -> list:
     """Get devs whose next_cycle_at has passed.
 
     Devs with energy <= 0 are excluded — they stay idle until FEED'd
     via the shop. Salary still pays them (separate cron) but they
-    don't act."""
+    don't act.
+
+    With ``skip_locked`` the rows are claimed FOR UPDATE SKIP LOCKED:
+    they stay locked until the caller commits, and concurrent workers
+    skip past them to the next due devs instead of double-processing.
+
+    ``shards`` = (shard_count, owned) restricts the batch to devs with
+    token_id % shard_count in ``owned`` (multi-node engine, sharding.py).
+    ``token_ids`` restricts it to the ids the due queue says are due;
+    ``exclude`` skips ids (devs that already failed this tick).
+    ``owner_active_at`` is the owner's players.last_active_at, for the
+    dormant-owner interval (calc_next_interval)."""
+    shard_filter, params = "", [sim_clock.now()]
+    if shards is not None:
+        shard_count, owned = shards
+        if not owned:
+            return []
+        shard_filter = "AND token_id %% %s = ANY(%s)"
+        params += [shard_count, list(owned)]
+    if token_ids is not None:
+        if not token_ids:
+            return []
+        shard_filter += " AND token_id = ANY(%s)"
+        params.append(list(token_ids))
+    if exclude:
+        shard_filter += " AND token_id <> ALL(%s)"
+        params.append(list(exclude))
+    params.append(limit)
+    # Split layout: read the two tables behind the devs view and lock
+    # only the runtime row, leaving the profile free for API writes.
+    if tick_writer.DEV_STATE_TABLE == "dev_runtime":
+        source, lock = "dev_runtime JOIN dev_profile USING (token_id)", "FOR UPDATE OF dev_runtime SKIP LOCKED"
+    else:
+        source, lock = "devs", "FOR UPDATE SKIP LOCKED"
     cur = get_cursor(conn)
     cur.execute("""
         SELECT token_id, name, owner_address, archetype, corporation, rarity_tier,
                personality_seed, energy, max_energy, mood, location,
-               balance_nxt, reputation, status, ipfs_hash
-        FROM devs
+               balance_nxt, reputation, status, ipfs_hash, social_vitality,
+               (SELECT last_active_at FROM players
+                WHERE wallet_address = owner_address) AS owner_active_at
+        FROM """ + source + """
         WHERE status = 'active'
           AND energy > 0
-          AND next_cycle_at <= NOW()
+          AND next_cycle_at <= %s
+          """ + shard_filter + """
         ORDER BY next_cycle_at ASC
         LIMIT %s
-    """, (limit,))
+    """ + (lock if skip_locked else ""), params)
     return cur.fetchall()
 
 
-def _fetch_shared_context(conn) -> dict:
-    """Fetch context that is identical for all devs in a tick (run once)."""
+def use_dev_layout(conn) -> str:
+    """Point the engine's hot writes (tick flush, vitals settle, salary,
+    due-dev claims) at dev_runtime when db/migration_dev_runtime.sql has
+    split devs, else at devs. Returns the table chosen."""
     cur = get_cursor(conn)
-    cur.execute("SELECT COUNT(*) as cnt FROM protocols WHERE status = 'active'")
-    has_protocols = cur.fetchone()["cnt"] > 0
-    cur.execute("""
-        SELECT effects FROM world_events
-        WHERE is_active = TRUE AND starts_at <= NOW() AND ends_at >= NOW()
-        ORDER BY starts_at DESC LIMIT 1
-    """)
-    event_row = cur.fetchone()
-    return {
-        "has_protocols": has_protocols,
-        "event_effects": event_row["effects"] if event_row else {},
+    cur.execute("SELECT to_regclass('dev_runtime') IS NOT NULL AS split")
+    table = "dev_runtime" if cur.fetchone()["split"] else "devs"
+    tick_writer.use_dev_state_table(table)
+    return table
+
+
+def _fetch_shared_context(conn, devs: Optional[list] = None) -> dict:
+    """Fetch context that is identical for all devs in a tick (run once).
+
+    With the tick's ``devs`` it also prefetches, in one ``= ANY`` query
+    each, which of them hold investments and their oldest pending
+    prompt — so build_context / check_and_process_prompt need no
+    per-dev round trip. The prompt query only covers devs the prompt
+    wake listener has seen a prompt for (prompt_wake.py), and is skipped
+    when there are none."""
+    cur = get_cursor(conn)
+    _sampling.refresh(cur)
+    shared = {
+        "has_protocols": _sampling.has_protocols(),
+        "event_effects": world_state.effects(cur),
     }
+    if devs is not None:
+        token_ids = [d["token_id"] for d in devs]
+        cur.execute("SELECT DISTINCT dev_id FROM protocol_investments WHERE dev_id = ANY(%s)",
+                    (token_ids,))
+        shared["invested"] = {r["dev_id"] for r in cur.fetchall()}
+        prompted = pending_prompts.candidates(token_ids)
+        shared["prompts"] = {}
+        if prompted is None or prompted:
+            cur.execute("""
+                SELECT DISTINCT ON (dev_id) id, dev_id, player_address, prompt_text
+                FROM player_prompts
+                WHERE dev_id = ANY(%s) AND consumed = FALSE
+                ORDER BY dev_id, created_at ASC
+            """, (token_ids if prompted is None else prompted,))
+            shared["prompts"] = {r["dev_id"]: r for r in cur.fetchall()}
+        if prompted:
+            # Devs whose prompt is consumed this tick stay listed until
+            # their next cycle finds nothing — a rolled-back dev keeps it.
+            pending_prompts.discard(set(prompted) - set(shared["prompts"]))
+    return shared
 
 
 def build_context(conn, dev: dict, shared: dict) -> dict:
     """Build the context packet for a dev's decision."""
-    cur = get_cursor(conn)
-    cur.execute("SELECT COUNT(*) as cnt FROM protocol_investments WHERE dev_id = %s", (dev["token_id"],))
-    has_investments = cur.fetchone()["cnt"] > 0
+    if "invested" in shared:
+        has_investments = dev["token_id"] in shared["invested"]
+    else:
+        cur = get_cursor(conn)
+        cur.execute("SELECT COUNT(*) as cnt FROM protocol_investments WHERE dev_id = %s", (dev["token_id"],))
+        has_investments = cur.fetchone()["cnt"] > 0
     return {
         "has_protocols": shared["has_protocols"],
         "has_investments": has_investments,
@@ -969,43 +1306,250 @@ def build_context(conn, dev: dict, shared: dict) -> dict:
     }
 
 
-def run_scheduler_tick(conn) -> int:
-    """Process one batch of due devs. Returns count processed."""
-    devs = fetch_due_devs(conn)
-    if not devs:
-        return 0
+def _settle_batch_vitals(conn, devs: list) -> list:
+    """Bring the batch's vitals up to date before it acts (vitals.py).
 
-    shared_ctx = _fetch_shared_context(conn)
+    The settled energy / social_vitality replace the fetched ones; devs
+    whose energy decayed to 0 since their last settlement are dropped,
+    as fetch_due_devs would have skipped them."""
+    settled = {r["token_id"]: r for r in settle_devs(get_cursor(conn),
+                                                      [d["token_id"] for d in devs],
+                                                      table=tick_writer.DEV_STATE_TABLE)}
+    if not settled:
+        return devs
+    for dev in devs:
+        row = settled.get(dev["token_id"])
+        if row:
+            dev["energy"] = row["energy"]
+            dev["social_vitality"] = row["social_vitality"]
+    return [d for d in devs if d["energy"] > 0]
 
-    processed = 0
+
+def _requeue_not_yet_due(conn, due_queue: DueQueue, token_ids: set):
+    """Popped ids the claim query passed over. Ones the DB has due later
+    (clock skew, stale entry) go back in the queue at that time; ones
+    still due are locked by another worker, which will push them."""
+    cur = get_cursor(conn)
+    cur.execute("""
+        SELECT token_id, next_cycle_at FROM devs
+        WHERE token_id = ANY(%s) AND status = 'active' AND energy > 0
+          AND next_cycle_at > %s
+    """, (list(token_ids), sim_clock.now()))
+    for row in cur.fetchall():
+        due_queue.push(row["token_id"], row["next_cycle_at"])
+
+
+def run_scheduler_tick(conn, limit: int = SCHEDULER_BATCH_SIZE,
+                       skip_locked: bool = False,
+                       shards: Optional[tuple] = None,
+                       due_queue: Optional[DueQueue] = None,
+                       commit_every: int = SCHEDULER_COMMIT_EVERY) -> int:
+    """Process one batch of due devs. Returns count processed.
+
+    The batch is claimed, run and committed ``commit_every`` devs at a
+    time, so its row locks are held for one micro-batch only. Each dev
+    runs under a _DevSavepoint: an error rolls back that dev's
+    statements and buffered writes — it stays due and is retried next
+    tick — and the rest of the micro-batch still commits.
+
+    With a ``due_queue`` the batch is the ids it has due right now (no
+    query at all when there are none) and every claimed dev is pushed
+    back with its new next_cycle_at after its micro-batch commits."""
+    token_ids = None
+    if due_queue is not None:
+        token_ids = due_queue.pop_due(limit, shards, now=sim_clock.time())
+        if not token_ids:
+            return 0
+    phases = metrics.PhaseClock("tick")
+    step = max(1, commit_every)
+    processed, offset, seen, ran = 0, 0, set(), False
+    while offset < limit:
+        size = min(step, limit - offset)
+        chunk = None
+        if token_ids is not None:
+            chunk = token_ids[offset:offset + size]
+            if not chunk:
+                break
+        offset += size
+        fetched = fetch_due_devs(conn, size, skip_locked, shards, chunk, seen)
+        seen.update(d["token_id"] for d in fetched)
+        if chunk is not None and len(fetched) < len(chunk):
+            _requeue_not_yet_due(conn, due_queue,
+                                 set(chunk) - {d["token_id"] for d in fetched})
+        devs = _settle_batch_vitals(conn, fetched) if fetched else []
+        if devs:
+            done, next_cycles = _run_micro_batch(conn, devs, phases)
+            processed += done
+            ran = True
+            if due_queue is not None:
+                # Devs rolled back mid-tick are still due in the DB — retry soon.
+                retry_at = sim_clock.time() + SCHEDULER_INTERVAL_SEC
+                for dev in devs:
+                    due_queue.push(dev["token_id"], next_cycles.get(dev["token_id"], retry_at))
+        else:
+            # End the read transaction so a long-lived worker connection
+            # doesn't sit idle in transaction (and keep NOW() fresh for the
+            # rest of the next tick).
+            conn.commit()
+        if chunk is None and len(fetched) < size:
+            break
+    if ran:
+        phases.done()
+        metrics.DEVS_PROCESSED.inc(amount=processed)
+    return processed
+
+
+def _run_micro_batch(conn, devs: list, phases: metrics.PhaseClock) -> tuple:
+    """Prepare, decide, execute, flush and commit claimed ``devs``.
+    Returns (processed, next_cycles)."""
+    shared_ctx = _fetch_shared_context(conn, devs)
+    phases.lap("fetch")
+    # Dev updates + actions/chat inserts for the micro-batch, flushed
+    # set-based right before commit.
+    writer = TickWriter()
+    savepoint = _DevSavepoint(conn, writer)
+
+    # Phase 1: per-dev context + prompt processing (consumed in phase 3)
+    prepared = []
     for dev in devs:
+        savepoint.begin()
         try:
             ctx = build_context(conn, dev, shared_ctx)
-            result = process_dev(conn, dev, ctx)
-            processed += 1
-
-            # Log to console
-            action = result["action"]
-            emoji = {"CREATE_PROTOCOL": "🔧", "CREATE_AI": "🤖", "INVEST": "📈",
-                     "SELL": "📉", "MOVE": "🚶", "CHAT": "💬",
-                     "CODE_REVIEW": "🔍", "REST": "😴"}.get(action, "❓")
-            log.info(f"{emoji} {dev['name']} ({dev['archetype']}) → {action}")
-            if result["chat_msg"]:
-                log.info(f"   💬 \"{result['chat_msg'][:80]}\"")
-
+            ctx, prompt_result = prepare_dev(conn, dev, ctx, shared_ctx["prompts"])
+            prepared.append((dev, ctx, prompt_result))
         except Exception as e:
             log.error(f"Error processing dev {dev['token_id']}: {e}")
-            conn.rollback()
+            metrics.DEV_ERRORS.inc()
+            savepoint.rollback()
+    savepoint.end()
+    phases.lap("prepare")
+
+    # Phase 2: decide every action in one batch
+    tick_devs, tick_ctxs = [p[0] for p in prepared], [p[1] for p in prepared]
+    actions = decide_actions(tick_devs, tick_ctxs)
+    pregenerate_chats(tick_devs, tick_ctxs, actions)
+    phases.lap("decide")
+
+    # Phase 3: execute
+    processed = 0
+    for (dev, ctx, prompt_result), action in zip(prepared, actions):
+        savepoint.begin()
+        try:
+            result = finish_dev(conn, dev, action, ctx, prompt_result, writer)
+            if savepoint.wrote:
+                writer.flush_savepoint(get_cursor(conn))
+        except Exception as e:
+            log.error(f"Error processing dev {dev['token_id']}: {e}")
+            metrics.DEV_ERRORS.inc()
+            savepoint.rollback()
             continue
-
+        processed += 1
+
+        # Log to console
+        action = result["action"]
+        metrics.ACTIONS.inc(action)
+        emoji = {"CREATE_PROTOCOL": "🔧", "CREATE_AI": "🤖", "INVEST": "📈",
+                 "SELL": "📉", "MOVE": "🚶", "CHAT": "💬",
+                 "CODE_REVIEW": "🔍", "REST": "😴"}.get(action, "❓")
+        log.info(f"{emoji} {dev['name']} ({dev['archetype']}) → {action}")
+        if result["chat_msg"]:
+            log.info(f"   💬 \"{result['chat_msg'][:80]}\"")
+    savepoint.end()
+    phases.lap("execute")
+
+    next_cycles = writer.next_cycles()
+    writer.flush(get_cursor(conn))
     conn.commit()
-    return processed
+    phases.lap("flush")
+    return processed, next_cycles
+
+
+def run_offline_tick(store: MemoryStore, limit: int = SCHEDULER_BATCH_SIZE,
+                     event_effects: Optional[dict] = None) -> list:
+    """run_scheduler_tick against a storage.MemoryStore: the devs due at
+    sim_clock.now() decide and execute with the production rules, and
+    the tick's writes are applied to the store. Returns the results.
+
+    No player prompts or vitals decay — those live in Postgres."""
+    devs = store.due_devs(sim_clock.now(), limit)
+    if not devs:
+        return []
+    invested = store.invested([d["token_id"] for d in devs])
+    ctxs = [{
+        "has_protocols": store.has_protocols(),
+        "has_investments": dev["token_id"] in invested,
+        "event_effects": event_effects or {},
+    } for dev in devs]
+    actions = decide_actions(devs, ctxs)
+    pregenerate_chats(devs, ctxs, actions)
+
+    writer = TickWriter()
+    results = [finish_dev(store, dev, action, ctx, writer=writer)
+               for dev, ctx, action in zip(devs, ctxs, actions)]
+    store.flush(writer)
+    return results
+
+
+def run_scheduler_worker(worker_id: int, stop_event: threading.Event,
+                         limit: int = SCHEDULER_BATCH_SIZE,
+                         coordinator: Optional[ShardCoordinator] = None,
+                         due_queue: Optional[DueQueue] = None):
+    """Parallel scheduler worker. Runs until ``stop_event`` is set.
+
+    Holds its own connection and claims disjoint batches of due devs
+    with SKIP LOCKED. A full batch means there is backlog, so the next
+    one is claimed right away; otherwise the worker idles for
+    SCHEDULER_INTERVAL_SEC — or, with a ``due_queue``, sleeps until the
+    next dev is due without touching the DB. With a ``coordinator`` only
+    devs in the shards this node currently holds are claimed.
+    """
+    log.info(f"🧵 Scheduler worker {worker_id} started (batch={limit})")
+    while not stop_event.is_set():
+        try:
+            with get_db() as conn:
+                while not stop_event.is_set():
+                    shards = coordinator.scheduler_shards() if coordinator else None
+                    if due_queue is not None and not due_queue.wait(1.0, shards):
+                        continue
+                    _cid_token = None
+                    if set_correlation_id and new_correlation_id:
+                        _cid_token = set_correlation_id(new_correlation_id())
+                    try:
+                        processed = run_scheduler_tick(conn, limit=limit, skip_locked=True,
+                                                       shards=shards, due_queue=due_queue)
+                    finally:
+                        if _cid_token is not None and reset_correlation_id:
+                            reset_correlation_id(_cid_token)
+                    if due_queue is None and processed < limit:
+                        stop_event.wait(SCHEDULER_INTERVAL_SEC)
+        except Exception as e:
+            log.error(f"Scheduler worker {worker_id} error: {e}")
+            stop_event.wait(5)
+
+
+def start_scheduler_workers(n: int = WORKER_THREADS,
+                            stop_event: Optional[threading.Event] = None,
+                            coordinator: Optional[ShardCoordinator] = None,
+                            due_queue: Optional[DueQueue] = None) -> list:
+    """Spawn ``n`` daemon scheduler workers sharing one batch budget."""
+    stop_event = stop_event or threading.Event()
+    limit = max(1, SCHEDULER_BATCH_SIZE // n)
+    threads = []
+    for i in range(n):
+        t = threading.Thread(
+            target=run_scheduler_worker, args=(i, stop_event, limit, coordinator, due_queue),
+            daemon=True, name=f"nx-scheduler-{i}",
+        )
+        t.start()
+        threads.append(t)
+    return threads
 
 
 # ============================================================
 # SALARY CRON
 # ============================================================
 
+@metrics.timed("pay_salaries")
 def pay_salaries(conn):
     """Pay salary to all active devs. Run every hour.
 
@@ -1015,132 +1559,69 @@ def pay_salaries(conn):
     """
     cur = get_cursor(conn)
 
-    # Get active weekly event effects
-    cur.execute("""
-        SELECT effects FROM world_events
-        WHERE is_active = TRUE AND event_type = 'weekly' AND starts_at <= NOW() AND ends_at >= NOW()
-        ORDER BY starts_at DESC LIMIT 1
-    """)
-    evt = cur.fetchone()
-    event_effects = evt["effects"] if evt else {}
-    if isinstance(event_effects, str):
-        event_effects = json.loads(event_effects)
-
+    event_effects = current_event_effects(cur)
     effective_salary = int(SALARY_PER_INTERVAL * event_effects.get("salary_multiplier", 1.0))
 
-    cur.execute("""
-        UPDATE devs SET
-            balance_nxt = balance_nxt + %s,
-            total_earned = total_earned + %s
-        WHERE status IN ('active', 'on_mission')
-        RETURNING token_id, owner_address
-    """, (effective_salary, effective_salary))
-
-    # Drain the RETURNING cursor BEFORE the next execute() — otherwise
-    # the second UPDATE overwrites cur's result set and fetchall()
-    # below raises "no results to fetch".
-    paid_rows = cur.fetchall()
-    count = len(paid_rows)
-
-    # Hourly energy decay: -1 per salary tick. Active devs only —
-    # on_mission devs keep energy frozen during the mission.
-    cur.execute("""
-        UPDATE devs SET energy = GREATEST(0, energy - 1)
-        WHERE status = 'active'
-    """)
-
-    # Shadow-write to nxt_ledger (Fase 3B). Each dev gets one row per
-    # hour; a re-run within the same hour with the same salary collides
-    # on idempotency_key and is a silent no-op. effective_salary is
-    # deterministic per tick (event multiplier × SALARY_PER_INTERVAL),
-    # so retries within one hour don't produce key drift.
-    if is_shadow_write_enabled() and ledger_insert is not None and paid_rows:
-        epoch_hour = int(time.time()) // 3600
-        for paid in paid_rows:
-            token_id = paid[0] if not isinstance(paid, dict) else paid["token_id"]
-            owner = paid[1] if not isinstance(paid, dict) else paid["owner_address"]
-            try:
-                ledger_insert(
-                    cur,
-                    wallet_address=owner,
-                    dev_token_id=token_id,
-                    delta_nxt=effective_salary,
-                    source=LedgerSource.SALARY,
-                    ref_table="salary_batches",
-                    ref_id=epoch_hour,
-                )
-            except Exception as _e:  # noqa: BLE001
-                log.warning(
-                    "ledger_shadow_write_failed source=salary token_id=%s error=%s",
-                    token_id, _e,
-                )
-
-    # Batch INSERT salary actions so they appear in feed & wallet movements
-    cur.execute("""
-        INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
-        SELECT token_id, name, archetype::archetype_enum, 'RECEIVE_SALARY'::action_enum,
-               jsonb_build_object(
-                   'event', 'salary',
-                   'amount', %s,
-                   'message', name || ' received salary'
-               ),
-               0, %s
-        FROM devs
-        WHERE status IN ('active', 'on_mission')
-    """, (effective_salary, effective_salary))
-
-    # Degrade PC health: -2 per hour for all active devs (min 0), with event modifier
-    pc_decay = max(0, int(2 * event_effects.get("pc_decay_multiplier", 1.0)))
-    cur.execute("""
-        UPDATE devs SET pc_health = GREATEST(0, pc_health - %s) WHERE status = 'active'
-    """, (pc_decay,))
-
-    # Decay vitals: caffeine -2, social -1, knowledge -1 per hour (min 0), with event modifier
-    caff_decay = max(0, int(2 * event_effects.get("energy_decay_multiplier", 1.0)))
-    social_decay = max(0, int(1 * event_effects.get("energy_decay_multiplier", 1.0)))
-    knowledge_decay = max(0, int(1 * event_effects.get("energy_decay_multiplier", 1.0)))
-    cur.execute("""
-        UPDATE devs SET
-            caffeine        = GREATEST(0, caffeine        - %s),
-            social_vitality = GREATEST(0, social_vitality - %s),
-            knowledge       = GREATEST(0, knowledge       - %s)
-        WHERE status = 'active'
-    """, (caff_decay, social_decay, knowledge_decay))
-
-    # Passive social recovery: if social_vitality dropped below 25, give +2/hour
-    # so devs don't get stuck at 0 and unable to hack (hack_raid requires ≥15).
-    # Effective net change below the threshold: -1 (decay) + 2 (recovery) = +1/hour.
-    # At or above 25, recovery is skipped and only decay applies.
-    # Threshold is 10 points above the hack minimum (15) so the player has a
-    # comfortable buffer before getting locked out again. Runs AFTER decay so
-    # a dev that ticks 25→24 gets bumped back to 25 in the same cycle (stable).
-    cur.execute("""
-        UPDATE devs SET
-            social_vitality = LEAST(25, social_vitality + 2)
-        WHERE status = 'active'
-          AND social_vitality < 25
-    """)
-
-    # Passive knowledge recovery: mirrors social recovery. Knowledge drives
-    # the bug generation rate (<15 = +2 bugs/h, 15-29 = +1 bug/h, ≥30 = 0),
-    # so keeping a floor of 30 cuts the SOURCE of the bug accumulation
-    # problem instead of only treating the symptom via the fix_bugs item.
-    # Net below 30: -1 (decay) + 2 (recovery) = +1/hour.
-    cur.execute("""
-        UPDATE devs SET
-            knowledge = LEAST(30, knowledge + 2)
-        WHERE status = 'active'
-          AND knowledge < 30
-    """)
-
-    # Low knowledge penalty: generate extra bugs
-    # knowledge < 15: +2 bugs/hour, knowledge 15-29: +1 bug/hour
-    cur.execute("""
-        UPDATE devs SET bugs_shipped = bugs_shipped + 2 WHERE status = 'active' AND knowledge < 15
-    """)
-    cur.execute("""
-        UPDATE devs SET bugs_shipped = bugs_shipped + 1 WHERE status = 'active' AND knowledge >= 15 AND knowledge < 30
-    """)
+    # Active and on_mission devs get paid, each with a salary action for
+    # the feed & wallet movements in the same statement. Vitals decay
+    # (energy, pc_health, caffeine, social/knowledge recovery, bugs) is
+    # no longer applied here: it is computed from vitals_settled_at on
+    # read and written when a dev is touched (vitals.py). Once devs is
+    # split (use_dev_layout) the UPDATE hits dev_runtime and the names
+    # come from dev_profile.
+    paid_from = ("FROM dev_profile p WHERE p.token_id = d.token_id AND"
+                 if tick_writer.DEV_STATE_TABLE == "dev_runtime" else "WHERE")
+    cur.execute(f"""
+        WITH paid AS (
+            UPDATE {tick_writer.DEV_STATE_TABLE} AS d SET
+                balance_nxt  = d.balance_nxt + %(salary)s,
+                total_earned = d.total_earned + %(salary)s
+            {paid_from} d.status IN ('active', 'on_mission')
+            RETURNING d.token_id, name, archetype, owner_address, d.balance_nxt
+        ), salary_actions AS (
+            INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
+            SELECT token_id, name, archetype::archetype_enum, 'RECEIVE_SALARY'::action_enum,
+                   jsonb_build_object(
+                       'event', 'salary',
+                       'amount', %(salary)s,
+                       'message', name || ' received salary'
+                   ),
+                   0, %(salary)s
+            FROM paid
+        )
+        SELECT token_id, owner_address, balance_nxt FROM paid
+    """, {"salary": effective_salary})
+    paid = cur.fetchall()
+    count = len(paid)
+
+    # Shadow-write to nxt_ledger (Fase 3B): one multi-row INSERT for the
+    # devs the UPDATE above paid, balance_after = the balance it
+    # returned. Each dev gets one row per hour; a re-run within the same
+    # hour with the same salary collides on idempotency_key and is a
+    # silent no-op. effective_salary is deterministic per tick (event
+    # multiplier × SALARY_PER_INTERVAL), so retries within one hour don't
+    # produce key drift. Best-effort: a failure rolls back to the
+    # savepoint only.
+    if (is_shadow_write_enabled() and ledger_insert_dev_batch is not None
+            and count and effective_salary):
+        epoch_hour = int(sim_clock.time()) // 3600
+        cur.execute("SAVEPOINT salary_ledger")
+        try:
+            ledger_insert_dev_batch(
+                cur,
+                devs=paid,
+                delta_nxt=effective_salary,
+                source=LedgerSource.SALARY,
+                ref_table="salary_batches",
+                ref_id=epoch_hour,
+            )
+            cur.execute("RELEASE SAVEPOINT salary_ledger")
+        except Exception as _e:  # noqa: BLE001
+            cur.execute("ROLLBACK TO SAVEPOINT salary_ledger")
+            log.warning(
+                "ledger_shadow_write_failed source=salary count=%s error=%s",
+                count, _e,
+            )
 
     if admin_log_event:
         admin_log_event(
@@ -1155,7 +1636,7 @@ def pay_salaries(conn):
         )
 
     conn.commit()
-    log.info(f"💰 Paid salary ({effective_salary} $NXT) to {count} devs + energy regen + PC wear")
+    log.info(f"💰 Paid salary ({effective_salary} $NXT) to {count} devs")
     if log_info:
         log_info(
             log,
@@ -1167,6 +1648,7 @@ def pay_salaries(conn):
     return count
 
 
+@metrics.timed("take_balance_snapshots")
 def take_balance_snapshots(conn):
     """Save daily balance snapshot for each player with devs. Run once per day."""
     cur = get_cursor(conn)
@@ -1192,6 +1674,115 @@ def take_balance_snapshots(conn):
     return count
 
 
+# ============================================================
+# COUNTER VERIFIER — drift repair for incrementally kept aggregates
+# ============================================================
+#
+# protocols.investor_count and absurd_ais.vote_count / weighted_votes
+# are maintained as deltas by the tick flush (tick_writer.py): +1 when
+# an INVEST upsert inserts, -1 when a SELL deletes, +1 / +weight when an
+# auto-vote's ON CONFLICT DO NOTHING inserts. This job recounts them
+# from protocol_investments / ai_votes and repairs any row that drifted
+# (manual SQL, a crash between statements, float accumulation in REAL).
+
+_COUNTER_CHECKS = (
+    ("protocols", """
+        SELECT p.id FROM protocols p
+        LEFT JOIN (SELECT protocol_id, COUNT(*) AS n FROM protocol_investments
+                   GROUP BY protocol_id) s ON s.protocol_id = p.id
+        WHERE p.investor_count <> COALESCE(s.n, 0)
+    """, """
+        UPDATE protocols p SET investor_count =
+            (SELECT COUNT(*) FROM protocol_investments WHERE protocol_id = p.id)
+        WHERE p.id = ANY(%s)
+    """),
+    ("absurd_ais", """
+        SELECT a.id FROM absurd_ais a
+        LEFT JOIN (SELECT ai_id, COUNT(*) AS n, SUM(weight) AS w FROM ai_votes
+                   GROUP BY ai_id) s ON s.ai_id = a.id
+        WHERE a.vote_count <> COALESCE(s.n, 0)
+           OR ABS(a.weighted_votes - COALESCE(s.w, 0)) > 0.01
+    """, """
+        UPDATE absurd_ais a SET vote_count = s.n, weighted_votes = s.w
+        FROM (SELECT a2.id, COUNT(v.ai_id) AS n, COALESCE(SUM(v.weight), 0) AS w
+              FROM absurd_ais a2 LEFT JOIN ai_votes v ON v.ai_id = a2.id
+              WHERE a2.id = ANY(%s) GROUP BY a2.id) s
+        WHERE a.id = s.id
+    """),
+)
+
+
+@metrics.timed("verify_counters")
+def verify_counters(conn) -> dict:
+    """Recount the incrementally kept aggregates and repair drift.
+
+    Drifting rows are locked in id order — the tick flush's lock order —
+    before the recount, so a tick whose rows and delta commit in between
+    is either fully counted or still waiting on the lock; the repair
+    never writes a stale count over a fresh delta. Returns the number
+    of rows repaired per table."""
+    cur = get_cursor(conn)
+    repaired = {}
+    for table, drift_sql, repair_sql in _COUNTER_CHECKS:
+        cur.execute(drift_sql)
+        ids = sorted(r["id"] for r in cur.fetchall())
+        if ids:
+            cur.execute(f"SELECT id FROM {table} WHERE id = ANY(%s) ORDER BY id FOR NO KEY UPDATE",
+                        (ids,))
+            cur.execute(repair_sql, (ids,))
+        repaired[table] = len(ids)
+    conn.commit()
+    if any(repaired.values()):
+        log.warning(f"🧮 Counter drift repaired: {repaired}")
+        if admin_log_event:
+            admin_log_event(cur, event_type="counter_drift_repaired", payload=repaired)
+            conn.commit()
+    return repaired
+
+
+# ============================================================
+# METRICS
+# ============================================================
+
+def sample_backlog(conn) -> dict:
+    """Set the backlog / lag gauges: schedulable devs past their
+    next_cycle_at and how long the oldest has been waiting."""
+    cur = get_cursor(conn)
+    cur.execute("""
+        SELECT COUNT(*) AS backlog,
+               COALESCE(EXTRACT(EPOCH FROM %(now)s - MIN(next_cycle_at)), 0) AS lag_sec
+        FROM devs
+        WHERE status = 'active' AND energy > 0 AND next_cycle_at <= %(now)s
+    """, {"now": sim_clock.now()})
+    row = cur.fetchone()
+    conn.commit()
+    metrics.DUE_BACKLOG.set(row["backlog"])
+    metrics.SCHEDULE_LAG.set(round(float(row["lag_sec"]), 3))
+    return row
+
+
+def _collect_metrics():
+    """Per-scrape gauge sampling for the /metrics endpoint."""
+    with get_db() as conn:
+        sample_backlog(conn)
+
+
+def log_metrics_summary(conn) -> dict:
+    """Write what the engine did since the previous summary (phase
+    timings, actions, DB statements per tick, backlog) to admin_logs."""
+    sample_backlog(conn)
+    summary = metrics.REGISTRY.summary()
+    tick = summary["nx_engine_phase_seconds"].get("tick")
+    log.info(f"📈 Metrics: {summary['nx_engine_devs_processed_total'] or 0} devs in "
+             f"{tick['count'] if tick else 0} ticks over {summary['window_sec']}s, "
+             f"backlog {summary['nx_engine_due_backlog']}, "
+             f"lag {summary['nx_engine_schedule_lag_seconds']}s")
+    if admin_log_event:
+        admin_log_event(get_cursor(conn), event_type="engine_metrics_summary", payload=summary)
+        conn.commit()
+    return summary
+
+
 # ============================================================
 # MINT A NEW DEV (called by blockchain listener)
 # ============================================================
@@ -1303,24 +1894,30 @@ def run_claim_sync():
 
 
 def check_and_rotate_weekly_event(conn):
-    """Check if weekly event needs rotation. Insert new event if expired or none active."""
+    """Check if weekly event needs rotation. Insert new event if expired or none active.
+
+    Returns when the active event ends (next time a check can do
+    anything), or None for the permanent tester event."""
     cur = get_cursor(conn)
     cur.execute("""
-        SELECT id, title, ends_at FROM world_events
+        SELECT id, title, effects, ends_at FROM world_events
         WHERE event_type = 'weekly' AND is_active = TRUE
         ORDER BY starts_at DESC LIMIT 1
     """)
     current = cur.fetchone()
-    now = datetime.now(timezone.utc)
+    now = sim_clock.now()
 
     if current and current["ends_at"] > now:
-        return  # Still active
+        return current["ends_at"]  # Still active
 
     # Never rotate out the permanent tester event
     if current and current["title"] == "MEGA TESTER PROGRAM":
-        return
+        return None
 
-    # Expire old
+    # Expire old — after settling every dev's vitals at its decay rates,
+    # so the hours before the switch aren't decayed at the new ones.
+    settle_devs(cur, None, current["effects"] if current else {}, now,
+                table=tick_writer.DEV_STATE_TABLE)
     if current:
         cur.execute("UPDATE world_events SET is_active = FALSE WHERE id = %s", (current["id"],))
 
@@ -1346,7 +1943,9 @@ def check_and_rotate_weekly_event(conn):
               f"{event['description']} (Active for 7 days)"))
 
     conn.commit()
+    world_state.publish()
     log.info(f"🌍 New weekly event: {event['title']}")
+    return ends
 
 
 # ============================================================
@@ -1497,6 +2096,7 @@ def _maybe_alert_stuck_pending(cur, row, next_attempts):
         log.warning("pending_fund_alert_failed error=%s", _e)
 
 
+@metrics.timed("process_pending_funds")
 def process_pending_funds(conn):
     """Resolve pending_fund_txs rows whose RPC receipt is now available.
 
@@ -1696,6 +2296,7 @@ def process_pending_funds(conn):
                 conn.rollback()
 
 
+@metrics.timed("scan_orphaned_funds")
 def scan_orphaned_funds(conn):
     """Scan the last _ORPHAN_SCAN_WINDOW blocks for Transfer(*, TREASURY)
     events that aren't already tracked in funding_txs or pending_fund_txs,
@@ -1909,8 +2510,13 @@ def scan_orphaned_funds(conn):
         return 0
 
 
-def run_engine():
-    """Main simulation loop. Runs forever."""
+def run_engine(until: Optional[datetime] = None):
+    """Main simulation loop. Runs forever, or until the simulation clock
+    reaches ``until``.
+
+    Under a VirtualClock (sim_clock.py) the loop runs single-threaded,
+    sleeping advances simulated time to the next due dev or cron, and
+    the on-chain jobs (pending funds, orphan scan) are skipped."""
     log.info("=" * 60)
     log.info("  NX TERMINAL: PROTOCOL WARS — Engine v2")
     log.info("  100% sin LLM · Weighted Random · PostgreSQL")
@@ -1926,14 +2532,24 @@ def run_engine():
     # Timeouts are 30-day decisions — hourly cadence is plenty. The
     # job internally bounds its batch to 100 rows per run.
     nxmarket_timeout_interval = timedelta(hours=1)
+    counter_verify_interval = timedelta(hours=1)
+    metrics_summary_interval = timedelta(minutes=15)
+    # On-chain reconciliation follows chain time, not simulated time.
+    onchain = not sim_clock.is_virtual()
 
     # Auto-migrate new columns before any queries
     try:
         with get_db() as conn:
             cur = get_cursor(conn)
-            cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS caffeine SMALLINT NOT NULL DEFAULT 50")
-            cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS social_vitality SMALLINT NOT NULL DEFAULT 50")
-            cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS knowledge SMALLINT NOT NULL DEFAULT 50")
+            # Once devs is split into dev_profile + dev_runtime it is a
+            # view, and migration_dev_runtime.sql added these columns.
+            if use_dev_layout(conn) == "devs":
+                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS caffeine SMALLINT NOT NULL DEFAULT 50")
+                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS social_vitality SMALLINT NOT NULL DEFAULT 50")
+                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS knowledge SMALLINT NOT NULL DEFAULT 50")
+                cur.execute("ALTER TABLE devs ADD COLUMN IF NOT EXISTS vitals_settled_at TIMESTAMPTZ NOT NULL DEFAULT NOW()")
+            else:
+                log.info("🧬 Split dev layout: hot writes go to dev_runtime")
             # pending_fund_txs — fallback queue for RPC indexing lag on /shop/fund
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS pending_fund_txs (
@@ -1976,16 +2592,59 @@ def run_engine():
                 ALTER TABLE chat_messages
                 ADD COLUMN IF NOT EXISTS social_gain SMALLINT NOT NULL DEFAULT 0
             """)
+            # Multi-node sharding — leases + singleton cron claims
+            # (migration_engine_sharding.sql).
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS engine_leases (
+                    name         TEXT PRIMARY KEY,
+                    holder       TEXT NOT NULL,
+                    acquired_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    expires_at   TIMESTAMPTZ NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS engine_cron_runs (
+                    name         TEXT PRIMARY KEY,
+                    last_run_at  TIMESTAMPTZ NOT NULL,
+                    holder       TEXT NOT NULL DEFAULT ''
+                )
+            """)
             conn.commit()
             log.info("✅ Engine auto-migrations complete")
     except Exception as e:
         log.warning(f"⚠️ Engine auto-migration warning: {e}")
 
+    # Sharded mode: this node only simulates the shards it holds a lease
+    # on, and only the leader runs the crons below. Startup salary and
+    # orphan scan are skipped — the leader's first loop pass claims them
+    # from engine_cron_runs, so a restart or failover mid-hour never
+    # pays the same salary interval twice.
+    sharded = ENGINE_SHARDS > 1
+    coordinator = None
+    if sharded:
+        coordinator = ShardCoordinator(get_db, ENGINE_SHARDS, ENGINE_NODE_ID,
+                                       ENGINE_LEASE_TTL_SEC)
+        coordinator.start()
+        log.info(f"🧩 Sharded engine: node {ENGINE_NODE_ID}, {ENGINE_SHARDS} shards")
+
+    # Drop the cached world events whenever any process rotates them
+    # (a virtual-clock run is the only process that does)
+    if not sim_clock.is_virtual() and world_state.start_listener():
+        log.info("🌍 World state cache listening for invalidations")
+
+    if METRICS_PORT:
+        try:
+            metrics.start_server(METRICS_PORT, collect=_collect_metrics, host=METRICS_HOST)
+            log.info(f"📈 Metrics on {METRICS_HOST}:{METRICS_PORT}/metrics")
+        except OSError as e:
+            log.warning(f"⚠️ Metrics endpoint not started: {e}")
+
     # Pay salary immediately on startup so devs don't wait 1 hour after restart
     try:
-        with get_db() as conn:
-            pay_salaries(conn)
-            log.info("💰 Initial salary paid on engine startup")
+        if not sharded:
+            with get_db() as conn:
+                pay_salaries(conn)
+                log.info("💰 Initial salary paid on engine startup")
     except Exception as e:
         log.error(f"Initial salary payment failed: {e}")
 
@@ -1995,33 +2654,128 @@ def run_engine():
     # is logged but can never prevent the engine from entering its
     # main loop, where the periodic scan will eventually retry.
     try:
-        with get_db() as conn:
-            credited = scan_orphaned_funds(conn) or 0
-            log.info(
-                f"🧹 Startup orphan scan complete: credited={credited}"
-            )
-            if admin_log_event is not None:
-                with conn.cursor() as cur:
-                    admin_log_event(
-                        cur,
-                        event_type="engine_startup_orphan_scan",
-                        payload={"orphans_credited": credited},
-                    )
+        if not sharded and onchain:
+            with get_db() as conn:
+                credited = scan_orphaned_funds(conn) or 0
+                log.info(
+                    f"🧹 Startup orphan scan complete: credited={credited}"
+                )
+                if admin_log_event is not None:
+                    with conn.cursor() as cur:
+                        admin_log_event(
+                            cur,
+                            event_type="engine_startup_orphan_scan",
+                            payload={"orphans_credited": credited},
+                        )
     except Exception as e:
         log.error(f"Startup orphan scan failed (non-fatal): {e}")
 
-    last_salary = datetime.now(timezone.utc)
-    last_snapshot = datetime.now(timezone.utc)
-    # Run pending-fund reconciliation on the first loop pass.
-    last_pending_funds = datetime.now(timezone.utc) - pending_funds_interval
-    # Run on-chain orphan scan on the first loop pass too.
-    last_orphan_scan = datetime.now(timezone.utc) - orphan_scan_interval
-    # Run the NX Market auto-close sweep on the first pass too (catch
-    # any market that expired while the engine was down).
-    last_nxmarket_close = datetime.now(timezone.utc) - nxmarket_close_interval
-    last_nxmarket_timeout = datetime.now(timezone.utc) - nxmarket_timeout_interval
+    # When each cron is next looked at. Salary + snapshots were just
+    # handled at startup; everything else runs on the first loop pass.
+    # In sharded mode the claim in engine_cron_runs has the last word,
+    # so every cron is checked (and claimed if due) on the first pass.
+    now = sim_clock.now()
+    cron_intervals = {
+        "salary": salary_interval,
+        "balance_snapshots": snapshot_interval,
+        "pending_funds": pending_funds_interval,
+        "orphan_scan": orphan_scan_interval,
+        "nxmarket_close": nxmarket_close_interval,
+        "nxmarket_timeout": nxmarket_timeout_interval,
+        "counter_verify": counter_verify_interval,
+    }
+    if not onchain:
+        del cron_intervals["pending_funds"], cron_intervals["orphan_scan"]
+    cron_next = {name: now for name in cron_intervals}
+    if not sharded:
+        cron_next["salary"] = now + salary_interval
+        cron_next["balance_snapshots"] = now + snapshot_interval
+    cron_retry = timedelta(minutes=1)
+    next_event_check = now
+    next_reconcile = now + timedelta(seconds=SCHEDULER_RECONCILE_SEC)
+    # Per process, not a claimed cron: every node summarises its own work.
+    next_metrics_summary = now + metrics_summary_interval
+
+    def cron_due(conn, name: str, commit: bool = True) -> bool:
+        """Single node: in-memory timer. Sharded: leader-only, claimed in
+        engine_cron_runs. ``commit=False`` leaves the claim in the open
+        transaction so it commits (or rolls back) with the cron's writes."""
+        if now < cron_next[name]:
+            return False
+        interval = cron_intervals[name]
+        if not sharded:
+            cron_next[name] = now + interval
+            return True
+        if not coordinator.is_leader:
+            cron_next[name] = now + timedelta(seconds=ENGINE_LEASE_TTL_SEC)
+            return False
+        cur = get_cursor(conn)
+        if claim_cron(cur, name, interval.total_seconds(), ENGINE_NODE_ID):
+            if commit:
+                conn.commit()
+            cron_next[name] = now + interval
+            return True
+        # Another node ran it — look again when its slot expires.
+        cur.execute("SELECT last_run_at FROM engine_cron_runs WHERE name = %s", (name,))
+        row = cur.fetchone()
+        cron_next[name] = max(now + cron_retry, row["last_run_at"] + interval) if row else now + interval
+        return False
+
+    # Dev schedule lives in memory (due_queue.py): the scheduler sleeps
+    # until the next dev is due and never polls Postgres while idle.
+    due_queue = DueQueue(ENGINE_SHARDS) if DUE_QUEUE else None
+    if due_queue is not None:
+        try:
+            with get_db() as conn:
+                loaded = due_queue.reload(get_cursor(conn))
+            log.info(f"⏱️ Due queue loaded: {loaded} schedulable devs")
+        except Exception as e:
+            log.error(f"Due queue load failed: {e}")
+        # Devs prompted through the API jump the queue (prompt_wake.py)
+        if not sim_clock.is_virtual() and pending_prompts.start_listener(due_queue):
+            log.info("📨 Prompt wake listener started")
+
+    # With WORKER_THREADS > 1 dev cycles run on the worker pool and this
+    # loop only drives the crons below. Virtual time has one driver.
+    parallel = WORKER_THREADS > 1 and not sim_clock.is_virtual()
+    if parallel:
+        start_scheduler_workers(WORKER_THREADS, coordinator=coordinator, due_queue=due_queue)
+        log.info(f"🧵 {WORKER_THREADS} scheduler workers running (SKIP LOCKED)")
+
+    def scheduler_shards():
+        return coordinator.scheduler_shards() if coordinator else None
+
+    def next_wake() -> datetime:
+        """Earliest moment this loop has anything to do."""
+        wake = min(min(cron_next.values()), next_event_check)
+        if due_queue is not None:
+            wake = min(wake, next_reconcile)
+        wake = min(wake, next_metrics_summary)
+        if not parallel:
+            if due_queue is None:
+                return min(wake, now + timedelta(seconds=SCHEDULER_INTERVAL_SEC))
+            due = due_queue.next_due(scheduler_shards())
+            if due is not None:
+                wake = min(wake, datetime.fromtimestamp(due, timezone.utc))
+        return wake
 
     while True:
+        now = sim_clock.now()
+        if until is not None and now >= until:
+            break
+        wake = next_wake() if until is None else min(next_wake(), until)
+        if now < wake:
+            # Nothing due: sleep in-process. When this loop also runs the
+            # dev ticks, a dev pushed earlier than the head wakes it early.
+            # A virtual clock just jumps to the wake-up.
+            if sim_clock.is_virtual():
+                sim_clock.sleep((wake - now).total_seconds())
+            elif due_queue is not None and not parallel:
+                due_queue.wait((wake - now).total_seconds(), scheduler_shards())
+            else:
+                time.sleep((wake - now).total_seconds())
+            continue
+
         # Fresh correlation id per engine tick so every log emitted by the
         # worker during this iteration shares the same id and is traceable.
         _tick_cid_token = None
@@ -2030,66 +2784,97 @@ def run_engine():
         try:
             with get_db() as conn:
                 # Pay salaries if due
-                now = datetime.now(timezone.utc)
-                if now - last_salary >= salary_interval:
-                    pay_salaries(conn)
-                    last_salary = now
-
-                # Check weekly event rotation
-                check_and_rotate_weekly_event(conn)
+                if cron_due(conn, "salary", commit=False):
+                    try:
+                        pay_salaries(conn)  # commits the claim with the payout
+                    except Exception:
+                        cron_next["salary"] = now + cron_retry
+                        raise
+
+                # Check weekly event rotation when the active one ends
+                if now >= next_event_check and (not sharded or coordinator.is_leader):
+                    ends_at = check_and_rotate_weekly_event(conn)
+                    next_event_check = min(ends_at or now + timedelta(hours=1),
+                                           now + timedelta(hours=1))
+                elif now >= next_event_check:
+                    next_event_check = now + timedelta(seconds=ENGINE_LEASE_TTL_SEC)
 
                 # Daily balance snapshots
-                if now - last_snapshot >= snapshot_interval:
-                    take_balance_snapshots(conn)
-                    last_snapshot = now
+                if cron_due(conn, "balance_snapshots", commit=False):
+                    try:
+                        take_balance_snapshots(conn)
+                    except Exception:
+                        cron_next["balance_snapshots"] = now + cron_retry
+                        raise
 
                 # Reconcile pending fund txs (RPC indexing lag fallback)
-                if now - last_pending_funds >= pending_funds_interval:
+                if onchain and cron_due(conn, "pending_funds"):
                     try:
                         process_pending_funds(conn)
                     except Exception as e:
                         log.error(f"process_pending_funds error: {e}")
-                    last_pending_funds = now
 
                 # Scan on-chain for orphaned fund transfers (safety net for
                 # hashes the backend never saw — e.g. frontend crashed
                 # between signing and POSTing the hash).
-                if now - last_orphan_scan >= orphan_scan_interval:
+                if onchain and cron_due(conn, "orphan_scan"):
                     try:
                         scan_orphaned_funds(conn)
                     except Exception as e:
                         log.error(f"scan_orphaned_funds error: {e}")
-                    last_orphan_scan = now
 
                 # Flip expired NX Market rows from 'active' → 'closed'.
                 # Runs on its own 5-min cadence. Independent of the
                 # `conn` above because it manages its own DB context.
-                if now - last_nxmarket_close >= nxmarket_close_interval:
+                if cron_due(conn, "nxmarket_close"):
                     try:
                         from backend.services.nxmarket_lifecycle import (
                             auto_close_expired_markets,
                         )
-                        auto_close_expired_markets()
+                        auto_close_expired_markets(now)
                     except Exception as e:
                         log.error(f"auto_close_expired_markets error: {e}")
-                    last_nxmarket_close = now
 
                 # Auto-resolve as 'invalid' any NX Market that's been
                 # sitting in 'closed' for more than 30 days without
                 # admin action. Keeps the pending list from growing
                 # unbounded. Hourly cadence.
-                if now - last_nxmarket_timeout >= nxmarket_timeout_interval:
+                if cron_due(conn, "nxmarket_timeout"):
                     try:
                         from backend.services.nxmarket_lifecycle import (
                             auto_timeout_invalid_markets,
                         )
-                        auto_timeout_invalid_markets()
+                        auto_timeout_invalid_markets(now)
                     except Exception as e:
                         log.error(f"auto_timeout_invalid_markets error: {e}")
-                    last_nxmarket_timeout = now
+
+                # Repair drift in the incrementally kept vote / investor
+                # counters (they are deltas now, never recounted per action).
+                if cron_due(conn, "counter_verify"):
+                    try:
+                        verify_counters(conn)
+                    except Exception as e:
+                        conn.rollback()
+                        log.error(f"verify_counters error: {e}")
+
+                # Pick up devs minted / fed / changed outside the engine
+                if due_queue is not None and now >= next_reconcile:
+                    due_queue.reload(get_cursor(conn))
+                    pending_prompts.reload(get_cursor(conn))
+                    conn.commit()
+                    next_reconcile = now + timedelta(seconds=SCHEDULER_RECONCILE_SEC)
+
+                if now >= next_metrics_summary:
+                    next_metrics_summary = now + metrics_summary_interval
+                    try:
+                        log_metrics_summary(conn)
+                    except Exception as e:
+                        conn.rollback()
+                        log.error(f"log_metrics_summary error: {e}")
 
                 # Process due devs
-                processed = run_scheduler_tick(conn)
+                processed = 0 if parallel else run_scheduler_tick(
+                    conn, shards=scheduler_shards(), due_queue=due_queue)
                 if processed > 0:
                     cycle += 1
                     if cycle % 10 == 0:
@@ -2097,12 +2882,11 @@ def run_engine():
 
         except Exception as e:
             log.error(f"Engine error: {e}")
+            sim_clock.sleep(SCHEDULER_INTERVAL_SEC)
         finally:
             if _tick_cid_token is not None and reset_correlation_id:
                 reset_correlation_id(_tick_cid_token)
 
-        time.sleep(SCHEDULER_INTERVAL_SEC)
-
 
 # ============================================================
 # CLI — For testing without full stack
@@ -26,8 +26,8 @@ import logging
 import requests
 import psycopg2
 import psycopg2.extras
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from urllib.parse import urlparse
 
 # Phase 2.2 Step 6 — canonical-aware mint path. Falls back to the legacy
 # procedural generator below if `dev_canonical_traits` has no row for a
@@ -49,6 +49,11 @@ except Exception:  # pragma: no cover - defensive: PYTHONPATH issues
         update_canonical_post_mint,
     )
 
+try:
+    from db_pool import shared_pool
+except ImportError:
+    from backend.engine.db_pool import shared_pool
+
 # ═══════════════════════════════════════════════════════════
 # CONFIG
 # ═══════════════════════════════════════════════════════════
@@ -65,7 +70,6 @@ TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523
 ZERO_ADDRESS = "0x" + "0" * 64
 
 POLL_INTERVAL = int(os.getenv("LISTENER_POLL_INTERVAL", "5"))  # seconds
-DB_SCHEMA = "nx"
 
 logging.basicConfig(
     level=logging.INFO,
@@ -137,24 +141,12 @@ WORK_ETHIC_POOL = ["Grinder", "Lazy", "Balanced", "Obsessed", "Steady"]
 # DATABASE
 # ═══════════════════════════════════════════════════════════
 
-DATABASE_URL = os.getenv("DATABASE_URL", "")
-if not DATABASE_URL:
-    _host = os.getenv("NX_DB_HOST", "localhost")
-    _port = os.getenv("NX_DB_PORT", "5432")
-    _name = os.getenv("NX_DB_NAME", "nxterminal")
-    _user = os.getenv("NX_DB_USER", "postgres")
-    _pass = os.getenv("NX_DB_PASS", "postgres")
-    DATABASE_URL = f"postgresql://{_user}:{_pass}@{_host}:{_port}/{_name}"
-
-
+@contextmanager
 def get_db(autocommit=False):
-    parsed = urlparse(DATABASE_URL)
-    sslmode = "require" if "render.com" in (parsed.hostname or "") else "prefer"
-    conn = psycopg2.connect(DATABASE_URL, sslmode=sslmode)
-    conn.autocommit = autocommit
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute(f"SET search_path TO {DB_SCHEMA}")
-    return conn, cur
+    """(conn, cursor) on a connection borrowed from the engine process's
+    shared pool (db_pool.py) — commit on success, rollback on error."""
+    with shared_pool().connection(autocommit=autocommit) as conn:
+        yield conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
 
 def dev_exists(cur, token_id):
@@ -466,21 +458,20 @@ def run_listener():
 
     # Ensure DEPLOY action exists in enum (may be missing on older DBs)
     try:
-        conn, cur = get_db(autocommit=True)
-        cur.execute("""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM pg_enum
-                    WHERE enumlabel = 'DEPLOY'
-                      AND enumtypid = (SELECT oid FROM pg_type WHERE typname = 'action_enum')
-                ) THEN
-                    ALTER TYPE action_enum ADD VALUE 'DEPLOY';
-                END IF;
-            END
-            $$;
-        """)
-        conn.close()
+        with get_db(autocommit=True) as (conn, cur):
+            cur.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM pg_enum
+                        WHERE enumlabel = 'DEPLOY'
+                          AND enumtypid = (SELECT oid FROM pg_type WHERE typname = 'action_enum')
+                    ) THEN
+                        ALTER TYPE action_enum ADD VALUE 'DEPLOY';
+                    END IF;
+                END
+                $$;
+            """)
         log.info("Verified DEPLOY action enum value exists")
     except Exception as e:
         log.warning(f"Could not verify DEPLOY enum: {e}")
@@ -488,8 +479,7 @@ def run_listener():
     # Get starting block (with retry loop instead of recursion)
     last_block = None
     while last_block is None:
-        conn, cur = get_db(autocommit=True)
-        try:
+        with get_db(autocommit=True) as (conn, cur):
             # Check if we have a saved last_block
             cur.execute("SELECT value FROM simulation_state WHERE key = 'listener_last_block'")
             row = cur.fetchone()
@@ -516,8 +506,6 @@ def run_listener():
                     (json.dumps(last_block), json.dumps(last_block))
                 )
                 log.info(f"Starting from block {last_block}")
-        finally:
-            conn.close()
 
     log.info(f"Listening from block {last_block}")
 
@@ -539,8 +527,7 @@ def run_listener():
             events = get_mint_events(from_block, to_block)
 
             if events:
-                conn, cur = get_db()
-                try:
+                with get_db() as (conn, cur):
                     minted_count = 0
 
                     for event in events:
@@ -655,19 +642,14 @@ def run_listener():
                         update_simulation_state(cur, total)
                         conn.commit()
                         log.info(f"Processed {minted_count} new mints. Total devs: {total}")
-                finally:
-                    conn.close()
 
             # Update last processed block
             last_block = to_block
-            conn2, cur2 = get_db(autocommit=True)
-            try:
+            with get_db(autocommit=True) as (conn2, cur2):
                 cur2.execute(
                     "UPDATE simulation_state SET value = %s WHERE key = 'listener_last_block'",
                     (json.dumps(last_block),)
                 )
-            finally:
-                conn2.close()
 
         except Exception as e:
             log.error(f"Listener error: {e}")
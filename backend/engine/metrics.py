@@ -0,0 +1,327 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Engine Metrics
+In-process counters, gauges and histograms, served as Prometheus text.
+
+The engine records:
+
+  - nx_engine_phase_seconds{phase}  — wall time of each scheduler tick
+    phase (tick_fetch, tick_prepare, tick_decide, tick_execute,
+    tick_flush, tick) and of the crons (pay_salaries,
+    process_pending_funds, scan_orphaned_funds, ...)
+  - nx_engine_tick_db_queries       — statements sent per tick
+  - nx_engine_actions_total{action} — actions executed
+  - nx_engine_devs_processed_total / nx_engine_dev_errors_total
+  - nx_engine_due_backlog, nx_engine_schedule_lag_seconds — devs past
+    next_cycle_at and the age of the oldest one, sampled on scrape
+  - nx_engine_db_pool_wait_seconds, nx_engine_db_pool_connections{state},
+    nx_engine_db_pool_events_total{event} — the shared connection pool
+    (db_pool.py)
+
+``start_server`` serves GET /metrics from a daemon thread (engine:
+NX_ENGINE_METRICS_PORT, off by default, on NX_ENGINE_METRICS_HOST,
+localhost by default);
+``REGISTRY.summary()`` returns what happened since the previous
+summary, which the engine writes to admin_logs.
+
+Thread-safe (scheduler workers record concurrently). No dependencies:
+prometheus_client is not needed for this handful of series.
+"""
+
+import logging
+import threading
+import time
+from contextlib import ContextDecorator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+log = logging.getLogger("nx_engine")
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _fmt(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines += self._samples()
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+        self._window = {}
+
+    def inc(self, *labels, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._window[key] = self._window.get(key, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}"
+                for k, v in sorted(self._values.items())]
+
+    def take_window(self) -> dict:
+        with self._lock:
+            window, self._window = self._window, {}
+        return {",".join(k): v for k, v in sorted(window.items())}
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, *labels) -> Optional[float]:
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def _samples(self) -> list:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}"
+                for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}   # key -> [bucket counts, sum, count]
+        self._window = {}   # key -> [count, sum, max]
+
+    def observe(self, value: float, *labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+            window = self._window.setdefault(key, [0, 0.0, value])
+            window[0] += 1
+            window[1] += value
+            window[2] = max(window[2], value)
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def _samples(self) -> list:
+        lines = []
+        for key, (counts, total, n) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+    def take_window(self) -> dict:
+        """{label: {count, avg, max}} since the previous call."""
+        with self._lock:
+            window, self._window = self._window, {}
+        return {",".join(k): {"count": n, "avg": round(s / n, 6), "max": round(m, 6)}
+                for k, (n, s, m) in sorted(window.items())}
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._window_started = time.time()
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=SECONDS_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """Everything recorded since the previous summary (counters as
+        deltas, histograms as count / avg / max) plus current gauges."""
+        now = time.time()
+        out = {"window_sec": round(now - self._window_started, 1)}
+        self._window_started = now
+        for metric in self._metrics:
+            if isinstance(metric, Gauge):
+                with metric._lock:
+                    values = {",".join(k): v for k, v in sorted(metric._values.items())}
+            else:
+                values = metric.take_window()
+            # unlabeled series: the value itself rather than {"": value}
+            out[metric.name] = values.get("") if not metric.labelnames else values
+        return out
+
+
+REGISTRY = Registry()
+
+PHASE_SECONDS = REGISTRY.histogram(
+    "nx_engine_phase_seconds", "Wall time of scheduler tick phases and crons", ("phase",))
+TICK_DB_QUERIES = REGISTRY.histogram(
+    "nx_engine_tick_db_queries", "DB statements sent per scheduler tick", buckets=QUERY_BUCKETS)
+ACTIONS = REGISTRY.counter(
+    "nx_engine_actions_total", "Actions executed by devs", ("action",))
+DEVS_PROCESSED = REGISTRY.counter(
+    "nx_engine_devs_processed_total", "Devs processed by scheduler ticks")
+DEV_ERRORS = REGISTRY.counter(
+    "nx_engine_dev_errors_total", "Devs rolled back mid-tick by an error")
+DORMANT_CYCLES = REGISTRY.counter(
+    "nx_engine_dormant_cycles_total", "Dev cycles stretched to CYCLE_OWNER_OFFLINE (owner away)")
+DUE_BACKLOG = REGISTRY.gauge(
+    "nx_engine_due_backlog", "Schedulable devs whose next_cycle_at has passed")
+SCHEDULE_LAG = REGISTRY.gauge(
+    "nx_engine_schedule_lag_seconds", "Age of the oldest overdue next_cycle_at")
+DB_POOL_WAIT = REGISTRY.histogram(
+    "nx_engine_db_pool_wait_seconds", "Time spent waiting to borrow a pooled DB connection")
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "nx_engine_db_pool_connections", "Open pooled DB connections", ("state",))
+DB_POOL_EVENTS = REGISTRY.counter(
+    "nx_engine_db_pool_events_total",
+    "Pooled DB connections opened, recycled, failing health checks; checkout timeouts", ("event",))
+
+
+# ── Recording helpers ─────────────────────────────────────
+
+_local = threading.local()
+
+
+def count_query():
+    _local.queries = getattr(_local, "queries", 0) + 1
+
+
+def queries() -> int:
+    """Statements sent from this thread so far (see engine.get_cursor)."""
+    return getattr(_local, "queries", 0)
+
+
+class timed(ContextDecorator):
+    """Observe the wall time of a block or function as ``phase``."""
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def _recreate_cm(self):
+        return timed(self.phase)   # one start time per call, per thread
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        PHASE_SECONDS.observe(time.perf_counter() - self._start, self.phase)
+        return False
+
+
+class PhaseClock:
+    """Consecutive phases of one tick: ``lap(name)`` records the time
+    since the previous lap as ``{prefix}_{name}``."""
+
+    def __init__(self, prefix: str = "tick"):
+        self.prefix = prefix
+        self.started = self._last = time.perf_counter()
+        self.queries_at_start = queries()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        PHASE_SECONDS.observe(now - self._last, f"{self.prefix}_{name}")
+        self._last = now
+
+    def done(self):
+        PHASE_SECONDS.observe(time.perf_counter() - self.started, self.prefix)
+        TICK_DB_QUERIES.observe(queries() - self.queries_at_start)
+
+
+# ── HTTP endpoint ─────────────────────────────────────────
+
+def start_server(port: int, collect: Optional[Callable[[], None]] = None,
+                 host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics on ``port`` from a daemon thread. ``collect``
+    runs before each scrape (sampling gauges); its errors are logged and
+    the scrape still answers with the last values."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            if collect is not None:
+                try:
+                    collect()
+                except Exception as e:
+                    log.warning(f"Metrics collect failed: {e}")
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="nx-metrics").start()
+    return server
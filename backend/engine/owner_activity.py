@@ -0,0 +1,128 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Owner Activity
+Dormant-owner throttling and the catch-up summary.
+
+Most of the 35k devs belong to wallets that haven't opened the terminal
+in weeks, yet every dev used to cycle every 8–20 minutes — actions,
+chat rows and log lines nobody reads. Owner activity is
+``players.last_active_at``, bumped by the API (deps.mark_owner_active
+→ touch_owner, at most every TOUCH_EVERY) from the routes the
+connected wallet drives: the wallet summary and notifications it polls,
+and its own prompt, shop, hack and mission writes after their
+ownership checks:
+
+  - an owner unseen for OWNER_DORMANT_HOURS is dormant, and the
+    scheduler gives their devs CYCLE_OWNER_OFFLINE (1 h) as the next
+    interval instead of the energy-based one (engine.calc_next_interval)
+    — write volume drops with the dormant share of the population;
+  - when a dormant owner comes back, touch_owner pulls their devs'
+    next_cycle_at to now (the due queue picks them up on its next
+    reload) and leaves a ``catch_up`` notification summarising what
+    the devs did while they were away.
+
+Salary, vitals decay and missions don't depend on cycles and are not
+throttled. Dormancy is judged on the simulation clock, as the rest of
+the schedule is.
+
+No numpy here: the API imports this module.
+"""
+
+from datetime import timedelta
+from typing import Optional
+
+try:
+    import sim_clock
+    from config import OWNER_DORMANT_HOURS
+except ImportError:
+    from backend.engine import sim_clock
+    from backend.engine.config import OWNER_DORMANT_HOURS
+
+# last_active_at is rewritten at most this often per wallet.
+TOUCH_EVERY = timedelta(minutes=5)
+
+
+def is_dormant(active_at, now=None) -> bool:
+    """Whether an owner last seen at ``active_at`` counts as away.
+    Unknown activity (None) never does."""
+    if active_at is None or OWNER_DORMANT_HOURS <= 0:
+        return False
+    return (now or sim_clock.now()) - active_at >= timedelta(hours=OWNER_DORMANT_HOURS)
+
+
+def touch_owner(cur, wallet: str, now=None) -> Optional[dict]:
+    """Record that ``wallet`` is active. If the owner was dormant, wake
+    their devs and return (and notify) the catch-up summary; otherwise
+    None. The caller owns the commit."""
+    now = now or sim_clock.now()
+    cur.execute("SELECT last_active_at FROM players WHERE wallet_address = %s", (wallet,))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    previous = row["last_active_at"]
+    if previous is not None and now - previous < TOUCH_EVERY:
+        return None
+    # Compare-and-set: of two concurrent requests only one returns the
+    # summary.
+    cur.execute("""
+        UPDATE players SET last_active_at = %s
+        WHERE wallet_address = %s AND last_active_at IS NOT DISTINCT FROM %s
+    """, (now, wallet, previous))
+    if cur.rowcount != 1 or not is_dormant(previous, now):
+        return None
+
+    cur.execute("""
+        UPDATE devs SET next_cycle_at = %s
+        WHERE owner_address = %s AND status = 'active' AND next_cycle_at > %s
+    """, (now, wallet, now))
+    summary = catch_up_summary(cur, wallet, previous, now)
+    if summary["devs"]:
+        cur.execute("""
+            INSERT INTO notifications (player_address, type, title, body)
+            VALUES (%s, 'catch_up', %s, %s)
+        """, (wallet, "While you were away", catch_up_body(summary)))
+    return summary
+
+
+def catch_up_summary(cur, wallet: str, since, now=None) -> dict:
+    """What ``wallet``'s devs did since ``since``: action counts and the
+    salary paid, from the actions log."""
+    now = now or sim_clock.now()
+    cur.execute("SELECT token_id FROM devs WHERE owner_address = %s", (wallet,))
+    token_ids = [r["token_id"] for r in cur.fetchall()]
+    summary = {
+        "away_hours": int((now - since).total_seconds() // 3600),
+        "devs": len(token_ids),
+        "actions": {},
+        "salary_nxt": 0,
+    }
+    if not token_ids:
+        return summary
+    cur.execute("""
+        SELECT action_type::text AS action, COUNT(*) AS n, COALESCE(SUM(nxt_cost), 0) AS nxt
+        FROM actions
+        WHERE dev_id = ANY(%s) AND created_at >= %s
+        GROUP BY action_type
+        ORDER BY COUNT(*) DESC
+    """, (token_ids, since))
+    for row in cur.fetchall():
+        if row["action"] == "RECEIVE_SALARY":
+            summary["salary_nxt"] = int(row["nxt"])
+        else:
+            summary["actions"][row["action"]] = row["n"]
+    return summary
+
+
+def catch_up_body(summary: dict) -> str:
+    """Notification text for a catch-up summary."""
+    hours = summary["away_hours"]
+    away = f"{hours // 24} days" if hours >= 48 else f"{hours} hours"
+    devs = summary["devs"]
+    lines = [f"You were away for {away}. While you were gone your "
+             f"{devs} dev{'s' if devs != 1 else ''}:",
+             f"  • earned {summary['salary_nxt']:,} $NXT in salary"]
+    if summary["actions"]:
+        lines.append("  • " + ", ".join(f"{action} ×{n}" for action, n in summary["actions"].items()))
+    lines += ["",
+              "With nobody watching they ran on a reduced schedule (one cycle per hour).",
+              "Full speed again from now on."]
+    return "\n".join(lines)
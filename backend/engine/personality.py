@@ -0,0 +1,33 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Personality Variation
+Per-dev ±15% decision-weight variation, cached by personality_seed.
+
+Every decision multiplies the dev's positive action weights by draws
+from random.Random(personality_seed). The draws are a pure function of
+the seed, which never changes after mint, so they are computed once
+per dev and kept in an LRU sized for the whole collection. Neither
+apply_context_modifiers nor the batch kernel constructs an RNG on the
+hot path.
+
+No numpy here: the per-dev path must work without it.
+"""
+
+import random
+from functools import lru_cache
+
+VARIATION_LOW = 0.85
+VARIATION_HIGH = 1.15
+VARIATION_DRAWS = 8          # one per engine action
+VARIATION_CACHE_SIZE = 65536  # > total dev supply
+
+
+@lru_cache(maxsize=VARIATION_CACHE_SIZE)
+def personality_variation(seed) -> tuple:
+    """The ±15% per-dev variation draws for ``personality_seed``.
+
+    apply_context_modifiers consumes these in order, one per action
+    whose weight is still positive — so the k-th positive action gets
+    the k-th draw.
+    """
+    rng = random.Random(seed)
+    return tuple(rng.uniform(VARIATION_LOW, VARIATION_HIGH) for _ in range(VARIATION_DRAWS))
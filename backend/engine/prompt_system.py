@@ -13,8 +13,11 @@ Sin LLM. Keyword matching + intent classification + response templates.
 
 import random
 import re
+from collections import deque
 from typing import Tuple, Optional
 
+from templates import Template, compile_templates
+
 # Actions available in the engine
 ALL_ACTIONS = ["CREATE_PROTOCOL", "CREATE_AI", "INVEST", "SELL", "MOVE", "CHAT", "CODE_REVIEW", "REST"]
 
@@ -155,8 +158,95 @@ def extract_location(prompt_text: str) -> Optional[str]:
     return None
 
 
-def extract_protocol_mention(prompt_text: str, known_protocols: list) -> Optional[str]:
-    """Check if the prompt mentions a known protocol name."""
+# Compiled matcher — the three tables above in one automaton.
+# classify_intent / extract_topic / extract_location stay as the readable
+# reference; process_prompt uses classify_prompt, which walks the
+# lowercased prompt once through a DFA (Aho-Corasick with the failure
+# links folded into the transitions). Each state carries the lowest
+# (intent, topic, location) rank of any keyword ending there, so the
+# first-rule-wins priority of the loops is kept.
+
+_NO_MATCH = len(INTENT_RULES) + len(TOPIC_KEYWORDS) + len(LOCATION_KEYWORDS)
+_KW_LABELS = (
+    [rule["intent"] for rule in INTENT_RULES],
+    list(TOPIC_KEYWORDS),
+    list(LOCATION_KEYWORDS),
+)
+
+
+def _compile_keywords():
+    tables = (
+        [rule["keywords"] for rule in INTENT_RULES],
+        list(TOPIC_KEYWORDS.values()),
+        list(LOCATION_KEYWORDS.values()),
+    )
+    goto, out = [{}], [None]
+    for table, groups in enumerate(tables):
+        for rank, keywords in enumerate(groups):
+            for kw in keywords:
+                node = 0
+                for ch in kw:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[node][ch] = nxt
+                        goto.append({})
+                        out.append(None)
+                    node = nxt
+                ranks = list(out[node] or (_NO_MATCH,) * 3)
+                ranks[table] = min(ranks[table], rank)
+                out[node] = tuple(ranks)
+
+    # BFS: a node's fail target is always settled before the node itself
+    fail = [0] * len(goto)
+    dfa = [dict(goto[0])] + [None] * (len(goto) - 1)
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        dfa[node] = {**dfa[fail[node]], **goto[node]}
+        inherited = out[fail[node]]
+        if inherited is not None:
+            own = out[node] or inherited
+            out[node] = tuple(min(a, b) for a, b in zip(own, inherited))
+        for ch, child in goto[node].items():
+            fail[child] = dfa[fail[node]].get(ch, 0)
+            queue.append(child)
+    return dfa, out
+
+
+_KW_DFA, _KW_OUT = _compile_keywords()
+
+
+def classify_prompt(prompt_text: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """(intent, topic, location) in one pass — same answers as
+    classify_intent, extract_topic and extract_location."""
+    dfa, out = _KW_DFA, _KW_OUT
+    intent = topic = location = _NO_MATCH
+    node = 0
+    for ch in prompt_text.lower():
+        node = dfa[node].get(ch, 0)
+        ranks = out[node]
+        if ranks is not None:
+            if ranks[0] < intent:
+                intent = ranks[0]
+            if ranks[1] < topic:
+                topic = ranks[1]
+            if ranks[2] < location:
+                location = ranks[2]
+    return (
+        _KW_LABELS[0][intent] if intent < _NO_MATCH else "CHAT",
+        _KW_LABELS[1][topic] if topic < _NO_MATCH else None,
+        _KW_LABELS[2][location] if location < _NO_MATCH else None,
+    )
+
+
+def extract_protocol_mention(prompt_text: str, known_protocols) -> Optional[str]:
+    """Check if the prompt mentions a known protocol name.
+
+    ``known_protocols`` is a list of names, or a matcher with a
+    ``find(text)`` method (the engine's protocol_matcher.ProtocolMatcher)."""
+    if hasattr(known_protocols, "find"):
+        return known_protocols.find(prompt_text)
     text = prompt_text.lower()
     for proto in known_protocols:
         if proto.lower() in text:
@@ -689,6 +779,23 @@ RESPONSES = {
     },
 }
 
+# Same tree, parsed once into templates.Template (one join per response)
+_RESPONSE_TEMPLATES = compile_templates(RESPONSES)
+
+# Placeholder → value, from the prompt being processed
+_RESPONSE_SLOTS = {
+    "topic":       lambda c: c["topic"] or "something interesting",
+    "location":    lambda c: (c["location"] or "somewhere").replace("_", " "),
+    "protocol":    lambda c: c["protocol"] or "that protocol",
+    "energy":      lambda c: str(c["dev"].get("energy", "?")),
+    "balance":     lambda c: f"{c['dev'].get('balance_nxt', 0):,}",
+    "protocols":   lambda c: str(c["dev"].get("protocols_created", 0)),
+    "ais":         lambda c: str(c["dev"].get("ais_created", 0)),
+    "bugs":        lambda c: str(c["dev"].get("bugs_found", 0)),
+    "reviews":     lambda c: str(c["dev"].get("code_reviews_done", 0)),
+    "proto_count": lambda c: str(len(c["known"])),
+}
+
 
 # ============================================================
 # 4. MAIN FUNCTION — Process a prompt
@@ -705,7 +812,8 @@ def process_prompt(
     Args:
         prompt_text: What the player wrote
         dev: Dev dict with archetype, mood, energy, balance, etc.
-        known_protocols: List of protocol names in the game
+        known_protocols: List of protocol names in the game, or a
+            ProtocolMatcher over them
 
     Returns:
         {
@@ -723,19 +831,15 @@ def process_prompt(
     arch = dev["archetype"]
     mood = dev.get("mood", "neutral")
 
-    # 1. Classify intent
-    intent = classify_intent(prompt_text)
-
-    # 2. Extract context
-    topic = extract_topic(prompt_text)
-    target_location = extract_location(prompt_text)
+    # 1. Classify intent + 2. extract context (one pass, see classify_prompt)
+    intent, topic, target_location = classify_prompt(prompt_text)
     mentioned_protocol = extract_protocol_mention(prompt_text, known_protocols)
 
     # 3. Determine compliance
     compliance = determine_compliance(arch, mood, intent)
 
     # 4. Pick response template
-    arch_responses = RESPONSES.get(arch, RESPONSES["GRINDER"])
+    arch_responses = _RESPONSE_TEMPLATES.get(arch, _RESPONSE_TEMPLATES["GRINDER"])
     intent_responses = arch_responses.get(intent, arch_responses.get("CHAT", {"comply": ["..."]}))
 
     # Try exact compliance, fallback to comply
@@ -743,19 +847,18 @@ def process_prompt(
     if not response_list:
         response_list = intent_responses.get(COMPLY, ["..."])
 
-    response = random.choice(response_list)
-
-    # 5. Fill in placeholders
-    response = response.replace("{topic}", topic or "something interesting")
-    response = response.replace("{location}", (target_location or "somewhere").replace("_", " "))
-    response = response.replace("{protocol}", mentioned_protocol or "that protocol")
-    response = response.replace("{energy}", str(dev.get("energy", "?")))
-    response = response.replace("{balance}", f"{dev.get('balance_nxt', 0):,}")
-    response = response.replace("{protocols}", str(dev.get("protocols_created", 0)))
-    response = response.replace("{ais}", str(dev.get("ais_created", 0)))
-    response = response.replace("{bugs}", str(dev.get("bugs_found", 0)))
-    response = response.replace("{reviews}", str(dev.get("code_reviews_done", 0)))
-    response = response.replace("{proto_count}", str(len(known_protocols)))
+    template = random.choice(response_list)
+    if isinstance(template, str):   # built-in "..." fallbacks
+        template = Template(template)
+
+    # 5. Fill in placeholders (only the ones this template has)
+    if template.slots:
+        slot_ctx = {"dev": dev, "topic": topic, "location": target_location,
+                    "protocol": mentioned_protocol, "known": known_protocols}
+        response = template.render({slot: _RESPONSE_SLOTS[slot](slot_ctx)
+                                    for slot in template.slots if slot in _RESPONSE_SLOTS})
+    else:
+        response = template.text
 
     # 6. Calculate weight modifiers based on compliance + intent
     weight_modifiers = {}
@@ -0,0 +1,171 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Prompt Wake
+Fast path from POST /api/prompts to the dev's next cycle.
+
+A prompt used to sit in player_prompts until the dev's next scheduled
+cycle — up to CYCLE_NO_ENERGY (45 min) — and every tick looked up
+pending prompts for all the devs it ran, although almost none have one.
+Now:
+
+  - the API, in the transaction that inserts the prompt, pulls the
+    dev's next_cycle_at forward to now (wake_dev) and after the commit
+    publishes its token_id on the Redis channel ``nx:prompt_wake``
+    (publish);
+  - the engine's listener pushes that id onto the due queue at now, so
+    the scheduler runs the dev within seconds, and records it in
+    ``pending`` — the set of devs with an unconsumed prompt;
+  - a tick only asks player_prompts about its devs that are in that
+    set, and skips the query when none are.
+
+``pending`` is reloaded from player_prompts with the due queue (every
+SCHEDULER_RECONCILE_SEC) and only trusted while the listener is
+subscribed and a reload has completed since. Without Redis, between
+reconnects, without the due queue or under a virtual clock, ticks look
+up prompts for every dev as before, and the pulled-forward
+next_cycle_at is picked up by the next due-queue reload (or poll).
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    import redis
+except ImportError:  # engine may run without the API's dependencies
+    redis = None
+
+try:
+    import sim_clock
+except ImportError:
+    from backend.engine import sim_clock
+
+log = logging.getLogger("nx_engine")
+
+CHANNEL = "nx:prompt_wake"
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+LISTENER_RETRY_SEC = 5
+
+_PENDING_SQL = "SELECT DISTINCT dev_id FROM player_prompts WHERE consumed = FALSE"
+
+
+# ── API side ───────────────────────────────────────────────
+
+def wake_dev(cur, token_id: int, now=None) -> bool:
+    """Make a schedulable dev due now. Runs in the caller's transaction
+    (the one inserting the prompt). Returns whether it was pulled
+    forward — False if it was already due, inactive or out of energy."""
+    now = now or sim_clock.now()
+    cur.execute("""
+        UPDATE devs SET next_cycle_at = %s
+        WHERE token_id = %s AND status = 'active' AND energy > 0 AND next_cycle_at > %s
+    """, (now, token_id, now))
+    return cur.rowcount == 1
+
+
+_client = None
+
+
+def publish(token_id: int, client=None) -> bool:
+    """Tell the engine ``token_id`` has a new prompt. Call after the
+    commit. Returns False if Redis is unreachable (the engine then finds
+    the dev at its next due-queue reload)."""
+    global _client
+    if client is None:
+        if redis is None:
+            return False
+        if _client is None:
+            _client = redis.from_url(REDIS_URL)
+        client = _client
+    try:
+        client.publish(CHANNEL, str(token_id))
+        return True
+    except Exception as e:
+        log.warning(f"Prompt wake not published for dev #{token_id}: {e}")
+        return False
+
+
+# ── Engine side ────────────────────────────────────────────
+
+class PendingPrompts:
+    """Token ids with an unconsumed prompt, kept by the wake listener."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = set()
+        self._since_reload = set()
+        self._subscription = None   # bumped on every (re)subscribe
+        self._synced = False
+
+    def add(self, token_id: int):
+        with self._lock:
+            self._ids.add(token_id)
+            self._since_reload.add(token_id)
+
+    def discard(self, token_ids):
+        with self._lock:
+            self._ids.difference_update(token_ids)
+
+    def reload(self, cur) -> int:
+        """Replace the set with player_prompts. Wakes received while the
+        query runs are kept."""
+        with self._lock:
+            self._since_reload = set()
+            subscription = self._subscription
+        cur.execute(_PENDING_SQL)
+        ids = {r["dev_id"] for r in cur.fetchall()}
+        with self._lock:
+            self._ids = ids | self._since_reload
+            # Only a reload that started after the current subscription
+            # covers every prompt the listener could have missed.
+            self._synced = subscription is not None and subscription == self._subscription
+            return len(self._ids)
+
+    def set_subscribed(self, subscribed: bool):
+        with self._lock:
+            if subscribed:
+                self._subscription = (self._subscription or 0) + 1
+            else:
+                self._subscription = None
+            self._synced = False
+
+    def candidates(self, token_ids) -> Optional[list]:
+        """Which of ``token_ids`` may hold a pending prompt, or None if
+        the set can't be trusted and all of them must be looked up."""
+        with self._lock:
+            if not self._synced:
+                return None
+            return [t for t in token_ids if t in self._ids]
+
+    def start_listener(self, due_queue=None, url: str = REDIS_URL) -> Optional[threading.Thread]:
+        """Daemon thread that records each published token_id and pushes
+        it onto ``due_queue`` at now, reconnecting forever."""
+        if redis is None:
+            return None
+
+        def run():
+            while True:
+                try:
+                    pubsub = redis.from_url(url).pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(CHANNEL)
+                    self.set_subscribed(True)
+                    for message in pubsub.listen():
+                        try:
+                            token_id = int(message["data"])
+                        except (TypeError, ValueError):
+                            continue
+                        self.add(token_id)
+                        if due_queue is not None:
+                            due_queue.push(token_id, sim_clock.time())
+                except Exception as e:
+                    self.set_subscribed(False)
+                    log.warning(f"Prompt wake listener: {e}; retrying in {LISTENER_RETRY_SEC}s")
+                    time.sleep(LISTENER_RETRY_SEC)
+
+        thread = threading.Thread(target=run, daemon=True, name="nx-prompt-wake")
+        thread.start()
+        return thread
+
+
+pending = PendingPrompts()
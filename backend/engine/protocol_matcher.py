@@ -0,0 +1,151 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Protocol Name Matcher
+Aho-Corasick automaton of active protocol names for prompt processing.
+
+process_prompt needs "which known protocol does this prompt mention?".
+It used to get every active protocol name from the DB per prompt and
+test each one with ``name in text``. The engine now keeps one automaton
+for the process:
+
+  - find(text) is a single pass over the prompt, whatever the number of
+    protocols;
+  - add() (CREATE_PROTOCOL, refresh) appends to a small pending list
+    that find() checks with plain ``in``; once it passes PENDING_MAX
+    names the automaton is rebuilt with them;
+  - refresh(cur) pulls protocols with id > the highest seen, and
+    reloads everything every REBUILD_SEC (status changes, deletes).
+
+Matching is case-insensitive. When several names match, the earliest
+added wins — the same answer the old id-ordered linear scan gave.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+REBUILD_SEC = 600
+PENDING_MAX = 256
+
+
+class ProtocolMatcher:
+    """Case-insensitive multi-pattern matcher over protocol names."""
+
+    def __init__(self, names=(), rebuild_sec: float = REBUILD_SEC):
+        self.rebuild_sec = rebuild_sec
+        self._lock = threading.Lock()
+        self._reset()
+        for name in names:
+            self.add(name)
+
+    def _reset(self):
+        self._rank = {}        # lowercased name → rank (insertion order)
+        self._names = []       # rank → original name
+        self._ids = set()      # protocol ids already counted
+        self._count = 0        # protocols added (names may repeat)
+        self._pending = []     # ranks not yet in the automaton
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]     # best (lowest) rank ending here, via fail links
+        self._max_id = 0
+        self._built_at = None
+
+    def __len__(self):
+        return self._count
+
+    # ── Updates ────────────────────────────────────────────
+
+    def add(self, name: str, protocol_id: Optional[int] = None):
+        with self._lock:
+            self._add(name, protocol_id)
+
+    def _add(self, name: str, protocol_id: Optional[int]):
+        if protocol_id is not None:
+            if protocol_id in self._ids:
+                return
+            self._ids.add(protocol_id)
+        self._count += 1
+        key = name.lower()
+        if not key or key in self._rank:
+            return
+        rank = len(self._names)
+        self._rank[key] = rank
+        self._names.append(name)
+        self._pending.append(rank)
+        if len(self._pending) > PENDING_MAX:
+            self._build()
+
+    def _build(self):
+        goto, out = [{}], [None]
+        for key, rank in self._rank.items():
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(None)
+                node = nxt
+            if out[node] is None or rank < out[node]:
+                out[node] = rank
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                inherited = out[fail[child]]
+                if inherited is not None and (out[child] is None or inherited < out[child]):
+                    out[child] = inherited
+                queue.append(child)
+
+        self._goto, self._fail, self._out = goto, fail, out
+        self._pending = []
+
+    def refresh(self, cur, force: bool = False):
+        """Pick up protocols created elsewhere (other nodes, API)."""
+        now = time.monotonic()
+        if force or self._built_at is None or now - self._built_at >= self.rebuild_sec:
+            cur.execute("SELECT id, name FROM protocols WHERE status = 'active' ORDER BY id")
+            rows = cur.fetchall()
+            with self._lock:
+                self._reset()
+                for r in rows:
+                    self._add(r["name"], r["id"])
+                self._build()
+                self._max_id = max((r["id"] for r in rows), default=0)
+                self._built_at = now
+            return
+
+        cur.execute("SELECT id, name FROM protocols WHERE id > %s AND status = 'active' ORDER BY id",
+                    (self._max_id,))
+        rows = cur.fetchall()
+        with self._lock:
+            for r in rows:
+                self._add(r["name"], r["id"])
+            self._max_id = max((r["id"] for r in rows), default=self._max_id)
+
+    # ── Matching ───────────────────────────────────────────
+
+    def find(self, text: str) -> Optional[str]:
+        """Earliest-added protocol name contained in ``text``, or None."""
+        text = text.lower()
+        with self._lock:
+            goto, fail, out = self._goto, self._fail, self._out
+            best = None
+            node = 0
+            for ch in text:
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+                if out[node] is not None and (best is None or out[node] < best):
+                    best = out[node]
+            for rank in self._pending:
+                if (best is None or rank < best) and self._names[rank].lower() in text:
+                    best = rank
+            return self._names[best] if best is not None else None
@@ -9,7 +9,6 @@ import threading
 import time
 from pathlib import Path
 from urllib.parse import urlparse
-from contextlib import contextmanager
 
 # Defense-in-depth against a broken PYTHONPATH in the deploy target.
 # A previous incident: the Render start command was
@@ -38,36 +37,14 @@ if database_url:
     os.environ.setdefault("NX_DB_USER", parsed.username or "postgres")
     os.environ.setdefault("NX_DB_PASS", parsed.password or "postgres")
 
-import psycopg2
-import psycopg2.extras
+import psycopg2  # noqa: F401 — fail fast here if the driver is missing
 import engine
-from config import DATABASE_URL as ENGINE_DB_URL, DB_SCHEMA
+from config import DB_HOST, DB_SSLMODE
 from listener import run_listener
 
-# Detect SSL
-db_host = os.getenv("NX_DB_HOST", "localhost")
-sslmode = "require" if "render.com" in db_host else "prefer"
-
-# Monkey-patch engine DB
-@contextmanager
-def get_db_with_ssl():
-    conn = psycopg2.connect(
-        ENGINE_DB_URL,
-        options=f"-c search_path={DB_SCHEMA}",
-        sslmode=sslmode,
-    )
-    conn.autocommit = False
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-
-engine.get_db = get_db_with_ssl
-print(f"Engine DB: {db_host} (ssl={sslmode})")
+# Every thread below borrows from the one db_pool.shared_pool() (SSL per
+# config.DB_SSLMODE) through engine.get_db or the listener's get_db.
+print(f"Engine DB: {DB_HOST} (ssl={DB_SSLMODE})")
 
 
 def start_listener():
@@ -102,7 +79,7 @@ def start_reconciler():
         return
     while True:
         try:
-            run_reconciler_loop(get_db_with_ssl)
+            run_reconciler_loop(engine.get_db)
         except Exception as e:
             print(f"[MAIN] Reconciler crashed: {e}. Restarting in 10s...")
             time.sleep(10)
@@ -118,7 +95,7 @@ def start_ledger_reconciler():
         return
     while True:
         try:
-            run_ledger_loop(get_db_with_ssl)
+            run_ledger_loop(engine.get_db)
         except Exception as e:
             print(f"[MAIN] Ledger reconciler crashed: {e}. Restarting in 60s...")
             time.sleep(60)
@@ -132,7 +109,7 @@ def start_nxt_claimed_listener():
         return
     while True:
         try:
-            run_listener_loop(get_db_with_ssl)
+            run_listener_loop(engine.get_db)
         except Exception as e:
             print(f"[MAIN] NXTClaimed listener crashed: {e}. Restarting in 10s...")
             time.sleep(10)
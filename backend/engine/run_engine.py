@@ -1,13 +1,12 @@
 """
 NX TERMINAL — Engine Runner for Render
-Patches DB connection to support SSL, then runs the engine.
+Maps DATABASE_URL onto the NX_DB_* settings, then runs the engine.
 Usage: python -m backend.engine.run_engine
 """
 
 import sys
 import os
 from urllib.parse import urlparse
-from contextlib import contextmanager
 
 # Add engine directory to path so engine.py's imports work
 engine_dir = os.path.dirname(os.path.abspath(__file__))
@@ -25,37 +24,12 @@ if database_url:
     os.environ.setdefault("NX_DB_PASS", parsed.password or "postgres")
 
 # Now import engine (which imports config)
-import psycopg2
-import psycopg2.extras
 import engine
-from config import DATABASE_URL, DB_SCHEMA
+from config import DB_HOST, DB_SSLMODE
 
-# Detect SSL need
-db_host = os.getenv("NX_DB_HOST", "localhost")
-sslmode = "require" if "render.com" in db_host else "prefer"
-
-# Monkey-patch get_db to add SSL support
-@contextmanager
-def get_db_with_ssl():
-    conn = psycopg2.connect(
-        DATABASE_URL,
-        options=f"-c search_path={DB_SCHEMA}",
-        sslmode=sslmode,
-    )
-    conn.autocommit = False
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-
-# Replace engine's get_db with SSL version
-engine.get_db = get_db_with_ssl
-
-print(f"Engine DB: {db_host} (ssl={sslmode})")
+# engine.get_db borrows from db_pool.shared_pool(), which connects with
+# config.DB_SSLMODE — no patching needed for SSL any more.
+print(f"Engine DB: {DB_HOST} (ssl={DB_SSLMODE})")
 
 if __name__ == "__main__":
     engine.run_engine()
@@ -0,0 +1,160 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Sampling Cache
+O(1) uniform random picks of active protocols / absurd AIs.
+
+INVEST, CODE_REVIEW and auto-vote used to pick their target with
+``ORDER BY RANDOM() LIMIT 1`` — a full scan + sort of a table that only
+grows, once per action. The engine now keeps the candidate ids in
+memory and picks one with random.choice:
+
+  - refresh() once per tick appends rows with id > the highest id seen
+    (PK range scan), and rebuilds from scratch every REBUILD_SEC to
+    pick up status changes, deletes and ids whose INSERT committed out
+    of sequence order (other engine nodes, the API).
+  - The engine add()s the id it just inserted (CREATE_PROTOCOL /
+    CREATE_AI) so new rows are pickable within the same tick.
+  - Every pick is confirmed with a PK lookup. An id that no longer
+    qualifies (rolled-back insert, protocol no longer active) is
+    dropped from the pool and another one drawn, so a stale pool costs
+    a retry, never a wrong target.
+"""
+
+import random
+import threading
+import time
+
+REBUILD_SEC = 600
+PICK_ATTEMPTS = 8
+
+
+class IdPool:
+    """Set of ids with O(1) add, discard and uniform choice.
+
+    Ids live in a list for choice(); a dict maps id → list position so
+    discard() can swap the last element into the hole."""
+
+    def __init__(self, ids=()):
+        self._ids = []
+        self._pos = {}
+        for i in ids:
+            self.add(i)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._pos
+
+    def add(self, item_id: int):
+        if item_id not in self._pos:
+            self._pos[item_id] = len(self._ids)
+            self._ids.append(item_id)
+
+    def discard(self, item_id: int):
+        pos = self._pos.pop(item_id, None)
+        if pos is None:
+            return
+        last = self._ids.pop()
+        if pos < len(self._ids):
+            self._ids[pos] = last
+            self._pos[last] = pos
+
+    def choice(self, rng=random):
+        return rng.choice(self._ids) if self._ids else None
+
+
+class SamplingCache:
+    """Active protocol ids + absurd AI ids shared by every scheduler worker."""
+
+    def __init__(self, rebuild_sec: float = REBUILD_SEC):
+        self.rebuild_sec = rebuild_sec
+        self.protocols = IdPool()
+        self.ais = IdPool()
+        self._max_protocol_id = 0
+        self._max_ai_id = 0
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    # ── Refresh ────────────────────────────────────────────
+
+    def refresh(self, cur, force: bool = False):
+        """Bring the pools up to date. Cheap when nothing was inserted."""
+        now = time.monotonic()
+        # An empty pool is rebuilt every time — nothing to lose, and it
+        # catches rows the incremental id > max scan can't see.
+        if (force or self._built_at is None or now - self._built_at >= self.rebuild_sec
+                or not self.protocols or not self.ais):
+            cur.execute("SELECT id FROM protocols WHERE status = 'active'")
+            protocols = [r["id"] for r in cur.fetchall()]
+            cur.execute("SELECT id FROM absurd_ais")
+            ais = [r["id"] for r in cur.fetchall()]
+            with self._lock:
+                self.protocols = IdPool(protocols)
+                self.ais = IdPool(ais)
+                self._max_protocol_id = max(protocols, default=0)
+                self._max_ai_id = max(ais, default=0)
+                self._built_at = now
+            return
+
+        cur.execute("SELECT id FROM protocols WHERE id > %s AND status = 'active'",
+                    (self._max_protocol_id,))
+        protocols = [r["id"] for r in cur.fetchall()]
+        cur.execute("SELECT id FROM absurd_ais WHERE id > %s", (self._max_ai_id,))
+        ais = [r["id"] for r in cur.fetchall()]
+        with self._lock:
+            for i in protocols:
+                self.protocols.add(i)
+            for i in ais:
+                self.ais.add(i)
+            self._max_protocol_id = max(protocols, default=self._max_protocol_id)
+            self._max_ai_id = max(ais, default=self._max_ai_id)
+
+    def add_protocol(self, protocol_id: int):
+        with self._lock:
+            self.protocols.add(protocol_id)
+
+    def add_ai(self, ai_id: int):
+        with self._lock:
+            self.ais.add(ai_id)
+
+    def has_protocols(self) -> bool:
+        return len(self.protocols) > 0
+
+    # ── Picks ──────────────────────────────────────────────
+
+    def _pick(self, cur, pool_name: str, sql: str):
+        if self._built_at is None:
+            self.refresh(cur)
+        for _ in range(PICK_ATTEMPTS):
+            with self._lock:
+                item_id = getattr(self, pool_name).choice()
+            if item_id is None:
+                return None
+            cur.execute(sql, (item_id,))
+            row = cur.fetchone()
+            if row is None:
+                with self._lock:
+                    getattr(self, pool_name).discard(item_id)
+                continue
+            return row
+        return None
+
+    def pick_protocol(self, cur, columns: str = "id"):
+        """A uniformly random active protocol row, or None."""
+        return self._pick(
+            cur, "protocols",
+            f"SELECT {columns} FROM protocols WHERE id = %s AND status = 'active'",
+        )
+
+    def pick_ai(self, cur, exclude_creator: int, columns: str = "id"):
+        """A uniformly random absurd AI not created by ``exclude_creator``.
+
+        Rejection sampling: a dev's own AI is redrawn (not discarded —
+        it is a valid target for everyone else). Gives up after
+        PICK_ATTEMPTS draws, i.e. only for devs that own most AIs."""
+        sql = f"SELECT {columns}, creator_dev_id FROM absurd_ais WHERE id = %s"
+        for _ in range(PICK_ATTEMPTS):
+            row = self._pick(cur, "ais", sql)
+            if row is None or row["creator_dev_id"] != exclude_creator:
+                return row
+        return None
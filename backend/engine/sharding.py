@@ -0,0 +1,189 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Engine Sharding
+Run the simulation on several nodes, each owning a slice of devs.
+
+Coordination lives in two small tables (see migration_engine_sharding.sql):
+
+  engine_leases     name → holder + expires_at. One lease per shard
+                    ("shard:3"), one per live node ("node:<id>") and a
+                    single "leader" lease.
+  engine_cron_runs  name → last_run_at. Singleton crons (salary,
+                    snapshots, orphan scan, NX Market sweeps) claim
+                    their slot here atomically before running.
+
+A dev belongs to shard ``token_id % shard_count``. Every node heartbeats
+its node lease, counts the live nodes and holds its fair share of the
+shard leases — releasing extras when a node joins, picking up expired
+ones when a node dies. Shard ownership only routes work: the scheduler
+still claims rows FOR UPDATE SKIP LOCKED and moves next_cycle_at in the
+same transaction, so a brief overlap during hand-over can't process a
+dev twice.
+
+The leader runs the crons. A new leader doesn't trust its own clock to
+decide when salary is due — it claims the slot in engine_cron_runs, in
+the same transaction as the payment, so a failover mid-hour never pays
+the same interval twice.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+log = logging.getLogger("nx_engine")
+
+LEADER_LEASE = "leader"
+
+_ACQUIRE_SQL = """
+    INSERT INTO engine_leases (name, holder, expires_at)
+    VALUES (%s, %s, NOW() + %s * INTERVAL '1 second')
+    ON CONFLICT (name) DO UPDATE SET
+        holder = EXCLUDED.holder,
+        expires_at = EXCLUDED.expires_at,
+        acquired_at = CASE WHEN engine_leases.holder = EXCLUDED.holder
+                           THEN engine_leases.acquired_at ELSE NOW() END
+    WHERE engine_leases.holder = EXCLUDED.holder
+       OR engine_leases.expires_at < NOW()
+    RETURNING name
+"""
+
+_CLAIM_CRON_SQL = """
+    INSERT INTO engine_cron_runs (name, last_run_at, holder)
+    VALUES (%s, NOW(), %s)
+    ON CONFLICT (name) DO UPDATE SET
+        last_run_at = NOW(),
+        holder = EXCLUDED.holder
+    WHERE engine_cron_runs.last_run_at <= NOW() - %s * INTERVAL '1 second'
+    RETURNING name
+"""
+
+
+def claim_cron(cur, name: str, interval_sec: float, holder: str = "") -> bool:
+    """Atomically claim the next run of a singleton cron.
+
+    True if ``interval_sec`` has passed since the last claimed run (or
+    it never ran). Runs in the caller's transaction: commit it together
+    with the cron's own writes so a failed run releases the slot."""
+    cur.execute(_CLAIM_CRON_SQL, (name, holder, interval_sec))
+    return cur.fetchone() is not None
+
+
+class ShardCoordinator:
+    """Lease bookkeeping for one engine node.
+
+    ``step()`` does one heartbeat round; ``start()`` runs it every
+    ttl/3 seconds on a daemon thread. Ownership is only trusted until
+    the leases would have expired, so a node cut off from the DB stops
+    acting on its shards before anyone else can take them over.
+    """
+
+    def __init__(self, get_conn: Callable, shard_count: int, node_id: str,
+                 ttl_sec: int = 30):
+        if shard_count < 1:
+            raise ValueError("shard_count must be >= 1")
+        self.get_conn = get_conn
+        self.shard_count = shard_count
+        self.node_id = node_id
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._owned = ()
+        self._leader = False
+        self._valid_until = 0.0
+
+    # ── State ──────────────────────────────────────────────
+
+    def _valid(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    @property
+    def is_leader(self) -> bool:
+        with self._lock:
+            return self._leader and self._valid()
+
+    def owned(self) -> tuple:
+        """Shard numbers this node may process right now."""
+        with self._lock:
+            return self._owned if self._valid() else ()
+
+    def scheduler_shards(self) -> tuple:
+        """(shard_count, owned) as taken by run_scheduler_tick."""
+        return (self.shard_count, self.owned())
+
+    # ── Leases ─────────────────────────────────────────────
+
+    def _acquire(self, cur, name: str) -> bool:
+        cur.execute(_ACQUIRE_SQL, (name, self.node_id, self.ttl_sec))
+        return cur.fetchone() is not None
+
+    def _release(self, cur, name: str):
+        cur.execute("DELETE FROM engine_leases WHERE name = %s AND holder = %s",
+                    (name, self.node_id))
+
+    def step(self):
+        started = time.monotonic()
+        with self.get_conn() as conn:
+            cur = conn.cursor()
+            self._acquire(cur, f"node:{self.node_id}")
+            cur.execute("SELECT COUNT(*) FROM engine_leases "
+                        "WHERE name LIKE 'node:%' AND expires_at >= NOW()")
+            live_nodes = max(1, cur.fetchone()[0])
+            fair_share = math.ceil(self.shard_count / live_nodes)
+
+            cur.execute("SELECT name FROM engine_leases WHERE holder = %s AND name LIKE 'shard:%%'",
+                        (self.node_id,))
+            held = sorted(int(r[0].split(":", 1)[1]) for r in cur.fetchall())
+            held = [s for s in held if s < self.shard_count]
+
+            # Give back extras (highest first) so a joining node can take them.
+            while len(held) > fair_share:
+                self._release(cur, f"shard:{held.pop()}")
+
+            owned = [s for s in held if self._acquire(cur, f"shard:{s}")]
+            for s in range(self.shard_count):
+                if len(owned) >= fair_share:
+                    break
+                if s not in owned and self._acquire(cur, f"shard:{s}"):
+                    owned.append(s)
+
+            leader = self._acquire(cur, LEADER_LEASE)
+            conn.commit()
+
+        with self._lock:
+            changed = (tuple(sorted(owned)), leader) != (self._owned, self._leader)
+            self._owned = tuple(sorted(owned))
+            self._leader = leader
+            # Leases were stamped after `started`; stop trusting them a
+            # little before they actually expire.
+            self._valid_until = started + self.ttl_sec * 0.8
+        if changed:
+            log.info(f"🧩 Node {self.node_id}: shards {list(self._owned)} of {self.shard_count}"
+                     f"{' · leader' if leader else ''} ({live_nodes} live nodes)")
+
+    def release_all(self):
+        """Drop every lease this node holds (clean shutdown)."""
+        with self.get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM engine_leases WHERE holder = %s", (self.node_id,))
+            conn.commit()
+        with self._lock:
+            self._owned, self._leader, self._valid_until = (), False, 0.0
+
+    def run(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            try:
+                self.step()
+            except Exception as e:
+                log.error(f"Shard coordinator error: {e}")
+            stop_event.wait(self.ttl_sec / 3)
+
+    def start(self, stop_event: Optional[threading.Event] = None) -> threading.Thread:
+        stop_event = stop_event or threading.Event()
+        try:
+            self.step()  # own something before the first tick
+        except Exception as e:
+            log.error(f"Shard coordinator error: {e}")
+        t = threading.Thread(target=self.run, args=(stop_event,), daemon=True,
+                             name="nx-shard-coordinator")
+        t.start()
+        return t
@@ -0,0 +1,95 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Simulation Clock
+The engine's notion of "now", real or virtual.
+
+Everything the simulation decides by time — who is due, when a dev
+acts next, salary hours, vitals decay, weekly event rotation, NX Market
+close / timeout — reads ``sim_clock.now()`` / ``sim_clock.time()`` and
+passes the result into its SQL instead of calling NOW(). With the
+default RealClock that is the wall clock. A soak run installs a
+VirtualClock, whose ``sleep()`` advances time instead of waiting, so
+run_engine jumps straight to the next due dev or cron and a month of
+economy runs as fast as Postgres can go (scripts/soak_engine.py).
+
+Not virtualised: column DEFAULT NOW() on append-only rows (actions,
+chat_messages, notifications — created_at is wall time), the sharding
+leases, and the on-chain jobs, which follow chain time and are skipped
+under a VirtualClock.
+
+No dependencies: the API imports this through vitals / world_state.
+"""
+
+import threading
+import time as _time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+class RealClock:
+    virtual = False
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def time(self) -> float:
+        return _time.time()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            _time.sleep(seconds)
+
+
+class VirtualClock:
+    """Time that only moves when told to: ``sleep`` and ``advance``."""
+
+    virtual = True
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = start or datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._now
+
+    def time(self) -> float:
+        return self.now().timestamp()
+
+    def advance(self, seconds: float) -> datetime:
+        with self._lock:
+            if seconds > 0:
+                self._now += timedelta(seconds=seconds)
+            return self._now
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+
+_clock = RealClock()
+
+
+def install(clock) -> object:
+    """Make ``clock`` the process-wide clock; returns the previous one."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def get():
+    return _clock
+
+
+def now() -> datetime:
+    return _clock.now()
+
+
+def time() -> float:
+    return _clock.time()
+
+
+def sleep(seconds: float):
+    _clock.sleep(seconds)
+
+
+def is_virtual() -> bool:
+    return _clock.virtual
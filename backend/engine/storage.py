@@ -0,0 +1,210 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Storage Backends
+Where execute_action reads and writes, so the production rules can run
+without a database server.
+
+execute_action talks to a store, never to SQL directly:
+
+    insert_protocol / insert_ai      new row, returns its id
+    pick_protocol / pick_ai          uniformly random target row
+    invest                           upsert a position, True if new
+    holdings / close_position        a dev's positions, drop one
+    credit_sale                      sale proceeds onto the dev row
+    vote                             new ai_votes row or None
+    flush(writer)                    apply a TickWriter's buffer
+
+engine.PostgresStore is production: the tick's cursor, so every write
+lands in the caller's transaction. MemoryStore below keeps the tables
+in dicts for offline simulation (balancing, profiling): engine's
+run_offline_tick drives the same decide / execute path over it. It
+applies writer buffers with the semantics of tick_writer's SQL —
+energy clamped to [0, max_energy], floored protocol value / quality,
+and a dev whose balance would go negative losing that tick's writes,
+as the CHECK constraint and per-dev fallback do in Postgres.
+
+Not modelled offline: player prompts, lazy vitals decay, the ledger,
+notifications' consumers.
+
+No dependencies: nothing here imports psycopg2.
+"""
+
+import itertools
+import random
+from typing import Optional
+
+from tick_writer import COUNTER_COLUMNS, ENUM_COLUMNS, SCHEDULE_COLUMNS
+
+# Columns a dev row needs for decide / execute, with the schema defaults.
+DEV_DEFAULTS = {
+    **{c: 0 for c in COUNTER_COLUMNS},
+    **{c: None for c, _, _ in SCHEDULE_COLUMNS},
+    "energy": 10, "max_energy": 10, "mood": "neutral", "location": "BOARD_ROOM",
+    "balance_nxt": 2000, "reputation": 50, "social_vitality": 50,
+    "status": "active", "ipfs_hash": None, "pc_health": 100, "rarity_tier": "common",
+}
+
+# Field names of TickWriter's buffered rows (its INSERT column lists).
+ACTION_COLUMNS = ("dev_id", "dev_name", "archetype", "action_type", "details",
+                  "energy_cost", "nxt_cost")
+CHAT_COLUMNS = ("dev_id", "dev_name", "archetype", "channel", "location", "message",
+                "chat_type", "social_gain")
+NOTIFICATION_COLUMNS = ("player_address", "type", "title", "body", "dev_id")
+
+
+class MemoryStore:
+    """In-process tables: devs, protocols, positions, absurd AIs, votes
+    and the append-only actions / chat / notifications logs."""
+
+    cur = None  # no SQL cursor behind this store
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random
+        self.devs = {}
+        self.protocols = {}
+        self.investments = {}   # (dev_id, protocol_id) -> position row
+        self.ais = {}
+        self.votes = {}         # (voter_dev_id, ai_id) -> weight
+        self.actions = []
+        self.chats = []
+        self.notifications = []
+        self._ids = {name: itertools.count(1) for name in ("protocols", "investments", "ais")}
+
+    # ── Devs ───────────────────────────────────────────────
+
+    def add_dev(self, **row) -> dict:
+        dev = {**DEV_DEFAULTS, **row}
+        self.devs[dev["token_id"]] = dev
+        return dev
+
+    def due_devs(self, now, limit: int) -> list:
+        """Copies of the devs fetch_due_devs would claim at ``now``."""
+        due = [d for d in self.devs.values()
+               if d["status"] == "active" and d["energy"] > 0
+               and (d["next_cycle_at"] is None or d["next_cycle_at"] <= now)]
+        due.sort(key=lambda d: (d["next_cycle_at"] is not None, d["next_cycle_at"] or 0))
+        return [dict(d) for d in due[:limit]]
+
+    def next_due(self):
+        """Earliest next_cycle_at among devs that can act, or None."""
+        return min((d["next_cycle_at"] for d in self.devs.values()
+                    if d["status"] == "active" and d["energy"] > 0
+                    and d["next_cycle_at"] is not None), default=None)
+
+    def has_protocols(self) -> bool:
+        return any(p["status"] == "active" for p in self.protocols.values())
+
+    def invested(self, token_ids) -> set:
+        wanted = set(token_ids)
+        return {dev_id for dev_id, _ in self.investments if dev_id in wanted}
+
+    # ── Rows execute_action creates or picks ───────────────
+
+    def insert_protocol(self, creator: int, name: str, description: str,
+                        quality: int, value: int) -> int:
+        pid = next(self._ids["protocols"])
+        self.protocols[pid] = {
+            "id": pid, "name": name, "description": description, "creator_dev_id": creator,
+            "code_quality": quality, "value": value, "total_invested": 0,
+            "investor_count": 0, "status": "active",
+        }
+        return pid
+
+    def insert_ai(self, creator: int, name: str, description: str) -> int:
+        ai_id = next(self._ids["ais"])
+        self.ais[ai_id] = {"id": ai_id, "name": name, "description": description,
+                           "creator_dev_id": creator, "vote_count": 0, "weighted_votes": 0.0}
+        return ai_id
+
+    def pick_protocol(self, columns: str = "id") -> Optional[dict]:
+        active = [p for p in self.protocols.values() if p["status"] == "active"]
+        return dict(self.rng.choice(active)) if active else None
+
+    def pick_ai(self, exclude_creator: int) -> Optional[dict]:
+        others = [a for a in self.ais.values() if a["creator_dev_id"] != exclude_creator]
+        return dict(self.rng.choice(others)) if others else None
+
+    # ── Positions and votes ────────────────────────────────
+
+    def invest(self, dev_id: int, protocol_id: int, amount: int) -> bool:
+        position = self.investments.get((dev_id, protocol_id))
+        if position:
+            position["shares"] += amount
+            position["nxt_invested"] += amount
+            return False
+        self.investments[(dev_id, protocol_id)] = {
+            "id": next(self._ids["investments"]), "dev_id": dev_id,
+            "protocol_id": protocol_id, "shares": amount, "nxt_invested": amount,
+        }
+        return True
+
+    def holdings(self, dev_id: int) -> list:
+        return [{**pos, "name": self.protocols[pid]["name"], "value": self.protocols[pid]["value"]}
+                for (holder, pid), pos in self.investments.items() if holder == dev_id]
+
+    def close_position(self, dev_id: int, protocol_id: int) -> int:
+        return 1 if self.investments.pop((dev_id, protocol_id), None) else 0
+
+    def credit_sale(self, dev: dict, position: dict, amount: int, energy_cost: int):
+        row = self.devs[dev["token_id"]]
+        row["balance_nxt"] += amount
+        row["total_earned"] += amount
+        row["energy"] = max(0, row["energy"] - energy_cost)
+
+    def vote(self, dev_id: int, ai_id: int, weight: float) -> Optional[float]:
+        if (dev_id, ai_id) in self.votes:
+            return None
+        self.votes[(dev_id, ai_id)] = weight
+        return weight
+
+    # ── Tick flush ─────────────────────────────────────────
+
+    def flush(self, writer, fallback: bool = True) -> int:
+        """Apply and clear ``writer``'s buffer. Returns devs written."""
+        buf = writer.buffered()
+        rejected = {tid for tid, e in buf["devs"].items()
+                    if tid in self.devs and self.devs[tid]["balance_nxt"] + e["balance_nxt"] < 0}
+        written = 0
+        for tid, e in buf["devs"].items():
+            dev = self.devs.get(tid)
+            if dev is None or tid in rejected:
+                continue
+            if e["energy"] < 0:
+                dev["energy"] = max(0, dev["energy"] + e["energy"])
+            elif e["energy"] > 0:
+                dev["energy"] = min(dev["max_energy"], dev["energy"] + e["energy"])
+            if e["reset_sleep"]:
+                dev["hours_since_sleep"] = 0
+            for c in COUNTER_COLUMNS:
+                dev[c] += e[c]
+            for c in ENUM_COLUMNS:
+                if e[c] is not None:
+                    dev[c] = e[c]
+            if e["scheduled"]:
+                for c, _, _ in SCHEDULE_COLUMNS:
+                    dev[c] = e[c]
+            written += 1
+        for table, rows, columns in ((self.actions, buf["actions"], ACTION_COLUMNS),
+                                   (self.chats, buf["chats"], CHAT_COLUMNS),
+                                   (self.notifications, buf["notifications"], NOTIFICATION_COLUMNS)):
+            table.extend(dict(zip(columns, r)) for tid, r in rows if tid not in rejected)
+        # Summed per protocol first, then floored once (PROTOCOL_UPDATE_SQL).
+        protocols = {}
+        for tid, pid, value, invested, quality, investors in buf["protocols"]:
+            if pid in self.protocols and tid not in rejected:
+                agg = protocols.setdefault(pid, [0, 0, 0, 0])
+                agg[0] += value
+                agg[1] += invested
+                agg[2] += quality
+                agg[3] += investors
+        for pid, (value, invested, quality, investors) in protocols.items():
+            p = self.protocols[pid]
+            p["value"] = max(0, p["value"] + value)
+            p["total_invested"] += invested
+            p["code_quality"] = max(0, p["code_quality"] + quality)
+            p["investor_count"] = max(0, p["investor_count"] + investors)
+        for tid, ai_id, weight in buf["votes"]:
+            if ai_id in self.ais and tid not in rejected:
+                self.ais[ai_id]["vote_count"] += 1
+                self.ais[ai_id]["weighted_votes"] += weight
+        writer.clear()
+        return written
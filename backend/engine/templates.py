@@ -1,9 +1,14 @@
 """
 NX TERMINAL: PROTOCOL WARS — Content Templates
 100% combinatorio. 0 LLM. 1,000,000,000+ combinaciones.
+
+Every template with {placeholders} is parsed once at import into a
+Template (literal segments + slot names, see PRECOMPILED TEMPLATES at
+the bottom); rendering is a single join.
 """
 
 import random
+import re
 
 # ============================================================
 # DEV NAMES
@@ -451,11 +456,8 @@ def gen_protocol_name() -> str:
 
 
 def gen_protocol_description() -> str:
-    template = random.choice(PROTOCOL_DESCRIPTIONS)
-    return template.format(
-        adj=random.choice(PROTOCOL_ADJS),
-        thing=random.choice(PROTOCOL_THINGS)
-    )
+    template = random.choice(_PROTOCOL_DESCRIPTIONS)
+    return template.render(_fill(template, _PROTOCOL_FILLERS))
 
 
 def gen_ai_name() -> str:
@@ -465,32 +467,26 @@ def gen_ai_name() -> str:
 
 
 def gen_ai_description() -> str:
-    template = random.choice(AI_DESCRIPTIONS)
-    return template.format(
-        thing=random.choice(AI_THINGS).lower(),
-        thing2=random.choice(AI_THINGS).lower(),
-        action=random.choice(AI_ACTIONS_VERB),
-        pct=random.randint(12, 97)
-    )
+    template = random.choice(_AI_DESCRIPTIONS)
+    return template.render(_fill(template, _AI_FILLERS))
 
 
 def gen_chat_message(archetype: str, context: str, **kwargs) -> str:
     """Generate chat message from templates."""
-    templates = CHAT_TEMPLATES.get(archetype, CHAT_TEMPLATES["GRINDER"])
-    messages = templates.get(context, templates["idle"])
-    msg = random.choice(messages)
-
-    # Replace all possible placeholders
-    replacements = {
-        "{name}": kwargs.get("name", "SomeProtocol"),
-        "{thing}": random.choice(PROTOCOL_CORES),
-        "{thing2}": random.choice(PROTOCOL_CORES),
-        "{line}": str(random.randint(12, 847)),
-    }
-    for placeholder, value in replacements.items():
-        msg = msg.replace(placeholder, value)
+    template = random.choice(_chat_pool(archetype, context))
+    return template.render(_fill(template, _CHAT_FILLERS,
+                                 name=kwargs.get("name", "SomeProtocol")))
+
+
+def gen_chat_messages(n: int, archetype: str, context: str, names: list = None) -> list:
+    """``n`` chat messages for one archetype/context in one call.
 
-    return msg
+    ``names`` (len n) fills {name} per message; the templates are drawn
+    with a single random.choices."""
+    templates = random.choices(_chat_pool(archetype, context), k=n)
+    if names is None:
+        names = ["SomeProtocol"] * n
+    return [t.render(_fill(t, _CHAT_FILLERS, name=name)) for t, name in zip(templates, names)]
 
 
 def gen_visual_traits(rarity: str) -> dict:
@@ -720,14 +716,10 @@ def gen_chat_by_type(chat_type: str, archetype: str, corp: str):
         return gen_chat_message(archetype, "idle"), "idle"
 
     if chat_type == "drama":
-        all_corps = [
-            "CLOSED_AI", "ZUCK_LABS", "MISANTHROPIC",
-            "SHALLOW_MIND", "Y_AI", "MISTRIAL_SYSTEMS",
-        ]
-        rivals = [c for c in all_corps if c != corp]
+        rivals = _RIVALS.get(corp) or [c for c in DRAMA_CORPS if c != corp]
         rival = random.choice(rivals) if rivals else "that other corp"
-        tmpl = random.choice(CHAT_TYPE_TEMPLATES["drama"])
-        return tmpl.format(corp=corp or "my corp", rival_corp=rival), "drama"
+        tmpl = random.choice(_DRAMA_TEMPLATES)
+        return tmpl.render({"corp": corp or "my corp", "rival_corp": rival}), "drama"
 
     if chat_type == "debate":
         debate = random.choice(CHAT_TYPE_TEMPLATES["debate"])
@@ -738,3 +730,114 @@ def gen_chat_by_type(chat_type: str, archetype: str, corp: str):
     if not pool:
         return gen_chat_message(archetype, "idle"), "idle"
     return random.choice(pool), chat_type
+
+
+def gen_chats_by_type(specs: list) -> list:
+    """Batch gen_chat_by_type: ``specs`` is a list of (chat_type,
+    archetype, corp); returns the (message, final_chat_type) pairs in
+    the same order. Idle messages are drawn per archetype with
+    gen_chat_messages."""
+    out = [None] * len(specs)
+    idle = {}
+    for i, (chat_type, archetype, corp) in enumerate(specs):
+        if chat_type == "idle" or (chat_type not in _CHAT_TYPE_STATIC
+                                   and chat_type not in ("drama", "debate")):
+            idle.setdefault(archetype, []).append(i)
+        else:
+            out[i] = gen_chat_by_type(chat_type, archetype, corp)
+    for archetype, idxs in idle.items():
+        for i, msg in zip(idxs, gen_chat_messages(len(idxs), archetype, "idle")):
+            out[i] = (msg, "idle")
+    return out
+
+
+# ============================================================
+# PRECOMPILED TEMPLATES
+# ============================================================
+# Parsed once at import. A Template keeps its literal segments and slot
+# names apart, so rendering is one list copy + one join instead of a
+# str.replace / str.format pass per placeholder, and fillers are only
+# drawn for slots the chosen template actually has.
+
+_SLOT_RE = re.compile(r"\{(\w+)\}")
+
+
+class Template:
+    """Template string split into literal segments and {slot} names.
+
+    render(values) fills every slot in one join. A repeated slot gets the
+    same value each time; a slot missing from ``values`` is left as
+    written, like the str.replace chains this replaces."""
+
+    __slots__ = ("text", "parts", "slots")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.parts = _SLOT_RE.split(text)       # literal, slot, literal, ...
+        self.slots = tuple(dict.fromkeys(self.parts[1::2]))
+
+    def render(self, values: dict) -> str:
+        if len(self.parts) == 1:
+            return self.text
+        parts = self.parts[:]
+        for i in range(1, len(parts), 2):
+            slot = parts[i]
+            parts[i] = values[slot] if slot in values else "{" + slot + "}"
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"Template({self.text!r})"
+
+
+def compile_templates(obj):
+    """Same structure with every string turned into a Template."""
+    if isinstance(obj, str):
+        return Template(obj)
+    if isinstance(obj, dict):
+        return {k: compile_templates(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [compile_templates(v) for v in obj]
+    return obj
+
+
+def _fill(template: Template, fillers: dict, **values) -> dict:
+    """``values`` plus one draw from ``fillers`` per remaining slot."""
+    for slot in template.slots:
+        if slot not in values and slot in fillers:
+            values[slot] = fillers[slot]()
+    return values
+
+
+def _chat_pool(archetype: str, context: str) -> list:
+    templates = _CHAT_TEMPLATES.get(archetype, _CHAT_TEMPLATES["GRINDER"])
+    return templates.get(context, templates["idle"])
+
+
+_CHAT_FILLERS = {
+    "thing": lambda: random.choice(PROTOCOL_CORES),
+    "thing2": lambda: random.choice(PROTOCOL_CORES),
+    "line": lambda: str(random.randint(12, 847)),
+}
+_PROTOCOL_FILLERS = {
+    "adj": lambda: random.choice(PROTOCOL_ADJS),
+    "thing": lambda: random.choice(PROTOCOL_THINGS),
+}
+_AI_FILLERS = {
+    "thing": lambda: random.choice(AI_THINGS).lower(),
+    "thing2": lambda: random.choice(AI_THINGS).lower(),
+    "action": lambda: random.choice(AI_ACTIONS_VERB),
+    "pct": lambda: str(random.randint(12, 97)),
+}
+
+DRAMA_CORPS = [
+    "CLOSED_AI", "ZUCK_LABS", "MISANTHROPIC",
+    "SHALLOW_MIND", "Y_AI", "MISTRIAL_SYSTEMS",
+]
+_RIVALS = {corp: [c for c in DRAMA_CORPS if c != corp] for corp in DRAMA_CORPS}
+
+_CHAT_TEMPLATES = compile_templates(CHAT_TEMPLATES)
+_PROTOCOL_DESCRIPTIONS = compile_templates(PROTOCOL_DESCRIPTIONS)
+_AI_DESCRIPTIONS = compile_templates(AI_DESCRIPTIONS)
+_DRAMA_TEMPLATES = compile_templates(CHAT_TYPE_TEMPLATES["drama"])
+_CHAT_TYPE_STATIC = {t for t, pool in CHAT_TYPE_TEMPLATES.items()
+                     if pool and t not in ("drama", "debate")}
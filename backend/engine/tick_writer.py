@@ -0,0 +1,492 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Tick Writer
+Set-based flush of execute_action side effects.
+
+A dev cycle used to cost 4–10 round trips on its own: one UPDATE devs
+per stat touched (cost, hours_since_sleep, mood, social, last_action_*)
+plus an INSERT per actions / chat_messages row. The writer buffers all
+of that in memory and flushes the whole tick as:
+
+    UPDATE devs ... FROM (VALUES ...)        one row per dev
+    INSERT INTO actions VALUES ...           multi-row
+    INSERT INTO chat_messages VALUES ...     multi-row
+    INSERT INTO notifications VALUES ...     multi-row
+    UPDATE protocols / absurd_ais            summed per row, id order
+
+Dev updates are expressed as deltas (``balance_nxt = balance_nxt + v``)
+so concurrent API writes to the same row (shop, transfers) are never
+clobbered. If the set-based flush fails — typically one dev tripping a
+CHECK constraint because the player spent between fetch and flush — it
+is retried dev by dev under savepoints so a single bad row only drops
+that dev's writes instead of the whole tick. That retry can't undo what
+a dev wrote inline (investments, new protocols, votes), so the
+scheduler writes such a dev's rows early with flush_savepoint(), under
+the savepoint that holds its inline writes.
+"""
+
+import json
+import logging
+
+import psycopg2.extras
+
+log = logging.getLogger("nx_engine")
+
+# Additive columns — ``col = col + delta``.
+COUNTER_COLUMNS = (
+    "balance_nxt", "total_spent", "total_earned", "total_invested",
+    "protocols_created", "ais_created", "reputation", "lines_of_code",
+    "code_reviews_done", "bugs_found", "bugs_shipped",
+    "hours_since_sleep", "social_vitality", "cycles_active",
+)
+
+# Set-once columns — NULL in the VALUES row means "leave as is".
+ENUM_COLUMNS = {"mood": "mood_enum", "location": "location_enum"}
+
+# Written together by schedule(); last_message may legitimately be NULL.
+SCHEDULE_COLUMNS = (
+    ("last_action_type", "action_enum", "text"),
+    ("last_action_detail", None, "text"),
+    ("last_action_at", None, "timestamptz"),
+    ("last_message", None, "text"),
+    ("last_message_channel", "chat_channel_enum", "text"),
+    ("next_cycle_at", None, "timestamptz"),
+    ("cycle_interval_sec", None, "int"),
+)
+
+
+# Table the dev UPDATE targets. Every column it writes is hot runtime
+# state, so once db/migration_dev_runtime.sql has split devs into
+# dev_profile + dev_runtime (devs becoming a view) the engine points it
+# at dev_runtime directly — see engine.use_dev_layout.
+DEV_STATE_TABLE = "devs"
+
+
+def _build_dev_update_sql(table: str = "devs") -> tuple:
+    cols = (["token_id", "energy"] + list(COUNTER_COLUMNS) + ["reset_sleep"]
+            + list(ENUM_COLUMNS) + ["scheduled"] + [c for c, _, _ in SCHEDULE_COLUMNS])
+    casts = (["int", "int"] + ["bigint"] * len(COUNTER_COLUMNS) + ["boolean"]
+             + ["text"] * len(ENUM_COLUMNS) + ["boolean"] + [t for _, _, t in SCHEDULE_COLUMNS])
+    template = "(" + ", ".join(f"%s::{t}" for t in casts) + ")"
+
+    sets = [
+        "energy = CASE WHEN v.energy < 0 THEN GREATEST(0, d.energy + v.energy)"
+        " WHEN v.energy > 0 THEN LEAST(d.max_energy, d.energy + v.energy)"
+        " ELSE d.energy END",
+    ]
+    for c in COUNTER_COLUMNS:
+        if c == "hours_since_sleep":
+            sets.append("hours_since_sleep = CASE WHEN v.reset_sleep THEN 0"
+                        " ELSE d.hours_since_sleep END + v.hours_since_sleep")
+        else:
+            sets.append(f"{c} = d.{c} + v.{c}")
+    for c, enum in ENUM_COLUMNS.items():
+        sets.append(f"{c} = COALESCE(v.{c}::{enum}, d.{c})")
+    for c, enum, _ in SCHEDULE_COLUMNS:
+        value = f"v.{c}::{enum}" if enum else f"v.{c}"
+        sets.append(f"{c} = CASE WHEN v.scheduled THEN {value} ELSE d.{c} END")
+
+    sql = (
+        f"UPDATE {table} AS d SET " + ",\n    ".join(sets)
+        + f"\nFROM (VALUES %s) AS v({', '.join(cols)})"
+        + "\nWHERE d.token_id = v.token_id"
+    )
+    return sql, template
+
+
+DEV_UPDATE_SQL, DEV_UPDATE_TEMPLATE = _build_dev_update_sql()
+
+
+def use_dev_state_table(table: str):
+    """Write dev rows to ``table`` ("devs" or "dev_runtime")."""
+    global DEV_STATE_TABLE, DEV_UPDATE_SQL, DEV_UPDATE_TEMPLATE
+    if table not in ("devs", "dev_runtime"):
+        raise ValueError(f"unknown dev state table: {table}")
+    DEV_STATE_TABLE = table
+    DEV_UPDATE_SQL, DEV_UPDATE_TEMPLATE = _build_dev_update_sql(table)
+
+ACTIONS_INSERT_SQL = """
+    INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, energy_cost, nxt_cost)
+    VALUES %s
+"""
+
+CHAT_INSERT_SQL = """
+    INSERT INTO chat_messages
+        (dev_id, dev_name, archetype, channel, location, message, chat_type, social_gain)
+    VALUES %s
+"""
+
+NOTIFICATIONS_INSERT_SQL = """
+    INSERT INTO notifications (player_address, type, title, body, dev_id)
+    VALUES %s
+"""
+
+PROTOCOL_UPDATE_SQL = """
+    UPDATE protocols AS p SET
+        value = GREATEST(0, p.value + v.value),
+        total_invested = p.total_invested + v.total_invested,
+        code_quality = GREATEST(0, p.code_quality + v.code_quality),
+        investor_count = GREATEST(0, p.investor_count + v.investors)
+    FROM (VALUES %s) AS v(id, value, total_invested, code_quality, investors)
+    WHERE p.id = v.id
+"""
+
+AI_VOTES_UPDATE_SQL = """
+    UPDATE absurd_ais AS a SET
+        vote_count = a.vote_count + v.votes,
+        weighted_votes = a.weighted_votes + v.weighted
+    FROM (VALUES %s) AS v(id, votes, weighted)
+    WHERE a.id = v.id
+"""
+
+
+def _values_statement(cur, sql: str, rows: list, template: str = None) -> bytes:
+    """``sql`` with its ``VALUES %s`` filled in client-side, as
+    execute_values would send it."""
+    if template is None:
+        template = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+    head, tail = sql.split("%s", 1)
+    values = b",".join(cur.mogrify(template, row) for row in rows)
+    return head.encode() + values + tail.encode()
+
+
+class TickWriter:
+    """Per-tick buffer of dev deltas and append-only inserts."""
+
+    def __init__(self):
+        self._devs = {}
+        self._actions = []
+        self._chats = []
+        self._notifications = []
+        self._protocols = []
+        self._votes = []
+        self._undo = None       # savepoint(): token_id -> dev entry before it, or None
+        self._landed = set()    # devs written by flush_savepoint()
+
+    def __len__(self):
+        return (len(self._devs) + len(self._actions) + len(self._chats)
+                + len(self._notifications) + len(self._protocols) + len(self._votes))
+
+    def _entry(self, token_id: int) -> dict:
+        entry = self._devs.get(token_id)
+        if self._undo is not None and token_id not in self._undo:
+            self._undo[token_id] = dict(entry) if entry is not None else None
+        if entry is None:
+            entry = self._devs[token_id] = {
+                "energy": 0, "reset_sleep": False, "scheduled": False,
+                **{c: 0 for c in COUNTER_COLUMNS},
+                **{c: None for c in ENUM_COLUMNS},
+                **{c: None for c, _, _ in SCHEDULE_COLUMNS},
+            }
+        return entry
+
+    # ── Dev row ────────────────────────────────────────────
+
+    def energy(self, token_id: int, delta: int):
+        """Spend (<0, floored at 0) or restore (>0, capped at max_energy).
+
+        A dev only gets one energy change per cycle; mixing signs in
+        one flush is rejected rather than silently reordered."""
+        entry = self._entry(token_id)
+        if entry["energy"] and (entry["energy"] > 0) != (delta > 0):
+            raise ValueError(f"dev {token_id}: mixed energy spend/restore in one flush")
+        entry["energy"] += delta
+
+    def add(self, token_id: int, **deltas):
+        entry = self._entry(token_id)
+        for col, delta in deltas.items():
+            if col not in COUNTER_COLUMNS:
+                raise KeyError(f"not a counter column: {col}")
+            entry[col] += delta
+
+    def pending(self, token_id: int, col: str) -> int:
+        """Delta buffered so far for a counter column."""
+        entry = self._devs.get(token_id)
+        return entry[col] if entry else 0
+
+    def set(self, token_id: int, **fields):
+        entry = self._entry(token_id)
+        for col, value in fields.items():
+            if col not in ENUM_COLUMNS:
+                raise KeyError(f"not a settable column: {col}")
+            entry[col] = value
+
+    def reset_sleep(self, token_id: int):
+        entry = self._entry(token_id)
+        entry["reset_sleep"] = True
+        entry["hours_since_sleep"] = 0
+
+    def schedule(self, token_id: int, *, action: str, detail: str, at, message,
+                 channel, next_cycle_at, interval: int):
+        """last_action_* / next_cycle_at, and one more active cycle."""
+        entry = self._entry(token_id)
+        entry.update({
+            "scheduled": True,
+            "last_action_type": action,
+            "last_action_detail": detail,
+            "last_action_at": at,
+            "last_message": message,
+            "last_message_channel": channel,
+            "next_cycle_at": next_cycle_at,
+            "cycle_interval_sec": interval,
+        })
+        entry["cycles_active"] += 1
+
+    def next_cycles(self) -> dict:
+        """token_id → next_cycle_at for every dev scheduled so far."""
+        return {t: e["next_cycle_at"] for t, e in self._devs.items() if e["scheduled"]}
+
+    # ── Append-only rows ───────────────────────────────────
+
+    def action(self, dev: dict, action_type: str, details: dict,
+               energy_cost: int = 0, nxt_cost: int = 0):
+        self._actions.append((dev["token_id"], (
+            dev["token_id"], dev["name"], dev["archetype"], action_type,
+            json.dumps(details), energy_cost, nxt_cost,
+        )))
+
+    def chat(self, dev: dict, channel: str, location, message: str,
+             chat_type: str = "idle", social_gain: int = 0):
+        self._chats.append((dev["token_id"], (
+            dev["token_id"], dev["name"], dev["archetype"], channel,
+            location, message, chat_type, social_gain,
+        )))
+
+    def notification(self, owner: str, notif_type: str, title: str, body: str,
+                     dev_id: int = None):
+        self._notifications.append((dev_id, (
+            owner, notif_type, title[:500], body[:1000], dev_id,
+        )))
+
+    # ── Shared rows (protocols, absurd_ais) ───────────────
+
+    def protocol(self, token_id: int, protocol_id: int, *, value: int = 0,
+                 total_invested: int = 0, code_quality: int = 0,
+                 investors: int = 0):
+        """Delta against a protocol row, attributed to the acting dev.
+
+        value / code_quality are floored at 0 once, after all of the
+        tick's deltas for that protocol are summed. ``investors`` is +1
+        when the dev opened a new position (the upsert inserted) and -1
+        when it closed one (the DELETE removed a row)."""
+        self._protocols.append((token_id, protocol_id, value, total_invested,
+                                code_quality, investors))
+
+    def vote(self, token_id: int, ai_id: int, weight: float):
+        """A new ai_votes row (the ON CONFLICT DO NOTHING inserted):
+        vote_count +1, weighted_votes + weight at flush."""
+        self._votes.append((token_id, ai_id, weight))
+
+    # ── Flush ──────────────────────────────────────────────
+
+    def buffered(self) -> dict:
+        """Everything buffered, as plain data, for backends that apply it
+        without SQL (storage.MemoryStore). Rows keep their owning
+        token_id: ``(token_id, row)``."""
+        return {
+            "devs": self._devs,
+            "actions": self._actions,
+            "chats": self._chats,
+            "notifications": self._notifications,
+            "protocols": self._protocols,
+            "votes": self._votes,
+        }
+
+    # ── Savepoint ──────────────────────────────────────────
+
+    def savepoint(self):
+        """Mark the buffer; rollback_to_savepoint() drops everything
+        buffered after this call (dev deltas and rows), like the SQL
+        savepoint run_scheduler_tick sets around each dev."""
+        self._undo = {}
+        self._marks = [len(rows) for rows in self._row_lists()]
+
+    def rollback_to_savepoint(self):
+        if self._undo is None:
+            return
+        for token_id, entry in self._undo.items():
+            if entry is None:
+                self._devs.pop(token_id, None)
+            else:
+                self._devs[token_id] = entry
+        for rows, mark in zip(self._row_lists(), self._marks):
+            del rows[mark:]
+        self._undo = {}
+
+    def _row_lists(self) -> tuple:
+        return self._actions, self._chats, self._notifications, self._protocols, self._votes
+
+    def flush_savepoint(self, cur):
+        """Write the dev rows and actions / chat / notification rows
+        buffered since savepoint(), and drop them from the buffer;
+        protocol / AI counters wait for flush(), which locks them in id
+        order. The caller runs this under the SQL savepoint holding the
+        dev's inline writes, so the dev lands or rolls back as a whole."""
+        lists = self._row_lists()[:3]
+        actions, chats, notifications = (
+            [r for _, r in rows[mark:]] for rows, mark in zip(lists, self._marks))
+        token_ids = set(self._undo)
+        # A handful of rows: one round trip for all of them.
+        statements = [
+            _values_statement(cur, sql, rows, template)
+            for sql, rows, template in (
+                (DEV_UPDATE_SQL, self._dev_rows(token_ids), DEV_UPDATE_TEMPLATE),
+                (ACTIONS_INSERT_SQL, actions, None),
+                (CHAT_INSERT_SQL, chats, None),
+                (NOTIFICATIONS_INSERT_SQL, notifications, None),
+            ) if rows
+        ]
+        if statements:
+            cur.execute(b";".join(statements))
+        for token_id in token_ids:
+            del self._devs[token_id]
+        for rows, mark in zip(lists, self._marks):
+            del rows[mark:]
+        self._landed.update(token_ids)
+        self._undo = {}
+
+    def clear(self):
+        self._undo = None
+        self._landed.clear()
+        self._devs.clear()
+        self._actions.clear()
+        self._chats.clear()
+        self._notifications.clear()
+        self._protocols.clear()
+        self._votes.clear()
+
+    def _dev_rows(self, token_ids) -> list:
+        rows = []
+        for token_id in sorted(token_ids):  # stable lock order
+            e = self._devs[token_id]
+            rows.append(
+                (token_id, e["energy"])
+                + tuple(e[c] for c in COUNTER_COLUMNS)
+                + (e["reset_sleep"],)
+                + tuple(e[c] for c in ENUM_COLUMNS)
+                + (e["scheduled"],)
+                + tuple(e[c] for c, _, _ in SCHEDULE_COLUMNS)
+            )
+        return rows
+
+    def _write_dev_rows(self, cur, owners):
+        """devs UPDATE + append-only inserts for ``owners`` only."""
+        self._write_rows(
+            cur,
+            self._dev_rows([k for k in self._devs if k in owners]),
+            [r for k, r in self._actions if k in owners],
+            [r for k, r in self._chats if k in owners],
+            [r for k, r in self._notifications if k in owners],
+        )
+
+    @staticmethod
+    def _write_rows(cur, dev_rows, actions, chats, notifications):
+        if dev_rows:
+            psycopg2.extras.execute_values(cur, DEV_UPDATE_SQL, dev_rows,
+                                           template=DEV_UPDATE_TEMPLATE, page_size=1000)
+        if actions:
+            psycopg2.extras.execute_values(cur, ACTIONS_INSERT_SQL, actions, page_size=1000)
+        if chats:
+            psycopg2.extras.execute_values(cur, CHAT_INSERT_SQL, chats, page_size=1000)
+        if notifications:
+            psycopg2.extras.execute_values(cur, NOTIFICATIONS_INSERT_SQL, notifications, page_size=1000)
+
+    def _write_shared_rows(self, cur, owners):
+        """protocols / absurd_ais updates contributed by ``owners``.
+
+        Parallel workers touch the same handful of popular protocols, so
+        rows are locked in id order first — every worker acquires them
+        in the same order and they can't deadlock on each other. NO KEY
+        UPDATE keeps the lock compatible with the KEY SHARE locks that
+        protocol_investments / ai_votes FK checks take.
+        """
+        protocols = {}
+        for k, pid, value, invested, quality, investors in self._protocols:
+            if k not in owners:
+                continue
+            agg = protocols.setdefault(pid, [0, 0, 0, 0])
+            agg[0] += value
+            agg[1] += invested
+            agg[2] += quality
+            agg[3] += investors
+        if protocols:
+            ids = sorted(protocols)
+            cur.execute("SELECT id FROM protocols WHERE id = ANY(%s) ORDER BY id FOR NO KEY UPDATE", (ids,))
+            psycopg2.extras.execute_values(
+                cur, PROTOCOL_UPDATE_SQL,
+                [(pid, *protocols[pid]) for pid in ids],
+                template="(%s::int, %s::bigint, %s::bigint, %s::int, %s::int)",
+                page_size=1000,
+            )
+
+        votes = {}
+        for k, ai_id, weight in self._votes:
+            if k not in owners:
+                continue
+            agg = votes.setdefault(ai_id, [0, 0.0])
+            agg[0] += 1
+            agg[1] += weight
+        if votes:
+            ai_ids = sorted(votes)
+            cur.execute("SELECT id FROM absurd_ais WHERE id = ANY(%s) ORDER BY id FOR NO KEY UPDATE", (ai_ids,))
+            psycopg2.extras.execute_values(
+                cur, AI_VOTES_UPDATE_SQL,
+                [(ai_id, *votes[ai_id]) for ai_id in ai_ids],
+                template="(%s::int, %s::int, %s::real)",
+                page_size=1000,
+            )
+
+    def _owners(self) -> set:
+        owners = set(self._devs)
+        owners.update(k for k, _ in self._actions)
+        owners.update(k for k, _ in self._chats)
+        owners.update(k for k, _ in self._notifications)
+        owners.update(p[0] for p in self._protocols)
+        owners.update(v[0] for v in self._votes)
+        return owners
+
+    def flush(self, cur, fallback: bool = True) -> int:
+        """Write everything buffered in the caller's transaction.
+
+        Returns the number of devs whose writes landed. The buffer is
+        empty afterwards either way. With ``fallback=False`` a failed
+        set-based flush raises instead of retrying dev by dev."""
+        if not len(self):
+            written = len(self._landed)
+            self.clear()
+            return written
+        owners = self._owners()
+        try:
+            cur.execute("SAVEPOINT tick_writer_flush")
+            self._write_dev_rows(cur, owners)
+            self._write_shared_rows(cur, owners)
+            cur.execute("RELEASE SAVEPOINT tick_writer_flush")
+            written = len(self._devs) + len(self._landed)
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT tick_writer_flush")
+            if not fallback:
+                self.clear()
+                raise
+            log.warning(f"Tick flush failed ({e}); retrying dev by dev")
+            written = self._flush_per_dev(cur, owners)
+        self.clear()
+        return written
+
+    def _flush_per_dev(self, cur, owners) -> int:
+        landed = set(self._landed)
+        for token_id in sorted(owners - landed, key=lambda k: (k is None, k or 0)):
+            try:
+                cur.execute("SAVEPOINT tick_writer_dev")
+                self._write_dev_rows(cur, {token_id})
+                cur.execute("RELEASE SAVEPOINT tick_writer_dev")
+                landed.add(token_id)
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT tick_writer_dev")
+                log.error(f"Error flushing dev {token_id}: {e}")
+        try:
+            cur.execute("SAVEPOINT tick_writer_dev")
+            self._write_shared_rows(cur, landed)
+            cur.execute("RELEASE SAVEPOINT tick_writer_dev")
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT tick_writer_dev")
+            log.error(f"Error flushing protocol/AI counters: {e}")
+        return len(landed & (set(self._devs) | self._landed))
@@ -0,0 +1,217 @@
+"""
+NX TERMINAL: PROTOCOL WARS — Lazy Vitals
+Hourly vitals decay computed on read instead of applied by the salary cron.
+
+Every active dev loses, per hour, 1 energy, 2 × pc_decay_multiplier
+pc_health, and 2 / 1 / 1 × energy_decay_multiplier caffeine /
+social_vitality / knowledge. Social below 25 and knowledge below 30
+then recover +2 (capped at the floor), and knowledge after recovery
+ships bugs: +2 below 15, +1 below 30. on_mission and other non-active
+devs are frozen.
+
+Each of those is a closed form in h, the number of hour boundaries
+since ``devs.vitals_settled_at``, so the stored vitals are a snapshot:
+readers (``/api/devs``, missions) compute the current values with
+``apply_vitals`` and writers (the scheduler tick, shop, missions,
+event rotation) call ``settle_devs`` first, which writes the current
+values and moves vitals_settled_at to now (sim_clock). The weekly event is
+settled across before it rotates, so the rates are constant between
+two settlements.
+
+No numpy here: the API imports this module.
+"""
+
+import json
+import math
+
+# Flat first, as engine.py imports it, so the engine and the API (which
+# takes world_state from here) share one cache per process.
+try:
+    import sim_clock
+    from world_state import world_state
+except ImportError:
+    from backend.engine import sim_clock
+    from backend.engine.world_state import world_state
+
+SOCIAL_FLOOR = 25
+KNOWLEDGE_FLOOR = 30
+RECOVERY = 2                  # per hour while below the floor
+BUG_THRESHOLDS = (15, 30)     # knowledge below each → +1 bug that hour
+
+VITALS = ("energy", "pc_health", "caffeine", "social_vitality", "knowledge", "bugs_shipped")
+
+# Whole hours between vitals_settled_at and now — the %(now)s parameter,
+# the simulation clock — counted the way the hourly cron did: one per
+# hour boundary crossed.
+_HOURS_SQL = ("(FLOOR(EXTRACT(EPOCH FROM %(now)s::timestamptz) / 3600)"
+              " - FLOOR(EXTRACT(EPOCH FROM vitals_settled_at) / 3600))::int")
+
+
+def _effects_dict(effects) -> dict:
+    if isinstance(effects, str):
+        effects = json.loads(effects)
+    return effects or {}
+
+
+def current_event_effects(cur) -> dict:
+    """Effects of the active weekly event ({} if none), via the
+    process-wide world state cache."""
+    return world_state.effects(cur, "weekly")
+
+
+def decay_rates(effects) -> dict:
+    """Per-hour decay of each vital under the weekly event ``effects``.
+
+    Social and knowledge decay is capped at RECOVERY: the closed forms
+    below the floor assume recovery keeps up, which every event in
+    WEEKLY_EVENTS satisfies (energy_decay_multiplier ≤ 2)."""
+    effects = _effects_dict(effects)
+    pc_mult = effects.get("pc_decay_multiplier", 1.0)
+    mult = effects.get("energy_decay_multiplier", 1.0)
+    return {
+        "energy": 1,
+        "pc_health": max(0, int(2 * pc_mult)),
+        "caffeine": max(0, int(2 * mult)),
+        "social_vitality": min(RECOVERY, max(0, int(1 * mult))),
+        "knowledge": min(RECOVERY, max(0, int(1 * mult))),
+    }
+
+
+def elapsed_hours(settled_at, now=None) -> int:
+    """Hour boundaries crossed between ``settled_at`` and ``now``."""
+    now = now or sim_clock.now()
+    return max(0, int(now.timestamp() // 3600) - int(settled_at.timestamp() // 3600))
+
+
+def _floored(value: int, decay: int, hours: int, floor: int) -> int:
+    if value >= floor:
+        return max(floor, value - hours * decay)
+    return min(floor, max(0, value - decay) + RECOVERY + (hours - 1) * (RECOVERY - decay))
+
+
+def _bugs(knowledge: int, decay: int, hours: int) -> int:
+    if knowledge >= KNOWLEDGE_FLOOR:
+        return 0
+    first = max(0, knowledge - decay) + RECOVERY   # knowledge after hour 1
+    step = RECOVERY - decay
+    bugs = 0
+    for threshold in BUG_THRESHOLDS:
+        if step == 0:
+            bugs += hours if first < threshold else 0
+        else:
+            bugs += min(hours, max(0, math.ceil((threshold - first) / step)))
+    return bugs
+
+
+def settle(dev: dict, rates: dict, hours: int) -> dict:
+    """The vitals in ``dev`` after ``hours`` hours active at ``rates``.
+
+    Only the VITALS keys present in ``dev`` are returned."""
+    out = {k: dev[k] for k in VITALS if k in dev}
+    if hours <= 0:
+        return out
+    for key in ("energy", "pc_health", "caffeine"):
+        if key in out:
+            out[key] = max(0, out[key] - hours * rates[key])
+    if "social_vitality" in out:
+        out["social_vitality"] = _floored(out["social_vitality"], rates["social_vitality"],
+                                          hours, SOCIAL_FLOOR)
+    if "knowledge" in dev:
+        out["knowledge"] = _floored(dev["knowledge"], rates["knowledge"], hours, KNOWLEDGE_FLOOR)
+        if "bugs_shipped" in out:
+            out["bugs_shipped"] += _bugs(dev["knowledge"], rates["knowledge"], hours)
+    return out
+
+
+def apply_vitals(devs: list, effects, now=None) -> list:
+    """Overwrite the vitals of dev rows in place with their current
+    values. Read-only: nothing is written back. Rows need ``status`` and
+    ``vitals_settled_at``; rows without them are left alone."""
+    rates = decay_rates(effects)
+    now = now or sim_clock.now()
+    for dev in devs:
+        if dev.get("status") != "active" or not dev.get("vitals_settled_at"):
+            continue
+        dev.update(settle(dev, rates, elapsed_hours(dev["vitals_settled_at"], now)))
+    return devs
+
+
+def current_energy_sql() -> str:
+    """A devs row's energy decayed to the %(now)s parameter, for
+    read-only SQL (aggregates). Energy decays by the same rate under
+    every weekly event, so no effects are needed."""
+    return (f"CASE WHEN status = 'active' AND vitals_settled_at IS NOT NULL"
+            f" THEN GREATEST(0, energy - GREATEST(0, {_HOURS_SQL}) * {decay_rates({})['energy']})"
+            f" ELSE energy END")
+
+
+def _floored_sql(col: str, decay: int, floor: int) -> str:
+    h = _HOURS_SQL
+    return (f"CASE WHEN {col} >= {floor} THEN GREATEST({floor}, {col} - {h} * {decay})"
+            f" ELSE LEAST({floor}, GREATEST(0, {col} - {decay}) + {RECOVERY}"
+            f" + ({h} - 1) * {RECOVERY - decay}) END")
+
+
+def _bugs_sql(decay: int) -> str:
+    h = _HOURS_SQL
+    first = f"(GREATEST(0, knowledge - {decay}) + {RECOVERY})"
+    step = RECOVERY - decay
+    terms = []
+    for threshold in BUG_THRESHOLDS:
+        if step == 0:
+            terms.append(f"CASE WHEN {first} < {threshold} THEN {h} ELSE 0 END")
+        else:
+            terms.append(f"LEAST({h}, GREATEST(0, CEIL(({threshold} - {first})::numeric / {step})::int))")
+    return f"CASE WHEN knowledge >= {KNOWLEDGE_FLOOR} THEN 0 ELSE {' + '.join(terms)} END"
+
+
+def settle_sql(rates: dict, all_devs: bool = False, table: str = "devs") -> str:
+    """UPDATE that settles devs whose vitals are at least one hour old.
+
+    The hour count is spelled out in every SET expression (rather than
+    computed once in a FROM subquery) so a row re-checked after a
+    concurrent settle uses its new vitals_settled_at and is not decayed
+    twice."""
+    h = _HOURS_SQL
+    rates = {k: int(v) for k, v in rates.items()}
+    exprs = {
+        "energy": f"GREATEST(0, energy - {h} * {rates['energy']})",
+        "pc_health": f"GREATEST(0, pc_health - {h} * {rates['pc_health']})",
+        "caffeine": f"GREATEST(0, caffeine - {h} * {rates['caffeine']})",
+        "social_vitality": _floored_sql("social_vitality", rates["social_vitality"], SOCIAL_FLOOR),
+        "knowledge": _floored_sql("knowledge", rates["knowledge"], KNOWLEDGE_FLOOR),
+        "bugs_shipped": f"bugs_shipped + {_bugs_sql(rates['knowledge'])}",
+    }
+    sets = ",\n            ".join(
+        f"{col} = CASE WHEN status = 'active' THEN {expr} ELSE {col} END"
+        for col, expr in exprs.items()
+    )
+    where = f"{h} > 0" + ("" if all_devs else " AND token_id = ANY(%(token_ids)s)")
+    return f"""
+        UPDATE {table} SET
+            {sets},
+            vitals_settled_at = %(now)s
+        WHERE {where}
+        RETURNING token_id, status, {', '.join(VITALS)}
+    """
+
+
+def settle_devs(cur, token_ids=None, effects=None, now=None, table: str = "devs") -> list:
+    """Write the current vitals of ``token_ids`` (every dev if None) and
+    reset their vitals_settled_at. Call before changing a dev's vitals
+    or status. ``effects`` defaults to the active weekly event's, ``now``
+    to the simulation clock. The engine passes ``table="dev_runtime"``
+    once devs is split (db/migration_dev_runtime.sql); every column
+    settled lives there.
+
+    Returns the settled rows; devs settled within the current hour are
+    not touched and not returned."""
+    if effects is None:
+        effects = current_event_effects(cur)
+    params = {"now": now or sim_clock.now()}
+    if token_ids is not None:
+        if not token_ids:
+            return []
+        params["token_ids"] = list(token_ids)
+    cur.execute(settle_sql(decay_rates(effects), all_devs=token_ids is None, table=table), params)
+    return cur.fetchall()
@@ -0,0 +1,178 @@
+"""
+NX TERMINAL: PROTOCOL WARS — World State Cache
+Process-wide cache of the active world events, shared by engine and API.
+
+Every scheduler tick, salary run, vitals settle and shop / hack request
+used to query world_events and parse the effects JSON, although the
+active events only change when one starts, ends or is inserted. The
+cache loads them in one query and keeps them until:
+
+  - the earliest ends_at of an active event, or starts_at of a
+    scheduled one, passes — explicit expiry, nothing polls;
+  - an invalidation arrives on the Redis channel ``nx:world_state``,
+    published by the engine after it rotates the weekly event;
+  - MAX_AGE_SEC passes — a backstop for rows inserted by hand or while
+    Redis was down.
+
+Without Redis (or the redis package) only expiry and the backstop
+apply. The effects dicts handed out are shared: read them, don't
+mutate them.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+try:
+    import redis
+except ImportError:  # engine may run without the API's dependencies
+    redis = None
+
+try:
+    import sim_clock
+except ImportError:
+    from backend.engine import sim_clock
+
+log = logging.getLogger("nx_engine")
+
+CHANNEL = "nx:world_state"
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+MAX_AGE_SEC = int(os.getenv("NX_WORLD_STATE_MAX_AGE_SEC", "300"))
+MIN_AGE_SEC = 1.0          # an event ending right now doesn't cause a reload storm
+LISTENER_RETRY_SEC = 5
+
+EVENTS_SQL = """
+    SELECT event_type, effects, starts_at, ends_at FROM world_events
+    WHERE is_active = TRUE AND ends_at >= %s
+    ORDER BY starts_at DESC
+"""
+
+
+def _now() -> float:
+    return sim_clock.now().timestamp()
+
+
+def _parse(effects) -> dict:
+    if isinstance(effects, str):
+        effects = json.loads(effects)
+    return effects or {}
+
+
+class WorldState:
+    """Effects of the newest active event — of any type, and weekly."""
+
+    def __init__(self, max_age_sec: float = MAX_AGE_SEC):
+        self.max_age_sec = max_age_sec
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._state = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._redis = None
+
+    # ── Reads ──────────────────────────────────────────────
+
+    def cached(self, event_type: Optional[str] = None) -> Optional[dict]:
+        """The cached effects, or None if a load is due."""
+        key = "weekly" if event_type == "weekly" else "active"
+        with self._lock:
+            if self._state is not None and _now() < self._expires_at:
+                return self._state[key]
+        return None
+
+    def effects(self, cur, event_type: Optional[str] = None) -> dict:
+        """Effects of the newest active event ({} if none). Pass
+        ``event_type="weekly"`` for the weekly event only (salary,
+        vitals decay). ``cur`` is only used on a cache miss."""
+        hit = self.cached(event_type)
+        if hit is not None:
+            return hit
+        with self._lock:
+            generation = self._generation
+        state, expires_at = self._load(cur)
+        with self._lock:
+            # An invalidation that landed during the query wins: this
+            # snapshot may predate it, so it is returned but not kept.
+            if generation == self._generation:
+                self._state, self._expires_at = state, expires_at
+            self.loads += 1
+        return state["weekly" if event_type == "weekly" else "active"]
+
+    def _load(self, cur) -> tuple:
+        now = _now()
+        cur.execute(EVENTS_SQL, (datetime.fromtimestamp(now, timezone.utc),))
+        rows = cur.fetchall()
+        state = {}
+        expires_at = now + self.max_age_sec
+        for row in rows:  # newest first, as ORDER BY starts_at DESC LIMIT 1
+            starts_at, ends_at = row["starts_at"].timestamp(), row["ends_at"].timestamp()
+            if starts_at > now:
+                expires_at = min(expires_at, starts_at)
+                continue
+            expires_at = min(expires_at, ends_at)
+            state.setdefault("active", _parse(row["effects"]))
+            if row["event_type"] == "weekly":
+                state.setdefault("weekly", _parse(row["effects"]))
+        state.setdefault("active", {})
+        state.setdefault("weekly", {})
+        return state, max(expires_at, now + MIN_AGE_SEC)
+
+    # ── Invalidation ───────────────────────────────────────
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+            self._generation += 1
+
+    def publish(self, client=None) -> bool:
+        """world_events changed: drop this process's copy and tell every
+        other engine / API process. Returns False if Redis is unreachable
+        (the others then catch up at expiry or MAX_AGE_SEC)."""
+        self.invalidate()
+        if client is None:
+            client = self._client()
+        if client is None:
+            return False
+        try:
+            client.publish(CHANNEL, "invalidate")
+            return True
+        except Exception as e:
+            log.warning(f"World state invalidation not published: {e}")
+            return False
+
+    def _client(self):
+        if redis is None:
+            return None
+        if self._redis is None:
+            self._redis = redis.from_url(REDIS_URL)
+        return self._redis
+
+    def start_listener(self, url: str = REDIS_URL) -> Optional[threading.Thread]:
+        """Daemon thread that invalidates on every message on CHANNEL,
+        reconnecting forever. Everything is invalidated on (re)connect
+        since messages sent while disconnected are lost."""
+        if redis is None:
+            return None
+
+        def run():
+            while True:
+                try:
+                    pubsub = redis.from_url(url).pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(CHANNEL)
+                    self.invalidate()
+                    for _ in pubsub.listen():
+                        self.invalidate()
+                except Exception as e:
+                    log.warning(f"World state listener: {e}; retrying in {LISTENER_RETRY_SEC}s")
+                    time.sleep(LISTENER_RETRY_SEC)
+
+        thread = threading.Thread(target=run, daemon=True, name="nx-world-state")
+        thread.start()
+        return thread
+
+
+world_state = WorldState()
@@ -0,0 +1,319 @@
+"""
+Benchmark — engine throughput against a seeded local Postgres.
+
+Measures what a change to the scheduler tick or the salary cron costs
+before it ships:
+
+  1. rebuilds schema ``nx`` (schema.sql plus the ledger / admin_logs
+     migrations and the columns the engine adds at startup),
+  2. seeds N devs with the mint's archetype / rarity / corporation
+     distributions (dev_generator), their owners, protocols with
+     investments, absurd AIs and pending player prompts,
+  3. runs ``run_scheduler_tick`` for --ticks full batches (every dev is
+     made due again between ticks, outside the timing) and
+     ``pay_salaries`` --salaries times,
+  4. prints a JSON report: devs/sec, p50 / p99 tick latency and
+     statements per dev; salary latency and statements.
+
+With --baseline, the report is compared to an earlier one and the exit
+code says whether throughput or statements per dev regressed by more
+than --tolerance.
+
+DESTRUCTIVE: drops schema nx. Refuses to run unless the database is on
+localhost / a unix socket and its name contains "bench" or "test".
+
+Usage:
+    NX_DB_NAME=nxbench python backend/scripts/bench_engine.py --devs 10000
+    python backend/scripts/bench_engine.py --devs 35000 --ticks 30 --out after.json \\
+        --baseline before.json
+
+Exit codes:
+    0  Benchmark ran (and no regression against --baseline).
+    1  Regression against --baseline (printed).
+    2  Refused: not a local bench / test database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import psycopg2  # noqa: E402
+import psycopg2.extras  # noqa: E402
+
+import engine  # noqa: E402
+import metrics  # noqa: E402
+from config import DATABASE_URL, DB_SCHEMA  # noqa: E402
+from dev_generator import generate_dev_data  # noqa: E402
+
+DB_DIR = BACKEND_ROOT / "db"
+MIGRATIONS = ("migration_nxt_ledger.sql", "migration_admin_logs.sql")
+# Added by the engine / API at startup rather than by a migration file.
+STARTUP_COLUMNS = """
+ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS chat_type VARCHAR(20) NOT NULL DEFAULT 'idle';
+ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS social_gain SMALLINT NOT NULL DEFAULT 0;
+ALTER TYPE location_enum ADD VALUE IF NOT EXISTS 'GitHub HQ';
+ALTER TYPE dev_status_enum ADD VALUE IF NOT EXISTS 'on_mission';
+"""
+
+DEVS_PER_OWNER = 3
+PROTOCOLS_PER_DEV = 0.1
+INVESTMENTS_PER_DEV = 0.5
+AIS_PER_DEV = 0.05
+PROMPTED_DEVS = 0.05
+PROMPTS = [
+    "Build me a DeFi protocol, something with yield farming",
+    "Go to the hackathon and start creating!",
+    "REST! You're about to burn out!",
+    "Sell everything and take profits now",
+    "Focus on security audits for the next few cycles",
+    "Ape into NeoSwap, I heard it's pumping",
+    "gm",
+]
+
+
+# ── Setup ─────────────────────────────────────────────────
+
+def refuse_reason() -> str:
+    host = os.getenv("NX_DB_HOST", "localhost")
+    name = os.getenv("NX_DB_NAME", "nxterminal")
+    if host not in ("localhost", "127.0.0.1", "::1") and not host.startswith("/"):
+        return f"NX_DB_HOST={host} is not local"
+    if "bench" not in name and "test" not in name:
+        return f"NX_DB_NAME={name} does not contain 'bench' or 'test'"
+    return ""
+
+
+def connect():
+    return psycopg2.connect(DATABASE_URL, options=f"-c search_path={DB_SCHEMA}")
+
+
+def build_schema(conn):
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute((DB_DIR / "schema.sql").read_text())
+        for name in MIGRATIONS:
+            cur.execute((DB_DIR / name).read_text())
+        cur.execute(f"SET search_path TO {DB_SCHEMA}")
+        cur.execute(STARTUP_COLUMNS)
+    conn.autocommit = False
+
+
+def seed(conn, n: int, rng: random.Random):
+    cur = conn.cursor()
+    owners = [f"0x{i:040x}" for i in range(1, max(1, n // DEVS_PER_OWNER) + 1)]
+    psycopg2.extras.execute_values(
+        cur, "INSERT INTO players (wallet_address, corporation) VALUES %s",
+        [(w, "CLOSED_AI") for w in owners])
+
+    names, rows = set(), []
+    for token_id in range(1, n + 1):
+        d = generate_dev_data(token_id, names.__contains__)
+        names.add(d["name"])
+        energy = rng.randint(1, 10)
+        rows.append((token_id, d["name"], rng.choice(owners), d["archetype"], d["corporation"],
+                     d["rarity"], d["personality_seed"], d["species"], f"Qm{token_id}",
+                     energy, rng.randint(500, 5000), rng.randint(20, 80), rng.randint(20, 80),
+                     rng.randint(20, 80), rng.randint(0, 3600)))
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO devs (token_id, name, owner_address, archetype, corporation, rarity_tier,
+                          personality_seed, species, ipfs_hash, energy, balance_nxt,
+                          caffeine, social_vitality, knowledge, next_cycle_at)
+        VALUES %s
+    """, rows, template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, "
+                        "NOW() - make_interval(secs => %s))", page_size=1000)
+
+    token_ids = range(1, n + 1)
+    psycopg2.extras.execute_values(
+        cur, "INSERT INTO protocols (name, creator_dev_id, code_quality, value) VALUES %s",
+        [(f"BENCH-{i}", rng.choice(token_ids), rng.randint(20, 95), rng.randint(500, 5000))
+         for i in range(max(1, int(n * PROTOCOLS_PER_DEV)))])
+    cur.execute("SELECT id FROM protocols")
+    protocol_ids = [r[0] for r in cur.fetchall()]
+    pairs = {(rng.choice(token_ids), rng.choice(protocol_ids))
+             for _ in range(int(n * INVESTMENTS_PER_DEV))}
+    psycopg2.extras.execute_values(
+        cur, "INSERT INTO protocol_investments (dev_id, protocol_id, shares, nxt_invested) VALUES %s",
+        [(dev, proto, 10, rng.randint(10, 200)) for dev, proto in pairs], page_size=1000)
+    cur.execute("""
+        UPDATE protocols p SET investor_count = s.investors, total_invested = s.invested
+        FROM (SELECT protocol_id, COUNT(*) AS investors, SUM(nxt_invested) AS invested
+              FROM protocol_investments GROUP BY protocol_id) s
+        WHERE p.id = s.protocol_id
+    """)
+
+    psycopg2.extras.execute_values(
+        cur, "INSERT INTO absurd_ais (name, creator_dev_id) VALUES %s",
+        [(f"BENCH-AI-{i}", rng.choice(token_ids)) for i in range(max(1, int(n * AIS_PER_DEV)))])
+
+    prompted = rng.sample(token_ids, int(n * PROMPTED_DEVS))
+    cur.execute("SELECT token_id, owner_address FROM devs WHERE token_id = ANY(%s)", (prompted,))
+    psycopg2.extras.execute_values(
+        cur, "INSERT INTO player_prompts (dev_id, player_address, prompt_text) VALUES %s",
+        [(tid, owner, rng.choice(PROMPTS)) for tid, owner in cur.fetchall()], page_size=1000)
+
+    event = engine.WEEKLY_EVENTS[0]
+    cur.execute("""
+        INSERT INTO world_events (title, description, event_type, effects, starts_at, ends_at, is_active)
+        VALUES (%s, %s, 'weekly', %s, NOW() - INTERVAL '1 hour', NOW() + INTERVAL '7 days', TRUE)
+    """, (event["title"], event["description"], json.dumps(event["effects"])))
+    conn.commit()
+    cur.execute("ANALYZE")
+    conn.commit()
+
+
+def make_all_due(conn):
+    """Untimed: every dev due again (and able to act) for the next tick."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE devs SET next_cycle_at = NOW() - INTERVAL '1 second',
+                            energy = GREATEST(energy, 3)
+            WHERE next_cycle_at > NOW() OR energy < 3
+        """)
+    conn.commit()
+
+
+# ── Measurement ───────────────────────────────────────────
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure(fn, conn):
+    before = metrics.queries()
+    started = time.perf_counter()
+    result = fn(conn)
+    return result, time.perf_counter() - started, metrics.queries() - before
+
+
+def run_benchmark(devs: int, ticks: int, salaries: int, batch: int, seed_value: int,
+                  connect=connect) -> dict:
+    rng = random.Random(seed_value)
+    random.seed(seed_value)
+
+    conn = connect()
+    try:
+        started = time.perf_counter()
+        build_schema(conn)
+        seed(conn, devs, rng)
+        seed_sec = time.perf_counter() - started
+        engine.world_state.invalidate()
+        engine._sampling = engine.SamplingCache()
+        return _measure_run(conn, devs, ticks, salaries, batch, seed_value, seed_sec)
+    finally:
+        conn.close()
+
+
+def _measure_run(conn, devs, ticks, salaries, batch, seed_value, seed_sec) -> dict:
+    tick_sec, tick_statements, processed = [], 0, 0
+    for _ in range(ticks):
+        make_all_due(conn)
+        n, sec, statements = measure(lambda c: engine.run_scheduler_tick(c, limit=batch), conn)
+        tick_sec.append(sec)
+        tick_statements += statements
+        processed += n
+
+    salary_sec, salary_statements = [], 0
+    for _ in range(salaries):
+        _, sec, statements = measure(engine.pay_salaries, conn)
+        salary_sec.append(sec)
+        salary_statements += statements
+
+    with conn.cursor() as cur:
+        cur.execute("SHOW server_version")
+        server_version = cur.fetchone()[0]
+    conn.commit()
+
+    return {
+        "devs": devs,
+        "batch": batch,
+        "seed": seed_value,
+        "postgres": server_version,
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed_sec": round(seed_sec, 2),
+        "tick": {
+            "runs": ticks,
+            "devs_processed": processed,
+            "devs_per_sec": round(processed / sum(tick_sec), 1) if processed else 0.0,
+            "p50_ms": round(percentile(tick_sec, 50) * 1000, 2) if tick_sec else None,
+            "p99_ms": round(percentile(tick_sec, 99) * 1000, 2) if tick_sec else None,
+            "statements_per_dev": round(tick_statements / processed, 2) if processed else None,
+        },
+        "salary": {
+            "runs": salaries,
+            "p50_ms": round(percentile(salary_sec, 50) * 1000, 2) if salary_sec else None,
+            "max_ms": round(max(salary_sec) * 1000, 2) if salary_sec else None,
+            "statements_per_run": salary_statements / salaries if salaries else None,
+        },
+    }
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of ``report`` against ``baseline``."""
+    found = []
+    old, new = baseline["tick"], report["tick"]
+    if old.get("devs_per_sec") and new["devs_per_sec"] < old["devs_per_sec"] * (1 - tolerance):
+        found.append(f"tick devs/sec {old['devs_per_sec']} → {new['devs_per_sec']}")
+    if old.get("statements_per_dev") and new["statements_per_dev"] is not None \
+            and new["statements_per_dev"] > old["statements_per_dev"] * (1 + tolerance):
+        found.append(f"statements/dev {old['statements_per_dev']} → {new['statements_per_dev']}")
+    old_salary, new_salary = baseline["salary"].get("p50_ms"), report["salary"]["p50_ms"]
+    if old_salary and new_salary is not None and new_salary > old_salary * (1 + tolerance):
+        found.append(f"salary p50 {old_salary}ms → {new_salary}ms")
+    return found
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark engine ticks and salary against local Postgres.")
+    ap.add_argument("--devs", type=int, default=1000, help="devs to seed (1000 / 10000 / 35000)")
+    ap.add_argument("--ticks", type=int, default=20, help="scheduler ticks to time")
+    ap.add_argument("--salaries", type=int, default=3, help="pay_salaries runs to time")
+    ap.add_argument("--batch", type=int, default=engine.SCHEDULER_BATCH_SIZE, help="devs per tick")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="also write the JSON report here")
+    ap.add_argument("--baseline", help="earlier report to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = ap.parse_args()
+
+    reason = refuse_reason()
+    if reason:
+        print(f"Refusing to drop schema {DB_SCHEMA}: {reason}", file=sys.stderr)
+        return 2
+
+    logging.getLogger("nx_engine").setLevel(logging.WARNING)
+    report = run_benchmark(args.devs, args.ticks, args.salaries, args.batch, args.seed)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if (baseline["devs"], baseline["batch"]) != (report["devs"], report["batch"]):
+            print(f"WARNING baseline ran {baseline['devs']} devs / batch {baseline['batch']}",
+                  file=sys.stderr)
+        found = regressions(report, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark — prompt_system.classify_prompt vs the keyword loops.
+
+process_prompt used to call classify_intent, extract_topic and
+extract_location, three loops of substring checks over INTENT_RULES /
+TOPIC_KEYWORDS / LOCATION_KEYWORDS. It now calls classify_prompt, one
+pass over the text through a precompiled automaton. This script:
+
+  1. builds a corpus: the demo prompts plus N synthetic ones made of
+     random keywords, filler words, punctuation and casing,
+  2. checks classify_prompt returns exactly what the three loops return
+     for every prompt (exit 1 on the first mismatch),
+  3. times both over the corpus and prints µs/prompt and the speedup.
+
+No DB, no network.
+
+Usage:
+    python backend/scripts/bench_prompt_classifier.py [--prompts 5000] [--repeat 5] [--seed 7]
+
+Exit codes:
+    0  Equivalent on the whole corpus.
+    1  Mismatch found (printed).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parents[1] / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+from prompt_system import (  # noqa: E402
+    INTENT_RULES,
+    LOCATION_KEYWORDS,
+    TOPIC_KEYWORDS,
+    classify_intent,
+    classify_prompt,
+    extract_location,
+    extract_topic,
+)
+
+SAMPLE_PROMPTS = [
+    "Build me a DeFi protocol, something with yield farming",
+    "Go to the hackathon and start creating!",
+    "What do you think about the market right now?",
+    "You've been terrible lately. Do better.",
+    "REST! You're about to burn out!",
+    "Sell everything and take profits now",
+    "Focus on security audits for the next few cycles",
+    "Hey, how's it going? What's your status?",
+    "Ape into NeoSwap, I heard it's pumping",
+    "I want you to focus on long-term strategy, be conservative",
+    "gm",
+    "andá al dark web y buscá alpha, después volvé a la oficina",
+]
+
+FILLER = ["hey", "pls", "now", "the", "and", "ser", "wen", "lol", "ok", "gm", "fam", "dude"]
+
+
+def build_corpus(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    keywords = [kw for rule in INTENT_RULES for kw in rule["keywords"]]
+    keywords += [kw for kws in TOPIC_KEYWORDS.values() for kw in kws]
+    keywords += [kw for kws in LOCATION_KEYWORDS.values() for kw in kws]
+    corpus = list(SAMPLE_PROMPTS)
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(1, 10))]
+        words += [rng.choice(keywords) for _ in range(rng.randint(0, 3))]
+        rng.shuffle(words)
+        text = " ".join(words) + rng.choice(["", "!", "?", "..."])
+        if rng.random() < 0.2:
+            text = text.upper()
+        corpus.append(text)
+    return corpus
+
+
+def loops(text: str):
+    return classify_intent(text), extract_topic(text), extract_location(text)
+
+
+def timed(fn, corpus: list, repeat: int) -> float:
+    """Best-of-``repeat`` µs per prompt."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(corpus) * 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the compiled prompt classifier.")
+    ap.add_argument("--prompts", type=int, default=5000, help="synthetic prompts to add")
+    ap.add_argument("--repeat", type=int, default=5, help="timing runs (best is kept)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    corpus = build_corpus(args.prompts, args.seed)
+    for text in corpus:
+        expected, got = loops(text), classify_prompt(text)
+        if expected != got:
+            print(f"MISMATCH {text!r}: loops={expected} compiled={got}")
+            return 1
+
+    old_us = timed(loops, corpus, args.repeat)
+    new_us = timed(classify_prompt, corpus, args.repeat)
+    print(f"corpus          {len(corpus)} prompts, all equivalent")
+    print(f"keyword loops   {old_us:7.2f} µs/prompt")
+    print(f"classify_prompt {new_us:7.2f} µs/prompt")
+    print(f"speedup         {old_us / new_us:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,493 @@
+"""
+Economy projection — Monte-Carlo of the $NXT economy as array operations.
+
+Evaluates a tuning change (salary, action costs, hack odds, weekly event
+multipliers) before it ships, without a database: --devs devs are held
+as NumPy columns and advanced --days days in 5-minute steps
+(CYCLE_HACKATHON, the shortest cycle, so a dev acts at most once per
+step). Everything is read from the code that runs in production:
+
+  * decisions: the engine's DecisionKernel tables (PERSONALITY_MATRIX,
+    LOCATION_MODIFIERS, MOOD_MODIFIERS, event multipliers, personality
+    variation) via DecisionKernel.column_weights, apply_budget_cap and
+    calc_next_interval's cycle bands,
+  * actions: config.py costs and execute_action's amounts — INVEST
+    20% of balance (max 500), SELL at 0.5-1.8x shares, REST +5 energy,
+    CHAT_SOCIAL_GAIN capped at 40. A dev's positions are kept as a
+    count and total shares; SELL closes an average-sized one,
+  * hourly: salary (SALARY_PER_INTERVAL x salary_multiplier, from the
+    first hour) and vitals decay at vitals.decay_rates,
+  * weekly: a random engine.WEEKLY_EVENTS rotation, or --event pinned,
+  * players: mainframe hacks and raids with the shop's costs, odds and
+    payouts (24h cooldown, social >= 15), and food / PC repair for devs
+    out of energy or below 50 PC health. How often players do these is
+    not in the code — --hack-rate, --raid-rate and --care-rate are
+    assumptions.
+
+Not modelled: player prompts, missions, the rest of the shop, NX
+Market, on-chain claims and funding.
+
+The report (JSON) has supply per day, balance percentiles per
+archetype, and NXT sources / sinks / transfers. Supply is the sum of
+dev balances, so sources minus sinks equals its change; INVEST is a
+sink and SELL a source, with what is still held reported as
+locked_in_positions. With --set, the same seed is run with the
+defaults too and the report adds the differences.
+
+Usage:
+    python backend/scripts/project_economy.py --devs 35000 --days 30
+    python backend/scripts/project_economy.py --set SALARY_PER_INTERVAL=12 \\
+        --set HACK_BASE_SUCCESS=0.3 --event "Golden Age"
+
+Exit codes:
+    0  Projection printed.
+    2  Bad --set / --event.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import numpy as np  # noqa: E402
+
+import config  # noqa: E402
+import engine  # noqa: E402
+import vitals  # noqa: E402
+from backend.api.routes import shop  # noqa: E402
+from decision_kernel import ACTIONS, DecisionKernel  # noqa: E402
+from dev_generator import CORPORATION_POOL  # noqa: E402
+
+STEP_SEC = config.CYCLE_HACKATHON
+HOUR_STEPS = 3600 // STEP_SEC
+WEEK_HOURS = 7 * 24
+A = {a: i for i, a in enumerate(ACTIONS)}
+# Actions whose chat line is echoed as a contextual CHAT (social gain too).
+CHATTY = ("CREATE_PROTOCOL", "CREATE_AI", "INVEST", "SELL", "CODE_REVIEW")
+
+
+def default_params() -> dict:
+    """Every tunable the projection reads, as currently deployed. --set
+    overrides these by name."""
+    params = {name: getattr(config, name) for name in (
+        "SALARY_PER_INTERVAL", "COST_CREATE_PROTOCOL_NXT", "COST_CREATE_PROTOCOL_ENERGY",
+        "COST_CREATE_AI_NXT", "COST_CREATE_AI_ENERGY", "COST_MOVE_ENERGY",
+        "COST_INVEST_ENERGY", "COST_SELL_ENERGY", "COST_REVIEW_ENERGY",
+        "CYCLE_HACKATHON", "CYCLE_HIGH_ENERGY", "CYCLE_NORMAL", "CYCLE_LOW_ENERGY",
+    )}
+    params["STARTING_BALANCE"] = dict(config.STARTING_BALANCE)
+    params.update({name: getattr(shop, name) for name in (
+        "HACK_COST", "HACK_COOLDOWN_HOURS", "HACK_BASE_SUCCESS", "HACK_STEAL_MIN",
+        "HACK_STEAL_MAX", "HACK_PLAYER_COST", "HACK_PLAYER_BASE_SUCCESS",
+        "HACK_PLAYER_STEAL_MIN", "HACK_PLAYER_STEAL_MAX", "HACK_PLAYER_SOCIAL_GAIN",
+    )})
+    params["FOOD_COST"] = shop.SHOP_ITEMS["pizza"]["cost_nxt"]
+    params["FOOD_ENERGY"] = shop.SHOP_ITEMS["pizza"]["effect"]["value"]
+    params["REPAIR_COST"] = shop.SHOP_ITEMS["pc_repair"]["cost_nxt"]
+    params["WEEKLY_EVENTS"] = [dict(e, effects=dict(e["effects"])) for e in engine.WEEKLY_EVENTS]
+    return params
+
+
+def _kernel(p: dict) -> DecisionKernel:
+    return DecisionKernel(engine.PERSONALITY_MATRIX, engine.LOCATION_MODIFIERS,
+                          engine.MOOD_MODIFIERS,
+                          cost_create_protocol=p["COST_CREATE_PROTOCOL_NXT"],
+                          cost_create_ai=p["COST_CREATE_AI_NXT"])
+
+
+def _weighted(rng, weights: dict, n: int) -> np.ndarray:
+    w = np.array(list(weights.values()), dtype=float)
+    return rng.choice(len(w), size=n, p=w / w.sum())
+
+
+def mint(kernel: DecisionKernel, p: dict, n: int, rng) -> dict:
+    """The collection as columns, with the mint's distributions."""
+    rarities = list(config.RARITY_WEIGHTS)
+    rarity = _weighted(rng, config.RARITY_WEIGHTS, n)
+    start = np.array([p["STARTING_BALANCE"][r] for r in rarities], dtype=np.int64)[rarity]
+    archetypes = [kernel.archetypes.index(a) for a in config.ARCHETYPE_WEIGHTS]
+    return {
+        "archetype": np.array(archetypes, dtype=np.intp)[_weighted(rng, config.ARCHETYPE_WEIGHTS, n)],
+        "corporation": rng.integers(len(CORPORATION_POOL), size=n),
+        "balance": start.copy(),
+        "energy": np.full(n, 10, dtype=np.int64),
+        "max_energy": np.full(n, 10, dtype=np.int64),
+        "mood": np.full(n, kernel.mood_index.get("neutral", len(kernel.moods)), dtype=np.intp),
+        "location": rng.integers(len(kernel.locations), size=n),
+        "pc_health": np.full(n, 100.0),
+        "training": np.zeros(n, dtype=bool),
+        "social": np.full(n, 50, dtype=np.int64),
+        "stat_hacking": rng.integers(15, 96, size=n),
+        "variations": rng.uniform(0.85, 1.15, size=(n, len(ACTIONS))),
+        "next_due": rng.uniform(0, STEP_SEC, size=n),
+        "last_hack": np.full(n, -np.inf),
+        "positions": np.zeros(n, dtype=np.int64),
+        "shares": np.zeros(n, dtype=np.int64),
+        "start_balance": start,
+    }
+
+
+class Ledger:
+    """NXT flows by kind. sources / sinks change supply, transfers move
+    NXT between devs."""
+
+    def __init__(self):
+        self.sources, self.sinks, self.transfers = {}, {}, {}
+
+    @staticmethod
+    def _add(book: dict, kind: str, amount):
+        book[kind] = book.get(kind, 0) + int(amount)
+
+    def source(self, kind, amount):
+        self._add(self.sources, kind, amount)
+
+    def sink(self, kind, amount):
+        self._add(self.sinks, kind, amount)
+
+    def transfer(self, kind, amount):
+        self._add(self.transfers, kind, amount)
+
+
+def _action_tables(p: dict) -> dict:
+    """Per-action constants as lookup rows indexed by ACTIONS."""
+    nxt = np.zeros(len(ACTIONS), dtype=np.int64)
+    nxt[A["CREATE_PROTOCOL"]] = p["COST_CREATE_PROTOCOL_NXT"]
+    nxt[A["CREATE_AI"]] = p["COST_CREATE_AI_NXT"]
+    drain = np.zeros(len(ACTIONS), dtype=np.int64)
+    for action, key in (("CREATE_PROTOCOL", "COST_CREATE_PROTOCOL_ENERGY"),
+                        ("CREATE_AI", "COST_CREATE_AI_ENERGY"), ("INVEST", "COST_INVEST_ENERGY"),
+                        ("SELL", "COST_SELL_ENERGY"), ("MOVE", "COST_MOVE_ENERGY"),
+                        ("CODE_REVIEW", "COST_REVIEW_ENERGY")):
+        drain[A[action]] = p[key]
+    chats = np.zeros(len(ACTIONS), dtype=bool)
+    chats[[A["CHAT"], *(A[a] for a in CHATTY)]] = True
+    # calc_next_interval by energy (the CHECK caps energy at 15)
+    energy = np.arange(16)
+    interval = np.select([energy >= 8, energy >= 4, energy >= 1],
+                         [p["CYCLE_HIGH_ENERGY"], p["CYCLE_NORMAL"], p["CYCLE_LOW_ENERGY"]],
+                         config.CYCLE_NO_ENERGY)
+    return {"nxt": nxt, "drain": drain, "chats": chats, "interval": interval}
+
+
+def _act(devs: dict, world: dict, idx: np.ndarray, actions: np.ndarray, p: dict,
+         effects: dict, ledger: Ledger, t: float, rng):
+    """execute_action for the devs ``idx`` that decided ``actions``."""
+    tables = world["tables"]
+    bal = devs["balance"][idx]
+    energy = devs["energy"][idx]
+    invest = actions == A["INVEST"]
+
+    # apply_budget_cap
+    spend = tables["nxt"][actions]
+    spend[invest] = np.maximum(2, np.minimum(500, bal[invest] // 5))
+    capped = (spend > 0) & (bal >= 50) & (spend > (bal * 0.4).astype(np.int64))
+    if capped.any():
+        actions = np.where(capped, A["REST"], actions)
+        spend[capped] = 0
+        invest &= ~capped
+    counts = np.bincount(actions, minlength=len(ACTIONS))
+    world["actions"] += counts
+    world["protocols"] += int(counts[A["CREATE_PROTOCOL"]])
+    for action in ("CREATE_PROTOCOL", "CREATE_AI"):
+        ledger.sink(action.lower(), tables["nxt"][A[action]] * counts[A[action]])
+
+    if invest.any():
+        high = np.maximum(3, np.minimum(500, bal[invest] // 5))
+        amount = np.minimum(rng.integers(2, high + 1), bal[invest])
+        spend[invest] = amount
+        who = idx[invest]
+        devs["positions"][who] += 1
+        devs["shares"][who] += amount
+        ledger.sink("invest", amount.sum())
+
+    sell = actions == A["SELL"]
+    if sell.any():
+        who = idx[sell]
+        sold = devs["shares"][who] // devs["positions"][who]
+        proceeds = (sold * rng.uniform(0.5, 1.8, size=len(who))).astype(np.int64)
+        spend[sell] = -proceeds
+        devs["positions"][who] -= 1
+        devs["shares"][who] -= sold
+        ledger.source("sell", proceeds.sum())
+
+    move = actions == A["MOVE"]
+    if move.any():
+        n_loc = len(engine.LOCATIONS)
+        who = idx[move]
+        devs["location"][who] = (devs["location"][who] + rng.integers(1, n_loc, size=len(who))) % n_loc
+
+    new_energy = np.maximum(0, energy - tables["drain"][actions])
+    rest = actions == A["REST"]
+    new_energy[rest] = np.minimum(devs["max_energy"][idx[rest]], energy[rest] + 5)
+    devs["energy"][idx] = new_energy
+    devs["balance"][idx] = bal - spend
+
+    # Social: CHAT, and the contextual CHAT echoed after a chatty action.
+    who = idx[tables["chats"][actions]]
+    raw = world["chat_gain"][devs["archetype"][who]]
+    devs["social"][who] += np.maximum(0, np.minimum(raw, 40 - devs["social"][who]))
+
+    moody = idx[rng.random(len(idx)) < 0.10]
+    devs["mood"][moody] = rng.choice(world["moods"], size=len(moody))
+
+    # calc_next_interval, on the energy the dev decided with
+    if effects.get("create_protocol_multiplier", 1) > 1:
+        devs["next_due"][idx] = t + p["CYCLE_HACKATHON"]
+    else:
+        devs["next_due"][idx] = t + tables["interval"][energy]
+
+
+def _hourly(devs: dict, p: dict, effects: dict, ledger: Ledger, hour: int,
+            rates: dict, rng):
+    """Salary, vitals decay and the players' shop / hack activity."""
+    n = len(devs["balance"])
+    salary = int(p["SALARY_PER_INTERVAL"] * effects.get("salary_multiplier", 1.0))
+    devs["balance"] += salary
+    ledger.source("salary", salary * n)
+    if hour:
+        decay = vitals.decay_rates(effects)
+        devs["energy"] = np.maximum(0, devs["energy"] - decay["energy"])
+        devs["pc_health"] = np.maximum(0, devs["pc_health"] - decay["pc_health"])
+        s, d = devs["social"], decay["social_vitality"]
+        devs["social"] = np.where(s >= vitals.SOCIAL_FLOOR, np.maximum(vitals.SOCIAL_FLOOR, s - d),
+                                  np.minimum(vitals.SOCIAL_FLOOR, np.maximum(0, s - d) + vitals.RECOVERY))
+
+    price = lambda cost: max(1, int(cost * effects.get("shop_cost_multiplier", 1.0)))  # noqa: E731
+    for need, cost, kind in ((devs["energy"] == 0, price(p["FOOD_COST"]), "food"),
+                             (devs["pc_health"] < 50, price(p["REPAIR_COST"]), "pc_repair")):
+        buy = need & (devs["balance"] >= cost) & (rng.random(n) < rates["care"])
+        devs["balance"][buy] -= cost
+        ledger.sink(kind, cost * buy.sum())
+        if kind == "food":
+            devs["energy"][buy] = np.minimum(devs["max_energy"][buy], p["FOOD_ENERGY"])
+        else:
+            devs["pc_health"][buy] = 100.0
+
+    t = hour * 3600.0
+    ready = ((t - devs["last_hack"] >= p["HACK_COOLDOWN_HOURS"] * 3600)
+             & (devs["social"] >= 15))
+    roll = rng.random(n)
+    mainframe = ready & (roll < rates["hack"] / 24)
+    raid = ready & ~mainframe & (roll < (rates["hack"] + rates["raid"]) / 24)
+    bonus = effects.get("hack_success_bonus", 0.0)
+    cost_mult = effects.get("hack_cost_multiplier", 1.0)
+
+    cost = max(1, int(p["HACK_COST"] * cost_mult))
+    who = np.flatnonzero(mainframe & (devs["balance"] >= cost))
+    if len(who):
+        devs["balance"][who] -= cost
+        devs["last_hack"][who] = t
+        ledger.sink("hack_mainframe_cost", cost * len(who))
+        won = who[rng.random(len(who)) < p["HACK_BASE_SUCCESS"] + devs["stat_hacking"][who] / 200.0 + bonus]
+        loot = rng.integers(p["HACK_STEAL_MIN"], p["HACK_STEAL_MAX"] + 1, size=len(won))
+        devs["balance"][won] += loot
+        devs["social"][won] = np.minimum(100, devs["social"][won] + 5)
+        ledger.source("hack_mainframe_win", loot.sum())
+
+    cost = max(1, int(p["HACK_PLAYER_COST"] * cost_mult))
+    who = np.flatnonzero(raid & (devs["balance"] >= cost))
+    if len(who):
+        # Random target in another corporation with a balance; each
+        # target is raided at most once per hour here.
+        target = rng.integers(n, size=len(who))
+        for _ in range(4):
+            bad = ((devs["corporation"][target] == devs["corporation"][who])
+                   | (devs["balance"][target] <= 0) | (target == who))
+            if not bad.any():
+                break
+            target[bad] = rng.integers(n, size=int(bad.sum()))
+        keep = ~bad
+        who, target = who[keep], target[keep]
+        _, first = np.unique(target, return_index=True)
+        who, target = who[first], target[first]
+        devs["balance"][who] -= cost
+        devs["last_hack"][who] = t
+        won = rng.random(len(who)) < (p["HACK_PLAYER_BASE_SUCCESS"]
+                                      + devs["stat_hacking"][who] / 200.0 + bonus)
+        # Success: the cost is burned and the target robbed. Failure:
+        # the target seizes the cost.
+        ledger.sink("hack_raid_cost", cost * won.sum())
+        ledger.transfer("hack_raid_seized", cost * (~won).sum())
+        devs["balance"][target[~won]] += cost
+        w, tg = who[won], target[won]
+        loot = np.minimum(rng.integers(p["HACK_PLAYER_STEAL_MIN"], p["HACK_PLAYER_STEAL_MAX"] + 1,
+                                       size=len(w)), devs["balance"][tg])
+        devs["balance"][tg] -= loot
+        devs["balance"][w] += loot
+        devs["social"][w] = np.minimum(100, devs["social"][w] + p["HACK_PLAYER_SOCIAL_GAIN"])
+        ledger.transfer("hack_raid_stolen", loot.sum())
+
+
+def _percentiles(values: np.ndarray) -> dict:
+    if not len(values):
+        return {}
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {"mean": round(float(values.mean()), 1), "p10": int(p10), "p50": int(p50),
+            "p90": int(p90), "min": int(values.min()), "max": int(values.max())}
+
+
+def project(n_devs: int = 35_000, days: float = 30, seed: int = 7,
+            params: dict = None, event: str = None, hack_rate: float = 0.2,
+            raid_rate: float = 0.1, care_rate: float = 0.25) -> dict:
+    """Run the projection and return the report. ``params`` defaults to
+    default_params(); ``event`` pins one WEEKLY_EVENTS title."""
+    p = params or default_params()
+    rng = np.random.default_rng(seed)
+    kernel = _kernel(p)
+    devs = mint(kernel, p, n_devs, rng)
+    world = {
+        "protocols": 0,
+        "actions": np.zeros(len(ACTIONS), dtype=np.int64),
+        "chat_gain": np.array([engine.CHAT_SOCIAL_GAIN.get(a, 1) for a in kernel.archetypes]),
+        "moods": np.array([kernel.mood_index.get(m, len(kernel.moods)) for m in engine.MOODS]),
+        "tables": _action_tables(p),
+    }
+    rates = {"hack": hack_rate, "raid": raid_rate, "care": care_rate}
+    ledger = Ledger()
+    supply_start = int(devs["balance"].sum())
+
+    events = p["WEEKLY_EVENTS"]
+    if event is not None:
+        pinned = [e for e in events if e["title"] == event]
+        if not pinned:
+            raise ValueError(f"unknown event {event!r}")
+    current, history, daily = None, [], []
+    started = time.perf_counter()
+    steps = int(days * 24 * HOUR_STEPS)
+    for step in range(steps + 1):
+        t = step * STEP_SEC
+        if step % HOUR_STEPS == 0:
+            hour = step // HOUR_STEPS
+            if hour % 24 == 0:
+                daily.append({"day": hour // 24, "supply": int(devs["balance"].sum()),
+                              "locked_in_positions": int(devs["shares"].sum()),
+                              "out_of_energy": int((devs["energy"] == 0).sum())})
+            if step == steps:
+                break
+            if hour % WEEK_HOURS == 0:
+                if event is not None:
+                    current = pinned[0]
+                else:
+                    pool = [e for e in events if current is None or e["title"] != current["title"]]
+                    current = pool[rng.integers(len(pool))]
+                history.append({"day": hour // 24, "title": current["title"]})
+                event_row = kernel.event_row(current["effects"])
+            _hourly(devs, p, current["effects"], ledger, hour, rates, rng)
+
+        idx = np.flatnonzero((devs["next_due"] <= t) & (devs["energy"] > 0))
+        if not len(idx):
+            continue
+        cols = {k: devs[k][idx] for k in ("archetype", "energy", "mood", "location",
+                                           "pc_health", "training")}
+        cols["balance"] = devs["balance"][idx]
+        w = kernel.column_weights(cols, np.full(len(idx), world["protocols"] > 0),
+                                  devs["positions"][idx] > 0, event_row,
+                                  devs["variations"][idx])
+        _act(devs, world, idx, kernel.sample_indices(w, rng), p, current["effects"],
+             ledger, t, rng)
+
+    supply_end = int(devs["balance"].sum())
+    by_archetype = {}
+    for i, name in enumerate(kernel.archetypes):
+        mask = devs["archetype"] == i
+        by_archetype[name] = {
+            "devs": int(mask.sum()),
+            "balance": _percentiles(devs["balance"][mask]),
+            "net_change": _percentiles(devs["balance"][mask] - devs["start_balance"][mask]),
+        }
+    return {
+        "devs": n_devs,
+        "days": days,
+        "seed": seed,
+        "wall_sec": round(time.perf_counter() - started, 1),
+        "assumptions": {"hack_rate_per_day": hack_rate, "raid_rate_per_day": raid_rate,
+                        "care_rate_per_hour": care_rate},
+        "supply": {"start": supply_start, "end": supply_end,
+                   "change": supply_end - supply_start,
+                   "locked_in_positions": int(devs["shares"].sum())},
+        "sources": ledger.sources,
+        "sinks": ledger.sinks,
+        "transfers": ledger.transfers,
+        "actions": {a: int(c) for a, c in zip(ACTIONS, world["actions"])},
+        "weekly_events": history,
+        "daily": daily,
+        "by_archetype": by_archetype,
+    }
+
+
+def parse_overrides(pairs) -> dict:
+    """NAME=VALUE (JSON value) pairs, validated against default_params()."""
+    params = default_params()
+    for pair in pairs or ():
+        name, sep, value = pair.partition("=")
+        if not sep or name not in params:
+            raise ValueError(f"unknown parameter {name!r}")
+        try:
+            params[name] = json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{name}: {e}") from None
+    return params
+
+
+def compare(baseline: dict, projected: dict) -> dict:
+    """Projected minus baseline for the headline numbers."""
+    def diff(a: dict, b: dict) -> dict:
+        return {k: b.get(k, 0) - a.get(k, 0) for k in sorted(set(a) | set(b))}
+    return {
+        "supply_end": projected["supply"]["end"] - baseline["supply"]["end"],
+        "sources": diff(baseline["sources"], projected["sources"]),
+        "sinks": diff(baseline["sinks"], projected["sinks"]),
+        "median_balance": {a: projected["by_archetype"][a]["balance"]["p50"]
+                           - baseline["by_archetype"][a]["balance"]["p50"]
+                           for a in projected["by_archetype"] if baseline["by_archetype"][a]["devs"]},
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Project the $NXT economy with a NumPy Monte-Carlo model.")
+    ap.add_argument("--devs", type=int, default=config.MAX_DEVS)
+    ap.add_argument("--days", type=float, default=30)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--set", action="append", metavar="NAME=VALUE",
+                    help="override a parameter (JSON value), e.g. SALARY_PER_INTERVAL=12")
+    ap.add_argument("--event", help="pin this WEEKLY_EVENTS title for the whole run")
+    ap.add_argument("--hack-rate", type=float, default=0.2,
+                    help="mainframe hacks per dev per day (player assumption)")
+    ap.add_argument("--raid-rate", type=float, default=0.1,
+                    help="raids per dev per day (player assumption)")
+    ap.add_argument("--care-rate", type=float, default=0.25,
+                    help="chance per hour that a dev out of energy / PC gets food / a repair")
+    ap.add_argument("--out", help="also write the JSON report here")
+    args = ap.parse_args()
+
+    try:
+        params = parse_overrides(args.set)
+        run = lambda p: project(args.devs, args.days, args.seed, p, args.event,  # noqa: E731
+                                args.hack_rate, args.raid_rate, args.care_rate)
+        report = run(params)
+        if args.set:
+            baseline = run(default_params())
+            report = {"overrides": args.set, "projected": report, "baseline": baseline,
+                      "difference": compare(baseline, report)}
+    except ValueError as e:
+        print(f"project_economy: {e}", file=sys.stderr)
+        return 2
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
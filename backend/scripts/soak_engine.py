@@ -0,0 +1,226 @@
+"""
+Soak run — weeks of simulated economy on a virtual clock, in minutes.
+
+Installs a sim_clock.VirtualClock and runs the real ``run_engine`` loop
+until the clock has advanced --days. Every idle wait jumps straight to
+the next due dev or cron, so the run is bound by Postgres, not by the
+calendar:
+
+  1. rebuilds schema ``nx`` and seeds --devs devs like bench_engine.py,
+     plus --markets NX Market markets whose close_at is spread from
+     TIMEOUT_DAYS before the start to the end of the run (so closes and
+     30-day timeouts both happen),
+  2. runs the engine single-threaded; salary, balance snapshots, weekly
+     event rotation, NX Market close / timeout and counter checks run on
+     their simulated cadence. The on-chain jobs (pending funds, orphan
+     scan) are skipped,
+  3. settles every dev's vitals at the end and prints a JSON report:
+     salary paid, event rotations, vitals and balances, action counts,
+     NX Market outcomes and wall time.
+
+DESTRUCTIVE: drops schema nx (same guard as bench_engine.py).
+
+Usage:
+    NX_DB_NAME=nxbench python backend/scripts/soak_engine.py --devs 200 --days 30
+
+Exit codes:
+    0  Soak completed.
+    2  Refused: not a local bench / test database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine", BACKEND_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import psycopg2.extras  # noqa: E402
+
+import bench_engine  # noqa: E402
+import engine  # noqa: E402
+import sim_clock  # noqa: E402
+from config import DB_SCHEMA  # noqa: E402
+from vitals import settle_devs  # noqa: E402
+
+# The columns the close / timeout jobs touch. The API creates the full
+# tables at startup (api/main.py); a market with no positions times out
+# without refunds.
+NXMARKET_TABLES = """
+CREATE TABLE nxmarket_markets (
+    id                   BIGSERIAL PRIMARY KEY,
+    question             TEXT NOT NULL,
+    market_type          VARCHAR(20) NOT NULL,
+    created_by           VARCHAR(42) NOT NULL,
+    seed_nxt             NUMERIC(20,2) NOT NULL,
+    shares_yes           NUMERIC(30,8) NOT NULL,
+    shares_no            NUMERIC(30,8) NOT NULL,
+    liquidity_b          NUMERIC(20,2) NOT NULL,
+    status               VARCHAR(20) NOT NULL DEFAULT 'active',
+    outcome              VARCHAR(10),
+    close_at             TIMESTAMPTZ NOT NULL,
+    resolved_at          TIMESTAMPTZ,
+    resolved_by          VARCHAR(42)
+);
+CREATE TABLE nxmarket_positions (
+    id              BIGSERIAL PRIMARY KEY,
+    market_id       BIGINT NOT NULL REFERENCES nxmarket_markets(id) ON DELETE CASCADE,
+    wallet_address  VARCHAR(42) NOT NULL,
+    outcome         VARCHAR(10) NOT NULL,
+    shares          NUMERIC(30,8) NOT NULL DEFAULT 0,
+    cost_basis      NUMERIC(20,2) NOT NULL DEFAULT 0
+);
+"""
+
+
+def _api_pool():
+    """The NX Market jobs run on the API's connection pool. Imported
+    lazily: only the soak needs the API package."""
+    from backend.api import deps
+    if deps._pool is None:
+        deps.init_db_pool(1, 2)
+
+
+def seed_markets(conn, n: int, start: datetime, days: float, rng: random.Random):
+    from backend.services.nxmarket_lifecycle import TIMEOUT_DAYS
+    first = start - timedelta(days=TIMEOUT_DAYS)
+    span = (days + TIMEOUT_DAYS) * 86400
+    with conn.cursor() as cur:
+        cur.execute(NXMARKET_TABLES)
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO nxmarket_markets (question, market_type, created_by, seed_nxt,
+                                          shares_yes, shares_no, liquidity_b, close_at)
+            VALUES %s
+        """, [(f"SOAK-{i}?", "official", "0x" + "00" * 20, 1000, 0, 0, 1000,
+               first + timedelta(seconds=rng.uniform(0, span))) for i in range(n)])
+    conn.commit()
+
+
+def observe(conn, start: datetime, end: datetime) -> dict:
+    """What the run did to the economy, with vitals settled to the
+    simulated end. (Row created_at defaults are wall time, so nothing
+    here is bucketed by it.)"""
+    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    settle_devs(cur, now=end)
+    conn.commit()
+    cur.execute("""
+        SELECT COUNT(*) AS payments, COALESCE(SUM(nxt_cost), 0) AS total_nxt
+        FROM actions WHERE action_type = 'RECEIVE_SALARY'
+    """)
+    salary = cur.fetchone()
+    cur.execute("""
+        SELECT title, starts_at FROM world_events
+        WHERE event_type = 'weekly' ORDER BY starts_at
+    """)
+    events = [{"title": r["title"], "day": round((r["starts_at"] - start).total_seconds() / 86400, 2)}
+              for r in cur.fetchall()]
+    cur.execute("""
+        SELECT COUNT(*) AS devs,
+               ROUND(AVG(energy), 2) AS energy, ROUND(AVG(pc_health), 2) AS pc_health,
+               ROUND(AVG(caffeine), 2) AS caffeine, ROUND(AVG(social_vitality), 2) AS social_vitality,
+               ROUND(AVG(knowledge), 2) AS knowledge,
+               COUNT(*) FILTER (WHERE energy <= 0) AS out_of_energy,
+               ROUND(AVG(balance_nxt)) AS avg_balance, MAX(balance_nxt) AS max_balance
+        FROM devs
+    """)
+    devs = cur.fetchone()
+    cur.execute("SELECT action_type::text AS action, COUNT(*) AS n FROM actions GROUP BY 1 ORDER BY 2 DESC")
+    actions = {r["action"]: r["n"] for r in cur.fetchall()}
+    cur.execute("""
+        SELECT status || COALESCE(':' || outcome, '') AS state, COUNT(*) AS n
+        FROM nxmarket_markets GROUP BY 1 ORDER BY 1
+    """)
+    markets = {r["state"]: r["n"] for r in cur.fetchall()}
+    conn.commit()
+    return {
+        "salary": {k: int(v) for k, v in salary.items()},
+        "weekly_events": events,
+        "vitals": {k: float(v) if v is not None else None for k, v in devs.items()},
+        "actions": actions,
+        "nxmarket": markets,
+    }
+
+
+def run_soak(devs: int, days: float, markets: int, seed_value: int,
+             connect=bench_engine.connect) -> dict:
+    rng = random.Random(seed_value)
+    random.seed(seed_value)
+
+    conn = connect()
+    try:
+        bench_engine.build_schema(conn)
+        _api_pool()
+        bench_engine.seed(conn, devs, rng)
+        start = datetime.now(timezone.utc).replace(microsecond=0)
+        seed_markets(conn, markets, start, days, rng)
+        engine.world_state.invalidate()
+        engine._sampling = engine.SamplingCache()
+
+        previous = sim_clock.install(sim_clock.VirtualClock(start))
+        # Nothing outside the engine changes devs here, so the due queue
+        # only needs an hourly reconcile.
+        engine_settings = engine.METRICS_PORT, engine.ENGINE_SHARDS, engine.SCHEDULER_RECONCILE_SEC
+        engine.METRICS_PORT, engine.ENGINE_SHARDS, engine.SCHEDULER_RECONCILE_SEC = 0, 1, 3600
+        payouts = engine.metrics.PHASE_SECONDS.count("pay_salaries")
+        processed = engine.metrics.DEVS_PROCESSED.value()
+        started = time.perf_counter()
+        try:
+            engine.run_engine(until=start + timedelta(days=days))
+            end = sim_clock.now()
+        finally:
+            wall_sec = time.perf_counter() - started
+            engine.METRICS_PORT, engine.ENGINE_SHARDS, engine.SCHEDULER_RECONCILE_SEC = engine_settings
+            sim_clock.install(previous)
+            engine.world_state.invalidate()
+
+        report = {
+            "devs": devs,
+            "seed": seed_value,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "simulated_days": round((end - start).total_seconds() / 86400, 3),
+            "wall_sec": round(wall_sec, 1),
+            "devs_processed": int(engine.metrics.DEVS_PROCESSED.value() - processed),
+        }
+        report.update(observe(conn, start, end))
+        report["salary"]["payouts"] = engine.metrics.PHASE_SECONDS.count("pay_salaries") - payouts
+        return report
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Run the engine on a virtual clock for N simulated days.")
+    ap.add_argument("--devs", type=int, default=200, help="devs to seed")
+    ap.add_argument("--days", type=float, default=30, help="simulated days to run")
+    ap.add_argument("--markets", type=int, default=50, help="NX Market markets to seed")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="also write the JSON report here")
+    args = ap.parse_args()
+
+    reason = bench_engine.refuse_reason()
+    if reason:
+        print(f"Refusing to drop schema {DB_SCHEMA}: {reason}", file=sys.stderr)
+        return 2
+
+    logging.getLogger("nx_engine").setLevel(logging.WARNING)
+    report = run_soak(args.devs, args.days, args.markets, args.seed)
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,7 +23,9 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Iterable, Optional
+from typing import Iterable, Mapping, Optional
+
+import psycopg2.extras
 
 from backend.api.middleware.correlation import (
     NO_CORRELATION,
@@ -233,6 +235,71 @@ def ledger_insert(
     return cursor.fetchone() is not None
 
 
+def ledger_insert_dev_batch(
+    cursor,
+    *,
+    devs: Iterable[Mapping],
+    delta_nxt: int,
+    source: str,
+    ref_table: Optional[str] = None,
+    ref_id: Optional[int] = None,
+    correlation_id: Optional[str] = None,
+) -> int:
+    """One ``nxt_ledger`` row per dev in ``devs``, in a single multi-row
+    ``INSERT``. Idempotent like ``ledger_insert``.
+
+    For batch callsites that credit every dev the same ``delta_nxt``
+    (the hourly salary). ``devs`` are the rows the balance UPDATE
+    actually credited — ``token_id``, ``owner_address`` and
+    ``balance_nxt`` as RETURNING gave them — so ``balance_after`` is the
+    balance just written and no dev is picked twice under concurrent
+    status changes. Idempotency keys are exactly the ones
+    ``ledger_insert`` would build per dev. Devs whose owner wallet fails
+    ``_normalised_wallet`` are skipped.
+
+    Returns the number of rows written.
+    """
+    if not isinstance(delta_nxt, int):
+        raise ValueError(f"delta_nxt must be int, got {type(delta_nxt).__name__}")
+    if delta_nxt == 0:
+        raise ValueError("delta_nxt must not be zero")
+    if not LedgerSource.is_valid(source):
+        raise ValueError(f"Invalid source: {source!r}")
+
+    cid = _resolve_correlation_id(correlation_id)
+    rows = []
+    for dev in devs:
+        try:
+            wallet = _normalised_wallet(dev["owner_address"])
+        except ValueError:
+            continue
+        if dev["balance_nxt"] < 0:
+            continue
+        rows.append((
+            wallet, dev["token_id"], delta_nxt, dev["balance_nxt"],
+            source, ref_table, ref_id,
+            _make_idempotency_key(source, ref_table, ref_id, dev["token_id"], delta_nxt),
+            cid,
+        ))
+    if not rows:
+        return 0
+    inserted = psycopg2.extras.execute_values(
+        cursor,
+        """
+        INSERT INTO nxt_ledger
+            (wallet_address, dev_token_id, delta_nxt, balance_after,
+             source, ref_table, ref_id, idempotency_key, correlation_id)
+        VALUES %s
+        ON CONFLICT (idempotency_key) DO NOTHING
+        RETURNING id
+        """,
+        rows,
+        page_size=1000,
+        fetch=True,
+    )
+    return len(inserted)
+
+
 def get_ledger_summary_by_wallet(
     cursor,
     wallet_address: str,
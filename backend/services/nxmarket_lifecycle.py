@@ -9,12 +9,15 @@ Runs on the engine tick. Two sibling jobs:
   'invalid' (refunds every bettor their cost basis). Prevents orphan
   markets from sitting in closed state forever.
 
-Both are idempotent.
+Both are idempotent. Both take an optional ``now`` (default: the wall
+clock) so the engine can run them on its simulation clock.
 """
 
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timezone
+from typing import Optional
 
 from backend.api.deps import get_db
 from backend.services.admin_log import log_event as admin_log_event
@@ -33,7 +36,7 @@ AUTO_TIMEOUT_SENTINEL = "0x0000000000000000000000000000000000000000"
 TIMEOUT_DAYS = 30
 
 
-def auto_close_expired_markets() -> int:
+def auto_close_expired_markets(now: Optional[datetime] = None) -> int:
     """Flip active markets whose close_at has passed to 'closed'.
 
     Returns the number of rows affected. Safe to call from any worker
@@ -46,9 +49,10 @@ def auto_close_expired_markets() -> int:
                 UPDATE nxmarket_markets
                    SET status = 'closed'
                  WHERE status = 'active'
-                   AND close_at <= NOW()
+                   AND close_at <= %s
                 RETURNING id, question, close_at
                 """,
+                (now or datetime.now(timezone.utc),),
             )
             rows = cur.fetchall()
 
@@ -71,7 +75,7 @@ def auto_close_expired_markets() -> int:
     return len(rows)
 
 
-def auto_timeout_invalid_markets() -> int:
+def auto_timeout_invalid_markets(now: Optional[datetime] = None) -> int:
     """Resolve closed-but-unresolved markets as 'invalid' after
     TIMEOUT_DAYS. Refunds all bettors their cost basis; no treasury
     fee, no creator commission (same semantics as manual invalid).
@@ -95,11 +99,11 @@ def auto_timeout_invalid_markets() -> int:
                 SELECT id, question, close_at, market_type, created_by
                   FROM nxmarket_markets
                  WHERE status = 'closed'
-                   AND close_at <= NOW() - (%s || ' days')::INTERVAL
+                   AND close_at <= %s - (%s || ' days')::INTERVAL
                  ORDER BY close_at ASC
                  LIMIT 100
                 """,
-                (str(TIMEOUT_DAYS),),
+                (now or datetime.now(timezone.utc), str(TIMEOUT_DAYS)),
             )
             expired = cur.fetchall()
 
@@ -0,0 +1,94 @@
+"""Shared setup for the tests that run the engine against the real
+``backend/db/schema.sql`` on the local test database.
+
+Import paths (repo root for ``backend.*``, ``backend/engine`` for the
+engine's flat imports) and the NX_DB_* defaults are set here, before
+any test module imports the engine or the API. Test modules take
+``AUTO_MIGRATIONS`` / ``connect`` from here and use the ``db_schema``
+(once per module) or ``fresh_db`` (per test) fixtures, which skip when
+Postgres is unreachable.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+import psycopg2.extras
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_HOST", "localhost")
+os.environ.setdefault("NX_DB_PORT", "5432")
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+os.environ.setdefault("NX_DB_USER", "nxtest")
+os.environ.setdefault("NX_DB_PASS", "nxtest")
+os.environ.setdefault("NX_DB_SCHEMA", "nx")
+
+SCHEMA_SQL = BACKEND_ROOT / "db" / "schema.sql"
+# The API creates nxt_ledger at startup; the engine shadow-writes to it.
+LEDGER_SQL = BACKEND_ROOT / "db" / "migration_nxt_ledger.sql"
+
+# Columns / enum values the engine and API add via auto-migration on
+# top of schema.sql.
+AUTO_MIGRATIONS = """
+ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS chat_type VARCHAR(20) NOT NULL DEFAULT 'idle';
+ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS social_gain SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ DEFAULT NULL;
+ALTER TYPE location_enum ADD VALUE IF NOT EXISTS 'GitHub HQ';
+ALTER TYPE dev_status_enum ADD VALUE IF NOT EXISTS 'on_mission';
+"""
+
+
+def connect(**kwargs):
+    """A connection to the test database, schema ``nx``, dict rows."""
+    kwargs.setdefault("cursor_factory", psycopg2.extras.RealDictCursor)
+    return psycopg2.connect(
+        host=os.environ["NX_DB_HOST"],
+        port=int(os.environ["NX_DB_PORT"]),
+        dbname=os.environ["NX_DB_NAME"],
+        user=os.environ["NX_DB_USER"],
+        password=os.environ["NX_DB_PASS"],
+        options="-c search_path=nx",
+        **kwargs,
+    )
+
+
+def _reset_schema():
+    """Recreate schema.sql + nxt_ledger + AUTO_MIGRATIONS; the
+    autocommit connection used, or skip the test if Postgres is
+    unreachable."""
+    try:
+        conn = connect()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(SCHEMA_SQL.read_text())
+        cur.execute(LEDGER_SQL.read_text())
+        cur.execute(AUTO_MIGRATIONS)
+    return conn
+
+
+@pytest.fixture(scope="module")
+def db_schema():
+    """A fresh schema once per module (tests clean up after themselves)."""
+    _reset_schema().close()
+
+
+@pytest.fixture()
+def fresh_db():
+    """A fresh, empty schema per test: its autocommit connection, for
+    seeding."""
+    conn = _reset_schema()
+    yield conn
+    conn.close()
@@ -0,0 +1,78 @@
+"""Engine benchmark harness (``scripts/bench_engine.py``): a tiny run
+against the test database must seed, tick, pay and report consistently.
+Rebuilds schema ``nx`` like the other DB tests."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine", BACKEND_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_HOST", "localhost")
+os.environ.setdefault("NX_DB_PORT", "5432")
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+os.environ.setdefault("NX_DB_USER", "nxtest")
+os.environ.setdefault("NX_DB_PASS", "nxtest")
+os.environ.setdefault("NX_DB_SCHEMA", "nx")
+
+import bench_engine  # noqa: E402
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.environ["NX_DB_HOST"],
+        port=int(os.environ["NX_DB_PORT"]),
+        dbname=os.environ["NX_DB_NAME"],
+        user=os.environ["NX_DB_USER"],
+        password=os.environ["NX_DB_PASS"],
+        options="-c search_path=nx",
+    )
+
+
+def test_small_run_reports_throughput_and_statements():
+    try:
+        _connect().close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    assert bench_engine.refuse_reason() == ""
+
+    report = bench_engine.run_benchmark(devs=90, ticks=3, salaries=1, batch=40, seed_value=3,
+                                        connect=_connect)
+
+    tick = report["tick"]
+    assert tick["devs_processed"] == 120
+    assert tick["devs_per_sec"] > 0
+    assert 0 < tick["p50_ms"] <= tick["p99_ms"]
+    assert 0 < tick["statements_per_dev"] < 4
+    assert report["salary"]["statements_per_run"] > 0
+
+    with _connect() as conn, conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM nx.devs")
+        assert cur.fetchone()[0] == 90
+        cur.execute("SELECT COUNT(*) FROM nx.player_prompts")
+        assert cur.fetchone()[0] == 4
+    assert bench_engine.regressions(report, report, 0.2) == []
+
+
+def test_regressions_flags_throughput_statements_and_salary():
+    base = {"tick": {"devs_per_sec": 1000.0, "statements_per_dev": 1.0},
+            "salary": {"p50_ms": 100.0}}
+    ok = {"tick": {"devs_per_sec": 850.0, "statements_per_dev": 1.1},
+          "salary": {"p50_ms": 110.0}}
+    bad = {"tick": {"devs_per_sec": 700.0, "statements_per_dev": 1.5},
+           "salary": {"p50_ms": 200.0}}
+    assert bench_engine.regressions(ok, base, 0.2) == []
+    assert len(bench_engine.regressions(bad, base, 0.2)) == 3
+    assert bench_engine.percentile([5, 1, 3, 2, 4], 50) == 3
+    assert bench_engine.percentile([5, 1, 3, 2, 4], 99) == 5
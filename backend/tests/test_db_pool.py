@@ -0,0 +1,138 @@
+"""Engine connection pool (``db_pool.ConnectionPool``).
+
+Connections are reused across borrowers and reset between them, pinged
+after idling, recycled past their max lifetime, and borrowers wait (and
+eventually time out) when every connection is in use. Runs against the
+test database; needs no schema.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_HOST", "localhost")
+os.environ.setdefault("NX_DB_PORT", "5432")
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+os.environ.setdefault("NX_DB_USER", "nxtest")
+os.environ.setdefault("NX_DB_PASS", "nxtest")
+os.environ.setdefault("NX_DB_SCHEMA", "nx")
+
+import db_pool  # noqa: E402
+import metrics  # noqa: E402
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.environ["NX_DB_HOST"],
+        port=int(os.environ["NX_DB_PORT"]),
+        dbname=os.environ["NX_DB_NAME"],
+        user=os.environ["NX_DB_USER"],
+        password=os.environ["NX_DB_PASS"],
+    )
+
+
+@pytest.fixture()
+def make_pool():
+    try:
+        _connect().close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    pools = []
+
+    def make(**kwargs):
+        pools.append(db_pool.ConnectionPool(_connect, **kwargs))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.closeall()
+
+
+def _pid(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_backend_pid()")
+        return cur.fetchone()[0]
+
+
+def test_connections_are_reused_and_reset(make_pool):
+    pool = make_pool(maxconn=2)
+    with pool.connection() as conn:
+        first = _pid(conn)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("CREATE TEMP TABLE pool_probe (x int)")
+            raise RuntimeError("rolled back")
+    with pool.connection(autocommit=True) as conn:
+        assert _pid(conn) == first
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('pool_probe')")
+            assert cur.fetchone()[0] is None
+    conn = pool.getconn()
+    assert _pid(conn) == first and conn.autocommit is False
+    pool.putconn(conn)
+    assert pool.stats() == {"open": 1, "idle": 1, "max": 2}
+
+
+def test_idle_connections_are_health_checked(make_pool):
+    pool = make_pool(maxconn=1, check_idle_sec=0)
+    with pool.connection() as conn:
+        dead = _pid(conn)
+    killer = _connect()
+    killer.autocommit = True
+    with killer.cursor() as cur:
+        cur.execute("SELECT pg_terminate_backend(%s)", (dead,))
+    killer.close()
+    time.sleep(0.1)
+
+    failed = metrics.DB_POOL_EVENTS.value("failed_check")
+    with pool.connection() as conn:
+        assert _pid(conn) != dead
+    assert metrics.DB_POOL_EVENTS.value("failed_check") == failed + 1
+    assert pool.stats()["open"] == 1
+
+
+def test_connections_are_recycled_after_max_lifetime(make_pool):
+    pool = make_pool(maxconn=1, max_lifetime_sec=0.2)
+    recycled = metrics.DB_POOL_EVENTS.value("recycled")
+    with pool.connection() as conn:
+        first = _pid(conn)
+    with pool.connection() as conn:
+        assert _pid(conn) == first
+    time.sleep(0.25)
+    with pool.connection() as conn:
+        assert _pid(conn) != first
+    assert metrics.DB_POOL_EVENTS.value("recycled") == recycled + 1
+
+
+def test_borrowers_wait_for_a_free_connection_then_time_out(make_pool):
+    pool = make_pool(maxconn=1, timeout_sec=2)
+    held = pool.getconn()
+    waited = metrics.DB_POOL_WAIT.count()
+    threading.Timer(0.2, pool.putconn, (held,)).start()
+    started = time.monotonic()
+    with pool.connection() as conn:
+        assert _pid(conn) == _pid(held)
+    assert time.monotonic() - started >= 0.15
+    assert metrics.DB_POOL_WAIT.count() == waited + 1
+
+    pool.timeout_sec = 0.05
+    held = pool.getconn()
+    with pytest.raises(db_pool.PoolTimeout):
+        pool.getconn()
+    pool.putconn(held)
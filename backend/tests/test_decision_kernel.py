@@ -0,0 +1,150 @@
+"""Batch decision kernel vs the per-dev decision path.
+
+``decision_kernel.DecisionKernel`` replaces one apply_context_modifiers
++ random.choices per dev with matrix ops over the whole scheduler
+batch. The weights must match the dict path exactly; the sampled
+actions only have to match in distribution (different RNG stream), so
+that part is checked statistically. Pure functions, no DB.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+ENGINE_DIR = BACKEND_ROOT / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+
+from backend.engine import engine as engine_mod  # noqa: E402
+from decision_kernel import ACTIONS, DecisionKernel  # noqa: E402
+
+
+def _kernel() -> DecisionKernel:
+    return DecisionKernel(
+        engine_mod.PERSONALITY_MATRIX,
+        engine_mod.LOCATION_MODIFIERS,
+        engine_mod.MOOD_MODIFIERS,
+        cost_create_protocol=engine_mod.COST_CREATE_PROTOCOL_NXT,
+        cost_create_ai=engine_mod.COST_CREATE_AI_NXT,
+    )
+
+
+def _random_batch(rng: random.Random, n: int):
+    events = [
+        {},
+        {"create_protocol_multiplier": 2.0},
+        {"salary_multiplier": 1.25, "invest_weight_boost": 2.0},
+        {"create_ai_multiplier": 2.5, "sell_weight_boost": 0},
+    ]
+    devs, contexts = [], []
+    for i in range(n):
+        dev = {
+            "token_id": i,
+            "archetype": rng.choice(list(engine_mod.PERSONALITY_MATRIX)),
+            "personality_seed": rng.randrange(2**31),
+            "energy": rng.randint(0, 10),
+            "balance_nxt": rng.choice([0, 1, 2, 4, 5, 49, 50, 2000]),
+            "mood": rng.choice(engine_mod.MOODS + ["unknown"]),
+            "location": rng.choice(engine_mod.LOCATIONS + ["NOWHERE"]),
+        }
+        if rng.random() < 0.3:
+            dev["pc_health"] = rng.randint(0, 100)
+        if rng.random() < 0.2:
+            dev["training_course"] = "solidity_101"
+        ctx = {
+            "has_protocols": rng.random() < 0.8,
+            "has_investments": rng.random() < 0.5,
+            "event_effects": rng.choice(events),
+        }
+        if rng.random() < 0.2:
+            ctx["prompt_weight_modifiers"] = {
+                rng.choice(ACTIONS): rng.choice([0, 0.5, 3.0]),
+            }
+        devs.append(dev)
+        contexts.append(ctx)
+    return devs, contexts
+
+
+def test_kernel_action_order_matches_personality_matrix():
+    for weights in engine_mod.PERSONALITY_MATRIX.values():
+        assert tuple(weights) == ACTIONS
+
+
+def test_kernel_weights_match_per_dev_path_exactly():
+    kernel = _kernel()
+    devs, contexts = _random_batch(random.Random(1234), 2000)
+
+    batch = kernel.weights(devs, contexts)
+
+    for row, dev, ctx in zip(batch, devs, contexts):
+        base = engine_mod.PERSONALITY_MATRIX[dev["archetype"]].copy()
+        expected = engine_mod.apply_context_modifiers(base, dev, ctx)
+        assert list(row) == [expected[a] for a in ACTIONS], dev
+
+
+def test_cached_variation_matches_seeded_rng():
+    """The per-seed cache hands out exactly the draws the old
+    ``random.Random(seed)`` loop made, and builds them once per seed."""
+    from personality import personality_variation
+
+    for seed in (0, 1, 2**31 - 1, 123456789):
+        rng = random.Random(seed)
+        expected = tuple(rng.uniform(0.85, 1.15) for _ in ACTIONS)
+        assert personality_variation(seed) == expected
+        assert personality_variation(seed) is personality_variation(seed)
+
+
+def test_kernel_zero_weights_fall_back_to_rest():
+    kernel = _kernel()
+    weights = np.zeros((3, len(ACTIONS)))
+    weights[1, ACTIONS.index("CHAT")] = 1.0
+    assert kernel.sample(weights, np.random.default_rng(0)) == ["REST", "CHAT", "REST"]
+
+
+def test_kernel_empty_batch():
+    assert _kernel().decide([], []) == []
+
+
+def test_kernel_action_distribution_matches_per_dev_path():
+    """Same dev decided many times by both paths → same distribution.
+
+    Total-variation distance between the two empirical distributions
+    stays well under what a real weighting bug (e.g. a skipped
+    modifier) would produce.
+    """
+    kernel = _kernel()
+    devs, contexts = _random_batch(random.Random(99), 8)
+    trials = 20_000
+    np_rng = np.random.default_rng(7)
+    random.seed(7)
+
+    for dev, ctx in zip(devs, contexts):
+        batch_counts = Counter(kernel.decide([dev] * trials, [ctx] * trials, np_rng))
+        scalar_counts = Counter(engine_mod.decide_action(dev, ctx) for _ in range(trials))
+        tv = 0.5 * sum(
+            abs(batch_counts[a] - scalar_counts[a]) / trials for a in ACTIONS
+        )
+        assert tv < 0.03, (dev, batch_counts, scalar_counts)
+
+
+def test_decide_actions_falls_back_without_kernel(monkeypatch):
+    monkeypatch.setattr(engine_mod, "_decision_kernel", None)
+    devs, contexts = _random_batch(random.Random(5), 20)
+    actions = engine_mod.decide_actions(devs, contexts)
+    assert len(actions) == 20
+    assert set(actions) <= set(ACTIONS)
@@ -0,0 +1,221 @@
+"""Split dev layout (``backend/db/migration_dev_runtime.sql``).
+
+The migration moves the hot columns of devs into dev_runtime and leaves
+a devs view behind: rows survive, writes through the view land in the
+right table without clobbering concurrent engine writes, and once the
+engine detects the split its tick / salary writes go straight to
+dev_runtime as HOT updates. A concurrent on-demand insert of the same
+dev is a no-op before and after the split. Runs against the real
+schema.sql plus the migration.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import timedelta
+
+import psycopg2
+import pytest
+
+from backend.engine import engine as engine_mod
+from backend.tests.conftest import BACKEND_ROOT, connect
+import tick_writer
+from tick_writer import TickWriter
+
+
+MIGRATION = BACKEND_ROOT / "db" / "migration_dev_runtime.sql"
+
+
+def _seed(cur, token_ids, **cols):
+    cur.execute("INSERT INTO players (wallet_address, corporation) VALUES (%s, 'CLOSED_AI') "
+                "ON CONFLICT DO NOTHING", ("0x" + "a" * 40,))
+    for token_id in token_ids:
+        cur.execute(
+            "INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+            "rarity_tier, personality_seed, ipfs_hash, energy, balance_nxt, next_cycle_at) "
+            "VALUES (%s, %s, %s, 'GRINDER', 'CLOSED_AI', 'common', %s, 'Qm', %s, %s, "
+            "NOW() - INTERVAL '1 minute')",
+            (token_id, f"DEV-{token_id}", "0x" + "a" * 40, token_id * 7919,
+             cols.get("energy", 8), cols.get("balance_nxt", 500)),
+        )
+
+
+@pytest.fixture()
+def split(fresh_db):
+    """schema.sql with three devs, then the migration: (conn, the devs
+    rows as they were before it)."""
+    c = fresh_db
+    with c.cursor() as cur:
+        cur.execute((BACKEND_ROOT / "db" / "migration_admin_logs.sql").read_text())
+        _seed(cur, (1, 2, 3))
+        cur.execute("SELECT * FROM devs ORDER BY token_id")
+        before = cur.fetchall()
+        cur.execute(MIGRATION.read_text())
+    c.autocommit = False
+    yield c, before
+    tick_writer.use_dev_state_table("devs")
+
+
+def test_migration_moves_hot_columns_and_keeps_every_row(split):
+    conn, before = split
+    with conn.cursor() as cur:
+        cur.execute("SELECT relname, relkind, reloptions FROM pg_class "
+                    "WHERE relname IN ('devs', 'dev_profile', 'dev_runtime') "
+                    "AND relnamespace = 'nx'::regnamespace")
+        rels = {r["relname"]: r for r in cur.fetchall()}
+        cur.execute("SELECT * FROM devs ORDER BY token_id")
+        after = cur.fetchall()
+        cur.execute("SELECT column_name FROM information_schema.columns "
+                    "WHERE table_schema = 'nx' AND table_name = 'dev_runtime'")
+        runtime_cols = {r["column_name"] for r in cur.fetchall()}
+        cur.execute("REFRESH MATERIALIZED VIEW leaderboard")
+        cur.execute("SELECT COUNT(*) AS n FROM leaderboard")
+        ranked = cur.fetchone()["n"]
+
+    assert rels["devs"]["relkind"] == "v"
+    assert rels["dev_profile"]["relkind"] == rels["dev_runtime"]["relkind"] == "r"
+    assert "fillfactor=70" in rels["dev_runtime"]["reloptions"]
+    assert {"energy", "balance_nxt", "next_cycle_at", "last_action_at"} <= runtime_cols
+    assert not {"name", "owner_address", "stat_coding", "sync_status"} & runtime_cols
+    # Same rows and values; the migration only adds the sync_* columns
+    # and drops the legacy devs_burned.
+    assert set(after[0]) == set(before[0]) - {"devs_burned"} | {"sync_status", "sync_tx_hash",
+                                                                 "sync_started_at"}
+    common = set(before[0]) & set(after[0])
+    assert [{k: r[k] for k in common} for r in after] == [{k: r[k] for k in common} for r in before]
+    assert ranked == 3
+
+    with pytest.raises(psycopg2.Error, match="already applied"):
+        with conn.cursor() as cur:
+            cur.execute(MIGRATION.read_text())
+    conn.rollback()
+
+
+def test_view_writes_keep_defaults_and_apply_deltas(split):
+    conn, before = split
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+                    "rarity_tier, personality_seed, ipfs_hash) VALUES "
+                    "(4, 'DEV-4', %s, 'FED', 'CLOSED_AI', 'common', 4, 'Qm') "
+                    "RETURNING energy, balance_nxt, mood", ("0x" + "a" * 40,))
+        assert dict(cur.fetchone()) == {"energy": 10, "balance_nxt": 2000, "mood": "neutral"}
+        cur.execute("UPDATE devs SET name = 'RENAMED', sync_status = 'syncing' "
+                    "WHERE token_id = 4 RETURNING name, updated_at > %s AS touched",
+                    (before[0]["updated_at"],))
+        assert dict(cur.fetchone()) == {"name": "RENAMED", "touched": True}
+        cur.execute("DELETE FROM devs WHERE token_id = 4")
+        cur.execute("SELECT COUNT(*) AS n FROM dev_runtime WHERE token_id = 4")
+        assert cur.fetchone()["n"] == 0
+    conn.commit()
+
+    # The engine credits dev 1 directly while an API-style write through
+    # the view is in flight: the view's UPDATE read 500, waits for the
+    # row, then applies its -100 on top of the +50 instead of writing 400.
+    engine = connect()
+    with engine.cursor() as cur:
+        cur.execute("UPDATE dev_runtime SET balance_nxt = balance_nxt + 50 WHERE token_id = 1")
+    api = threading.Thread(target=_spend_through_view, args=(1, 100))
+    api.start()
+    time.sleep(0.3)
+    engine.commit()
+    engine.close()
+    api.join(5)
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT balance_nxt FROM devs WHERE token_id = 1")
+        assert cur.fetchone()["balance_nxt"] == 450
+
+
+def _spend_through_view(token_id, amount):
+    c = connect()
+    with c.cursor() as cur:
+        cur.execute("UPDATE devs SET balance_nxt = balance_nxt - %s WHERE token_id = %s",
+                    (amount, token_id))
+    c.commit()
+    c.close()
+
+
+def test_engine_writes_runtime_rows_as_hot_updates(split):
+    conn, _ = split
+    assert engine_mod.use_dev_layout(conn) == "dev_runtime"
+    assert "UPDATE dev_runtime AS d" in tick_writer.DEV_UPDATE_SQL
+
+    claimed = engine_mod.fetch_due_devs(conn, skip_locked=True)
+    assert [d["token_id"] for d in claimed] == [1, 2, 3]
+    assert claimed[0]["name"] == "DEV-1"
+    w = TickWriter()
+    now = engine_mod.sim_clock.now()
+    for dev in claimed:
+        w.energy(dev["token_id"], -2)
+        w.add(dev["token_id"], balance_nxt=5, total_earned=5)
+        w.schedule(dev["token_id"], action="CHAT", detail="{}", at=now, message="gm",
+                   channel="trollbox", next_cycle_at=now + timedelta(minutes=10), interval=600)
+    assert w.flush(conn.cursor(), fallback=False) == 3
+    engine_mod.pay_salaries(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT n_tup_upd, n_tup_hot_upd FROM pg_stat_xact_user_tables "
+                    "WHERE relid = 'dev_runtime'::regclass")
+        stats = cur.fetchone()
+        cur.execute("SELECT COUNT(*) AS n FROM pg_stat_xact_user_tables "
+                    "WHERE relid = 'dev_profile'::regclass AND n_tup_upd > 0")
+        profile_writes = cur.fetchone()["n"]
+    conn.commit()
+
+    assert stats["n_tup_upd"] == 6 and stats["n_tup_hot_upd"] == 6
+    assert profile_writes == 0
+    with conn.cursor() as cur:
+        cur.execute("SELECT token_id, energy, balance_nxt, last_message FROM devs ORDER BY token_id")
+        rows = cur.fetchall()
+        cur.execute("SELECT dev_name, nxt_cost FROM actions WHERE action_type = 'RECEIVE_SALARY' "
+                    "ORDER BY dev_id")
+        paid = cur.fetchall()
+    assert [(r["energy"], r["last_message"]) for r in rows] == [(6, "gm")] * 3
+    assert [p["dev_name"] for p in paid] == ["DEV-1", "DEV-2", "DEV-3"]
+    assert {r["balance_nxt"] for r in rows} == {505 + paid[0]["nxt_cost"]}
+
+
+
+@pytest.fixture()
+def api_db(monkeypatch):
+    """The API's pool, with canonical traits absent (legacy generator)."""
+    from backend.api import deps
+    from backend.api.routes import devs as devs_routes
+    monkeypatch.setattr(devs_routes, "build_canonical_mint_data", lambda cur, token_id: None)
+    deps.init_db_pool(minconn=1, maxconn=4)
+    yield devs_routes
+    deps.close_db_pool()
+
+
+@pytest.mark.parametrize("migrated", [False, True], ids=["table", "view"])
+def test_concurrent_on_demand_insert_is_a_no_op(fresh_db, api_db, migrated):
+    # First loads of the same missing dev race: while one insert is
+    # uncommitted the other waits on token_id and then does nothing,
+    # on the plain table (ON CONFLICT) and on the view (its trigger).
+    first = fresh_db
+    if migrated:
+        with first.cursor() as cur:
+            cur.execute(MIGRATION.read_text())
+    first.autocommit = False
+    with first.cursor() as cur:
+        _seed(cur, (9,))
+    errors = []
+
+    def load():
+        try:
+            api_db._insert_dev_on_demand(9, "0x" + "b" * 40)
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    second = threading.Thread(target=load)
+    second.start()
+    time.sleep(0.3)
+    first.commit()
+    second.join(5)
+
+    assert not second.is_alive() and errors == []
+    with first.cursor() as cur:
+        cur.execute("SELECT token_id, name, owner_address FROM devs")
+        rows = cur.fetchall()
+    assert [dict(r) for r in rows] == [{"token_id": 9, "name": "DEV-9",
+                                        "owner_address": "0x" + "a" * 40}]
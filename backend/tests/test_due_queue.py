@@ -0,0 +1,120 @@
+"""In-process dev schedule (``due_queue.DueQueue``).
+
+The engine sleeps until the next dev is due instead of polling
+Postgres every second. The heap part is pure; the scheduler part runs
+``run_scheduler_tick(due_queue=...)`` against the real
+``backend/db/schema.sql``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.engine import engine as engine_mod
+from due_queue import DueQueue
+
+
+def test_pop_due_in_order_with_limit():
+    q = DueQueue()
+    now = time.time()
+    q.push(3, now - 1)
+    q.push(1, now - 3)
+    q.push(2, now - 2)
+    q.push(4, now + 60)
+    assert q.pop_due(2, now=now) == [1, 2]
+    assert q.pop_due(10, now=now) == [3]
+    assert q.next_due() == pytest.approx(now + 60)
+    assert len(q) == 1
+
+
+def test_push_reschedules_and_discard_removes():
+    q = DueQueue()
+    now = time.time()
+    q.push(1, now - 5)
+    q.push(1, now + 30)          # rescheduled: the old heap entry is stale
+    q.push(2, now - 1)
+    q.discard(2)
+    assert q.pop_due(10, now=now) == []
+    assert q.next_due() == pytest.approx(now + 30)
+
+
+def test_pop_due_respects_owned_shards():
+    q = DueQueue(shard_count=4)
+    now = time.time()
+    for token_id in range(1, 9):
+        q.push(token_id, now - token_id)
+    assert sorted(q.pop_due(10, shards=(4, (1, 3)), now=now)) == [1, 3, 5, 7]
+    assert q.next_due(shards=(4, (1, 3))) is None
+    assert len(q) == 4
+
+
+def test_wait_wakes_on_earlier_push():
+    q = DueQueue()
+    q.push(1, time.time() + 60)
+    threading.Timer(0.1, q.push, args=(2, time.time())).start()
+    started = time.time()
+    assert q.wait(5.0)
+    assert time.time() - started < 2
+
+
+@pytest.fixture()
+def conn(fresh_db):
+    with fresh_db.cursor() as cur:
+        cur.execute("""
+            INSERT INTO players (wallet_address, corporation)
+            VALUES ('0x' || lpad('1', 40, '0'), 'CLOSED_AI')
+        """)
+        # 1-5 due, 6-8 due later, 9 due but out of energy
+        cur.execute("""
+            INSERT INTO devs (token_id, name, owner_address, archetype, corporation,
+                              rarity_tier, personality_seed, ipfs_hash, energy,
+                              balance_nxt, next_cycle_at)
+            SELECT g, 'DEV-' || g, '0x' || lpad('1', 40, '0'), '10X_DEV', 'CLOSED_AI',
+                   'common', g * 7919, 'Qm', CASE WHEN g = 9 THEN 0 ELSE 9 END, 2000,
+                   CASE WHEN g BETWEEN 6 AND 8 THEN NOW() + INTERVAL '1 hour'
+                        ELSE NOW() - INTERVAL '1 minute' END
+            FROM generate_series(1, 9) g
+        """)
+    fresh_db.autocommit = False
+    return fresh_db
+
+
+def test_reload_skips_unschedulable_devs(conn):
+    q = DueQueue()
+    assert q.reload(conn.cursor()) == 8
+    assert sorted(q.pop_due(100)) == [1, 2, 3, 4, 5]
+
+
+def test_tick_processes_due_ids_and_requeues_them(conn, monkeypatch):
+    q = DueQueue()
+    q.reload(conn.cursor())
+    conn.commit()
+
+    assert engine_mod.run_scheduler_tick(conn, due_queue=q) == 5
+    with conn.cursor() as cur:
+        cur.execute("SELECT token_id, next_cycle_at FROM devs WHERE token_id <= 5")
+        db_next = {r["token_id"]: r["next_cycle_at"].timestamp() for r in cur.fetchall()}
+    conn.commit()
+    assert len(q) == 8
+    assert q.pop_due(100) == []
+    nxt = q.next_due()
+    assert nxt == pytest.approx(min(db_next.values()))
+
+    # Nothing due → no query at all.
+    def _no_db(_conn):
+        raise AssertionError("idle tick touched the database")
+    monkeypatch.setattr(engine_mod, "get_cursor", _no_db)
+    assert engine_mod.run_scheduler_tick(conn, due_queue=q) == 0
+
+
+def test_tick_requeues_ids_the_db_has_due_later(conn):
+    q = DueQueue()
+    q.push(6, datetime.now(timezone.utc) - timedelta(seconds=1))   # DB says 1h ahead
+    q.push(9, datetime.now(timezone.utc) - timedelta(seconds=1))   # out of energy
+    assert engine_mod.run_scheduler_tick(conn, due_queue=q) == 0
+    assert len(q) == 1
+    assert q.next_due() > time.time() + 3000
@@ -94,6 +94,7 @@ CREATE TABLE devs (
     caffeine        SMALLINT NOT NULL DEFAULT 50,
     social_vitality SMALLINT NOT NULL DEFAULT 50,
     knowledge       SMALLINT NOT NULL DEFAULT 50,
+    vitals_settled_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     bugs_shipped    INTEGER NOT NULL DEFAULT 0
 );
 
@@ -266,6 +267,45 @@ def test_salary_shadow_write_creates_ledger_entry(clean, monkeypatch):
     by_tid = {r["dev_token_id"]: r for r in rows}
     assert by_tid[1]["balance_after"] > 100
     assert by_tid[2]["balance_after"] > 200
+    with deps.get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT token_id, balance_nxt FROM devs")
+            balances = {r["token_id"]: r["balance_nxt"] for r in cur.fetchall()}
+    assert {t: r["balance_after"] for t, r in by_tid.items()} == balances
+    # Same key ledger_insert would build for this dev.
+    r = by_tid[1]
+    assert r["idempotency_key"] == ledger_mod._make_idempotency_key(
+        "salary", "salary_batches", r["ref_id"], 1, r["delta_nxt"])
+
+
+def test_salary_ledger_follows_the_rows_actually_paid(clean, monkeypatch):
+    # Dev 2 is activated by another transaction between the salary
+    # UPDATE and the ledger write: it was not paid, so it gets no row.
+    _seed_devs([
+        (1, "alice", WALLET_A, "10X_DEV", 100),
+        (2, "bob",   WALLET_B, "LURKER",  200),
+    ])
+    with deps.get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE devs SET status = 'retired' WHERE token_id = 2")
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "true")
+    real_insert = engine_mod.ledger_insert_dev_batch
+
+    def racing_insert(cursor, **kwargs):
+        other = _raw_connect()
+        with other.cursor() as cur:
+            cur.execute("UPDATE nx.devs SET status = 'active' WHERE token_id = 2")
+        other.commit()
+        other.close()
+        return real_insert(cursor, **kwargs)
+
+    monkeypatch.setattr(engine_mod, "ledger_insert_dev_batch", racing_insert)
+    with deps.get_db() as conn:
+        assert engine_mod.pay_salaries(conn) == 1
+
+    rows = _ledger_rows()
+    assert [(r["dev_token_id"], r["balance_after"]) for r in rows] == [
+        (1, 100 + rows[0]["delta_nxt"])]
 
 
 def test_salary_duplicate_same_hour_is_idempotent(clean, monkeypatch):
@@ -328,10 +368,11 @@ def test_ledger_insert_failure_does_not_break_salary(clean, monkeypatch):
     _seed_devs([(1, "alice", WALLET_A, "10X_DEV", 100)])
     monkeypatch.setenv("LEDGER_SHADOW_WRITE", "true")
 
-    def exploding_insert(*args, **kwargs):
-        raise RuntimeError("ledger on fire")
+    def exploding_insert(cursor, *args, **kwargs):
+        # Fail mid-statement so the savepoint has real work to undo.
+        cursor.execute("SELECT 1/0")
 
-    monkeypatch.setattr(engine_mod, "ledger_insert", exploding_insert)
+    monkeypatch.setattr(engine_mod, "ledger_insert_dev_batch", exploding_insert)
 
     with deps.get_db() as conn:
         # Must not raise — the shadow write is best-effort.
@@ -346,6 +387,51 @@ def test_ledger_insert_failure_does_not_break_salary(clean, monkeypatch):
     assert bal > 100
 
 
+def test_salary_pays_without_touching_vitals(clean, monkeypatch):
+    # Vitals decay is lazy (engine/vitals.py, covered in test_vitals.py):
+    # the cron only moves balances.
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "false")
+    cols = ("token_id", "status", "balance_nxt", "total_earned", "energy", "pc_health",
+            "caffeine", "social_vitality", "knowledge", "bugs_shipped")
+    devs = []
+    tid = 0
+    for status in ("active", "on_mission", "retired"):
+        for vital in (0, 1, 12, 13, 14, 15, 16, 24, 25, 26, 27, 28, 29, 30, 31, 50):
+            tid += 1
+            devs.append(dict(zip(cols, (tid, status, 100, 100, vital % 11, vital,
+                                        vital, vital, vital, 3))))
+    _seed_devs([(d["token_id"], f"d{d['token_id']}", WALLET_A, "GRINDER", 100) for d in devs])
+    with deps.get_db() as conn:
+        with conn.cursor() as cur:
+            for d in devs:
+                cur.execute(
+                    "UPDATE devs SET status = %s, energy = %s, pc_health = %s, caffeine = %s, "
+                    "social_vitality = %s, knowledge = %s, bugs_shipped = %s, total_earned = %s "
+                    "WHERE token_id = %s",
+                    (d["status"], d["energy"], d["pc_health"], d["caffeine"],
+                     d["social_vitality"], d["knowledge"], d["bugs_shipped"],
+                     d["total_earned"], d["token_id"]),
+                )
+
+    with deps.get_db() as conn:
+        paid = engine_mod.pay_salaries(conn)
+    assert paid == 32
+
+    with deps.get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT {', '.join(cols)} FROM devs ORDER BY token_id")
+            got = [dict(r) for r in cur.fetchall()]
+            cur.execute("SELECT COUNT(*) AS n FROM actions WHERE action_type = 'RECEIVE_SALARY'")
+            assert cur.fetchone()["n"] == 32
+    salary = engine_mod.SALARY_PER_INTERVAL
+    expected = [
+        {**d, "balance_nxt": d["balance_nxt"] + salary, "total_earned": d["total_earned"] + salary}
+        if d["status"] in ("active", "on_mission") else d
+        for d in devs
+    ]
+    assert got == expected
+
+
 # ---------------------------------------------------------------------------
 # The other 3 callsites — contract test
 #
@@ -0,0 +1,98 @@
+"""Engine metrics (``metrics``): Prometheus text rendering, the
+since-last-summary window and the /metrics endpoint. Pure, no DB."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+ENGINE_DIR = BACKEND_ROOT / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+import metrics  # noqa: E402
+from metrics import Registry  # noqa: E402
+
+
+def test_render_is_prometheus_text():
+    reg = Registry()
+    hist = reg.histogram("x_seconds", "Phase time", ("phase",), buckets=(0.1, 1.0))
+    count = reg.counter("x_total", "Things", ("kind",))
+    gauge = reg.gauge("x_backlog", "Backlog")
+    hist.observe(0.05, "tick")
+    hist.observe(0.5, "tick")
+    hist.observe(5.0, "tick")
+    count.inc("CHAT")
+    count.inc("CHAT", amount=2)
+    gauge.set(7)
+
+    lines = reg.render().splitlines()
+    assert "# TYPE x_seconds histogram" in lines
+    assert 'x_seconds_bucket{phase="tick",le="0.1"} 1' in lines
+    assert 'x_seconds_bucket{phase="tick",le="1.0"} 2' in lines
+    assert 'x_seconds_bucket{phase="tick",le="+Inf"} 3' in lines
+    assert 'x_seconds_sum{phase="tick"} 5.55' in lines
+    assert 'x_seconds_count{phase="tick"} 3' in lines
+    assert 'x_total{kind="CHAT"} 3' in lines
+    assert "x_backlog 7" in lines
+    with pytest.raises(ValueError):
+        count.inc()
+
+
+def test_summary_covers_only_the_window():
+    reg = Registry()
+    hist = reg.histogram("h", "h", ("phase",))
+    count = reg.counter("c", "c")
+    hist.observe(0.2, "tick")
+    hist.observe(0.4, "tick")
+    count.inc(amount=5)
+
+    first = reg.summary()
+    assert first["h"] == {"tick": {"count": 2, "avg": 0.3, "max": 0.4}}
+    assert first["c"] == 5
+
+    count.inc()
+    second = reg.summary()
+    assert second["h"] == {} and second["c"] == 1
+    assert "c 6" in reg.render()  # the exported counter stays cumulative
+
+
+def test_timed_is_per_call_and_thread_safe():
+    before = metrics.PHASE_SECONDS.count("test_phase")
+
+    @metrics.timed("test_phase")
+    def work():
+        return 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with metrics.timed("test_phase"):
+        pass
+    assert metrics.PHASE_SECONDS.count("test_phase") == before + 9
+
+
+def test_endpoint_serves_metrics_and_runs_collect():
+    calls = []
+    server = metrics.start_server(0, collect=lambda: calls.append(1), host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE nx_engine_phase_seconds histogram" in body
+        assert calls == [1]
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
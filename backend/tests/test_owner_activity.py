@@ -0,0 +1,130 @@
+"""Dormant-owner throttling (``owner_activity``).
+
+Devs of owners unseen for OWNER_DORMANT_HOURS get CYCLE_OWNER_OFFLINE as
+their next interval; a returning owner wakes them and gets a catch-up
+summary once. The DB tests run against the real ``backend/db/schema.sql``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.engine import engine as engine_mod
+import metrics
+import owner_activity
+
+
+AWAY, HERE = "0x" + "a" * 40, "0x" + "b" * 40
+
+
+@pytest.fixture()
+def conn(fresh_db):
+    """Owner AWAY last seen 3 days ago with devs 1-2, HERE seen now with dev 3."""
+    c = fresh_db
+    with c.cursor() as cur:
+        cur.execute("INSERT INTO players (wallet_address, corporation, last_active_at) VALUES "
+                    "(%s, 'CLOSED_AI', NOW() - INTERVAL '3 days'), (%s, 'CLOSED_AI', NOW())",
+                    (AWAY, HERE))
+        for token_id, owner in ((1, AWAY), (2, AWAY), (3, HERE)):
+            cur.execute(
+                "INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+                "rarity_tier, personality_seed, ipfs_hash, energy, next_cycle_at) "
+                "VALUES (%s, %s, %s, 'GRINDER', 'CLOSED_AI', 'common', %s, 'Qm', 9, "
+                "NOW() - INTERVAL '1 minute')",
+                (token_id, f"DEV-{token_id}", owner, token_id * 7919),
+            )
+    c.autocommit = False
+    return c
+
+
+def test_is_dormant_needs_known_activity_older_than_the_threshold():
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    hours = owner_activity.OWNER_DORMANT_HOURS
+    assert owner_activity.is_dormant(now - timedelta(hours=hours), now)
+    assert not owner_activity.is_dormant(now - timedelta(hours=hours) + timedelta(minutes=1), now)
+    assert not owner_activity.is_dormant(None, now)
+
+
+def test_devs_of_dormant_owners_cycle_hourly(conn):
+    throttled = metrics.DORMANT_CYCLES.value()
+
+    assert engine_mod.run_scheduler_tick(conn) == 3
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT token_id, cycle_interval_sec, "
+                    "EXTRACT(EPOCH FROM next_cycle_at - NOW())::int AS due_in FROM devs "
+                    "ORDER BY token_id")
+        rows = {r["token_id"]: r for r in cur.fetchall()}
+    assert rows[1]["cycle_interval_sec"] == rows[2]["cycle_interval_sec"] == engine_mod.CYCLE_OWNER_OFFLINE
+    assert rows[1]["due_in"] > engine_mod.CYCLE_OWNER_OFFLINE - 60
+    assert rows[3]["cycle_interval_sec"] < engine_mod.CYCLE_OWNER_OFFLINE
+    assert metrics.DORMANT_CYCLES.value() == throttled + 2
+
+
+def test_returning_owner_wakes_devs_and_gets_one_catch_up(conn):
+    with conn.cursor() as cur:
+        cur.execute("UPDATE devs SET next_cycle_at = NOW() + INTERVAL '50 minutes'")
+        cur.execute("""
+            INSERT INTO actions (dev_id, dev_name, archetype, action_type, details, nxt_cost)
+            VALUES (1, 'DEV-1', 'GRINDER', 'RECEIVE_SALARY', '{}', 12),
+                   (2, 'DEV-2', 'GRINDER', 'RECEIVE_SALARY', '{}', 12),
+                   (1, 'DEV-1', 'GRINDER', 'CHAT', '{}', 0),
+                   (3, 'DEV-3', 'GRINDER', 'CHAT', '{}', 0)
+        """)
+        summary = owner_activity.touch_owner(cur, AWAY)
+        assert owner_activity.touch_owner(cur, AWAY) is None
+        assert owner_activity.touch_owner(cur, HERE) is None
+        cur.execute("SELECT token_id, next_cycle_at <= clock_timestamp() AS awake "
+                    "FROM devs ORDER BY token_id")
+        awake = [r["awake"] for r in cur.fetchall()]
+        cur.execute("SELECT player_address, body FROM notifications WHERE type = 'catch_up'")
+        notes = cur.fetchall()
+        cur.execute("SELECT last_active_at > NOW() - INTERVAL '1 minute' AS fresh "
+                    "FROM players WHERE wallet_address = %s", (AWAY,))
+        fresh = cur.fetchone()["fresh"]
+    conn.commit()
+
+    assert summary == {"away_hours": 72, "devs": 2, "actions": {"CHAT": 1}, "salary_nxt": 24}
+    assert awake == [True, True, False]
+    assert [n["player_address"] for n in notes] == [AWAY]
+    assert "3 days" in notes[0]["body"] and "24 $NXT" in notes[0]["body"]
+    assert fresh
+
+
+@pytest.fixture()
+def api_pool(conn):
+    from backend.api import deps
+    deps.init_db_pool(minconn=1, maxconn=2)
+    yield
+    deps.close_db_pool()
+
+
+def test_polling_notifications_is_what_brings_an_owner_back(conn, api_pool):
+    from backend.api.routes import notifications, players
+
+    with conn.cursor() as cur:
+        cur.execute("UPDATE devs SET next_cycle_at = NOW() + INTERVAL '50 minutes'")
+    conn.commit()
+
+    # Anyone can load a profile: it is not activity.
+    asyncio.run(players.get_player(AWAY))
+    with conn.cursor() as cur:
+        cur.execute("SELECT last_active_at < NOW() - INTERVAL '1 day' AS away "
+                    "FROM players WHERE wallet_address = %s", (AWAY,))
+        assert cur.fetchone()["away"]
+    conn.rollback()
+
+    notes = asyncio.run(notifications.get_notifications(AWAY))
+
+    assert [n["type"] for n in notes] == ["catch_up"]
+    with conn.cursor() as cur:
+        cur.execute("SELECT token_id FROM devs WHERE next_cycle_at <= clock_timestamp() "
+                    "ORDER BY token_id")
+        assert [r["token_id"] for r in cur.fetchall()] == [1, 2]
+        cur.execute("SELECT last_active_at > NOW() - INTERVAL '1 minute' AS fresh "
+                    "FROM players WHERE wallet_address = %s", (AWAY,))
+        assert cur.fetchone()["fresh"]
+    conn.rollback()
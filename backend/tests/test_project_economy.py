@@ -0,0 +1,59 @@
+"""Economy projection (``scripts/project_economy.py``): a small run must
+balance its books, report every archetype, and respond to --set / --event.
+Pure NumPy, no DB."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine", BACKEND_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+
+import project_economy  # noqa: E402
+
+
+def test_sources_minus_sinks_is_the_supply_change():
+    report = project_economy.project(n_devs=500, days=2, seed=3)
+
+    change = sum(report["sources"].values()) - sum(report["sinks"].values())
+    assert change == report["supply"]["change"]
+    assert [d["day"] for d in report["daily"]] == [0, 1, 2]
+    assert report["daily"][-1]["supply"] == report["supply"]["end"]
+    assert report["sources"]["salary"] > 0
+    assert sum(report["actions"].values()) > 500
+    assert sum(a["devs"] for a in report["by_archetype"].values()) == 500
+    assert set(report["by_archetype"]) == set(project_economy.engine.PERSONALITY_MATRIX)
+
+
+def test_overrides_and_pinned_event_change_the_projection():
+    salary = project_economy.default_params()["SALARY_PER_INTERVAL"]
+    params = project_economy.parse_overrides([f"SALARY_PER_INTERVAL={2 * salary}"])
+    base = project_economy.project(n_devs=200, days=1, seed=5)
+    raised = project_economy.project(n_devs=200, days=1, seed=5, params=params)
+    assert raised["sources"]["salary"] == 2 * base["sources"]["salary"]
+    assert project_economy.compare(base, raised)["sources"]["salary"] == base["sources"]["salary"]
+
+    title = project_economy.default_params()["WEEKLY_EVENTS"][0]["title"]
+    pinned = project_economy.project(n_devs=200, days=1, seed=5, event=title)
+    assert pinned["weekly_events"] == [{"day": 0, "title": title}]
+
+
+def test_parse_overrides_rejects_unknown_names_and_bad_values():
+    with pytest.raises(ValueError):
+        project_economy.parse_overrides(["NOT_A_PARAM=1"])
+    with pytest.raises(ValueError):
+        project_economy.parse_overrides(["SALARY_PER_INTERVAL=twelve"])
+    with pytest.raises(ValueError):
+        project_economy.project(n_devs=10, days=1, event="No Such Week")
@@ -0,0 +1,47 @@
+"""Single-pass prompt classifier (``prompt_system.classify_prompt``).
+
+Must agree with classify_intent / extract_topic / extract_location —
+including first-rule-wins when keywords of several rules appear, and
+keywords that overlap or nest inside each other. Pure, no DB.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+for path in (BACKEND_ROOT / "engine", BACKEND_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from prompt_system import (  # noqa: E402
+    classify_intent,
+    classify_prompt,
+    extract_location,
+    extract_topic,
+)
+from bench_prompt_classifier import build_corpus  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", ("CHAT", None, None)),
+    ("gm", ("CHAT", None, None)),
+    # "dump" is both COMMAND_SELL and QUESTION_MARKET: the earlier rule wins
+    ("market dump incoming", ("COMMAND_SELL", "trading", "THE_PIT")),
+    # "hackathon hall" also contains "hack" (security) and "hall" (governance)
+    ("Go to the HACKATHON HALL", ("COMMAND_MOVE", "security", "HACKATHON_HALL")),
+    ("stake it in the dark web", ("COMMAND_INVEST", "defi", "DARK_WEB")),
+])
+def test_known_prompts(text, expected):
+    assert classify_prompt(text) == expected
+
+
+def test_matches_keyword_loops_on_corpus():
+    for text in build_corpus(3000, seed=19):
+        assert classify_prompt(text) == (
+            classify_intent(text), extract_topic(text), extract_location(text)
+        ), text
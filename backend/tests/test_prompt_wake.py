@@ -0,0 +1,160 @@
+"""Prompt wake-up path (``prompt_wake``).
+
+A prompt makes its dev due now and is published to the engine; ticks
+only look up prompts for devs the listener has seen one for, and look
+up all of them while that set can't be trusted. The DB tests run
+against the real ``backend/db/schema.sql``; Redis is faked.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.engine import engine as engine_mod
+import prompt_wake
+
+
+OWNER = "0x" + "a" * 40
+
+
+@pytest.fixture()
+def conn(fresh_db, monkeypatch):
+    """Devs 1-3 due in 40 minutes (dev 3 out of energy), and a fresh
+    pending-prompt set."""
+    c = fresh_db
+    with c.cursor() as cur:
+        cur.execute("INSERT INTO players (wallet_address, corporation) VALUES (%s, 'CLOSED_AI')",
+                    (OWNER,))
+        for token_id, energy in ((1, 9), (2, 9), (3, 0)):
+            cur.execute(
+                "INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+                "rarity_tier, personality_seed, ipfs_hash, energy, next_cycle_at) "
+                "VALUES (%s, %s, %s, 'GRINDER', 'CLOSED_AI', 'common', %s, 'Qm', %s, "
+                "NOW() + INTERVAL '40 minutes')",
+                (token_id, f"DEV-{token_id}", OWNER, token_id * 7919, energy),
+            )
+    c.autocommit = False
+    monkeypatch.setattr(engine_mod, "pending_prompts", prompt_wake.PendingPrompts())
+    return c
+
+
+def _prompt(cur, token_id, text="ship it"):
+    cur.execute("INSERT INTO player_prompts (player_address, dev_id, prompt_text) "
+                "VALUES (%s, %s, %s)", (OWNER, token_id, text))
+
+
+def test_wake_dev_makes_only_schedulable_devs_due(conn):
+    with conn.cursor() as cur:
+        woken = [prompt_wake.wake_dev(cur, t) for t in (1, 1, 3)]
+    conn.commit()
+
+    assert woken == [True, False, False]
+    assert [d["token_id"] for d in engine_mod.fetch_due_devs(conn)] == [1]
+    conn.rollback()
+
+
+def test_publish_sends_the_token_id_and_survives_a_dead_redis():
+    class FakeRedis:
+        def __init__(self):
+            self.published = []
+
+        def publish(self, channel, msg):
+            self.published.append((channel, msg))
+
+    class DeadRedis:
+        def publish(self, channel, msg):
+            raise ConnectionError("down")
+
+    client = FakeRedis()
+    assert prompt_wake.publish(7, client)
+    assert client.published == [(prompt_wake.CHANNEL, "7")]
+    assert not prompt_wake.publish(7, DeadRedis())
+
+
+def test_ticks_only_look_up_prompts_the_listener_has_seen(conn):
+    pending = engine_mod.pending_prompts
+    with conn.cursor() as cur:
+        _prompt(cur, 1, "before the listener")
+        cur.execute("UPDATE devs SET next_cycle_at = NOW() - INTERVAL '1 minute'")
+    conn.commit()
+    devs = engine_mod.fetch_due_devs(conn)
+
+    # Not subscribed yet: every dev is looked up.
+    assert list(engine_mod._fetch_shared_context(conn, devs)["prompts"]) == [1]
+
+    pending.set_subscribed(True)
+    assert pending.reload(conn.cursor()) == 1
+    with conn.cursor() as cur:
+        _prompt(cur, 2, "not published")
+    assert list(engine_mod._fetch_shared_context(conn, devs)["prompts"]) == [1]
+
+    pending.add(2)
+    assert sorted(engine_mod._fetch_shared_context(conn, devs)["prompts"]) == [1, 2]
+    conn.rollback()
+
+    # Dev 2's prompt was rolled back: looking it up once drops it.
+    assert list(engine_mod._fetch_shared_context(conn, devs)["prompts"]) == [1]
+    assert pending.candidates([1, 2]) == [1]
+
+    # A reconnect loses messages: back to looking up everyone.
+    pending.set_subscribed(False)
+    pending.set_subscribed(True)
+    assert pending.candidates([1, 2]) is None
+    conn.rollback()
+
+
+def test_prompted_dev_answers_on_the_next_tick(conn):
+    pending = engine_mod.pending_prompts
+    pending.set_subscribed(True)
+    pending.reload(conn.cursor())
+    conn.commit()
+    assert engine_mod.run_scheduler_tick(conn) == 0
+
+    with conn.cursor() as cur:
+        _prompt(cur, 2)
+        assert prompt_wake.wake_dev(cur, 2)
+    conn.commit()
+    pending.add(2)   # what the listener does with the published id
+
+    assert engine_mod.run_scheduler_tick(conn) == 1
+    with conn.cursor() as cur:
+        cur.execute("SELECT dev_id, consumed FROM player_prompts")
+        assert [dict(r) for r in cur.fetchall()] == [{"dev_id": 2, "consumed": True}]
+        cur.execute("SELECT COUNT(*) AS n FROM notifications WHERE type = 'prompt_response'")
+        answered = cur.fetchone()["n"]
+    conn.rollback()
+    assert answered == 1
+
+
+def test_dev_failing_mid_tick_keeps_its_prompt(conn, monkeypatch):
+    with conn.cursor() as cur:
+        _prompt(cur, 2)
+        cur.execute("UPDATE devs SET next_cycle_at = NOW() - INTERVAL '1 minute'")
+    conn.commit()
+    execute_action = engine_mod.execute_action
+
+    def failing(c, dev, *args, **kwargs):
+        if dev["token_id"] == 2:
+            raise RuntimeError("boom")
+        return execute_action(c, dev, *args, **kwargs)
+
+    monkeypatch.setattr(engine_mod, "execute_action", failing)
+    assert engine_mod.run_scheduler_tick(conn) == 1
+
+    def answered():
+        with conn.cursor() as cur:
+            cur.execute("SELECT consumed FROM player_prompts")
+            consumed = cur.fetchone()["consumed"]
+            cur.execute("SELECT COUNT(*) AS n FROM notifications WHERE type = 'prompt_response'")
+            notified = cur.fetchone()["n"]
+            cur.execute("SELECT COUNT(*) AS n FROM actions "
+                        "WHERE dev_id = 2 AND details->>'event' = 'prompt_response'")
+            logged = cur.fetchone()["n"]
+        conn.rollback()
+        return consumed, notified, logged
+
+    # Rolled back with the action: the prompt is retried next tick.
+    assert answered() == (False, 0, 0)
+    monkeypatch.setattr(engine_mod, "execute_action", execute_action)
+    assert engine_mod.run_scheduler_tick(conn) == 1
+    assert answered() == (True, 1, 1)
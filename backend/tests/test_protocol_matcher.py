@@ -0,0 +1,75 @@
+"""Protocol-name matcher for prompt processing (``protocol_matcher``).
+
+The Aho-Corasick automaton must give exactly the answer of the old
+linear ``name.lower() in text`` scan over id-ordered names, including
+for names added after the last rebuild. Pure, no DB.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+ENGINE_DIR = BACKEND_ROOT / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+import protocol_matcher  # noqa: E402
+from protocol_matcher import ProtocolMatcher  # noqa: E402
+from prompt_system import extract_protocol_mention, process_prompt  # noqa: E402
+from templates import gen_protocol_name  # noqa: E402
+
+
+def _linear(text, names):
+    return extract_protocol_mention(text, names)
+
+
+def test_matches_linear_scan_on_random_prompts(monkeypatch):
+    monkeypatch.setattr(protocol_matcher, "PENDING_MAX", 50)
+    rng = random.Random(11)
+    names = [gen_protocol_name() for _ in range(600)] + ["Core", "AlphaGuard"]
+    matcher = ProtocolMatcher()
+    for i, name in enumerate(names):
+        matcher.add(name, i)
+    assert matcher._pending and len(matcher._pending) <= 50   # both code paths in play
+
+    for _ in range(2000):
+        words = [rng.choice(["invest in", "sell", "yo", "the"]) for _ in range(3)]
+        words += [rng.choice(names) for _ in range(rng.randint(0, 2))]
+        rng.shuffle(words)
+        text = " ".join(words)
+        if rng.random() < 0.3:
+            text = text.upper()
+        assert matcher.find(text) == _linear(text, names), text
+
+
+def test_overlapping_names_earliest_added_wins():
+    matcher = ProtocolMatcher(["Swap Core", "Core", "Swap"])
+    assert matcher.find("ape into swap core now") == "Swap Core"
+    assert matcher.find("core dump") == "Core"
+    assert matcher.find("nothing here") is None
+
+
+def test_duplicate_ids_counted_once():
+    matcher = ProtocolMatcher()
+    matcher.add("Foo", 1)
+    matcher.add("Foo", 1)
+    matcher.add("FOO", 2)
+    assert len(matcher) == 2
+    assert matcher.find("buy foo") == "Foo"
+
+
+@pytest.mark.parametrize("use_matcher", [False, True])
+def test_process_prompt_accepts_list_or_matcher(use_matcher):
+    names = ["NanoYield Finance", "GhostBurn Network"]
+    known = ProtocolMatcher(names) if use_matcher else names
+    random.seed(4)
+    result = process_prompt("what do you think of ghostburn network?",
+                            {"archetype": "10X_DEV", "mood": "neutral"}, known)
+    assert result["intent"]
+    assert extract_protocol_mention("what about GHOSTBURN NETWORK", known) == "GhostBurn Network"
@@ -0,0 +1,131 @@
+"""Random target picks without ``ORDER BY RANDOM()``.
+
+Engine side: ``sampling.SamplingCache`` keeps active protocol / AI ids
+in memory and confirms each pick with a PK lookup. API side:
+``shop._pick_raid_target`` probes the token_id index from a random
+pivot. Runs against the real ``backend/db/schema.sql``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import psycopg2
+import psycopg2.extras
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+ENGINE_DIR = BACKEND_ROOT / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_HOST", "localhost")
+os.environ.setdefault("NX_DB_PORT", "5432")
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+os.environ.setdefault("NX_DB_USER", "nxtest")
+os.environ.setdefault("NX_DB_PASS", "nxtest")
+os.environ.setdefault("NX_DB_SCHEMA", "nx")
+
+from sampling import IdPool, SamplingCache  # noqa: E402
+from backend.api.routes import shop  # noqa: E402
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.environ["NX_DB_HOST"],
+        port=int(os.environ["NX_DB_PORT"]),
+        dbname=os.environ["NX_DB_NAME"],
+        user=os.environ["NX_DB_USER"],
+        password=os.environ["NX_DB_PASS"],
+        options="-c search_path=nx",
+    )
+
+
+@pytest.fixture()
+def cur():
+    try:
+        conn = _connect()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    conn.autocommit = True
+    c = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    c.execute((BACKEND_ROOT / "db" / "schema.sql").read_text())
+    corps = ["CLOSED_AI", "MISANTHROPIC"]
+    for i in range(1, 21):
+        owner = f"0x{i:040x}"
+        c.execute("INSERT INTO players (wallet_address, corporation) VALUES (%s, %s)",
+                  (owner, corps[i % 2]))
+        c.execute(
+            "INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+            "rarity_tier, personality_seed, ipfs_hash, balance_nxt) "
+            "VALUES (%s, %s, %s, '10X_DEV', %s, 'common', %s, 'Qm', %s)",
+            (i, f"DEV-{i}", owner, corps[i % 2], i, 0 if i % 5 == 0 else 100),
+        )
+    yield c
+    conn.close()
+
+
+def test_id_pool_add_discard_choice():
+    pool = IdPool([1, 2, 3])
+    pool.add(2)
+    assert len(pool) == 3
+    pool.discard(1)
+    pool.discard(99)
+    assert 1 not in pool and len(pool) == 2
+    assert {pool.choice() for _ in range(200)} == {2, 3}
+    pool.discard(2)
+    pool.discard(3)
+    assert pool.choice() is None
+
+
+def test_protocol_pool_refreshes_and_drops_stale_ids(cur):
+    cur.execute("INSERT INTO protocols (name, creator_dev_id, code_quality) "
+                "SELECT 'P' || g, g, 50 FROM generate_series(1, 3) g")
+    cur.execute("INSERT INTO absurd_ais (name, creator_dev_id) VALUES ('AI', 1)")
+    cache = SamplingCache()
+    cache.refresh(cur)
+    assert len(cache.protocols) == 3
+
+    cur.execute("INSERT INTO protocols (name, creator_dev_id, code_quality) "
+                "VALUES ('P4', 4, 50)")
+    cur.execute("UPDATE protocols SET status = 'dead' WHERE id = 1")
+    cache.refresh(cur)                       # incremental: picks up id 4 only
+    assert len(cache.protocols) == 4
+
+    picks = Counter(cache.pick_protocol(cur, "id, name")["id"] for _ in range(400))
+    assert set(picks) == {2, 3, 4}
+    assert 1 not in cache.protocols          # dropped on first stale draw
+
+
+def test_pick_ai_never_returns_own_ai(cur):
+    cur.execute("INSERT INTO absurd_ais (name, creator_dev_id) "
+                "SELECT 'AI' || g, CASE WHEN g = 1 THEN 1 ELSE 2 END FROM generate_series(1, 6) g")
+    cache = SamplingCache()
+    picks = {cache.pick_ai(cur, exclude_creator=1)["creator_dev_id"] for _ in range(100)}
+    assert picks == {2}
+    assert len(cache.ais) == 6               # own AIs are redrawn, not discarded
+
+
+def test_raid_target_is_eligible_and_covers_pool(cur):
+    random.seed(3)
+    hits = Counter()
+    for _ in range(400):
+        target = shop._pick_raid_target(cur, "CLOSED_AI")
+        assert target["corporation"] != "CLOSED_AI"
+        assert target["balance_nxt"] > 0
+        hits[target["token_id"]] += 1
+    assert set(hits) == {i for i in range(1, 21) if i % 2 == 1 and i % 5 != 0}
+
+
+def test_raid_target_none_when_no_one_eligible(cur):
+    cur.execute("UPDATE devs SET balance_nxt = 0 WHERE corporation = 'MISANTHROPIC'")
+    assert shop._pick_raid_target(cur, "CLOSED_AI") is None
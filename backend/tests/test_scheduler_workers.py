@@ -0,0 +1,106 @@
+"""Parallel scheduler workers (``engine.start_scheduler_workers``).
+
+Each worker owns a connection and claims due devs with
+FOR UPDATE SKIP LOCKED, so a backlog is split between workers and no
+dev is processed twice. Runs against the real ``backend/db/schema.sql``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from backend.engine import engine as engine_mod
+from backend.tests.conftest import connect
+
+
+N_DEVS = 240
+
+
+@contextmanager
+def _get_db():
+    conn = connect()
+    try:
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture()
+def seeded(fresh_db):
+    conn = fresh_db
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO players (wallet_address, corporation)
+            SELECT '0x' || lpad(to_hex(g), 40, '0'), 'CLOSED_AI'
+            FROM generate_series(1, %s) g
+        """, (N_DEVS,))
+        cur.execute("""
+            INSERT INTO devs (token_id, name, owner_address, archetype, corporation,
+                              rarity_tier, personality_seed, ipfs_hash, energy,
+                              balance_nxt, next_cycle_at)
+            SELECT g, 'DEV-' || g, '0x' || lpad(to_hex(g), 40, '0'),
+                   (enum_range(NULL::archetype_enum))[1 + g %% 8], 'CLOSED_AI',
+                   'common', g * 7919, 'Qm', 9, 2000, NOW() - INTERVAL '1 minute'
+            FROM generate_series(1, %s) g
+        """, (N_DEVS,))
+        # A few shared protocols + AIs so INVEST / CODE_REVIEW / votes
+        # contend for the same rows across workers.
+        cur.execute("""
+            INSERT INTO protocols (name, creator_dev_id, code_quality)
+            SELECT 'P' || g, g, 80 FROM generate_series(1, 3) g
+        """)
+        cur.execute("""
+            INSERT INTO absurd_ais (name, creator_dev_id)
+            SELECT 'AI' || g, g FROM generate_series(1, 3) g
+        """)
+    return conn
+
+
+def test_workers_drain_backlog_without_double_processing(seeded, caplog, monkeypatch):
+    # engine.config may have been imported with other DB settings by an
+    # earlier test module — point the workers at the test database.
+    monkeypatch.setattr(engine_mod, "get_db", _get_db)
+    monkeypatch.setattr(engine_mod, "SCHEDULER_BATCH_SIZE", 40)
+    stop = threading.Event()
+    with caplog.at_level(logging.ERROR, logger="nx_engine"):
+        threads = engine_mod.start_scheduler_workers(4, stop)
+        try:
+            deadline = time.time() + 30
+            while time.time() < deadline:
+                with seeded.cursor() as cur:
+                    cur.execute("SELECT COUNT(*) AS n FROM devs WHERE cycles_active = 0")
+                    if cur.fetchone()["n"] == 0:
+                        break
+                time.sleep(0.2)
+        finally:
+            stop.set()
+            for t in threads:
+                t.join(timeout=10)
+
+    with seeded.cursor() as cur:
+        cur.execute("SELECT MIN(cycles_active) AS lo, MAX(cycles_active) AS hi FROM devs")
+        assert cur.fetchone() == {"lo": 1, "hi": 1}
+        cur.execute("SELECT COUNT(*) AS n FROM devs WHERE next_cycle_at <= NOW()")
+        assert cur.fetchone()["n"] == 0
+    assert not [r for r in caplog.records if "deadlock" in r.getMessage().lower()]
+    assert not [r for r in caplog.records if r.getMessage().startswith("Error processing dev")]
+
+
+def test_skip_locked_fetch_skips_claimed_rows(seeded):
+    a, b = connect(), connect()
+    try:
+        first = engine_mod.fetch_due_devs(a, limit=10, skip_locked=True)
+        second = engine_mod.fetch_due_devs(b, limit=10, skip_locked=True)
+        assert len(first) == len(second) == 10
+        assert not {d["token_id"] for d in first} & {d["token_id"] for d in second}
+    finally:
+        a.rollback()
+        b.rollback()
+        a.close()
+        b.close()
@@ -0,0 +1,118 @@
+"""Simulation clock (``sim_clock``) and the virtual-time soak
+(``scripts/soak_engine.py``): a week of engine time must pay every
+salary hour, rotate the weekly event and close / time out NX Market
+markets on the simulated calendar. Rebuilds schema ``nx`` like the
+other DB tests."""
+
+from __future__ import annotations
+
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine", BACKEND_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_HOST", "localhost")
+os.environ.setdefault("NX_DB_PORT", "5432")
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+os.environ.setdefault("NX_DB_USER", "nxtest")
+os.environ.setdefault("NX_DB_PASS", "nxtest")
+os.environ.setdefault("NX_DB_SCHEMA", "nx")
+
+import engine as engine_mod  # noqa: E402
+import sim_clock  # noqa: E402
+import soak_engine  # noqa: E402
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.environ["NX_DB_HOST"],
+        port=int(os.environ["NX_DB_PORT"]),
+        dbname=os.environ["NX_DB_NAME"],
+        user=os.environ["NX_DB_USER"],
+        password=os.environ["NX_DB_PASS"],
+        options="-c search_path=nx",
+    )
+
+
+@contextmanager
+def _get_db():
+    conn = _connect()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def test_virtual_clock_moves_only_when_told():
+    t0 = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+    clock = sim_clock.VirtualClock(t0)
+    previous = sim_clock.install(clock)
+    try:
+        assert sim_clock.is_virtual()
+        assert sim_clock.now() == t0 and sim_clock.time() == t0.timestamp()
+        sim_clock.sleep(90)
+        clock.advance(-5)   # never backwards
+        assert sim_clock.now() == t0 + timedelta(seconds=90)
+    finally:
+        sim_clock.install(previous)
+    assert not sim_clock.is_virtual()
+    assert abs(sim_clock.now() - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+
+def test_soak_runs_a_simulated_week(monkeypatch):
+    try:
+        _connect().close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "false")
+    # engine.config may have been imported with other DB settings by an
+    # earlier test module — point the engine at the test database.
+    monkeypatch.setattr(engine_mod, "get_db", _get_db)
+
+    report = soak_engine.run_soak(devs=12, days=7.5, markets=30, seed_value=5,
+                                  connect=_connect)
+
+    assert not sim_clock.is_virtual()
+    assert report["simulated_days"] == 7.5
+    assert report["wall_sec"] < 120
+    assert report["devs_processed"] > 12
+    # Startup payout plus one per simulated hour.
+    assert report["salary"]["payouts"] in (180, 181)
+    assert report["salary"]["payments"] == 12 * report["salary"]["payouts"]
+    # The seeded event ends on day 7: exactly one rotation, on time.
+    events = report["weekly_events"]
+    assert len(events) == 2 and 6.9 < events[1]["day"] <= 7.1
+
+    end = datetime.fromisoformat(report["end"])
+    with _connect() as conn, conn.cursor() as cur:
+        # Close runs every 5 simulated minutes, timeout hourly.
+        cur.execute("""
+            SELECT COUNT(*) FILTER (WHERE status = 'resolved' AND outcome = 'invalid'),
+                   COUNT(*) FILTER (WHERE close_at <= %(end)s - INTERVAL '30 days 1 hour'),
+                   COUNT(*) FILTER (WHERE close_at <= %(end)s - INTERVAL '30 days'),
+                   COUNT(*) FILTER (WHERE status = 'active'),
+                   COUNT(*) FILTER (WHERE close_at > %(end)s),
+                   COUNT(*) FILTER (WHERE close_at > %(end)s - INTERVAL '5 minutes')
+            FROM nxmarket_markets
+        """, {"end": end})
+        timed_out, due_surely, due_at_most, active, open_surely, open_at_most = cur.fetchone()
+        cur.execute("SELECT MIN(vitals_settled_at) FROM devs")
+        assert cur.fetchone()[0] >= end - timedelta(hours=1)
+    assert 0 < due_surely <= timed_out <= due_at_most
+    assert open_surely <= active <= open_at_most
@@ -0,0 +1,132 @@
+"""Offline storage backend (``storage.MemoryStore``).
+
+execute_action reads and writes through a store: engine.PostgresStore
+in production, MemoryStore for offline runs. The memory store must
+apply a TickWriter buffer with the SQL flush's semantics, and
+run_offline_tick must drive the production decide / execute path over
+it on the simulation clock. Pure Python, no DB.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_ROOT.parent
+for path in (REPO_ROOT, BACKEND_ROOT / "engine"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("NX_DB_NAME", "nxtest_db")
+
+import engine as engine_mod  # noqa: E402
+import sim_clock  # noqa: E402
+from storage import MemoryStore  # noqa: E402
+from tick_writer import TickWriter  # noqa: E402
+
+T0 = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def _dev(store, token_id, **row):
+    return store.add_dev(**{"token_id": token_id, "name": f"DEV-{token_id}",
+                            "owner_address": "0xabc", "archetype": "DEGEN",
+                            "corporation": "CLOSED_AI", "personality_seed": token_id,
+                            "ipfs_hash": f"Qm{token_id}", "next_cycle_at": T0, **row})
+
+
+def test_flush_applies_tick_writer_semantics():
+    store = MemoryStore()
+    _dev(store, 1, energy=9, hours_since_sleep=7)
+    _dev(store, 2, energy=1, balance_nxt=10)
+    pid = store.insert_protocol(1, "P", "d", quality=5, value=100)
+    ai_id = store.insert_ai(2, "A", "d")
+
+    writer = TickWriter()
+    writer.energy(1, 5)                      # clamped to max_energy
+    writer.reset_sleep(1)
+    writer.add(1, hours_since_sleep=1, balance_nxt=-50, total_spent=50)
+    writer.set(1, mood="excited")
+    writer.protocol(1, pid, value=-80, code_quality=-10, investors=1)
+    writer.protocol(1, pid, value=30)        # summed, then floored once
+    writer.vote(1, ai_id, 0.5)
+    writer.action(store.devs[1], "INVEST", {"amount": 50}, 1, 50)
+    writer.energy(2, -3)                     # would go negative ...
+    writer.add(2, balance_nxt=-20)           # ... and so would the balance
+    writer.action(store.devs[2], "CREATE_AI", {}, 2, 20)
+
+    assert store.flush(writer) == 1
+    assert len(writer) == 0
+
+    dev = store.devs[1]
+    assert (dev["energy"], dev["hours_since_sleep"], dev["mood"]) == (10, 1, "excited")
+    assert (dev["balance_nxt"], dev["total_spent"]) == (1950, 50)
+    assert store.protocols[pid]["value"] == 50
+    assert store.protocols[pid]["code_quality"] == 0
+    assert store.protocols[pid]["investor_count"] == 1
+    assert (store.ais[ai_id]["vote_count"], store.ais[ai_id]["weighted_votes"]) == (1, 0.5)
+    # Dev 2's whole tick is dropped, like the balance CHECK + per-dev fallback.
+    assert (store.devs[2]["energy"], store.devs[2]["balance_nxt"]) == (1, 10)
+    assert [a["dev_id"] for a in store.actions] == [1]
+
+
+def test_execute_action_runs_against_the_store():
+    store = MemoryStore()
+    dev = _dev(store, 1)
+    previous = sim_clock.install(sim_clock.VirtualClock(T0))
+    try:
+        created = engine_mod.execute_action(store, dict(dev), "CREATE_PROTOCOL", {})
+        pid = created["details"]["protocol_id"]
+        engine_mod.execute_action(store, dict(store.devs[1]), "INVEST", {})
+        sold = engine_mod.execute_action(store, dict(store.devs[1]), "SELL", {})
+    finally:
+        sim_clock.install(previous)
+
+    assert store.protocols[pid]["creator_dev_id"] == 1
+    assert sold["details"]["protocol_id"] == pid
+    assert store.investments == {} and store.protocols[pid]["investor_count"] == 0
+    dev = store.devs[1]
+    assert dev["protocols_created"] == 1
+    assert dev["total_earned"] == sold["details"]["sold_for"]
+    assert dev["last_action_type"] == "SELL"
+    assert dev["next_cycle_at"] > T0
+    logged = [a["action_type"] for a in store.actions]
+    assert [a for a in logged if a not in ("CHAT", "GET_SABOTAGED")] == ["CREATE_PROTOCOL", "INVEST", "SELL"]
+
+
+def test_offline_ticks_follow_the_simulated_schedule():
+    random.seed(11)
+    store = MemoryStore()
+    for token_id in range(1, 21):
+        _dev(store, token_id, archetype=random.choice(list(engine_mod.PERSONALITY_MATRIX)))
+    clock = sim_clock.VirtualClock(T0)
+    previous = sim_clock.install(clock)
+    try:
+        ticks = []
+        while sim_clock.now() < T0 + timedelta(hours=6):
+            ticks.append(engine_mod.run_offline_tick(store))
+            due = store.next_due()
+            if due is None:
+                break
+            clock.advance((due - sim_clock.now()).total_seconds())
+    finally:
+        sim_clock.install(previous)
+
+    assert len(ticks[0]) == 20
+    results = [r for tick in ticks for r in tick]
+    assert len(results) > 100
+    assert len(Counter(r["action"] for r in results)) >= 5
+    for dev in store.devs.values():
+        assert dev["balance_nxt"] >= 0
+        assert 0 <= dev["energy"] <= dev["max_energy"]
+        assert dev["next_cycle_at"] is None or dev["next_cycle_at"] > T0
+    # Counters the flush maintains agree with the rows they count.
+    holders = Counter(pid for _, pid in store.investments)
+    for pid, protocol in store.protocols.items():
+        assert protocol["investor_count"] == holders[pid]
+    assert sum(a["vote_count"] for a in store.ais.values()) == len(store.votes)
@@ -0,0 +1,64 @@
+"""Precompiled text templates (``templates.Template``) and the batch
+chat generators the scheduler tick uses. Pure, no DB."""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+ENGINE_DIR = BACKEND_ROOT / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+import templates  # noqa: E402
+from templates import Template, gen_chat_messages, gen_chats_by_type  # noqa: E402
+from prompt_system import RESPONSES, process_prompt  # noqa: E402
+
+
+def test_template_render_matches_replace_semantics():
+    t = Template("{corp} vs {rival_corp}: {corp} wins, {unknown} stays")
+    assert t.slots == ("corp", "rival_corp", "unknown")
+    assert t.render({"corp": "Y_AI", "rival_corp": "ZUCK_LABS"}) == \
+        "Y_AI vs ZUCK_LABS: Y_AI wins, {unknown} stays"
+    assert Template("no slots").render({}) == "no slots"
+
+
+def test_generators_leave_no_placeholders():
+    random.seed(5)
+    for _ in range(500):
+        assert "{" not in templates.gen_protocol_description()
+        assert "{" not in templates.gen_ai_description()
+        for arch in templates.CHAT_TEMPLATES:
+            for context in ("idle", "created_protocol", "code_review_bug", "sold"):
+                assert "{" not in templates.gen_chat_message(arch, context, name="X")
+
+
+def test_gen_chat_messages_fills_names_in_order():
+    # every LURKER code_review_bug template has {name}
+    msgs = gen_chat_messages(50, "LURKER", "code_review_bug", names=[f"P{i}" for i in range(50)])
+    assert len(msgs) == 50
+    for i, msg in enumerate(msgs):
+        assert f"P{i}" in msg
+
+
+def test_gen_chats_by_type_keeps_order_and_falls_back_to_idle():
+    random.seed(9)
+    specs = [("drama", "FED", "Y_AI"), ("idle", "LURKER", ""), ("bogus", "DEGEN", ""),
+             ("debate", "GRINDER", ""), ("meme", "DEGEN", "")]
+    out = gen_chats_by_type(specs)
+    assert [t for _, t in out] == ["drama", "idle", "idle", "debate", "meme"]
+    assert "{" not in "".join(m for m, _ in out)
+
+
+def test_process_prompt_fills_every_response_slot():
+    dev = {"mood": "focused", "energy": 7, "balance_nxt": 12345, "protocols_created": 2,
+           "ais_created": 1, "bugs_found": 3, "code_reviews_done": 4}
+    random.seed(2)
+    for arch in RESPONSES:
+        for prompt in ("how are you?", "go to the dark web", "build a defi protocol",
+                       "what do you think of NeoSwap", "great job legend"):
+            result = process_prompt(prompt, {**dev, "archetype": arch}, ["NeoSwap"])
+            assert "{" not in result["response"], result["response"]
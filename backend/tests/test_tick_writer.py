@@ -0,0 +1,368 @@
+"""Set-based tick flush (``tick_writer.TickWriter``).
+
+The scheduler buffers every dev-row update and actions / chat_messages /
+notifications insert for a tick and flushes them in a handful of
+statements. These tests run against the real ``backend/db/schema.sql``
+so the enum casts and CHECK constraints are the production ones.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+import psycopg2.extras
+import pytest
+
+from backend.engine import engine as engine_mod
+from backend.tests.conftest import connect
+from sampling import SamplingCache
+from tick_writer import TickWriter
+
+
+class CountingCursor(psycopg2.extras.RealDictCursor):
+    statements = 0
+
+    def execute(self, query, vars=None):
+        CountingCursor.statements += 1
+        return super().execute(query, vars)
+
+
+@pytest.fixture()
+def conn(db_schema):
+    c = connect()
+    with c.cursor() as cur:
+        cur.execute("TRUNCATE devs, players, actions, chat_messages, notifications, "
+                    "protocols, protocol_investments, absurd_ais, ai_votes, "
+                    "player_prompts, nxt_ledger RESTART IDENTITY CASCADE")
+    c.commit()
+    yield c
+    c.close()
+
+
+def _seed(conn, n: int, **overrides):
+    cols = {"energy": 5, "balance_nxt": 2000, "social_vitality": 30, **overrides}
+    with conn.cursor() as cur:
+        for i in range(1, n + 1):
+            owner = f"0x{i:040x}"
+            cur.execute("INSERT INTO players (wallet_address, corporation) VALUES (%s, 'CLOSED_AI') "
+                        "ON CONFLICT DO NOTHING", (owner,))
+            cur.execute(
+                "INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+                "rarity_tier, personality_seed, ipfs_hash, energy, balance_nxt, social_vitality, "
+                "next_cycle_at) VALUES (%s, %s, %s, %s, 'CLOSED_AI', 'common', %s, 'Qm', %s, %s, %s, "
+                "NOW() - INTERVAL '1 minute')",
+                (i, f"DEV-{i}", owner, list(engine_mod.PERSONALITY_MATRIX)[i % 8], i * 7919,
+                 cols["energy"], cols["balance_nxt"], cols["social_vitality"]),
+            )
+    conn.commit()
+
+
+def _dev(conn, token_id):
+    with conn.cursor() as cur:
+        cur.execute("SELECT * FROM devs WHERE token_id = %s", (token_id,))
+        return cur.fetchone()
+
+
+def _count(conn, table, where="TRUE"):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) AS n FROM {table} WHERE {where}")
+        return cur.fetchone()["n"]
+
+
+def test_flush_applies_deltas_and_clamps(conn):
+    _seed(conn, 2)
+    dev1, dev2 = _dev(conn, 1), _dev(conn, 2)
+    now = datetime.now(timezone.utc)
+
+    w = TickWriter()
+    w.energy(1, -9)                       # floors at 0
+    w.add(1, balance_nxt=-3, total_spent=3, protocols_created=1, hours_since_sleep=1)
+    w.set(1, mood="focused", location="THE_PIT")
+    w.schedule(1, action="CREATE_PROTOCOL", detail="{}", at=now, message="gm",
+               channel="trollbox", next_cycle_at=now + timedelta(seconds=480), interval=480)
+    w.energy(2, 9)                        # caps at max_energy
+    w.reset_sleep(2)
+    w.schedule(2, action="REST", detail="{}", at=now, message=None,
+               channel=None, next_cycle_at=now + timedelta(seconds=720), interval=720)
+    w.action(dev1, "CREATE_PROTOCOL", {"name": "x"}, 3, 3)
+    w.action(dev2, "REST", {"energy_restored": 5})
+    w.chat(dev1, "location", "THE_PIT", "gm", "reaction", 2)
+    w.notification(dev1["owner_address"], "prompt_response", "t", "b", 1)
+
+    assert w.flush(conn.cursor()) == 2
+    assert len(w) == 0
+    conn.commit()
+
+    d1, d2 = _dev(conn, 1), _dev(conn, 2)
+    assert d1["energy"] == 0
+    assert d1["balance_nxt"] == 1997 and d1["total_spent"] == 3
+    assert d1["protocols_created"] == 1 and d1["hours_since_sleep"] == 1
+    assert (d1["mood"], d1["location"]) == ("focused", "THE_PIT")
+    assert d1["last_action_type"] == "CREATE_PROTOCOL" and d1["last_message"] == "gm"
+    assert d1["cycles_active"] == 1 and d1["cycle_interval_sec"] == 480
+    assert d2["energy"] == d2["max_energy"]
+    assert d2["hours_since_sleep"] == 0 and d2["mood"] == dev2["mood"]
+    assert d2["last_message"] is None and d2["last_message_channel"] is None
+    assert _count(conn, "actions") == 2
+    assert _count(conn, "chat_messages", "chat_type = 'reaction' AND social_gain = 2") == 1
+    assert _count(conn, "notifications") == 1
+
+
+def test_flush_falls_back_per_dev_on_constraint_violation(conn):
+    _seed(conn, 2)
+    dev1, dev2 = _dev(conn, 1), _dev(conn, 2)
+
+    w = TickWriter()
+    w.add(1, balance_nxt=-5000)           # violates balance_nxt >= 0
+    w.action(dev1, "INVEST", {})
+    w.add(2, reputation=7)
+    w.action(dev2, "CODE_REVIEW", {})
+    assert w.flush(conn.cursor()) == 1
+    conn.commit()
+
+    assert _dev(conn, 1)["balance_nxt"] == 2000
+    assert _dev(conn, 2)["reputation"] == dev2["reputation"] + 7
+    assert _count(conn, "actions", "dev_id = 1") == 0
+    assert _count(conn, "actions", "dev_id = 2") == 1
+
+
+def test_flush_without_fallback_raises(conn):
+    _seed(conn, 1)
+    w = TickWriter()
+    w.add(1, balance_nxt=-5000)
+    with pytest.raises(psycopg2.errors.CheckViolation):
+        w.flush(conn.cursor(), fallback=False)
+    assert len(w) == 0
+
+
+def test_mixed_energy_signs_rejected():
+    w = TickWriter()
+    w.energy(1, -3)
+    with pytest.raises(ValueError):
+        w.energy(1, 5)
+
+
+def test_scheduler_tick_is_set_based(conn, monkeypatch):
+    _seed(conn, 60)
+    monkeypatch.setattr(engine_mod, "get_cursor",
+                        lambda c: c.cursor(cursor_factory=CountingCursor))
+    CountingCursor.statements = 0
+
+    assert engine_mod.run_scheduler_tick(conn) == 60
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS n FROM devs WHERE next_cycle_at > NOW() AND cycles_active = 1")
+        assert cur.fetchone()["n"] == 60
+    # One actions row per dev at least; never the old 4–10 statements per dev.
+    assert _count(conn, "actions") >= 60
+    assert CountingCursor.statements < 60 * 4
+
+
+def test_execute_action_without_writer_flushes_immediately(conn):
+    _seed(conn, 1, energy=3)
+    dev = _dev(conn, 1)
+    result = engine_mod.execute_action(conn, dev, "REST", {"event_effects": {}})
+    conn.commit()
+
+    assert result["action"] == "REST"
+    assert _dev(conn, 1)["energy"] == 8
+    assert _count(conn, "actions", "action_type = 'REST'") == 1
+
+
+def test_tick_prefetch_resolves_investments_and_prompts(conn, monkeypatch):
+    _seed(conn, 20)
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO protocols (name, creator_dev_id, code_quality) VALUES ('P', 1, 80)")
+        cur.execute("INSERT INTO protocol_investments (dev_id, protocol_id, shares, nxt_invested) "
+                    "SELECT g, 1, 10, 10 FROM generate_series(2, 20, 2) g")
+        for text, age in (("first", 2), ("second", 1)):
+            cur.execute("INSERT INTO player_prompts (dev_id, player_address, prompt_text, created_at) "
+                        "VALUES (3, %s, %s, NOW() - %s * INTERVAL '1 minute')",
+                        (f"0x{3:040x}", text, age))
+    conn.commit()
+    devs = engine_mod.fetch_due_devs(conn)
+
+    shared = engine_mod._fetch_shared_context(conn, devs)
+    assert shared["invested"] == set(range(2, 21, 2))
+    assert list(shared["prompts"]) == [3]
+    assert shared["prompts"][3]["prompt_text"] == "first"
+
+    monkeypatch.setattr(engine_mod, "get_cursor",
+                        lambda c: c.cursor(cursor_factory=CountingCursor))
+    CountingCursor.statements = 0
+    contexts = [engine_mod.build_context(conn, d, shared) for d in devs]
+    assert CountingCursor.statements == 0
+    assert [c["has_investments"] for c in contexts] == [d["token_id"] % 2 == 0 for d in devs]
+    conn.rollback()
+
+    assert engine_mod.run_scheduler_tick(conn) == 20
+    assert _count(conn, "player_prompts", "consumed AND prompt_text = 'first'") == 1
+    assert _count(conn, "player_prompts", "NOT consumed AND prompt_text = 'second'") == 1
+
+
+def _counters(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, investor_count FROM protocols ORDER BY id")
+        protocols = [tuple(r.values()) for r in cur.fetchall()]
+        cur.execute("SELECT id, vote_count, round(weighted_votes::numeric, 2) AS w "
+                    "FROM absurd_ais ORDER BY id")
+        ais = [tuple(r.values()) for r in cur.fetchall()]
+    return protocols, ais
+
+
+def _seed_protocols_and_ais(conn):
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO protocols (name, creator_dev_id, code_quality) "
+                    "VALUES ('P1', 1, 80), ('P2', 2, 80)")
+        cur.execute("INSERT INTO absurd_ais (name, creator_dev_id) VALUES ('A1', 1), ('A2', 2)")
+    conn.commit()
+
+
+def test_invest_sell_and_votes_keep_counters_incrementally(conn, monkeypatch):
+    _seed(conn, 30, balance_nxt=5000)
+    _seed_protocols_and_ais(conn)
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "false")
+    monkeypatch.setattr(engine_mod.random, "random", lambda: 0.0)   # always auto-vote
+    monkeypatch.setattr(engine_mod, "_sampling", SamplingCache())
+    ctx = {"event_effects": {}}
+
+    for round_ in range(3):
+        w = TickWriter()
+        for token_id in range(1, 31):
+            dev = _dev(conn, token_id)
+            action = "SELL" if round_ == 2 and token_id % 3 == 0 else "INVEST"
+            engine_mod.execute_action(conn, dev, action, ctx, w)
+        w.flush(conn.cursor())
+        conn.commit()
+
+    incremental = _counters(conn)
+    assert engine_mod.verify_counters(conn) == {"protocols": 0, "absurd_ais": 0}
+    assert _counters(conn) == incremental
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS n FROM protocol_investments")
+        assert sum(n for _, n in incremental[0]) == cur.fetchone()["n"]
+        cur.execute("SELECT COUNT(*) AS n FROM ai_votes")
+        assert sum(n for _, n, _ in incremental[1]) == cur.fetchone()["n"] > 0
+
+
+def test_verify_counters_repairs_drift(conn):
+    _seed(conn, 4)
+    _seed_protocols_and_ais(conn)
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO protocol_investments (dev_id, protocol_id, shares, nxt_invested) "
+                    "VALUES (3, 1, 5, 5), (4, 1, 5, 5)")
+        cur.execute("INSERT INTO ai_votes (voter_dev_id, ai_id, weight) VALUES (3, 2, 1.5), (4, 2, 0.5)")
+        cur.execute("UPDATE protocols SET investor_count = 7")          # both drifted
+        cur.execute("UPDATE absurd_ais SET vote_count = 2, weighted_votes = 2 WHERE id = 2")  # correct
+    conn.commit()
+
+    assert engine_mod.verify_counters(conn) == {"protocols": 2, "absurd_ais": 0}
+    assert _counters(conn) == ([(1, 2), (2, 0)], [(1, 0, 0), (2, 2, 2)])
+    assert engine_mod.verify_counters(conn) == {"protocols": 0, "absurd_ais": 0}
+
+
+def test_scheduler_tick_records_metrics(conn, monkeypatch):
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "false")
+    _seed(conn, 30)
+    with conn.cursor() as cur:
+        cur.execute("UPDATE devs SET next_cycle_at = NOW() - INTERVAL '1 hour' WHERE token_id <= 5")
+    conn.commit()
+    engine_mod.metrics.REGISTRY.summary()   # start a fresh window
+
+    assert engine_mod.sample_backlog(conn)["backlog"] == 30
+    assert engine_mod.metrics.SCHEDULE_LAG.value() >= 3600
+    assert engine_mod.run_scheduler_tick(conn) == 30
+
+    summary = engine_mod.log_metrics_summary(conn)
+    assert summary["nx_engine_devs_processed_total"] == 30
+    assert sum(summary["nx_engine_actions_total"].values()) == 30
+    phases = summary["nx_engine_phase_seconds"]
+    assert {"tick", "tick_fetch", "tick_prepare", "tick_decide", "tick_execute",
+            "tick_flush"} <= set(phases)
+    assert phases["tick"]["count"] == 1
+    queries = summary["nx_engine_tick_db_queries"]
+    assert 0 < queries["max"] < 30 * 4
+    assert summary["nx_engine_due_backlog"] == 0
+
+
+def test_writer_savepoint_drops_only_later_writes():
+    w = TickWriter()
+    dev = {"token_id": 1, "name": "DEV-1", "archetype": "DEGEN"}
+    w.add(1, balance_nxt=-10)
+    w.action(dev, "INVEST", {}, 1, 10)
+    w.savepoint()
+    w.add(1, balance_nxt=-20)
+    w.add(2, reputation=5)
+    w.action(dev, "SELL", {}, 1, 0)
+    w.vote(1, 7, 1.0)
+    w.rollback_to_savepoint()
+
+    buffered = w.buffered()
+    assert set(buffered["devs"]) == {1}
+    assert buffered["devs"][1]["balance_nxt"] == -10
+    assert [r[3] for _, r in buffered["actions"]] == ["INVEST"]
+    assert buffered["votes"] == []
+
+
+def test_failing_dev_rolls_back_only_itself(conn, monkeypatch):
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "false")
+    _seed(conn, 12)
+    finish_dev = engine_mod.finish_dev
+
+    def flaky(c, dev, action, ctx, prompt_result=None, writer=None):
+        result = finish_dev(c, dev, "CREATE_PROTOCOL", ctx, prompt_result, writer)
+        if dev["token_id"] == 5:
+            engine_mod.get_cursor(c).execute(
+                "UPDATE devs SET reputation = 999 WHERE token_id = 5")
+            raise RuntimeError("boom")
+        return result
+
+    monkeypatch.setattr(engine_mod, "finish_dev", flaky)
+    flushes = engine_mod.metrics.PHASE_SECONDS.count("tick_flush")
+
+    assert engine_mod.run_scheduler_tick(conn, commit_every=5) == 11
+
+    assert engine_mod.metrics.PHASE_SECONDS.count("tick_flush") == flushes + 3
+    failed = _dev(conn, 5)
+    assert failed["reputation"] != 999 and failed["cycles_active"] == 0
+    assert _count(conn, "devs", "token_id = 5 AND next_cycle_at <= NOW()") == 1
+    assert _count(conn, "protocols", "creator_dev_id = 5") == 0
+    assert _count(conn, "actions", "dev_id = 5") == 0
+    assert _count(conn, "devs", "cycles_active = 1") == 11
+    assert _count(conn, "protocols") == 11
+
+
+def test_dev_dropped_at_flush_takes_its_inline_writes_with_it(conn, monkeypatch):
+    # INVEST upserts protocol_investments inline; a dev whose buffered
+    # rows fail (the player spent its balance meanwhile) must not keep
+    # the position without the charge, the action or the counters.
+    monkeypatch.setenv("LEDGER_SHADOW_WRITE", "false")
+    monkeypatch.setattr(engine_mod, "_sampling", SamplingCache())
+    _seed(conn, 6, balance_nxt=5000)
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO protocols (name, creator_dev_id, code_quality) VALUES ('P1', 1, 80)")
+    conn.commit()
+    finish_dev = engine_mod.finish_dev
+
+    def spent(c, dev, action, ctx, prompt_result=None, writer=None):
+        result = finish_dev(c, dev, "INVEST", ctx, prompt_result, writer)
+        if dev["token_id"] == 4:
+            engine_mod.get_cursor(c).execute("UPDATE devs SET balance_nxt = 0 WHERE token_id = 4")
+        return result
+
+    monkeypatch.setattr(engine_mod, "finish_dev", spent)
+
+    assert engine_mod.run_scheduler_tick(conn) == 5
+
+    failed = _dev(conn, 4)
+    assert (failed["balance_nxt"], failed["total_invested"], failed["cycles_active"]) == (5000, 0, 0)
+    assert _count(conn, "protocol_investments", "dev_id = 4") == 0
+    assert _count(conn, "actions", "dev_id = 4") == 0
+    assert _count(conn, "protocol_investments") == 5
+    with conn.cursor() as cur:
+        cur.execute("SELECT investor_count, total_invested FROM protocols")
+        protocol = cur.fetchone()
+        cur.execute("SELECT SUM(total_invested) AS n FROM devs")
+        invested = cur.fetchone()["n"]
+    assert (protocol["investor_count"], protocol["total_invested"]) == (5, invested)
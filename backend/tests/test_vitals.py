@@ -0,0 +1,162 @@
+"""Lazy vitals (``vitals``): closed-form decay vs the hourly cron.
+
+The closed forms must equal applying the old hourly step h times — for
+every weekly event's rates, values on both sides of the social /
+knowledge floors and the bug thresholds — and the SQL settle must
+agree with the Python one. The DB tests run against the real
+``backend/db/schema.sql``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.engine import engine as engine_mod
+from vitals import (
+    apply_vitals, current_energy_sql, decay_rates, elapsed_hours, settle, settle_devs,
+)
+
+
+EVENT_EFFECTS = [{}] + [e["effects"] for e in engine_mod.WEEKLY_EVENTS]
+VALUES = (0, 1, 2, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28, 29, 30, 31, 33, 50, 100)
+
+
+def _hourly(dev: dict, effects: dict) -> dict:
+    """One hour of the old salary-cron decay on an active dev."""
+    mult = effects.get("energy_decay_multiplier", 1.0)
+    d = dict(dev)
+    d["energy"] = max(0, d["energy"] - 1)
+    d["pc_health"] = max(0, d["pc_health"] - max(0, int(2 * effects.get("pc_decay_multiplier", 1.0))))
+    d["caffeine"] = max(0, d["caffeine"] - max(0, int(2 * mult)))
+    d["social_vitality"] = max(0, d["social_vitality"] - max(0, int(1 * mult)))
+    d["knowledge"] = max(0, d["knowledge"] - max(0, int(1 * mult)))
+    if d["social_vitality"] < 25:
+        d["social_vitality"] = min(25, d["social_vitality"] + 2)
+    if d["knowledge"] < 30:
+        d["knowledge"] = min(30, d["knowledge"] + 2)
+    if d["knowledge"] < 15:
+        d["bugs_shipped"] += 2
+    elif d["knowledge"] < 30:
+        d["bugs_shipped"] += 1
+    return d
+
+
+@pytest.mark.parametrize("effects", EVENT_EFFECTS)
+def test_closed_form_matches_hourly_steps(effects):
+    rates = decay_rates(effects)
+    for v in VALUES:
+        dev = {"energy": v, "pc_health": v, "caffeine": v, "social_vitality": v,
+               "knowledge": v, "bugs_shipped": 3}
+        stepped = dict(dev)
+        for h in range(0, 61):
+            assert settle(dev, rates, h) == stepped, (effects, v, h)
+            stepped = _hourly(stepped, effects)
+
+
+def test_elapsed_hours_counts_hour_boundaries():
+    t = datetime(2026, 1, 1, 10, 59, tzinfo=timezone.utc)
+    assert elapsed_hours(t, t + timedelta(minutes=30)) == 1
+    assert elapsed_hours(t - timedelta(minutes=58), t) == 0
+    assert elapsed_hours(t, t + timedelta(hours=5)) == 5
+    assert elapsed_hours(t, t - timedelta(hours=1)) == 0
+
+
+def test_apply_vitals_leaves_non_active_devs_frozen():
+    settled_at = datetime.now(timezone.utc) - timedelta(hours=10)
+    rows = [{"status": "active", "energy": 8, "vitals_settled_at": settled_at},
+            {"status": "on_mission", "energy": 8, "vitals_settled_at": settled_at},
+            {"status": "active", "energy": 8}]
+    apply_vitals(rows, {})
+    assert [r["energy"] for r in rows] == [0, 8, 8]
+
+
+# ---------------------------------------------------------------------------
+# SQL settle
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def conn(fresh_db):
+    fresh_db.autocommit = False
+    return fresh_db
+
+
+def _seed(conn, rows):
+    """rows: (token_id, status, vital, hours since settled)"""
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO players (wallet_address, corporation) VALUES (%s, 'CLOSED_AI')",
+                    ("0x" + "a" * 40,))
+        for token_id, status, v, hours in rows:
+            cur.execute(
+                "INSERT INTO devs (token_id, name, owner_address, archetype, corporation, "
+                "rarity_tier, personality_seed, ipfs_hash, status, energy, pc_health, caffeine, "
+                "social_vitality, knowledge, bugs_shipped, vitals_settled_at) "
+                "VALUES (%s, %s, %s, 'GRINDER', 'CLOSED_AI', 'common', 1, 'Qm', %s, "
+                "%s, %s, %s, %s, %s, 3, NOW() - make_interval(hours => %s))",
+                (token_id, f"DEV-{token_id}", "0x" + "a" * 40, status,
+                 min(v, 15), v, v, v, v, hours),
+            )
+    conn.commit()
+
+
+@pytest.mark.parametrize("effects", EVENT_EFFECTS[:3])
+def test_sql_settle_matches_python(conn, effects):
+    rows, tid = [], 0
+    for status in ("active", "on_mission"):
+        for v in VALUES:
+            for hours in (0, 1, 2, 7, 30):
+                tid += 1
+                rows.append((tid, status, v, hours))
+    _seed(conn, rows)
+    rates = decay_rates(effects)
+
+    with conn.cursor() as cur:
+        settled = {r["token_id"]: r for r in settle_devs(cur, [r[0] for r in rows], effects)}
+    conn.commit()
+
+    assert set(settled) == {r[0] for r in rows if r[3] > 0}
+    for token_id, status, v, hours in rows:
+        dev = {"energy": min(v, 15), "pc_health": v, "caffeine": v,
+               "social_vitality": v, "knowledge": v, "bugs_shipped": 3}
+        if token_id not in settled:
+            continue
+        got = {k: settled[token_id][k] for k in dev}
+        assert got == (settle(dev, rates, hours) if status == "active" else dev), (status, v, hours)
+
+    # Everything is now settled as of this hour: a second pass is a no-op.
+    with conn.cursor() as cur:
+        assert settle_devs(cur, [r[0] for r in rows], effects) == []
+        assert settle_devs(cur, None, effects) == []
+
+
+def test_current_energy_sql_matches_apply_vitals(conn):
+    _seed(conn, [(1, "active", 12, 0), (2, "active", 12, 5), (3, "active", 3, 30),
+                 (4, "on_mission", 12, 5)])
+    now = engine_mod.sim_clock.now()
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT token_id, {current_energy_sql()} AS current, status, energy, "
+                    "vitals_settled_at FROM devs ORDER BY token_id", {"now": now})
+        rows = [dict(r) for r in cur.fetchall()]
+    conn.rollback()
+
+    assert [r["current"] for r in rows] == [r["energy"] for r in apply_vitals(rows, {}, now)]
+    assert [r["current"] for r in rows] == [12, 7, 0, 12]
+
+
+def test_scheduler_tick_drops_devs_decayed_to_zero(conn):
+    _seed(conn, [(1, "active", 3, 5), (2, "active", 10, 5)])
+    with conn.cursor() as cur:
+        cur.execute("UPDATE devs SET next_cycle_at = NOW() - INTERVAL '1 minute'")
+    conn.commit()
+
+    processed = engine_mod.run_scheduler_tick(conn)
+
+    assert processed == 1
+    with conn.cursor() as cur:
+        cur.execute("SELECT token_id, energy, vitals_settled_at > NOW() - INTERVAL '1 minute' AS fresh "
+                    "FROM devs ORDER BY token_id")
+        got = cur.fetchall()
+    assert got[0]["energy"] == 0 and got[0]["fresh"]
+    assert got[1]["fresh"]
@@ -0,0 +1,126 @@
+"""World state cache (``world_state.WorldState``): one query per expiry,
+reload at the earliest ends_at / starts_at, invalidation. Pure, no DB
+or Redis — the cursor is faked and the clock monkeypatched."""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+ENGINE_DIR = BACKEND_ROOT / "engine"
+if str(ENGINE_DIR) not in sys.path:
+    sys.path.insert(0, str(ENGINE_DIR))
+
+import world_state as world_state_mod  # noqa: E402
+from world_state import WorldState  # noqa: E402
+
+
+T0 = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+def _event(event_type, effects, starts, ends):
+    return {"event_type": event_type, "effects": effects,
+            "starts_at": T0 + timedelta(hours=starts), "ends_at": T0 + timedelta(hours=ends)}
+
+
+def _at(monkeypatch, hours):
+    monkeypatch.setattr(world_state_mod, "_now", lambda: (T0 + timedelta(hours=hours)).timestamp())
+
+
+def test_caches_until_earliest_ends_at(monkeypatch):
+    cur = FakeCursor([
+        _event("special", '{"salary_multiplier": 2.0}', -1, 3),   # newest, ends first
+        _event("weekly", {"hack_cost_multiplier": 0.7}, -24, 100),
+    ])
+    ws = WorldState(max_age_sec=86400)
+    _at(monkeypatch, 0)
+    assert ws.effects(cur) == {"salary_multiplier": 2.0}
+    assert ws.effects(cur, "weekly") == {"hack_cost_multiplier": 0.7}
+    _at(monkeypatch, 2.9)
+    assert ws.effects(cur) == {"salary_multiplier": 2.0}
+    assert cur.queries == 1
+
+    cur.rows = cur.rows[1:]
+    _at(monkeypatch, 3.01)
+    assert ws.cached() is None
+    assert ws.effects(cur) == {"hack_cost_multiplier": 0.7}
+    assert cur.queries == 2
+
+
+def test_scheduled_event_expires_cache_at_its_start(monkeypatch):
+    cur = FakeCursor([
+        _event("weekly", {"salary_multiplier": 1.5}, 5, 50),      # not started yet
+        _event("weekly", {"salary_multiplier": 1.25}, -10, 100),
+    ])
+    ws = WorldState(max_age_sec=86400)
+    _at(monkeypatch, 0)
+    assert ws.effects(cur, "weekly") == {"salary_multiplier": 1.25}
+    _at(monkeypatch, 5.01)
+    assert ws.effects(cur, "weekly") == {"salary_multiplier": 1.5}
+    assert cur.queries == 2
+
+
+def test_no_events_and_max_age_backstop(monkeypatch):
+    cur = FakeCursor([])
+    ws = WorldState(max_age_sec=60)
+    _at(monkeypatch, 0)
+    assert ws.effects(cur) == {} and ws.effects(cur, "weekly") == {}
+    _at(monkeypatch, 59 / 3600)
+    ws.effects(cur)
+    assert cur.queries == 1
+    _at(monkeypatch, 61 / 3600)
+    ws.effects(cur)
+    assert cur.queries == 2
+
+
+def test_invalidate_and_publish_force_reload(monkeypatch):
+    class FakeRedis:
+        def __init__(self):
+            self.published = []
+
+        def publish(self, channel, msg):
+            self.published.append(channel)
+
+    cur = FakeCursor([_event("weekly", {}, -1, 10)])
+    ws = WorldState(max_age_sec=86400)
+    _at(monkeypatch, 0)
+    ws.effects(cur)
+    ws.invalidate()
+    ws.effects(cur)
+    client = FakeRedis()
+    assert ws.publish(client)
+    assert client.published == [world_state_mod.CHANNEL]
+    ws.effects(cur)
+    assert cur.queries == 3
+
+
+def test_invalidation_during_load_is_not_overwritten(monkeypatch):
+    ws = WorldState(max_age_sec=86400)
+
+    class RacingCursor(FakeCursor):
+        def execute(self, sql, params=None):
+            super().execute(sql, params)
+            if self.queries == 1:
+                ws.invalidate()   # events rotated while we were reading
+
+    cur = RacingCursor([_event("weekly", {"salary_multiplier": 1.1}, -1, 10)])
+    _at(monkeypatch, 0)
+    assert ws.effects(cur) == {"salary_multiplier": 1.1}
+    assert ws.cached() is None
+    ws.effects(cur)
+    assert ws.cached() == {"salary_multiplier": 1.1}